@@ -12,14 +12,36 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from app.core.config import settings
+from app.core.shards import shard_uris
 
 config = context.config
 
-if config.config_file_name is not None:
+if config.config_file_name is not None and config.attributes.get(
+    "configure_logger", True
+):
     fileConfig(config.config_file_name)
 
 config.set_main_option("sqlalchemy.url", settings.db_uri)
 
+
+def target_uris() -> list[str]:
+    """
+    マイグレーション対象の接続URIを取得する
+
+    DB_BACKEND=sharded の場合はメインDBと全シャードが対象です。
+    config.attributes["db_uris"] で明示的に指定することもできます。
+
+    Returns:
+        list[str]: マイグレーション対象の接続URI
+    """
+    explicit: list[str] | None = config.attributes.get("db_uris")
+    if explicit:
+        return explicit
+    if settings.db_backend == "sharded":
+        return [settings.db_uri, *shard_uris()]
+    return [settings.db_uri]
+
+
 target_metadata = None
 
 
@@ -45,21 +67,23 @@ async def run_migrations_online() -> None:
     """
     オンラインモードでマイグレーションを実行する（非同期）
 
-    実際のデータベース接続を使用してマイグレーションを適用します。
+    実際のデータベース接続を使用して、対象の全データベースへ
+    順にマイグレーションを適用します。
     """
-    configuration = config.get_section(config.config_ini_section) or {}
-    configuration["sqlalchemy.url"] = settings.db_uri
+    for uri in target_uris():
+        configuration = config.get_section(config.config_ini_section) or {}
+        configuration["sqlalchemy.url"] = uri
 
-    connectable = async_engine_from_config(
-        configuration,
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+        connectable = async_engine_from_config(
+            configuration,
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )
 
-    async with connectable.connect() as connection:
-        await connection.run_sync(do_run_migrations)
+        async with connectable.connect() as connection:
+            await connection.run_sync(do_run_migrations)
 
-    await connectable.dispose()
+        await connectable.dispose()
 
 
 def do_run_migrations(connection) -> None:  # type: ignore
@@ -0,0 +1,125 @@
+"""add versions and tombstones
+
+Revision ID: 5f2c8d17e3a9
+Revises: d41e7a0c9b52
+Create Date: 2025-10-29 16:48:02.774513
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2c8d17e3a9"
+down_revision: str | Sequence[str] | None = "d41e7a0c9b52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("folders", "chat_threads")
+USER_ID = sa.text("json_extract(doc, '$.userId')")
+
+
+def _log(table: str, row: str, change: str) -> str:
+    """変更ログへのINSERT文を作成する"""
+    return (
+        "INSERT INTO changes (user_id, entity, entity_id, op) VALUES ("
+        f"json_extract({row}.doc, '$.userId'), '{table}', {row}.id, '{change}');"
+    )
+
+
+def _set_version(table: str) -> str:
+    """直前に記録した変更の連番を行のバージョンにするUPDATE文を作成する"""
+    return f"UPDATE {table} SET version = last_insert_rowid() WHERE id = NEW.id;"
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    for table in TABLES:
+        for event in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER {table}_changes_{event}")
+        op.add_column(
+            table,
+            sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+        )
+
+    # 既存の行は変更ログに記録し直し、その連番をバージョンとする
+    # （since=0 の全件同期でも一意なバージョンでページングできるようにする）
+    op.create_index("ix_changes_entity_id_tmp", "changes", ["entity_id", "seq"])
+    for table in TABLES:
+        op.execute(
+            "INSERT INTO changes (user_id, entity, entity_id, op) "
+            f"SELECT json_extract(doc, '$.userId'), '{table}', id, 'upsert' "
+            f"FROM {table} ORDER BY rowid"
+        )
+        op.execute(
+            f"UPDATE {table} SET version = (SELECT MAX(seq) FROM changes "
+            f"WHERE entity_id = {table}.id AND entity = '{table}')"
+        )
+        op.create_index(f"ix_{table}_user_id_version", table, [USER_ID, "version"])
+    op.drop_index("ix_changes_entity_id_tmp", table_name="changes")
+    # (userId, version) の複合インデックスで代替できる
+    op.drop_index("ix_folders_user_id", table_name="folders")
+
+    op.create_table(
+        "tombstones",
+        sa.Column("entity", sa.Text(), nullable=False),
+        sa.Column("entity_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(),
+            server_default=sa.func.current_timestamp(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("entity", "entity_id"),
+    )
+    op.create_index(
+        "ix_tombstones_user_id_version", "tombstones", ["user_id", "version"]
+    )
+
+    # 行のバージョンは変更ログの連番とし、削除時は墓標を残す。
+    # 更新トリガーは doc の更新に限定し、バージョンの設定で再度発火しないようにする
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_insert AFTER INSERT ON {table} BEGIN "
+            f"{_log(table, 'NEW', 'upsert')} {_set_version(table)} "
+            f"DELETE FROM tombstones WHERE entity = '{table}' AND entity_id = NEW.id; "
+            "END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_update AFTER UPDATE OF doc ON {table} "
+            f"BEGIN {_log(table, 'NEW', 'upsert')} {_set_version(table)} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_delete AFTER DELETE ON {table} BEGIN "
+            f"{_log(table, 'OLD', 'delete')} "
+            "INSERT OR REPLACE INTO tombstones (entity, entity_id, user_id, version) "
+            f"VALUES ('{table}', OLD.id, json_extract(OLD.doc, '$.userId'), "
+            "last_insert_rowid()); END"
+        )
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    for table in TABLES:
+        for event, row, change in (
+            ("INSERT", "NEW", "upsert"),
+            ("UPDATE", "NEW", "upsert"),
+            ("DELETE", "OLD", "delete"),
+        ):
+            op.execute(f"DROP TRIGGER {table}_changes_{event.lower()}")
+            op.execute(
+                f"CREATE TRIGGER {table}_changes_{event.lower()} "
+                f"AFTER {event} ON {table} BEGIN {_log(table, row, change)} END"
+            )
+
+    op.drop_index("ix_tombstones_user_id_version", table_name="tombstones")
+    op.drop_table("tombstones")
+    op.create_index("ix_folders_user_id", "folders", [USER_ID])
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_user_id_version", table_name=table)
+        op.execute(f"ALTER TABLE {table} DROP COLUMN version")
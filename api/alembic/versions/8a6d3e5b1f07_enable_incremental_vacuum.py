@@ -0,0 +1,64 @@
+"""enable incremental vacuum
+
+既存のDBで auto_vacuum の切り替えを反映するにはVACUUMによる再構築が必要です。
+VACUUMはDB全体を書き直し、その間は書き込みロックを保持してファイルサイズ分の
+一時領域も使うため、このリビジョンは空のDB（新規作成時）でのみ再構築します。
+
+データのあるDBでは再構築しないため、アプリケーションを停止した状態で
+オフラインの手順として設定と再構築を実行してください
+（auto_vacuum の設定はVACUUMを実行した接続でのみ反映されます）::
+
+    sqlite3 data/app.db "PRAGMA auto_vacuum = INCREMENTAL; VACUUM;"
+
+再構築するまではインクリメンタルバキュームのメンテナンスは何もしません。
+
+Revision ID: 8a6d3e5b1f07
+Revises: 5f2c8d17e3a9
+Create Date: 2025-11-04 11:37:25.180964
+
+"""
+
+import logging
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a6d3e5b1f07"
+down_revision: str | Sequence[str] | None = "5f2c8d17e3a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+_TABLES = ("folders", "chat_threads", "changes", "tombstones")
+
+
+def _set_auto_vacuum(mode: str) -> None:
+    """auto_vacuum を設定し、空のDBであれば再構築して反映する"""
+    # VACUUMはトランザクション外で実行する
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        bind.exec_driver_sql(f"PRAGMA auto_vacuum = {mode}")
+        has_rows = any(
+            bind.exec_driver_sql(f"SELECT 1 FROM {table} LIMIT 1").first()
+            for table in _TABLES
+        )
+        if has_rows:
+            logger.warning(
+                "database has rows; skipped rebuild. Stop the application and "
+                "run 'PRAGMA auto_vacuum = %s; VACUUM;' to apply it offline",
+                mode,
+            )
+            return
+        bind.exec_driver_sql("VACUUM")
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    _set_auto_vacuum("INCREMENTAL")
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    _set_auto_vacuum("NONE")
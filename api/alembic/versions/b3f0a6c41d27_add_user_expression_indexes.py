@@ -0,0 +1,36 @@
+"""add user expression indexes
+
+Revision ID: b3f0a6c41d27
+Revises: 429214a93c4b
+Create Date: 2025-10-22 14:03:51.902417
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f0a6c41d27"
+down_revision: str | Sequence[str] | None = "429214a93c4b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+USER_ID = sa.text("json_extract(doc, '$.userId')")
+FOLDER_ID = sa.text("json_extract(doc, '$.folderId')")
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    op.create_index("ix_folders_user_id", "folders", [USER_ID])
+    op.create_index(
+        "ix_chat_threads_user_id_folder_id", "chat_threads", [USER_ID, FOLDER_ID]
+    )
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    op.drop_index("ix_chat_threads_user_id_folder_id", table_name="chat_threads")
+    op.drop_index("ix_folders_user_id", table_name="folders")
@@ -0,0 +1,42 @@
+"""add retention horizons
+
+Revision ID: b8e5f1a3c902
+Revises: f3a9c1e8b264
+Create Date: 2025-11-13 14:05:37.210448
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e5f1a3c902"
+down_revision: str | Sequence[str] | None = "f3a9c1e8b264"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    # 保持期間を過ぎて削除した行の最大の連番（変更ログ・墓標ごと）。
+    # これより前の位置から再開するクライアントには全件の再同期を求める
+    op.create_table(
+        "retention_horizons",
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("seq", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.func.current_timestamp(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    op.drop_table("retention_horizons")
@@ -0,0 +1,28 @@
+"""add tombstones version index
+
+Revision ID: c4f7a2d9e518
+Revises: b8e5f1a3c902
+Create Date: 2025-11-13 15:21:04.583912
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f7a2d9e518"
+down_revision: str | Sequence[str] | None = "b8e5f1a3c902"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    # 保持期間を過ぎた墓標をユーザーに関係なくバージョン順に削除する
+    op.create_index("ix_tombstones_version", "tombstones", ["version"])
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    op.drop_index("ix_tombstones_version", table_name="tombstones")
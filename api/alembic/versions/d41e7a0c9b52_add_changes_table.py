@@ -0,0 +1,67 @@
+"""add changes table
+
+Revision ID: d41e7a0c9b52
+Revises: b3f0a6c41d27
+Create Date: 2025-10-27 10:21:36.540118
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d41e7a0c9b52"
+down_revision: str | Sequence[str] | None = "b3f0a6c41d27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("folders", "chat_threads")
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    op.create_table(
+        "changes",
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("entity", sa.Text(), nullable=False),
+        sa.Column("entity_id", sa.Text(), nullable=False),
+        sa.Column("op", sa.Text(), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(),
+            server_default=sa.func.current_timestamp(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("seq"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_changes_user_id_seq", "changes", ["user_id", "seq"])
+
+    # 変更の記録はトリガーで行い、リポジトリ・ライトビハインドのフラッシュ・
+    # 一括投入のいずれの書き込みでも同じトランザクションで記録されるようにする
+    for table in TABLES:
+        for event, row, change in (
+            ("INSERT", "NEW", "upsert"),
+            ("UPDATE", "NEW", "upsert"),
+            ("DELETE", "OLD", "delete"),
+        ):
+            op.execute(
+                f"CREATE TRIGGER {table}_changes_{event.lower()} "
+                f"AFTER {event} ON {table} BEGIN "
+                "INSERT INTO changes (user_id, entity, entity_id, op) VALUES ("
+                f"json_extract({row}.doc, '$.userId'), '{table}', {row}.id, "
+                f"'{change}'); END"
+            )
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    for table in TABLES:
+        for event in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_changes_{event}")
+    op.drop_index("ix_changes_user_id_seq", table_name="changes")
+    op.drop_table("changes")
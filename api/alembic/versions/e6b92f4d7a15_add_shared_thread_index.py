@@ -0,0 +1,35 @@
+"""add shared thread index
+
+Revision ID: e6b92f4d7a15
+Revises: 8a6d3e5b1f07
+Create Date: 2025-11-06 10:12:44.318207
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b92f4d7a15"
+down_revision: str | Sequence[str] | None = "8a6d3e5b1f07"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    # 共有中のスレッドのみを含む部分インデックス（公開読み取りの経路で使用）
+    op.create_index(
+        "ix_chat_threads_shared",
+        "chat_threads",
+        ["id"],
+        sqlite_where=sa.text("json_extract(doc, '$.isShared') = 1"),
+    )
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    op.drop_index("ix_chat_threads_shared", table_name="chat_threads")
@@ -0,0 +1,53 @@
+"""add batch migrations table
+
+Revision ID: f3a9c1e8b264
+Revises: e6b92f4d7a15
+Create Date: 2025-11-10 09:41:27.905312
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9c1e8b264"
+down_revision: str | Sequence[str] | None = "e6b92f4d7a15"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """データベースをアップグレードする"""
+    # バッチマイグレーション（batch_migrations/）の進捗。バッチごとに
+    # 書き換えと同じトランザクションで更新し、中断した位置から再開できるようにする
+    op.create_table(
+        "batch_migrations",
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("target", sa.Text(), nullable=False),
+        sa.Column("last_key", sa.Text(), server_default="", nullable=False),
+        sa.Column("rows_scanned", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rows_changed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("batches", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "started_at",
+            sa.DateTime(),
+            server_default=sa.func.current_timestamp(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.func.current_timestamp(),
+            nullable=False,
+        ),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """データベースをダウングレードする"""
+    op.drop_table("batch_migrations")
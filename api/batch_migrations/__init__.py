@@ -0,0 +1,27 @@
+"""
+バッチマイグレーションの定義
+
+folders / chat_threads のドキュメントの形の変更を、APIサーバーを止めずに
+小さなバッチで適用するマイグレーションを置くディレクトリです
+（ランナーは app.core.batch_migration、実行は scripts/batch_migrate.py）。
+
+ファイル名は適用順に並ぶよう日付で始め（例: 20251110_add_pinned.py）、
+モジュール変数 migration に BatchMigration を定義します。
+where_sql で書き換えが必要な行だけを対象にし、再実行しても冪等にしてください。
+
+Example:
+    ```python
+    from app.core.batch_migration import BatchMigration
+
+    migration = BatchMigration(
+        "20251110_add_pinned",
+        "chat_threads",
+        set_sql="doc = json_set(doc, '$.pinned', json('false'))",
+        where_sql="json_type(doc, '$.pinned') IS NULL",
+        description="チャットスレッドにピン留めフラグを追加",
+    )
+    ```
+
+列への切り出しは、先に Alembic で列を追加してから
+set_sql="folder_id = json_extract(doc, '$.folderId')" のように埋めます。
+"""
@@ -0,0 +1,306 @@
+"""
+オンラインバックアップ・復元
+
+SQLiteのオンラインバックアップAPIで、APIサーバーを止めずにDBファイルを
+小さなページ数ずつ複製します（ステップ間で休止し、開始時点の
+スナップショットを複製）。--compress でgzip圧縮します。
+
+--probe を付けると、バックアップと並行して同じDBへ読み取りと
+書き込みロックの取得（BEGIN IMMEDIATE; ROLLBACK）を繰り返し、
+バックアップ前と実行中のレイテンシ（p50/p95/p99/max）を比較して報告します。
+
+restore はAPIサーバーを停止してから実行してください。
+
+Usage:
+    python scripts/backup_db.py backup --compress --probe
+    python scripts/backup_db.py backup --db-uri sqlite+aiosqlite:///./data/app.db \\
+        --out data/backups/app.db --step-pages 128 --step-sleep 0.02
+    python scripts/backup_db.py restore data/backups/main-20250101T000000Z.db.gz
+"""
+
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, "src")
+
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app.core.backup import (  # noqa: E402
+    BackupError,
+    backup_database,
+    backup_name,
+    database_paths,
+    restore_database,
+)
+from app.core.clock import utc_now  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """
+    レイテンシのパーセンタイルを求める
+
+    Args:
+        samples: レイテンシ（秒）
+
+    Returns:
+        dict[str, float]: 件数とp50/p95/p99/max（ミリ秒）
+    """
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {
+            "count": len(samples),
+            "p50_ms": value,
+            "p95_ms": value,
+            "p99_ms": value,
+            "max_ms": value,
+        }
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "p50_ms": round(q[49] * 1000, 3),
+        "p95_ms": round(q[94] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+class Probe:
+    """
+    バックアップと並行して同じDBへ問い合わせるレイテンシ計測スレッド
+
+    読み取り（一覧相当のSELECT）と、書き込みロックの取得・解放
+    （データは変更しない）を交互に実行します。
+
+    Attributes:
+        reads: 読み取りのレイテンシ（秒）
+        writes: 書き込みロック取得のレイテンシ（秒）
+    """
+
+    def __init__(self, db_path: Path, interval: float) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            db_path: 計測対象のDBファイル
+            interval: 問い合わせの間隔（秒）
+        """
+        self.reads: list[float] = []
+        self.writes: list[float] = []
+        self._db_path = db_path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """計測を開始する"""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """計測を停止する"""
+        self._stop.set()
+        self._thread.join()
+
+    def take(self) -> tuple[list[float], list[float]]:
+        """
+        ここまでの計測値を取り出して記録を空にする
+
+        Returns:
+            tuple[list[float], list[float]]: (読み取り, 書き込みロック取得) のレイテンシ
+        """
+        reads, writes = self.reads, self.writes
+        self.reads, self.writes = [], []
+        return reads, writes
+
+    def _run(self) -> None:
+        """計測スレッドの本体"""
+        conn = sqlite3.connect(self._db_path, isolation_level=None, timeout=30)
+        try:
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                conn.execute(
+                    "SELECT id, doc FROM folders ORDER BY rowid DESC LIMIT 50"
+                ).fetchall()
+                self.reads.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("ROLLBACK")
+                self.writes.append(time.perf_counter() - started)
+                self._stop.wait(self._interval)
+        finally:
+            conn.close()
+
+
+def progress_printer(database: str) -> Callable[[int, int], None]:
+    """
+    バックアップの進捗を表示する関数を作成する
+
+    Args:
+        database: DB名
+
+    Returns:
+        Callable[[int, int], None]: (残りページ数, 全ページ数) を受け取る関数
+    """
+
+    def _print(remaining: int, total: int) -> None:
+        done = total - remaining
+        print(f"\r  {database}: {done:,}/{total:,} pages", end="", flush=True)
+
+    return _print
+
+
+def _sources(db_uri: str | None) -> dict[str, Path]:
+    """バックアップ対象のDBファイルを取得する"""
+    if db_uri is None:
+        return database_paths()
+    database = make_url(db_uri).database
+    if not database:
+        raise SystemExit(f"Unsupported DB URI: {db_uri}")
+    return {"main": Path(database)}
+
+
+def backup(args: argparse.Namespace) -> int:
+    """
+    バックアップを実行する
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        int: 終了コード
+    """
+    sources = _sources(args.db_uri)
+    if args.out is not None and len(sources) > 1:
+        raise SystemExit("--out cannot be used with multiple databases (sharded)")
+    now = utc_now()
+    directory = Path(args.dir or settings.backup_dir)
+
+    entries: list[dict[str, object]] = []
+    for database, source in sources.items():
+        dest = args.out or directory / backup_name(
+            database, now, compress=args.compress
+        )
+        probe = Probe(source, args.probe_interval) if args.probe else None
+        baseline = during = ([], [])
+        if probe is not None:
+            probe.start()
+            time.sleep(args.probe_baseline)
+            baseline = probe.take()
+
+        try:
+            result = backup_database(
+                source,
+                dest,
+                step_pages=args.step_pages,
+                step_sleep=args.step_sleep,
+                compress=args.compress,
+                progress=progress_printer(database),
+            )
+        except BackupError as exc:
+            print(f"\n❌ {exc}", file=sys.stderr)
+            return 1
+        finally:
+            if probe is not None:
+                during = probe.take()
+                probe.stop()
+        print()
+
+        entry: dict[str, object] = result.model_copy(
+            update={"database": database}
+        ).model_dump()
+        if probe is not None:
+            entry["latency"] = {
+                "read": {
+                    "baseline": percentiles(baseline[0]),
+                    "during_backup": percentiles(during[0]),
+                },
+                "write_lock": {
+                    "baseline": percentiles(baseline[1]),
+                    "during_backup": percentiles(during[1]),
+                },
+            }
+        entries.append(entry)
+        print(
+            f"✅ {database}: {result.pages:,} pages in {result.steps:,} steps, "
+            f"{result.duration_seconds:.2f}s -> {result.path} "
+            f"({result.size_bytes:,} bytes)"
+        )
+
+    print(json.dumps({"backups": entries}, ensure_ascii=False, indent=2))
+    return 0
+
+
+def restore(args: argparse.Namespace) -> int:
+    """
+    バックアップから復元する
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        int: 終了コード
+    """
+    dest = _sources(args.db_uri or settings.db_uri)["main"]
+    started = time.perf_counter()
+    try:
+        pages = restore_database(args.backup, dest)
+    except BackupError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"✅ Restored {pages:,} pages from {args.backup} into {dest} "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backup_parser = commands.add_parser("backup", help="オンラインバックアップを作成")
+    backup_parser.add_argument(
+        "--db-uri", help="バックアップ元のDB URI（省略時はDB_URI、シャードを含む）"
+    )
+    backup_parser.add_argument("--dir", help="保存先ディレクトリ（省略時はBACKUP_DIR）")
+    backup_parser.add_argument("--out", type=Path, help="保存先ファイル")
+    backup_parser.add_argument("--compress", action="store_true", help="gzip圧縮する")
+    backup_parser.add_argument(
+        "--step-pages", type=int, help="1ステップでコピーするページ数"
+    )
+    backup_parser.add_argument(
+        "--step-sleep", type=float, help="ステップ間の休止時間（秒）"
+    )
+    backup_parser.add_argument(
+        "--probe", action="store_true", help="並行問い合わせのレイテンシを計測する"
+    )
+    backup_parser.add_argument(
+        "--probe-baseline",
+        type=float,
+        default=2.0,
+        help="バックアップ前にベースラインを計測する時間（秒）",
+    )
+    backup_parser.add_argument(
+        "--probe-interval", type=float, default=0.005, help="問い合わせの間隔（秒）"
+    )
+    backup_parser.set_defaults(handler=backup)
+
+    restore_parser = commands.add_parser("restore", help="バックアップから復元")
+    restore_parser.add_argument("backup", type=Path, help="バックアップファイル")
+    restore_parser.add_argument("--db-uri", help="復元先のDB URI（省略時はDB_URI）")
+    restore_parser.set_defaults(handler=restore)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(args.handler(args))
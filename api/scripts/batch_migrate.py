@@ -0,0 +1,236 @@
+"""
+バッチマイグレーションの実行
+
+batch_migrations/ に置いたドキュメントの書き換えを、APIサーバーを止めずに
+小さなバッチ（短いトランザクション）で適用します。進捗は各DBの
+batch_migrations テーブルに記録し、中断しても次回は続きから再開します。
+DB_BACKEND=sharded の場合はメインDBと全シャードへ順に適用します。
+
+事前に alembic upgrade head で batch_migrations テーブルを作成してください。
+
+Usage:
+    python scripts/batch_migrate.py status --pending
+    python scripts/batch_migrate.py run
+    python scripts/batch_migrate.py run 20251110_add_pinned --batch-size 500 \\
+        --pause 0.1 --max-batches 100
+    python scripts/batch_migrate.py reset 20251110_add_pinned
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, "src")
+
+from app.core.batch_migration import (  # noqa: E402
+    BatchMigration,
+    BatchMigrationError,
+    BatchMigrationRunner,
+    BatchProgress,
+    load_migrations,
+)
+from app.core.config import settings  # noqa: E402
+from app.core.db import create_engine  # noqa: E402
+from app.core.shards import shard_uris  # noqa: E402
+
+API_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _targets(db_uri: str | None) -> dict[str, str]:
+    """適用先のDB名と接続URIを取得する"""
+    if db_uri is not None:
+        return {"main": db_uri}
+    uris = {"main": settings.db_uri}
+    if settings.db_backend == "sharded":
+        for shard, uri in enumerate(shard_uris()):
+            uris[f"shard{shard}"] = uri
+    return uris
+
+
+def _select(args: argparse.Namespace) -> list[BatchMigration]:
+    """対象のマイグレーションを読み込む（名前の指定がなければ全件）"""
+    try:
+        migrations = load_migrations(args.dir)
+    except BatchMigrationError as exc:
+        raise SystemExit(f"❌ {exc}") from exc
+    names: list[str] = getattr(args, "names", None) or []
+    unknown = set(names) - {m.name for m in migrations}
+    if unknown:
+        raise SystemExit(f"❌ Unknown batch migrations: {sorted(unknown)}")
+    return [m for m in migrations if not names or m.name in names]
+
+
+def _runner(uri: str, args: argparse.Namespace) -> BatchMigrationRunner:
+    """DBのランナーを作成する"""
+    return BatchMigrationRunner(
+        create_engine(uri),
+        batch_size=getattr(args, "batch_size", None),
+        pause=getattr(args, "pause", None),
+        target_seconds=getattr(args, "target_seconds", None),
+    )
+
+
+def progress_printer(database: str, name: str) -> Callable[[BatchProgress], None]:
+    """
+    進捗を1行で上書き表示する関数を作成する
+
+    Args:
+        database: DB名
+        name: マイグレーション名
+
+    Returns:
+        Callable[[BatchProgress], None]: バッチごとに呼び出す関数
+    """
+
+    def _print(progress: BatchProgress) -> None:
+        print(
+            f"\r⏳ {database} {name}: {progress.batches:,} batches, "
+            f"{progress.rows_scanned:,} scanned, {progress.rows_changed:,} changed",
+            end="",
+            flush=True,
+        )
+
+    return _print
+
+
+async def status(args: argparse.Namespace) -> int:
+    """
+    進捗を表示する
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        int: 終了コード
+    """
+    migrations = _select(args)
+    entries: list[dict[str, object]] = []
+    for database, uri in _targets(args.db_uri).items():
+        runner = _runner(uri, args)
+        try:
+            for migration in migrations:
+                progress = await runner.status(migration)
+                entry: dict[str, object] = {
+                    "database": database,
+                    "name": migration.name,
+                    "table": migration.table,
+                    "progress": progress.model_dump() if progress else None,
+                }
+                if args.pending:
+                    entry["pending"] = await runner.pending(migration)
+                entries.append(entry)
+        finally:
+            await runner.engine.dispose()
+    print(json.dumps({"migrations": entries}, ensure_ascii=False, indent=2))
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    """
+    マイグレーションを前回の続きから適用する
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        int: 終了コード（--max-batches で未完了のものが残った場合は2）
+    """
+    migrations = _select(args)
+    incomplete = False
+    for database, uri in _targets(args.db_uri).items():
+        runner = _runner(uri, args)
+        try:
+            for migration in migrations:
+                progress = await runner.run(
+                    migration,
+                    max_batches=args.max_batches,
+                    on_batch=progress_printer(database, migration.name),
+                )
+                print()
+                if progress.completed_at is None:
+                    incomplete = True
+                    print(
+                        f"⏸️  {database} {migration.name}: paused at "
+                        f"{progress.last_key!r} ({progress.rows_changed:,} changed)"
+                    )
+                else:
+                    print(
+                        f"✅ {database} {migration.name}: {progress.rows_changed:,}"
+                        f" of {progress.rows_scanned:,} rows changed in "
+                        f"{progress.batches:,} batches"
+                    )
+        finally:
+            await runner.engine.dispose()
+    return 2 if incomplete else 0
+
+
+async def reset(args: argparse.Namespace) -> int:
+    """
+    進捗を削除する（次回の run は先頭から）
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        int: 終了コード
+    """
+    migrations = _select(args)
+    for database, uri in _targets(args.db_uri).items():
+        runner = _runner(uri, args)
+        try:
+            for migration in migrations:
+                await runner.reset(migration)
+                print(f"🔄 {database} {migration.name}: progress reset")
+        finally:
+            await runner.engine.dispose()
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--db-uri", help="適用先のDB URI（省略時はDB_URI、シャードを含む）"
+    )
+    parser.add_argument(
+        "--dir",
+        type=Path,
+        default=API_ROOT / "batch_migrations",
+        help="マイグレーションの定義を置いたディレクトリ",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status_parser = commands.add_parser("status", help="進捗を表示")
+    status_parser.add_argument(
+        "--pending",
+        action="store_true",
+        help="書き換えが必要な残りの行数も数える（テーブル全体を走査）",
+    )
+    status_parser.set_defaults(handler=status, names=[])
+
+    run_parser = commands.add_parser("run", help="マイグレーションを適用")
+    run_parser.add_argument(
+        "names", nargs="*", help="マイグレーション名（省略時は全件）"
+    )
+    run_parser.add_argument("--batch-size", type=int, help="1バッチの行数の上限")
+    run_parser.add_argument("--pause", type=float, help="バッチ間の休止時間（秒）")
+    run_parser.add_argument(
+        "--target-seconds", type=float, help="バッチを小さくする1バッチの所要時間（秒）"
+    )
+    run_parser.add_argument(
+        "--max-batches", type=int, help="この実行でコミットするバッチ数の上限"
+    )
+    run_parser.set_defaults(handler=run)
+
+    reset_parser = commands.add_parser("reset", help="進捗を削除")
+    reset_parser.add_argument("names", nargs="+", help="マイグレーション名")
+    reset_parser.set_defaults(handler=reset)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(asyncio.run(args.handler(args)))
@@ -0,0 +1,149 @@
+"""
+認証オーバーヘッドのベンチマーク
+
+リクエストごとの認証処理（get_current_user）の所要時間を、
+ヘッダー認証、JWT認証のキャッシュミス（毎回異なるトークン）と
+キャッシュヒット（同じトークン）について計測し、p50/p95/p99（マイクロ秒）を出力します。
+
+JWTはRS256（2048ビット）とHS256の両方を計測します。
+
+Usage:
+    python scripts/bench_auth.py --ops 2000
+    python scripts/bench_auth.py --output bench-auth.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, "src")
+sys.path.insert(0, ".")
+
+from app.api.auth import get_current_user  # noqa: E402
+from app.core import tokens  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.tokens import TokenVerifier  # noqa: E402
+from tests.jwt_tools import encode_token, generate_rsa_jwk  # noqa: E402
+
+HMAC_JWK = {
+    "kty": "oct",
+    "kid": "bench-hmac",
+    "k": "YmVuY2gtc2VjcmV0LWJlbmNoLXNlY3JldA",
+}
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """
+    計測結果（秒）からマイクロ秒のパーセンタイルを求める
+
+    Args:
+        samples: 1回ごとの所要時間（秒）
+
+    Returns:
+        dict[str, float]: p50/p95/p99/mean（マイクロ秒）
+    """
+    q = statistics.quantiles(samples, n=100)
+    return {
+        "p50_us": round(q[49] * 1e6, 2),
+        "p95_us": round(q[94] * 1e6, 2),
+        "p99_us": round(q[98] * 1e6, 2),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+    }
+
+
+async def measure(ops: int, call: Callable[[int], Awaitable[Any]]) -> dict[str, float]:
+    """
+    認証処理をops回実行して所要時間を計測する
+
+    Args:
+        ops: 実行回数
+        call: i回目の認証処理
+
+    Returns:
+        dict[str, float]: パーセンタイル（マイクロ秒）
+    """
+    samples: list[float] = []
+    for i in range(ops):
+        started = time.perf_counter()
+        await call(i)
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=2000, help="計測ごとの実行回数")
+    parser.add_argument("--bits", type=int, default=2048, help="RSA鍵のビット数")
+    parser.add_argument("--output", type=Path, help="結果JSONの出力先")
+    return parser.parse_args()
+
+
+async def main() -> int:
+    """ベンチマークを実行する"""
+    args = parse_args()
+    rsa_jwk = generate_rsa_jwk("bench-rsa", bits=args.bits)
+    public = {k: v for k, v in rsa_jwk.items() if k != "d"}
+    exp = time.time() + 3600
+
+    def issue(jwk: dict[str, Any], count: int) -> list[str]:
+        return [
+            encode_token(
+                {"sub": f"user-{i}", "email": "b@example.com", "exp": exp}, jwk
+            )
+            for i in range(count)
+        ]
+
+    rsa_tokens = issue(rsa_jwk, args.ops)
+    hmac_tokens = issue(HMAC_JWK, args.ops)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jwks_path = Path(tmp) / "jwks.json"
+        jwks_path.write_text(json.dumps({"keys": [public, HMAC_JWK]}))
+        verifier = TokenVerifier(jwks_path=str(jwks_path), cache_size=args.ops * 4)
+        await verifier.start()
+    tokens._verifier = verifier  # noqa: SLF001
+
+    async def headers(_: int) -> Any:
+        return await get_current_user("bench-user", "b@example.com", None)
+
+    def bearer(token_list: list[str], cached: bool) -> Callable[[int], Awaitable[Any]]:
+        async def call(i: int) -> Any:
+            token = token_list[0 if cached else i]
+            return await get_current_user(None, None, f"Bearer {token}")
+
+        return call
+
+    results: dict[str, dict[str, float]] = {}
+    settings.auth_mode = "headers"
+    results["headers"] = await measure(args.ops, headers)
+    settings.auth_mode = "jwt"
+    results["rs256_miss"] = await measure(args.ops, bearer(rsa_tokens, False))
+    results["rs256_hit"] = await measure(args.ops, bearer(rsa_tokens, True))
+    results["hs256_miss"] = await measure(args.ops, bearer(hmac_tokens, False))
+    results["hs256_hit"] = await measure(args.ops, bearer(hmac_tokens, True))
+    await verifier.stop()
+
+    print(f"{'mode':<12}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}  (µs)")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<12}{stats['p50_us']:>10.1f}{stats['p95_us']:>10.1f}"
+            f"{stats['p99_us']:>10.1f}{stats['mean_us']:>10.1f}"
+        )
+
+    if args.output:
+        report = {"ops": args.ops, "rsa_bits": args.bits, "results": results}
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,406 @@
+"""
+Repositoryベンチマーク
+
+実運用規模のデータ（既定で10k/100k/1M件のフォルダとスレッド）を投入した
+SQLiteデータベースに対して、リポジトリ操作ごとのレイテンシ（p50/p95/p99）と
+スループット（ops/sec）を計測し、JSONで出力します。
+
+前回の結果をベースラインとして渡すと、閾値を超えて悪化した操作を
+報告して終了コード1で終了します。
+
+Usage:
+    python scripts/bench_repo.py --sizes 10000,100000 --output bench.json
+    python scripts/bench_repo.py --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, "src")
+
+from alembic.config import Config  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app.core.clock import to_api_datetime  # noqa: E402
+from app.core.db import create_engine  # noqa: E402
+from app.core.ids import new_uuid  # noqa: E402
+from app.models.schemas import (  # noqa: E402
+    ChatThreadCreate,
+    ChatThreadUpdate,
+    FolderCreate,
+    FolderUpdate,
+)
+from app.repositories.sqlite import (  # noqa: E402
+    SQLiteChatThreadRepository,
+    SQLiteFolderRepository,
+)
+
+API_ROOT = Path(__file__).resolve().parents[1]
+PAGE_SIZE = 50
+
+
+def migrate(db_path: Path) -> None:
+    """
+    ベンチマーク用データベースにマイグレーションを適用する
+
+    Args:
+        db_path: SQLiteファイルのパス
+    """
+    config = Config(str(API_ROOT / "alembic.ini"))
+    config.attributes["db_uris"] = [f"sqlite+aiosqlite:///{db_path}"]
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def seed(db_path: Path, size: int, users: int) -> dict[str, Any]:
+    """
+    フォルダとスレッドをそれぞれsize件、usersユーザーに分散して投入する
+
+    投入はリポジトリと同じドキュメント形式で、sqlite3のexecutemanyを使用します。
+
+    Args:
+        db_path: SQLiteファイルのパス
+        size: フォルダ・スレッドそれぞれの件数
+        users: ユーザー数
+
+    Returns:
+        dict[str, Any]: 計測で使用するID・ユーザー・フォルダのサンプル
+    """
+    now_utc = datetime.now(UTC)
+    created_at = to_api_datetime(now_utc)
+    now = now_utc.isoformat(" ")
+    user_ids = [f"bench-user-{i:06d}" for i in range(users)]
+    folders_per_user = max(1, size // users // 10)
+    user_folders: dict[str, list[str]] = {u: [] for u in user_ids}
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    folder_rows: list[tuple[str, str, str, str]] = []
+    for i in range(size):
+        user_id = user_ids[i % users]
+        folder_id = new_uuid()
+        if len(user_folders[user_id]) < folders_per_user:
+            user_folders[user_id].append(folder_id)
+        doc = {
+            "id": folder_id,
+            "name": f"Folder {i}",
+            "type": "chat",
+            "createdAt": created_at,
+            "userId": user_id,
+            "email": f"{user_id}@example.com",
+        }
+        folder_rows.append((folder_id, json.dumps(doc), now, now))
+    conn.executemany(
+        "INSERT INTO folders (id, doc, created_at, updated_at) VALUES (?, ?, ?, ?)",
+        folder_rows,
+    )
+
+    thread_rows: list[tuple[str, str, str, str]] = []
+    for i in range(size):
+        user_id = user_ids[i % users]
+        thread_id = new_uuid()
+        doc = {
+            "id": thread_id,
+            "name": f"Thread {i}",
+            "prompt": "You are a helpful assistant",
+            "temperature": 0.7,
+            "folderId": random.choice(user_folders[user_id]),
+            "isShared": False,
+            "createdAt": created_at,
+            "sharedAt": None,
+            "userId": user_id,
+            "email": f"{user_id}@example.com",
+        }
+        thread_rows.append((thread_id, json.dumps(doc), now, now))
+    conn.executemany(
+        "INSERT INTO chat_threads (id, doc, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?)",
+        thread_rows,
+    )
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    return {
+        "users": user_ids,
+        "user_folders": user_folders,
+        "folder_ids": [row[0] for row in random.sample(folder_rows, min(size, 1000))],
+        "thread_ids": [row[0] for row in random.sample(thread_rows, min(size, 1000))],
+        "rows_per_user": size // users,
+    }
+
+
+def summarize(samples: list[float], wall: float) -> dict[str, float]:
+    """
+    レイテンシのサンプルを集計する
+
+    Args:
+        samples: 1操作ごとの所要時間（秒）
+        wall: 全操作の合計経過時間（秒）
+
+    Returns:
+        dict[str, float]: p50/p95/p99（ミリ秒）とops/sec
+    """
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "p50_ms": round(quantiles[49] * 1000, 4),
+        "p95_ms": round(quantiles[94] * 1000, 4),
+        "p99_ms": round(quantiles[98] * 1000, 4),
+        "ops_per_sec": round(len(samples) / wall, 2),
+    }
+
+
+async def measure(
+    factory: async_sessionmaker[AsyncSession],
+    ops: int,
+    op: Callable[[AsyncSession, int], Awaitable[object]],
+) -> dict[str, float]:
+    """
+    1リクエスト1セッションの条件で操作をops回実行して計測する
+
+    Args:
+        factory: セッションファクトリ
+        ops: 実行回数
+        op: セッションと試行番号を受け取る操作
+
+    Returns:
+        dict[str, float]: 集計結果
+    """
+    samples: list[float] = []
+    wall_start = time.perf_counter()
+    for i in range(ops):
+        started = time.perf_counter()
+        async with factory() as session:
+            await op(session, i)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, time.perf_counter() - wall_start)
+
+
+async def run_size(
+    db_path: Path, size: int, users: int, ops: int
+) -> dict[str, dict[str, float]]:
+    """
+    1つのデータ規模について全操作を計測する
+
+    Args:
+        db_path: SQLiteファイルのパス
+        size: フォルダ・スレッドそれぞれの件数
+        users: ユーザー数
+        ops: 操作ごとの実行回数
+
+    Returns:
+        dict[str, dict[str, float]]: 操作名ごとの集計結果
+    """
+    print(f"Seeding {size:,} folders and threads across {users:,} users...")
+    sample = seed(db_path, size, users)
+    deep_offset = max(0, sample["rows_per_user"] - PAGE_SIZE)
+
+    engine = create_engine(f"sqlite+aiosqlite:///{db_path}")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    user_ids: list[str] = sample["users"]
+    user_folders: dict[str, list[str]] = sample["user_folders"]
+    created_folders: list[str] = []
+    created_threads: list[str] = []
+
+    def user(i: int) -> str:
+        return user_ids[(i * 7919) % len(user_ids)]
+
+    async def folder_create(s: AsyncSession, i: int) -> None:
+        read = await SQLiteFolderRepository(s).create(
+            FolderCreate(name=f"Bench {i}", type="chat"),
+            user_id=user(i),
+            email="bench@example.com",
+        )
+        created_folders.append(read.id)
+
+    async def thread_create(s: AsyncSession, i: int) -> None:
+        u = user(i)
+        read = await SQLiteChatThreadRepository(s).create(
+            ChatThreadCreate(
+                name=f"Bench {i}",
+                prompt="bench",
+                temperature=0.5,
+                folderId=user_folders[u][0],
+            ),
+            user_id=u,
+            email="bench@example.com",
+        )
+        created_threads.append(read.id)
+
+    folder_ids: list[str] = sample["folder_ids"]
+    thread_ids: list[str] = sample["thread_ids"]
+    cases: dict[str, Callable[[AsyncSession, int], Awaitable[object]]] = {
+        "folders.get": lambda s, i: SQLiteFolderRepository(s).get(
+            folder_ids[i % len(folder_ids)]
+        ),
+        "folders.list.shallow": lambda s, i: SQLiteFolderRepository(s).list(
+            user(i), limit=PAGE_SIZE
+        ),
+        "folders.list.deep": lambda s, i: SQLiteFolderRepository(s).list(
+            user(i), limit=PAGE_SIZE, offset=deep_offset
+        ),
+        "folders.create": folder_create,
+        "folders.update": lambda s, i: SQLiteFolderRepository(s).update(
+            created_folders[i % len(created_folders)],
+            FolderUpdate(name=f"Renamed {i}"),
+        ),
+        "folders.delete": lambda s, i: SQLiteFolderRepository(s).delete(
+            created_folders[i]
+        ),
+        "chat_threads.get": lambda s, i: SQLiteChatThreadRepository(s).get(
+            thread_ids[i % len(thread_ids)]
+        ),
+        "chat_threads.list.shallow": lambda s, i: SQLiteChatThreadRepository(s).list(
+            user(i), limit=PAGE_SIZE
+        ),
+        "chat_threads.list.deep": lambda s, i: SQLiteChatThreadRepository(s).list(
+            user(i), limit=PAGE_SIZE, offset=deep_offset
+        ),
+        "chat_threads.list.folder": lambda s, i: SQLiteChatThreadRepository(s).list(
+            user(i), limit=PAGE_SIZE, folder_id=user_folders[user(i)][0]
+        ),
+        "chat_threads.create": thread_create,
+        "chat_threads.update": lambda s, i: SQLiteChatThreadRepository(s).update(
+            created_threads[i % len(created_threads)],
+            ChatThreadUpdate(temperature=(i % 10) / 10),
+        ),
+        "chat_threads.delete": lambda s, i: SQLiteChatThreadRepository(s).delete(
+            created_threads[i]
+        ),
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for name, op in cases.items():
+        results[name] = await measure(factory, ops, op)
+        print(f"  {name:<28} {results[name]}")
+
+    await engine.dispose()
+    return results
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    ベースラインと比較して閾値を超えた悪化を列挙する
+
+    p95レイテンシの増加率またはops/secの減少率がthresholdを超えた操作を悪化とみなします。
+
+    Args:
+        current: 今回の結果
+        baseline: ベースラインの結果
+        threshold: 許容する悪化率（0.2なら20%）
+
+    Returns:
+        list[str]: 悪化した操作の説明
+    """
+    regressions: list[str] = []
+    for size, ops in current["results"].items():
+        for name, now in ops.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            if now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{size} {name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms"
+                )
+            if now["ops_per_sec"] < before["ops_per_sec"] * (1 - threshold):
+                regressions.append(
+                    f"{size} {name}: ops/sec "
+                    f"{before['ops_per_sec']} -> {now['ops_per_sec']}"
+                )
+    return regressions
+
+
+def git_revision() -> str | None:
+    """現在のgitコミットを取得する（取得できない場合はNone）"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="フォルダ・スレッドそれぞれの件数（カンマ区切り）",
+    )
+    parser.add_argument("--users", type=int, default=1000, help="ユーザー数")
+    parser.add_argument("--ops", type=int, default=500, help="操作ごとの実行回数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    parser.add_argument("--output", type=Path, help="結果JSONの出力先")
+    parser.add_argument("--baseline", type=Path, help="比較するベースラインJSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="許容する悪化率（既定20%%）"
+    )
+    return parser.parse_args()
+
+
+async def main() -> int:
+    """ベンチマークを実行し、悪化があれば1を返す"""
+    args = parse_args()
+    random.seed(args.seed)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    report: dict[str, Any] = {
+        "meta": {
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "users": args.users,
+            "ops": args.ops,
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db_path = Path(tmp) / f"bench-{size}.db"
+            await asyncio.to_thread(migrate, db_path)
+            report["results"][str(size)] = await run_size(
+                db_path, size, args.users, args.ops
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
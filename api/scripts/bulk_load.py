@@ -0,0 +1,374 @@
+"""
+高速バルクローダー
+
+NDJSON（1行1ドキュメント）ファイルをストリームで読み込み、
+FolderCreate / ChatThreadCreate の検証規則でチャンク単位に検証したうえで、
+sqlite3 の executemany と大きなトランザクションでまとめて投入します。
+
+投入中は接続単位のPRAGMA（synchronous=OFF 等）を緩め、対象テーブルの
+インデックスを一時的に削除して投入後に再作成します。
+
+各行には所有者の userId と email が必要です。id / createdAt があれば
+そのまま引き継ぎ（他ストアからの移行用）、なければ生成します。
+
+Usage:
+    python scripts/bulk_load.py --table folders folders.ndjson
+    python scripts/bulk_load.py --table chat_threads threads-*.ndjson \\
+        --rejects rejects.ndjson
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, TextIO
+
+sys.path.insert(0, "src")
+
+from pydantic import BaseModel, TypeAdapter, ValidationError  # noqa: E402
+
+from app.core.clock import to_api_datetime  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.ids import new_uuid  # noqa: E402
+from app.models.schemas import ChatThreadCreate, FolderCreate  # noqa: E402
+
+SQLITE_PREFIX = "sqlite+aiosqlite:///"
+
+type Row = tuple[str, str, str, str]
+
+
+class Owner(BaseModel):
+    """
+    投入行の所有者情報
+
+    Attributes:
+        userId: ユーザーID
+        email: メールアドレス
+    """
+
+    userId: str  # noqa: N815
+    email: str
+
+
+OWNERS = TypeAdapter(list[Owner])
+CREATES: dict[str, TypeAdapter[Any]] = {
+    "folders": TypeAdapter(list[FolderCreate]),
+    "chat_threads": TypeAdapter(list[ChatThreadCreate]),
+}
+
+
+def iter_chunks(paths: list[Path], size: int) -> Iterator[list[tuple[str, str]]]:
+    """
+    入力ファイルを行単位でストリームし、チャンクごとに返す
+
+    Args:
+        paths: NDJSONファイル
+        size: チャンクの行数
+
+    Yields:
+        list[tuple[str, str]]: (行の位置, 行文字列) のチャンク
+    """
+    chunk: list[tuple[str, str]] = []
+    for path in paths:
+        with path.open(encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                chunk.append((f"{path}:{number}", line))
+                if len(chunk) >= size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+class Clock:
+    """
+    チャンク単位で共有する投入時刻
+
+    行ごとの時刻生成・書式化を避けるため、チャンクごとに1回だけ計算します。
+
+    Attributes:
+        api: API出力形式の作成日時（createdAt）
+        db: DB列形式のUTC日時（created_at / updated_at）
+    """
+
+    def __init__(self) -> None:
+        """コンストラクタ"""
+        now_utc = datetime.now(UTC)
+        self.api = to_api_datetime(now_utc)
+        self.db = now_utc.isoformat(" ")
+
+
+ENCODE = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def to_row(
+    table: str, obj: dict[str, Any], dto: Any, owner: Owner, clock: Clock
+) -> Row:
+    """
+    検証済みの行をテーブルの行（id, doc, created_at, updated_at）に変換する
+
+    Args:
+        table: 投入先テーブル
+        obj: 入力のJSONオブジェクト
+        dto: 検証済みのCreateモデル
+        owner: 所有者情報
+        clock: チャンク共有の投入時刻
+
+    Returns:
+        Row: 挿入する行
+    """
+    created_raw = obj.get("createdAt")
+    created_db = (
+        datetime.fromisoformat(created_raw).astimezone(UTC).isoformat(" ")
+        if created_raw
+        else clock.db
+    )
+    doc_id = obj.get("id") or new_uuid()
+    created_at = created_raw or clock.api
+
+    if table == "folders":
+        doc: dict[str, Any] = {
+            "id": doc_id,
+            "name": dto.name,
+            "type": dto.type,
+            "createdAt": created_at,
+            "userId": owner.userId,
+            "email": owner.email,
+        }
+    else:
+        doc = {
+            "id": doc_id,
+            "name": dto.name,
+            "prompt": dto.prompt,
+            "temperature": dto.temperature,
+            "folderId": dto.folder_id,
+            "isShared": dto.is_shared,
+            "createdAt": created_at,
+            "sharedAt": dto.shared_at,
+            "userId": owner.userId,
+            "email": owner.email,
+        }
+    return (doc_id, ENCODE(doc), created_db, clock.db)
+
+
+def validate_chunk(
+    table: str, chunk: list[tuple[str, str]], rejects: TextIO | None
+) -> tuple[list[Row], int]:
+    """
+    チャンクを検証して挿入行に変換する
+
+    まずチャンク全体を一括検証し、失敗した場合のみ行単位で検証して
+    不正な行を除外します。
+
+    Args:
+        table: 投入先テーブル
+        chunk: (行の位置, 行文字列) のチャンク
+        rejects: 不正な行の書き出し先（任意）
+
+    Returns:
+        tuple[list[Row], int]: 挿入行と除外した行数
+    """
+    parsed: list[tuple[str, Any]] = []
+    rejected = 0
+    for where, line in chunk:
+        try:
+            parsed.append((where, json.loads(line)))
+        except json.JSONDecodeError as e:
+            rejected += _reject(rejects, where, line, str(e))
+
+    objs = [obj for _, obj in parsed]
+    clock = Clock()
+    try:
+        dtos = CREATES[table].validate_python(objs)
+        owners = OWNERS.validate_python(objs)
+        rows = [
+            to_row(table, o, d, w, clock)
+            for o, d, w in zip(objs, dtos, owners, strict=True)
+        ]
+        return rows, rejected
+    except (ValidationError, ValueError):
+        pass
+
+    valid: list[Row] = []
+    for where, obj in parsed:
+        try:
+            dto = CREATES[table].validate_python([obj])[0]
+            owner = OWNERS.validate_python([obj])[0]
+            valid.append(to_row(table, obj, dto, owner, clock))
+        except (ValidationError, ValueError) as e:
+            rejected += _reject(rejects, where, json.dumps(obj), str(e))
+    return valid, rejected
+
+
+def _reject(rejects: TextIO | None, where: str, line: str, error: str) -> int:
+    """不正な行を書き出し、除外件数（1）を返す"""
+    if rejects is not None:
+        record = {"where": where, "error": error, "line": line.rstrip("\n")}
+        rejects.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return 1
+
+
+def relax_pragmas(conn: sqlite3.Connection, exclusive: bool) -> None:
+    """
+    投入用に接続単位のPRAGMAを緩める
+
+    設定はこの接続にのみ有効で、接続を閉じると元に戻ります。
+
+    Args:
+        conn: sqlite3接続
+        exclusive: 投入中に他の接続をロックアウトするか
+    """
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")
+    if exclusive:
+        conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+
+
+def drop_indexes(conn: sqlite3.Connection, table: str) -> list[tuple[str, str]]:
+    """
+    テーブルの明示的なインデックスを削除し、再作成用の定義を返す
+
+    Args:
+        conn: sqlite3接続
+        table: 対象テーブル
+
+    Returns:
+        list[tuple[str, str]]: (インデックス名, CREATE INDEX文)
+    """
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    conn.commit()
+    return indexes
+
+
+def rebuild_indexes(
+    conn: sqlite3.Connection, table: str, indexes: list[tuple[str, str]]
+) -> None:
+    """
+    削除したインデックスを再作成し、統計情報を更新する
+
+    Args:
+        conn: sqlite3接続
+        table: 対象テーブル
+        indexes: (インデックス名, CREATE INDEX文)
+    """
+    for name, sql in indexes:
+        started = time.perf_counter()
+        conn.execute(sql)
+        print(f"  rebuilt index {name} in {time.perf_counter() - started:.1f}s")
+    conn.execute(f"ANALYZE {table}")
+    conn.commit()
+
+
+def load(args: argparse.Namespace) -> int:
+    """
+    バルクロードを実行する
+
+    Args:
+        args: コマンドライン引数
+
+    Returns:
+        int: 終了コード（除外行があり--strictの場合は1）
+    """
+    db_uri: str = args.db_uri or settings.db_uri
+    if not db_uri.startswith(SQLITE_PREFIX):
+        raise SystemExit(f"Unsupported DB URI: {db_uri}")
+    conn = sqlite3.connect(db_uri.removeprefix(SQLITE_PREFIX), isolation_level=None)
+    relax_pragmas(conn, args.exclusive)
+
+    rejects = args.rejects.open("w", encoding="utf-8") if args.rejects else None
+    insert = (
+        f"INSERT INTO {args.table} (id, doc, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?)"
+    )
+    if args.on_conflict == "skip":
+        insert = insert.replace("INSERT", "INSERT OR IGNORE")
+    elif args.on_conflict == "replace":
+        insert = insert.replace("INSERT", "INSERT OR REPLACE")
+
+    loaded = rejected = in_txn = 0
+    started = time.perf_counter()
+    indexes = [] if args.keep_indexes else drop_indexes(conn, args.table)
+    try:
+        conn.execute("BEGIN")
+        for chunk in iter_chunks(args.files, args.chunk_rows):
+            rows, bad = validate_chunk(args.table, chunk, rejects)
+            conn.executemany(insert, rows)
+            loaded += len(rows)
+            rejected += bad
+            in_txn += len(rows)
+            if in_txn >= args.txn_rows:
+                conn.execute("COMMIT")
+                conn.execute("BEGIN")
+                in_txn = 0
+            elapsed = time.perf_counter() - started
+            print(
+                f"\r  {loaded:,} rows ({loaded / elapsed:,.0f} rows/s), "
+                f"{rejected:,} rejected",
+                end="",
+                flush=True,
+            )
+        conn.execute("COMMIT")
+        print()
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        rebuild_indexes(conn, args.table, indexes)
+        conn.close()
+        if rejects is not None:
+            rejects.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Loaded {loaded:,} rows into {args.table} in {elapsed:.1f}s "
+        f"({loaded / elapsed:,.0f} rows/s, {loaded / elapsed * 60:,.0f} rows/min), "
+        f"{rejected:,} rejected"
+    )
+    return 1 if rejected and args.strict else 0
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="+", type=Path, help="NDJSONファイル")
+    parser.add_argument("--table", choices=["folders", "chat_threads"], required=True)
+    parser.add_argument("--db-uri", help="投入先のDB URI（省略時はDB_URI）")
+    parser.add_argument(
+        "--chunk-rows", type=int, default=10000, help="検証チャンクの行数"
+    )
+    parser.add_argument(
+        "--txn-rows", type=int, default=500000, help="1トランザクションの行数"
+    )
+    parser.add_argument(
+        "--on-conflict",
+        choices=["fail", "skip", "replace"],
+        default="fail",
+        help="既存IDと衝突した場合の扱い",
+    )
+    parser.add_argument(
+        "--keep-indexes", action="store_true", help="インデックスを削除せずに投入する"
+    )
+    parser.add_argument(
+        "--exclusive", action="store_true", help="投入中は他の接続をロックアウトする"
+    )
+    parser.add_argument("--rejects", type=Path, help="不正な行の書き出し先")
+    parser.add_argument(
+        "--strict", action="store_true", help="不正な行があれば終了コード1"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(load(parse_args()))
@@ -0,0 +1,436 @@
+"""
+HTTPスループット計測ハーネス
+
+/api/v1 の folders / chat-threads エンドポイントに対して、読み書き比率を
+指定した混合リクエストを並列度ごとに一定時間流し、スループットと
+レイテンシのパーセンタイル、並列度に対する飽和曲線を報告します。
+
+ルーティング、get_current_user のヘッダー認証、依存性注入、
+response_model の検証を含むリクエスト全体のコストを計測します。
+
+Usage:
+    # ASGIアプリをプロセス内で直接駆動（tests/ と同じ httpx.ASGITransport）
+    python scripts/load_http.py --target inprocess --concurrency 1,4,16,64
+
+    # uvicornを起動して実ソケット経由で計測
+    python scripts/load_http.py --target uvicorn --write-ratio 0.3
+
+    # 起動済みのサーバーに対して計測
+    python scripts/load_http.py --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+API_ROOT = Path(__file__).resolve().parents[1]
+PREFIX = "/api/v1"
+
+
+class Workload:
+    """
+    混合リクエストの生成と初期データ
+
+    Attributes:
+        users: 認証ヘッダーに使うユーザー
+        folders: ユーザーごとのフォルダID
+        threads: ユーザーごとのスレッドID
+        write_ratio: 書き込みリクエストの比率
+        large_prompt_bytes: 作成・更新時のプロンプトサイズ（0なら短文）
+    """
+
+    def __init__(
+        self, users: int, write_ratio: float, large_prompt_bytes: int = 0
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            users: ユーザー数
+            write_ratio: 書き込みリクエストの比率（0.0〜1.0）
+            large_prompt_bytes: 作成・更新時のプロンプトサイズ
+        """
+        self.users = [f"load-user-{i:04d}" for i in range(users)]
+        self.folders: dict[str, list[str]] = {u: [] for u in self.users}
+        self.threads: dict[str, list[str]] = {u: [] for u in self.users}
+        self.write_ratio = write_ratio
+        self.large_prompt_bytes = large_prompt_bytes
+
+    @staticmethod
+    def headers(user: str) -> dict[str, str]:
+        """ユーザーの認証ヘッダーを返す"""
+        return {"X-User-Id": user, "X-User-Email": f"{user}@example.com"}
+
+    def prompt(self) -> str:
+        """作成・更新時に送るプロンプトを返す"""
+        if self.large_prompt_bytes <= 0:
+            return "You are a helpful assistant"
+        return "x" * self.large_prompt_bytes
+
+    async def setup(
+        self, client: httpx.AsyncClient, folders: int, threads: int
+    ) -> None:
+        """
+        ユーザーごとに初期のフォルダとスレッドを作成する
+
+        Args:
+            client: HTTPクライアント
+            folders: ユーザーごとのフォルダ数
+            threads: ユーザーごとのスレッド数
+        """
+        for user in self.users:
+            headers = self.headers(user)
+            for i in range(folders):
+                response = await client.post(
+                    f"{PREFIX}/folders",
+                    json={"name": f"Folder {i}", "type": "chat"},
+                    headers=headers,
+                )
+                response.raise_for_status()
+                self.folders[user].append(response.json()["id"])
+            for i in range(threads):
+                response = await client.post(
+                    f"{PREFIX}/chat-threads",
+                    json={
+                        "name": f"Thread {i}",
+                        "prompt": self.prompt(),
+                        "temperature": 0.7,
+                        "folderId": self.folders[user][i % folders],
+                    },
+                    headers=headers,
+                )
+                response.raise_for_status()
+                self.threads[user].append(response.json()["id"])
+
+    def next_request(self, rng: random.Random, user: str) -> tuple[str, str, str, Any]:
+        """
+        次に送るリクエストを選ぶ
+
+        Args:
+            rng: 乱数生成器
+            user: リクエストを送るユーザー
+
+        Returns:
+            tuple[str, str, str, Any]: (操作名, メソッド, パス, JSONボディ)
+        """
+        folder = rng.choice(self.folders[user])
+        threads = self.threads[user]
+        if rng.random() >= self.write_ratio:
+            return rng.choice(
+                [
+                    ("GET /folders", "GET", f"{PREFIX}/folders", None),
+                    ("GET /folders/{id}", "GET", f"{PREFIX}/folders/{folder}", None),
+                    ("GET /chat-threads", "GET", f"{PREFIX}/chat-threads", None),
+                    (
+                        "GET /chat-threads?folderId",
+                        "GET",
+                        f"{PREFIX}/chat-threads?folderId={folder}",
+                        None,
+                    ),
+                    (
+                        "GET /chat-threads/{id}",
+                        "GET",
+                        f"{PREFIX}/chat-threads/{rng.choice(threads)}",
+                        None,
+                    ),
+                ]
+            )
+
+        roll = rng.random()
+        if roll < 0.5:
+            return (
+                "PUT /chat-threads/{id}",
+                "PUT",
+                f"{PREFIX}/chat-threads/{rng.choice(threads)}",
+                {"temperature": round(rng.random(), 2), "prompt": self.prompt()},
+            )
+        if roll < 0.8:
+            return (
+                "POST /chat-threads",
+                "POST",
+                f"{PREFIX}/chat-threads",
+                {
+                    "name": "Load thread",
+                    "prompt": self.prompt(),
+                    "temperature": 0.5,
+                    "folderId": folder,
+                },
+            )
+        return (
+            "PUT /folders/{id}",
+            "PUT",
+            f"{PREFIX}/folders/{folder}",
+            {"name": f"Renamed {rng.randint(0, 9999)}"},
+        )
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """
+    レイテンシのパーセンタイルを求める
+
+    Args:
+        samples: レイテンシ（秒）
+
+    Returns:
+        dict[str, float]: p50/p95/p99（ミリ秒）
+    """
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(q[49] * 1000, 3),
+        "p95_ms": round(q[94] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+    }
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict[str, Any]:
+    """
+    指定した並列度で一定時間リクエストを送り続けて計測する
+
+    Args:
+        client: HTTPクライアント
+        workload: ワークロード
+        concurrency: 並列ワーカー数
+        duration: 計測時間（秒）
+        seed: 乱数シード
+
+    Returns:
+        dict[str, Any]: スループット・パーセンタイル・操作別の結果
+    """
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            user = rng.choice(workload.users)
+            name, method, path, body = workload.next_request(rng, user)
+            started = time.perf_counter()
+            response = await client.request(
+                method, path, json=body, headers=workload.headers(user)
+            )
+            samples.setdefault(name, []).append(time.perf_counter() - started)
+            if response.status_code >= 500:
+                errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [s for values in samples.values() for s in values]
+    return {
+        "concurrency": concurrency,
+        "requests": len(all_samples),
+        "errors": sum(errors.values()),
+        "throughput_rps": round(len(all_samples) / elapsed, 1),
+        **percentiles(all_samples),
+        "by_operation": {
+            name: {"requests": len(values), **percentiles(values)}
+            for name, values in sorted(samples.items())
+        },
+    }
+
+
+def find_saturation(levels: list[dict[str, Any]]) -> int | None:
+    """
+    飽和点（並列度を上げてもスループットが10%以上伸びなくなる点）を求める
+
+    Args:
+        levels: 並列度の昇順に並んだ計測結果
+
+    Returns:
+        int | None: 飽和した並列度（飽和していない場合はNone）
+    """
+    for previous, current in zip(levels, levels[1:], strict=False):
+        if current["throughput_rps"] < previous["throughput_rps"] * 1.1:
+            return previous["concurrency"]
+    return None
+
+
+def free_port() -> int:
+    """空いているTCPポートを取得する"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def open_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    計測対象に応じたHTTPクライアントを用意する
+
+    Args:
+        args: コマンドライン引数
+
+    Yields:
+        httpx.AsyncClient: 計測用HTTPクライアント
+    """
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+            yield client
+        return
+
+    if args.target == "inprocess":
+        sys.path.insert(0, str(API_ROOT / "src"))
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            yield client
+        return
+
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--app-dir",
+            "src",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--workers",
+            str(args.workers),
+        ],
+        cwd=API_ROOT,
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            for _ in range(100):
+                try:
+                    await client.get(f"{PREFIX}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def prepare_database(tmp: str) -> None:
+    """
+    一時データベースを作成し、アプリが使うDB_URIを差し替える
+
+    Args:
+        tmp: 一時ディレクトリ
+    """
+    os.environ["DB_URI"] = f"sqlite+aiosqlite:///{tmp}/load.db"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=API_ROOT,
+        env=os.environ.copy(),
+        check=True,
+        capture_output=True,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--target", choices=["inprocess", "uvicorn"], default="inprocess"
+    )
+    parser.add_argument("--url", help="起動済みサーバーのURL（指定時は--targetを無視）")
+    parser.add_argument("--workers", type=int, default=1, help="uvicornのワーカー数")
+    parser.add_argument(
+        "--concurrency", default="1,4,16,64", help="並列度（カンマ区切り）"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="並列度ごとの秒数")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="書き込み比率")
+    parser.add_argument("--users", type=int, default=20, help="ユーザー数")
+    parser.add_argument(
+        "--folders", type=int, default=5, help="ユーザーごとのフォルダ数"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=50, help="ユーザーごとのスレッド数"
+    )
+    parser.add_argument(
+        "--large-prompt-bytes",
+        type=int,
+        default=0,
+        help="作成・更新で送るプロンプトのサイズ（大きなドキュメントの影響確認用）",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    parser.add_argument("--output", type=Path, help="結果JSONの出力先")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """計測を実行して結果を表示する"""
+    args = parse_args()
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.url:
+            prepare_database(tmp)
+
+        async with open_client(args) as client:
+            workload = Workload(args.users, args.write_ratio, args.large_prompt_bytes)
+            await workload.setup(client, args.folders, args.threads)
+
+            results: list[dict[str, Any]] = []
+            print(f"{'conc':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+            for concurrency in levels:
+                level = await run_level(
+                    client, workload, concurrency, args.duration, args.seed
+                )
+                results.append(level)
+                print(
+                    f"{concurrency:>5} {level['throughput_rps']:>9} "
+                    f"{level['p50_ms']:>8} {level['p95_ms']:>8} "
+                    f"{level['p99_ms']:>8} {level['errors']:>5}"
+                )
+
+    saturation = find_saturation(results)
+    print(
+        f"\nSaturation at concurrency {saturation}"
+        if saturation
+        else "\nNo saturation observed in the tested range"
+    )
+
+    if args.output:
+        report = {
+            "target": args.url or args.target,
+            "write_ratio": args.write_ratio,
+            "duration": args.duration,
+            "saturation_concurrency": saturation,
+            "levels": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,7 +5,7 @@ import sys
 sys.path.insert(0, "src")
 
 from app.core.config import settings
-from app.core.db import AsyncSessionLocal
+from app.core.db import get_session_factory
 from app.models.schemas import (
     ChatThreadCreate,
     ChatThreadUpdate,
@@ -19,7 +19,7 @@ async def test_folder_crud():
     """Test Folder CRUD operations"""
     print("Testing Folder CRUD...")
 
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         repo = SQLiteFolderRepository(session)
 
         folder = await repo.create(FolderCreate(name="Test Folder", type="chat"))
@@ -53,7 +53,7 @@ async def test_chatthread_crud():
     """Test ChatThread CRUD operations"""
     print("\nTesting ChatThread CRUD...")
 
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         folder_repo = SQLiteFolderRepository(session)
         thread_repo = SQLiteChatThreadRepository(session)
 
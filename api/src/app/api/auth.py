@@ -3,10 +3,21 @@
 
 このモジュールはリクエストヘッダーからユーザー情報を抽出し、
 認証済みユーザー情報を提供します。
+
+AUTH_MODE=jwt の場合は Authorization: Bearer のJWTを検証し、
+sub をユーザーID、email をメールアドレスとして扱います。
 """
 
-from fastapi import Header, HTTPException, status
+import hmac
+
+from fastapi import Header, HTTPException, Request, status
 from pydantic import BaseModel
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.tokens import KeySetUnavailableError, TokenError, get_token_verifier
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
 
 
 class AuthenticatedUser(BaseModel):
@@ -25,23 +36,30 @@ class AuthenticatedUser(BaseModel):
 async def get_current_user(
     x_user_id: str | None = Header(None, alias="X-User-Id"),
     x_user_email: str | None = Header(None, alias="X-User-Email"),
+    authorization: str | None = Header(None),
 ) -> AuthenticatedUser:
     """
     リクエストヘッダーから認証済みユーザー情報を取得
 
-    フロントエンドのAuth.jsから送信されるカスタムヘッダー
-    （X-User-Id, X-User-Email）を抽出して返します。
+    AUTH_MODE=headers の場合は、フロントエンドのAuth.jsから送信される
+    カスタムヘッダー（X-User-Id, X-User-Email）を抽出して返します。
+    AUTH_MODE=jwt の場合は、Bearerトークンを検証してクレームから返します。
 
     Args:
         x_user_id: X-User-Idヘッダー
         x_user_email: X-User-Emailヘッダー
+        authorization: Authorizationヘッダー
 
     Returns:
         AuthenticatedUser: 認証済みユーザー情報
 
     Raises:
-        HTTPException: 認証ヘッダーが不足している場合（401）
+        HTTPException: 認証情報が不足・不正な場合（401）、
+            JWTの鍵セットが読み込まれていない場合（503）
     """
+    if settings.auth_mode == "jwt":
+        return _verify_bearer(authorization)
+
     if not x_user_id or not x_user_email:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,3 +67,67 @@ async def get_current_user(
         )
 
     return AuthenticatedUser(user_id=x_user_id, email=x_user_email)
+
+
+def _verify_bearer(authorization: str | None) -> AuthenticatedUser:
+    """Bearerトークンを検証して認証済みユーザー情報を返す"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required. Missing bearer token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        claims = get_token_verifier().verify(token.strip())
+    except KeySetUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token signing keys are not available.",
+        ) from None
+    except TokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid token: {e}",
+            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+        ) from None
+    return AuthenticatedUser(user_id=claims.subject, email=claims.email)
+
+
+def is_admin(headers: Headers) -> bool:
+    """
+    リクエストが管理操作を許可されているか判定する
+
+    デバッグモード、または X-Admin-Token ヘッダーが ADMIN_TOKEN と
+    一致する場合に許可します。
+
+    Args:
+        headers: リクエストヘッダー
+
+    Returns:
+        bool: 許可されている場合True
+    """
+    if settings.debug:
+        return True
+    token = headers.get(ADMIN_TOKEN_HEADER)
+    if not settings.admin_token or not token:
+        return False
+    # str同士の比較はASCII以外の文字でTypeErrorになるため、バイト列で比較する
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+async def require_admin(request: Request) -> None:
+    """
+    管理操作の権限を要求する
+
+    Args:
+        request: リクエスト
+
+    Raises:
+        HTTPException: 権限がない場合（403）
+    """
+    if not is_admin(request.headers):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required.",
+        )
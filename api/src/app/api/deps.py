@@ -11,13 +11,33 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.db import get_session
+from app.core.shards import get_shard_set
 from app.repositories.base import (
+    BootstrapRepositoryProtocol,
     ChatThreadRepositoryProtocol,
     FolderRepositoryProtocol,
+    SyncRepositoryProtocol,
+)
+from app.repositories.coalescing import (
+    CoalescingChatThreadRepository,
+    CoalescingFolderRepository,
+)
+from app.repositories.sharded import (
+    ShardedBootstrapRepository,
+    ShardedChatThreadRepository,
+    ShardedFolderRepository,
+    ShardedSyncRepository,
 )
 from app.repositories.sqlite import (
+    SQLiteBootstrapRepository,
     SQLiteChatThreadRepository,
     SQLiteFolderRepository,
+    SQLiteSyncRepository,
+)
+from app.repositories.write_behind import (
+    WriteBehindChatThreadRepository,
+    WriteBehindFolderRepository,
+    get_write_behind_store,
 )
 
 
@@ -28,6 +48,8 @@ async def get_folder_repo(
     フォルダリポジトリを取得
 
     環境変数DB_BACKENDに応じて適切なリポジトリ実装を返します。
+    SQLite/シャーディングの場合、COALESCE_READS_ENABLEDが有効であれば
+    同時の同一読み取りを1回の問い合わせにまとめるラッパーを適用します。
 
     Args:
         session: データベースセッション
@@ -38,12 +60,19 @@ async def get_folder_repo(
     Raises:
         ValueError: 未知のDB_BACKENDが指定された場合
     """
+    repo: FolderRepositoryProtocol
     if settings.db_backend == "sqlite":
-        yield SQLiteFolderRepository(session)
+        repo = SQLiteFolderRepository(session)
+    elif settings.db_backend == "hybrid":
+        yield WriteBehindFolderRepository(get_write_behind_store())
+        return
+    elif settings.db_backend == "sharded":
+        repo = ShardedFolderRepository(get_shard_set())
     elif settings.db_backend == "cosmos":
         raise NotImplementedError("Cosmos DB implementation coming in Step 5")
     else:
         raise ValueError(f"Unknown DB_BACKEND: {settings.db_backend}")
+    yield CoalescingFolderRepository(repo) if settings.coalesce_reads_enabled else repo
 
 
 async def get_chatthread_repo(
@@ -53,6 +82,8 @@ async def get_chatthread_repo(
     チャットスレッドリポジトリを取得
 
     環境変数DB_BACKENDに応じて適切なリポジトリ実装を返します。
+    SQLite/シャーディングの場合、COALESCE_READS_ENABLEDが有効であれば
+    同時の同一読み取りを1回の問い合わせにまとめるラッパーを適用します。
 
     Args:
         session: データベースセッション
@@ -60,11 +91,84 @@ async def get_chatthread_repo(
     Yields:
         ChatThreadRepositoryProtocol: チャットスレッドリポジトリ
 
+    Raises:
+        ValueError: 未知のDB_BACKENDが指定された場合
+    """
+    repo: ChatThreadRepositoryProtocol
+    if settings.db_backend == "sqlite":
+        repo = SQLiteChatThreadRepository(session)
+    elif settings.db_backend == "hybrid":
+        yield WriteBehindChatThreadRepository(get_write_behind_store())
+        return
+    elif settings.db_backend == "sharded":
+        repo = ShardedChatThreadRepository(get_shard_set())
+    elif settings.db_backend == "cosmos":
+        raise NotImplementedError("Cosmos DB implementation coming in Step 5")
+    else:
+        raise ValueError(f"Unknown DB_BACKEND: {settings.db_backend}")
+    yield (
+        CoalescingChatThreadRepository(repo)
+        if settings.coalesce_reads_enabled
+        else repo
+    )
+
+
+async def get_sync_repo(
+    session: AsyncSession = Depends(get_session),  # noqa: B008
+) -> AsyncGenerator[SyncRepositoryProtocol, None]:
+    """
+    差分同期リポジトリを取得
+
+    環境変数DB_BACKENDに応じて適切なリポジトリ実装を返します。
+    hybridの場合は未フラッシュの変更をSQLiteへ書き込んでから同期します。
+
+    Args:
+        session: データベースセッション
+
+    Yields:
+        SyncRepositoryProtocol: 差分同期リポジトリ
+
+    Raises:
+        ValueError: 未知のDB_BACKENDが指定された場合
+    """
+    if settings.db_backend == "sqlite":
+        yield SQLiteSyncRepository(session)
+    elif settings.db_backend == "hybrid":
+        await get_write_behind_store().flush()
+        yield SQLiteSyncRepository(session)
+    elif settings.db_backend == "sharded":
+        yield ShardedSyncRepository(get_shard_set())
+    elif settings.db_backend == "cosmos":
+        raise NotImplementedError("Cosmos DB implementation coming in Step 5")
+    else:
+        raise ValueError(f"Unknown DB_BACKEND: {settings.db_backend}")
+
+
+async def get_bootstrap_repo(
+    session: AsyncSession = Depends(get_session),  # noqa: B008
+) -> AsyncGenerator[BootstrapRepositoryProtocol, None]:
+    """
+    初期表示（サイドバー）リポジトリを取得
+
+    環境変数DB_BACKENDに応じて適切なリポジトリ実装を返します。
+    hybridの場合は未フラッシュの変更をSQLiteへ書き込んでから集約します。
+
+    Args:
+        session: データベースセッション
+
+    Yields:
+        BootstrapRepositoryProtocol: 初期表示リポジトリ
+
     Raises:
         ValueError: 未知のDB_BACKENDが指定された場合
     """
     if settings.db_backend == "sqlite":
-        yield SQLiteChatThreadRepository(session)
+        yield SQLiteBootstrapRepository(session)
+    elif settings.db_backend == "hybrid":
+        await get_write_behind_store().flush()
+        yield SQLiteBootstrapRepository(session)
+    elif settings.db_backend == "sharded":
+        yield ShardedBootstrapRepository(get_shard_set())
     elif settings.db_backend == "cosmos":
         raise NotImplementedError("Cosmos DB implementation coming in Step 5")
     else:
@@ -0,0 +1,299 @@
+"""
+アドミッション制御
+
+このモジュールは /api/v1 へのリクエストを読み取り（GET）と書き込み
+（POST/PUT/PATCH/DELETE）のレーンに分け、レーンごとの同時実行数の上限と
+上限付きの待ち行列で受け付けを制御するASGIミドルウェアを提供します。
+
+待ち行列が満杯のリクエストや待ち時間が上限を超えたリクエストには、
+すぐに 503 と Retry-After を返します。同時実行数の上限は、SQLの実行時間の
+指数加重移動平均（EWMA）が目標を超えると乗算的に下げ、目標内で
+上限まで使われていれば1ずつ上げる（AIMD）ことで、過負荷時にも
+テールレイテンシが際限なく伸びないようにします。
+
+CORSのプリフライト（OPTIONS）は処理が軽く、拒否するとブラウザ側で
+本来のリクエストが送られなくなるため、制御の対象外とします。
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import DB_LATENCY, REGISTRY, Counter, Gauge
+
+ADMISSION_LIMIT = REGISTRY.register(
+    Gauge("admission_limit", "Current concurrency limit by lane.", ("lane",))
+)
+ADMISSION_IN_FLIGHT = REGISTRY.register(
+    Gauge("admission_in_flight", "Admitted requests in progress by lane.", ("lane",))
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.register(
+    Gauge("admission_queue_depth", "Requests waiting for admission.", ("lane",))
+)
+ADMISSION_REJECTED = REGISTRY.register(
+    Counter(
+        "admission_rejected",
+        "Requests shed with 503 by lane and reason (queue_full/timeout).",
+        ("lane", "reason"),
+    )
+)
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class Lane:
+    """
+    同時実行数の上限と待ち行列を持つレーン
+
+    Attributes:
+        name: レーン名（read/write）
+        limit: 現在の同時実行数の上限
+        max_limit: 同時実行数の上限の最大値
+        max_queue: 待ち行列の長さの上限
+        in_flight: 処理中のリクエスト数
+    """
+
+    def __init__(self, name: str, max_limit: int, max_queue: int) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            name: レーン名
+            max_limit: 同時実行数の上限の最大値（初期値）
+            max_queue: 待ち行列の長さの上限
+        """
+        self.name = name
+        self.limit = float(max_limit)
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._saturated = False
+        self._adjusted_at = time.monotonic()
+
+    @property
+    def queue_depth(self) -> int:
+        """待ち行列のリクエスト数"""
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        """同時実行数に空きがあるか"""
+        return self.in_flight < max(1, int(self.limit))
+
+    async def acquire(self, timeout: float) -> str | None:
+        """
+        実行枠を取得する
+
+        Args:
+            timeout: 待ち行列で待つ最大時間（秒）
+
+        Returns:
+            str | None: 取得できた場合None、拒否した場合は理由（queue_full/timeout）
+        """
+        self.adjust()
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return None
+        self._saturated = True
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done():
+                # 枠を譲られた直後に期限切れになった場合は返却する
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return "timeout"
+        return None
+
+    def release(self) -> None:
+        """実行枠を返却し、待ち行列の先頭に譲る"""
+        self.in_flight -= 1
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def adjust(self, now: float | None = None) -> None:
+        """
+        DBレイテンシのEWMAに基づいて同時実行数の上限を調整する（AIMD）
+
+        Args:
+            now: 現在時刻（time.monotonic、テスト用）
+        """
+        now = time.monotonic() if now is None else now
+        if now - self._adjusted_at < settings.admission_adjust_interval:
+            return
+        self._adjusted_at = now
+        target = settings.admission_target_db_latency_ms / 1000
+        if DB_LATENCY.value > target:
+            self.limit = max(1.0, self.limit * settings.admission_decrease_factor)
+        elif self._saturated:
+            self.limit = min(float(self.max_limit), self.limit + 1)
+        self._saturated = False
+
+
+class AdmissionController:
+    """
+    読み取り・書き込みレーンの組
+
+    Attributes:
+        read: 読み取りレーン
+        write: 書き込みレーン
+    """
+
+    def __init__(
+        self,
+        read_limit: int,
+        write_limit: int,
+        read_queue: int,
+        write_queue: int,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            read_limit: 読み取りの同時実行数の上限
+            write_limit: 書き込みの同時実行数の上限
+            read_queue: 読み取りの待ち行列の上限
+            write_queue: 書き込みの待ち行列の上限
+        """
+        self.read = Lane("read", read_limit, read_queue)
+        self.write = Lane("write", write_limit, write_queue)
+
+    def lane_for(self, method: str) -> Lane:
+        """
+        HTTPメソッドに対応するレーンを取得する
+
+        Args:
+            method: HTTPメソッド
+
+        Returns:
+            Lane: レーン
+        """
+        return self.write if method in WRITE_METHODS else self.read
+
+    def queue_depth(self) -> int:
+        """
+        全レーンの待ち行列のリクエスト数を取得する
+
+        Returns:
+            int: 待ち行列のリクエスト数
+        """
+        return self.read.queue_depth + self.write.queue_depth
+
+    def collect(self) -> None:
+        """レーンの状態をメトリクスに反映する"""
+        for lane in (self.read, self.write):
+            ADMISSION_LIMIT.labels(lane.name).set(int(lane.limit))
+            ADMISSION_IN_FLIGHT.labels(lane.name).set(lane.in_flight)
+            ADMISSION_QUEUE_DEPTH.labels(lane.name).set(lane.queue_depth)
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    プロセス共有のアドミッション制御を取得する
+
+    Returns:
+        AdmissionController: アドミッション制御
+    """
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            read_limit=settings.admission_read_limit,
+            write_limit=settings.admission_write_limit,
+            read_queue=settings.admission_read_queue,
+            write_queue=settings.admission_write_queue,
+        )
+        REGISTRY.add_collector(_controller.collect)
+    return _controller
+
+
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics", "/changes/stream"})
+
+
+def _is_exempt(path: str) -> bool:
+    """
+    監視用エンドポイントや長時間接続のストリームなど制御の対象外のパスか判定する
+    """
+    prefix = settings.api_v1_prefix
+    if not path.startswith(prefix):
+        return True
+    return path.removeprefix(prefix) in EXEMPT_PATHS
+
+
+async def _reject(send: Send) -> None:
+    """503とRetry-Afterを返す"""
+    body = json.dumps({"detail": "Server is over capacity. Retry later."}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.admission_retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    /api/v1 のリクエストの受け付けを制御するASGIミドルウェア
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            app: ラップするASGIアプリケーション
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        リクエストを処理する
+
+        Args:
+            scope: ASGIスコープ
+            receive: ASGI受信関数
+            send: ASGI送信関数
+        """
+        if (
+            scope["type"] != "http"
+            or not settings.admission_enabled
+            or scope["method"] == "OPTIONS"
+            or _is_exempt(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        lane = get_admission_controller().lane_for(scope["method"])
+        rejected = await lane.acquire(settings.admission_queue_timeout)
+        if rejected is not None:
+            ADMISSION_REJECTED.labels(lane.name, rejected).inc()
+            await _reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
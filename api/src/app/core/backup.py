@@ -0,0 +1,362 @@
+"""
+オンラインバックアップ
+
+このモジュールはSQLiteのオンラインバックアップAPIでDBファイルを
+稼働中のまま複製・復元する機能を提供します。
+
+バックアップは小さなページ数ずつコピーし、ステップ間で休止することで
+書き込みロックやI/Oを独占しないようにします。コピー元では読み取り
+トランザクションを保持して開始時点のスナップショットを複製します
+（保持しないと他の接続の書き込みのたびにバックアップが最初からやり直しになり、
+書き込みが続く間は終わりません）。WALモードのため、スナップショットを
+保持していても他の接続の読み書きは妨げません。
+
+DB_BACKEND=sharded の場合、スナップショットはDBごとに独立して取得するため、
+バックアップ全体として同一時点の状態にはなりません。ユーザーのデータは
+単一のシャードに収まり、シャードはIDから求めるためDB間で参照し合う
+データはありません。シャードごとに整合した状態に復元できますが、
+シャードをまたいで異なる時点の状態になります。
+"""
+
+import asyncio
+import gzip
+import shutil
+import sqlite3
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+from sqlalchemy.engine import make_url
+
+from app.core.clock import utc_now
+from app.core.config import settings
+from app.core.metrics import DB_STATEMENT_DURATION, HTTP_REQUEST_DURATION, Histogram
+from app.core.shards import shard_uris
+
+GZIP_SUFFIX = ".gz"
+
+
+class BackupError(Exception):
+    """バックアップ・復元に失敗した場合の例外"""
+
+
+class BackupInProgressError(BackupError):
+    """バックアップが既に実行中の場合の例外"""
+
+
+class BackupResult(BaseModel):
+    """
+    1DB分のバックアップ結果
+
+    Attributes:
+        database: DB名（main/shardN）
+        path: バックアップファイルのパス
+        size_bytes: バックアップファイルのサイズ（圧縮後）
+        pages: コピーしたページ数
+        steps: バックアップのステップ数
+        duration_seconds: 所要時間（秒、検証・圧縮を含む）
+        compressed: gzip圧縮したか
+    """
+
+    database: str
+    path: str
+    size_bytes: int
+    pages: int
+    steps: int
+    duration_seconds: float
+    compressed: bool
+
+
+class LatencyImpact(BaseModel):
+    """
+    バックアップ中の同時リクエストへの影響
+
+    Attributes:
+        requests: バックアップ中に完了したHTTPリクエスト数
+        mean_request_ms: バックアップ中のHTTPリクエストの平均レイテンシ（ミリ秒）
+        baseline_request_ms: バックアップ開始直前の計測期間
+            （BACKUP_BASELINE_WINDOW）のHTTPリクエストの平均レイテンシ
+        statements: バックアップ中に実行したSQL文の数
+        mean_statement_ms: バックアップ中のSQL文の平均実行時間（ミリ秒）
+        baseline_statement_ms: バックアップ開始直前の計測期間のSQL文の
+            平均実行時間
+    """
+
+    requests: int
+    mean_request_ms: float | None
+    baseline_request_ms: float | None
+    statements: int
+    mean_statement_ms: float | None
+    baseline_statement_ms: float | None
+
+
+class BackupReport(BaseModel):
+    """
+    バックアップの実行結果
+
+    Attributes:
+        backups: DBごとのバックアップ結果
+        latency: バックアップ中の同時リクエストへの影響
+    """
+
+    backups: list[BackupResult]
+    latency: LatencyImpact
+
+
+def database_paths() -> dict[str, Path]:
+    """
+    バックアップ対象のDBファイルを取得する
+
+    DB_BACKEND=sharded の場合はメインDBと全シャードが対象です
+    （DBごとに別の時点のスナップショットになります）。
+
+    Returns:
+        dict[str, Path]: DB名をキーとしたDBファイルのパス
+    """
+    uris = {"main": settings.db_uri}
+    if settings.db_backend == "sharded":
+        for shard, uri in enumerate(shard_uris()):
+            uris[f"shard{shard}"] = uri
+    paths: dict[str, Path] = {}
+    for name, uri in uris.items():
+        database = make_url(uri).database
+        if not database or database == ":memory:":
+            raise BackupError(f"Database {name} is not a file: {uri}")
+        paths[name] = Path(database)
+    return paths
+
+
+def backup_database(
+    source: Path,
+    dest: Path,
+    *,
+    step_pages: int | None = None,
+    step_sleep: float | None = None,
+    compress: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+) -> BackupResult:
+    """
+    DBファイルをオンラインでバックアップする（ブロッキング）
+
+    一時ファイルへページ単位で複製し、PRAGMA quick_check で検証してから
+    （compressの場合はgzip圧縮して）destへ置き換えます。
+
+    Args:
+        source: コピー元のDBファイル
+        dest: バックアップファイル（compressの場合は .gz を付与）
+        step_pages: 1ステップでコピーするページ数（省略時は設定値）
+        step_sleep: ステップ間の休止時間（秒、省略時は設定値）
+        compress: gzip圧縮するか
+        progress: ステップごとに (残りページ数, 全ページ数) で呼び出す関数
+
+    Returns:
+        BackupResult: バックアップ結果（databaseはコピー元のファイル名）
+
+    Raises:
+        BackupError: コピー元がない場合、または複製の検証に失敗した場合
+    """
+    if not source.is_file():
+        raise BackupError(f"Database file not found: {source}")
+    pages = settings.backup_step_pages if step_pages is None else step_pages
+    pause = settings.backup_step_sleep if step_sleep is None else step_sleep
+    if compress and dest.suffix != GZIP_SUFFIX:
+        dest = dest.with_name(dest.name + GZIP_SUFFIX)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    partial = dest.with_name(dest.name + ".partial")
+    copied = dest.with_suffix(".partial") if compress else partial
+
+    steps = 0
+    total = 0
+
+    def _step(status: int, remaining: int, count: int) -> None:  # noqa: ARG001
+        nonlocal steps, total
+        steps += 1
+        total = count
+        if progress is not None:
+            progress(remaining, count)
+        if remaining and pause > 0:
+            time.sleep(pause)
+
+    started = time.perf_counter()
+    src = sqlite3.connect(source, isolation_level=None)
+    dst = sqlite3.connect(copied, isolation_level=None)
+    try:
+        # 読み取りトランザクションを保持してスナップショットを固定する
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchall()
+        src.backup(dst, pages=pages, progress=_step)
+        src.execute("COMMIT")
+        (check,) = dst.execute("PRAGMA quick_check").fetchone()
+        if check != "ok":
+            raise BackupError(f"Backup of {source} failed quick_check: {check}")
+        dst.execute("PRAGMA journal_mode = DELETE")
+    except BaseException:
+        dst.close()
+        copied.unlink(missing_ok=True)
+        raise
+    finally:
+        src.close()
+    dst.close()
+
+    if compress:
+        try:
+            with copied.open("rb") as f_in, gzip.open(partial, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        finally:
+            copied.unlink(missing_ok=True)
+    partial.replace(dest)
+
+    return BackupResult(
+        database=source.stem,
+        path=str(dest),
+        size_bytes=dest.stat().st_size,
+        pages=total,
+        steps=steps,
+        duration_seconds=time.perf_counter() - started,
+        compressed=compress,
+    )
+
+
+def restore_database(backup: Path, dest: Path) -> int:
+    """
+    バックアップファイルからDBファイルを復元する（ブロッキング）
+
+    バックアップAPIでdestの内容を置き換えます。復元中はdestへの書き込みを
+    ロックするため、APIサーバーを停止してから実行してください
+    （ライトビハインドや読み取り合流のメモリ上の状態は復元されません）。
+
+    Args:
+        backup: バックアップファイル（.gz の場合は展開して復元）
+        dest: 復元先のDBファイル
+
+    Returns:
+        int: 復元したページ数
+
+    Raises:
+        BackupError: バックアップファイルがない場合、または検証に失敗した場合
+    """
+    if not backup.is_file():
+        raise BackupError(f"Backup file not found: {backup}")
+    expanded: Path | None = None
+    if backup.suffix == GZIP_SUFFIX:
+        expanded = dest.with_name(dest.name + ".restore")
+        with gzip.open(backup, "rb") as f_in, expanded.open("wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+
+    src = sqlite3.connect(expanded or backup, isolation_level=None)
+    dst = sqlite3.connect(dest, isolation_level=None)
+    try:
+        (check,) = src.execute("PRAGMA quick_check").fetchone()
+        if check != "ok":
+            raise BackupError(f"Backup {backup} failed quick_check: {check}")
+        (pages,) = src.execute("PRAGMA page_count").fetchone()
+        src.backup(dst)
+        dst.execute("PRAGMA journal_mode = WAL")
+    finally:
+        src.close()
+        dst.close()
+        if expanded is not None:
+            expanded.unlink(missing_ok=True)
+    return pages
+
+
+def _totals(histogram: Histogram) -> tuple[int, float]:
+    """ヒストグラムの全系列の (件数, 合計) を取得する"""
+    count = 0
+    total = 0.0
+    for _, child in histogram.series():
+        count += sum(child.counts)
+        total += child.sum
+    return count, total
+
+
+def _mean_ms(count: int, total: float) -> float | None:
+    """平均値をミリ秒で取得する（件数0の場合None）"""
+    return total / count * 1000 if count else None
+
+
+Totals = tuple[tuple[int, float], tuple[int, float]]
+
+
+def _snapshot() -> Totals:
+    """HTTPリクエストとSQL文のレイテンシの集計値を取得する"""
+    return _totals(HTTP_REQUEST_DURATION), _totals(DB_STATEMENT_DURATION)
+
+
+def _impact(baseline: Totals, before: Totals, after: Totals) -> LatencyImpact:
+    """
+    計測期間の開始時・バックアップ開始時・終了時の集計値から
+    同時リクエストへの影響を求める
+    """
+    (req_nb, req_sb), (stmt_nb, stmt_sb) = baseline
+    (req_n0, req_s0), (stmt_n0, stmt_s0) = before
+    (req_n1, req_s1), (stmt_n1, stmt_s1) = after
+    return LatencyImpact(
+        requests=req_n1 - req_n0,
+        mean_request_ms=_mean_ms(req_n1 - req_n0, req_s1 - req_s0),
+        baseline_request_ms=_mean_ms(req_n0 - req_nb, req_s0 - req_sb),
+        statements=stmt_n1 - stmt_n0,
+        mean_statement_ms=_mean_ms(stmt_n1 - stmt_n0, stmt_s1 - stmt_s0),
+        baseline_statement_ms=_mean_ms(stmt_n0 - stmt_nb, stmt_s0 - stmt_sb),
+    )
+
+
+def backup_name(database: str, now: datetime, *, compress: bool) -> str:
+    """
+    バックアップファイル名を作成する
+
+    Args:
+        database: DB名
+        now: バックアップ日時（UTC）
+        compress: gzip圧縮するか
+
+    Returns:
+        str: ファイル名（例: main-20250101T000000Z.db.gz）
+    """
+    suffix = ".db" + (GZIP_SUFFIX if compress else "")
+    return f"{database}-{now:%Y%m%dT%H%M%SZ}{suffix}"
+
+
+_lock = asyncio.Lock()
+
+
+async def run_backup(compress: bool | None = None) -> BackupReport:
+    """
+    全DBをBACKUP_DIRへバックアップする
+
+    ステップ間の休止でイベントループを妨げないよう、コピーはスレッドで実行します。
+    バックアップ中のHTTPリクエストとSQL文の平均レイテンシを、開始直前の
+    BACKUP_BASELINE_WINDOW 秒間の平均と比較し、同時リクエストへの影響を
+    報告します（プロセス起動時からの平均では直近の負荷と比較できないため）。
+
+    Args:
+        compress: gzip圧縮するか（省略時は設定値）
+
+    Returns:
+        BackupReport: バックアップ結果と同時リクエストへの影響
+
+    Raises:
+        BackupInProgressError: バックアップが実行中の場合
+        BackupError: バックアップに失敗した場合
+    """
+    if _lock.locked():
+        raise BackupInProgressError("A backup is already in progress.")
+    compress = settings.backup_compress if compress is None else compress
+    async with _lock:
+        now = utc_now()
+        directory = Path(settings.backup_dir)
+        baseline = _snapshot()
+        if settings.backup_baseline_window > 0:
+            await asyncio.sleep(settings.backup_baseline_window)
+        before = _snapshot()
+        backups: list[BackupResult] = []
+        for database, path in database_paths().items():
+            dest = directory / backup_name(database, now, compress=compress)
+            result = await asyncio.to_thread(
+                backup_database, path, dest, compress=compress
+            )
+            backups.append(result.model_copy(update={"database": database}))
+        after = _snapshot()
+    return BackupReport(backups=backups, latency=_impact(baseline, before, after))
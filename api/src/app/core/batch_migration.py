@@ -0,0 +1,375 @@
+"""
+バッチマイグレーション
+
+このモジュールは folders / chat_threads のドキュメント（doc列）の形の変更
+（フィールドの追加・名前の変更・列への切り出し）を、APIサーバーを止めずに
+小さなバッチに分けて適用するランナーを提供します。
+
+各バッチは主キーのキーセット順（id > 前回の最終キー）で範囲を決め、
+BEGIN IMMEDIATE の短いトランザクションで書き換えと進捗（batch_migrations テーブル）の
+更新を同時にコミットします。中断しても次回は最後にコミットしたバッチの続きから
+再開します。バッチ間では休止し、バッチの所要時間が目標を超えた場合はバッチを
+小さくして、APIの書き込みが書き込みロックを長く待たないようにします。
+
+書き換えは doc 列の更新トリガーにより変更ログ（changes）へ記録されるため、
+差分同期のクライアントと他のワーカーの変更フィードにも反映されます。
+
+マイグレーションの定義は batch_migrations/ ディレクトリに置き、
+scripts/batch_migrate.py で実行します。
+
+Note:
+    実行中もAPIは旧い形のドキュメントを書き込めるため、先に新旧どちらの形も
+    読めて新しい形で書き込むアプリケーションをデプロイしてから実行してください。
+    ライトビハインド（DB_BACKEND=hybrid）はメモリ上のドキュメントを丸ごと
+    書き戻すため、完了後に pending() が0であることを確認し、残っていれば
+    reset() して再実行します（where で対象を絞っていれば既に適用済みの行は
+    書き換えません）。
+"""
+
+import asyncio
+import importlib.util
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+
+TableName = Literal["folders", "chat_threads"]
+
+# バッチを小さくする下限（これより小さくはしない）
+_MIN_BATCH_SIZE = 10
+
+
+class BatchMigrationError(Exception):
+    """バッチマイグレーションの定義・実行に失敗した場合の例外"""
+
+
+class BatchMigration:
+    """
+    バッチマイグレーションの定義
+
+    Attributes:
+        name: マイグレーション名（進捗のキー、一意）
+        table: 対象テーブル（folders/chat_threads）
+        set_sql: UPDATE の SET 句（例: "doc = json_set(doc, ...)"）
+        where_sql: 書き換えが必要な行の条件（適用済みの行を除外し、再実行を冪等にする）
+        description: 説明
+
+    Example:
+        ```python
+        migration = BatchMigration(
+            "20251110_add_pinned",
+            "chat_threads",
+            set_sql="doc = json_set(doc, '$.pinned', json('false'))",
+            where_sql="json_type(doc, '$.pinned') IS NULL",
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: TableName,
+        *,
+        set_sql: str,
+        where_sql: str = "1",
+        description: str = "",
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            name: マイグレーション名
+            table: 対象テーブル
+            set_sql: UPDATE の SET 句
+            where_sql: 書き換えが必要な行の条件（省略時は全行）
+            description: 説明
+
+        Raises:
+            BatchMigrationError: 対象テーブルが folders/chat_threads でない場合
+        """
+        if table not in ("folders", "chat_threads"):
+            raise BatchMigrationError(f"Unsupported table for {name}: {table}")
+        self.name = name
+        self.table = table
+        self.set_sql = set_sql
+        self.where_sql = where_sql
+        self.description = description
+
+
+class BatchProgress(BaseModel):
+    """
+    バッチマイグレーションの進捗
+
+    Attributes:
+        name: マイグレーション名
+        target: 対象テーブル
+        last_key: 最後にコミットしたバッチの最終キー（id）
+        rows_scanned: 走査した行数
+        rows_changed: 書き換えた行数
+        batches: コミットしたバッチ数
+        started_at: 開始日時（UTC）
+        updated_at: 最終更新日時（UTC）
+        completed_at: 完了日時（UTC、未完了の場合None）
+    """
+
+    name: str
+    target: str
+    last_key: str
+    rows_scanned: int
+    rows_changed: int
+    batches: int
+    started_at: str
+    updated_at: str
+    completed_at: str | None
+
+
+def load_migrations(directory: Path) -> list[BatchMigration]:
+    """
+    ディレクトリからマイグレーションの定義を読み込む
+
+    ファイル名順に、モジュール変数 migration（BatchMigration）を持つ
+    .py ファイルを読み込みます（_ で始まるファイルは除外）。
+
+    Args:
+        directory: 定義を置いたディレクトリ
+
+    Returns:
+        list[BatchMigration]: ファイル名順のマイグレーション
+
+    Raises:
+        BatchMigrationError: 定義がない、または名前が重複している場合
+    """
+    migrations: list[BatchMigration] = []
+    for path in sorted(directory.glob("*.py")):
+        if path.name.startswith("_"):
+            continue
+        spec = importlib.util.spec_from_file_location(f"batch_{path.stem}", path)
+        if spec is None or spec.loader is None:
+            raise BatchMigrationError(f"Cannot load batch migration: {path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migration = getattr(module, "migration", None)
+        if not isinstance(migration, BatchMigration):
+            raise BatchMigrationError(f"{path} does not define `migration`")
+        migrations.append(migration)
+
+    names = [m.name for m in migrations]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise BatchMigrationError(f"Duplicate batch migrations: {sorted(duplicates)}")
+    return migrations
+
+
+class BatchMigrationRunner:
+    """
+    バッチマイグレーションを1つのDBへ適用するランナー
+
+    Attributes:
+        engine: 対象DBのエンジン
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        batch_size: int | None = None,
+        pause: float | None = None,
+        target_seconds: float | None = None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            engine: 対象DBのエンジン
+            batch_size: 1バッチの行数の上限（省略時は設定値）
+            pause: バッチ間の休止時間（秒、省略時は設定値）
+            target_seconds: 1バッチの目標所要時間（秒、省略時は設定値）
+        """
+        self.engine = engine
+        self._max_batch_size = batch_size or settings.batch_migration_batch_size
+        self._pause = settings.batch_migration_pause if pause is None else pause
+        self._target_seconds = target_seconds or settings.batch_migration_target_seconds
+
+    async def status(self, migration: BatchMigration) -> BatchProgress | None:
+        """
+        進捗を取得する
+
+        Args:
+            migration: マイグレーション
+
+        Returns:
+            BatchProgress | None: 進捗（未実行の場合None）
+        """
+        async with self.engine.connect() as conn:
+            return await self._progress(conn, migration)
+
+    async def pending(self, migration: BatchMigration) -> int:
+        """
+        書き換えが必要な行（where_sql に一致する行）の数を取得する
+
+        テーブル全体を走査するため、完了後の確認に使用します。
+
+        Args:
+            migration: マイグレーション
+
+        Returns:
+            int: 書き換えが必要な行数
+        """
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    f"SELECT COUNT(*) FROM {migration.table} "
+                    f"WHERE {migration.where_sql}"
+                )
+            )
+            return result.scalar_one()
+
+    async def reset(self, migration: BatchMigration) -> None:
+        """
+        進捗を削除する（次回の実行は先頭から）
+
+        Args:
+            migration: マイグレーション
+        """
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM batch_migrations WHERE name = :name"),
+                {"name": migration.name},
+            )
+
+    async def run(
+        self,
+        migration: BatchMigration,
+        *,
+        max_batches: int | None = None,
+        on_batch: Callable[[BatchProgress], None] | None = None,
+    ) -> BatchProgress:
+        """
+        マイグレーションを前回の続きから適用する
+
+        Args:
+            migration: マイグレーション
+            max_batches: この実行でコミットするバッチ数の上限（省略時は完了まで）
+            on_batch: バッチをコミットするたびに進捗で呼び出す関数
+
+        Returns:
+            BatchProgress: 実行後の進捗（完了していれば completed_at が設定される）
+        """
+        batch_size = self._max_batch_size
+        committed = 0
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(
+                text(
+                    "INSERT INTO batch_migrations (name, target) "
+                    "VALUES (:name, :target) ON CONFLICT (name) DO NOTHING"
+                ),
+                {"name": migration.name, "target": migration.table},
+            )
+            progress = await self._checkpoint(conn, migration)
+            while progress.completed_at is None and (
+                max_batches is None or committed < max_batches
+            ):
+                started = time.perf_counter()
+                await self._apply_batch(conn, migration, progress.last_key, batch_size)
+                elapsed = time.perf_counter() - started
+                committed += 1
+
+                progress = await self._checkpoint(conn, migration)
+                if on_batch is not None:
+                    on_batch(progress)
+                if elapsed > self._target_seconds:
+                    batch_size = max(batch_size // 2, _MIN_BATCH_SIZE)
+                elif elapsed < self._target_seconds / 2:
+                    batch_size = min(batch_size * 2, self._max_batch_size)
+                if progress.completed_at is None and self._pause > 0:
+                    await asyncio.sleep(self._pause)
+        return progress
+
+    async def _apply_batch(
+        self,
+        conn: AsyncConnection,
+        migration: BatchMigration,
+        after: str,
+        batch_size: int,
+    ) -> None:
+        """キーセット順の次のバッチを書き換え、進捗と同じトランザクションでコミットする"""
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            result = await conn.execute(
+                text(
+                    f"SELECT id FROM {migration.table} "
+                    "WHERE id > :after ORDER BY id LIMIT :limit"
+                ),
+                {"after": after, "limit": batch_size},
+            )
+            ids = result.scalars().all()
+            scanned = len(ids)
+            if not ids:
+                await conn.execute(
+                    text(
+                        "UPDATE batch_migrations SET completed_at = CURRENT_TIMESTAMP, "
+                        "updated_at = CURRENT_TIMESTAMP WHERE name = :name"
+                    ),
+                    {"name": migration.name},
+                )
+            else:
+                result = await conn.execute(
+                    text(
+                        f"UPDATE {migration.table} SET {migration.set_sql} "
+                        "WHERE id > :after AND id <= :upper "
+                        f"AND ({migration.where_sql})"
+                    ),
+                    {"after": after, "upper": ids[-1]},
+                )
+                await conn.execute(
+                    text(
+                        "UPDATE batch_migrations SET last_key = :upper, "
+                        "rows_scanned = rows_scanned + :scanned, "
+                        "rows_changed = rows_changed + :changed, "
+                        "batches = batches + 1, updated_at = CURRENT_TIMESTAMP "
+                        "WHERE name = :name"
+                    ),
+                    {
+                        "name": migration.name,
+                        "upper": ids[-1],
+                        "scanned": scanned,
+                        "changed": result.rowcount,
+                    },
+                )
+            await conn.exec_driver_sql("COMMIT")
+        except BaseException:
+            await conn.exec_driver_sql("ROLLBACK")
+            raise
+
+    async def _checkpoint(
+        self, conn: AsyncConnection, migration: BatchMigration
+    ) -> BatchProgress:
+        """実行中のマイグレーションの進捗を読み込む（行がない場合は例外）"""
+        progress = await self._progress(conn, migration)
+        if progress is None:
+            raise BatchMigrationError(f"Progress of {migration.name} was removed")
+        return progress
+
+    async def _progress(
+        self, conn: AsyncConnection, migration: BatchMigration
+    ) -> BatchProgress | None:
+        """進捗の行を読み込む"""
+        result = await conn.execute(
+            text(
+                "SELECT name, target, last_key, rows_scanned, rows_changed, batches, "
+                "started_at, updated_at, completed_at "
+                "FROM batch_migrations WHERE name = :name"
+            ),
+            {"name": migration.name},
+        )
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        return BatchProgress.model_validate(dict(row))
@@ -0,0 +1,484 @@
+"""
+変更フィード
+
+このモジュールはフォルダ・チャットスレッドの変更ログ（changes テーブル）を
+購読者へ配信する仕組みを提供します。
+
+変更ログはテーブルのトリガーで書き込み（作成・更新・削除）と同じトランザクション内に
+単調増加の連番（seq）付きで記録されます。ワーカーごとにDB（シャーディング時は
+シャードごと）につき1つのテールタスクが新しい変更を読み取り、購読中のユーザーの
+キューへ振り分けます。購読開始時は指定した連番より後の変更をユーザー単位で
+読み直してから、テールの配信に切り替えます。
+
+変更ログはメンテナンス（prune_changes）で保持期間（CHANGE_RETENTION_SECONDS）を
+過ぎたものから削除し、削除した最大の連番を保持境界（retention_horizons）に
+記録します。保持境界より前から再開する購読には全件の再同期を求めます。
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import AsyncGenerator, Callable, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.db import get_session_factory
+from app.core.metrics import REGISTRY, Counter, Gauge
+from app.core.shards import get_shard_set
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_SUBSCRIBERS = REGISTRY.register(
+    Gauge("change_feed_subscribers", "Open change feed subscriptions.")
+)
+CHANGE_FEED_OVERFLOWS = REGISTRY.register(
+    Counter(
+        "change_feed_overflows",
+        "Subscriptions closed because the client fell too far behind.",
+    )
+)
+
+_SELECT = (
+    "SELECT c.seq, c.user_id, c.entity, c.entity_id, c.op, "
+    "COALESCE(f.doc, t.doc) FROM changes c "
+    "LEFT JOIN folders f ON c.entity = 'folders' AND f.id = c.entity_id "
+    "LEFT JOIN chat_threads t ON c.entity = 'chat_threads' AND t.id = c.entity_id "
+)
+
+
+class ChangeFeedOverflowError(Exception):
+    """購読者のキューがあふれ、変更を取りこぼした場合の例外"""
+
+    pass
+
+
+class ChangeFeedResyncRequiredError(Exception):
+    """再開位置より後の変更ログが保持期間を過ぎて削除済みの場合の例外"""
+
+    pass
+
+
+async def retention_horizon(db: AsyncSession | AsyncConnection, name: str) -> int:
+    """
+    保持期間を過ぎて削除した行の最大の連番を取得する
+
+    Args:
+        db: セッションまたは接続
+        name: 対象（changes/tombstones）
+
+    Returns:
+        int: 保持境界（削除していない場合0）
+    """
+    result = await db.execute(
+        text("SELECT seq FROM retention_horizons WHERE name = :name"), {"name": name}
+    )
+    return result.scalar_one_or_none() or 0
+
+
+class Change:
+    """
+    変更ログの1件
+
+    Attributes:
+        seq: 連番
+        user_id: 所有ユーザーID
+        entity: テーブル名（folders/chat_threads）
+        entity_id: ドキュメントID
+        op: 変更種別（upsert/delete）
+        doc: 現在のドキュメントのJSON文字列（削除済みの場合None）
+    """
+
+    __slots__ = ("seq", "user_id", "entity", "entity_id", "op", "doc")
+
+    def __init__(
+        self,
+        seq: int,
+        user_id: str,
+        entity: str,
+        entity_id: str,
+        op: str,
+        doc: str | None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            seq: 連番
+            user_id: 所有ユーザーID
+            entity: テーブル名
+            entity_id: ドキュメントID
+            op: 変更種別
+            doc: 現在のドキュメントのJSON文字列
+        """
+        self.seq = seq
+        self.user_id = user_id
+        self.entity = entity
+        self.entity_id = entity_id
+        self.op = op
+        self.doc = doc if op != "delete" else None
+
+    def to_json(self) -> str:
+        """
+        イベントのJSONを作成する
+
+        docは保存済みのJSON文字列をそのまま埋め込み、再エンコードを行いません。
+
+        Returns:
+            str: {"seq", "entity", "op", "id", "doc"} のJSON文字列
+        """
+        return (
+            f'{{"seq":{self.seq},"entity":"{self.entity}","op":"{self.op}",'
+            f'"id":{json.dumps(self.entity_id)},"doc":{self.doc or "null"}}}'
+        )
+
+
+def _changes(rows: Sequence[Any]) -> list[Change]:
+    """クエリ結果の行を変更の一覧に変換する"""
+    return [Change(*row) for row in rows]
+
+
+class Subscription:
+    """
+    1ユーザーの変更の購読
+
+    Attributes:
+        user_id: ユーザーID
+        source: 変更を読み取るDBの番号
+        cursor: 配信済みの最後の連番
+    """
+
+    def __init__(
+        self, feed: "ChangeFeed", user_id: str, source: int, after: int
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            feed: 変更フィード
+            user_id: ユーザーID
+            source: 変更を読み取るDBの番号
+            after: この連番より後の変更から配信する
+        """
+        self.user_id = user_id
+        self.source = source
+        self.cursor = after
+        self.overflowed = False
+        self._feed = feed
+        self._queue: asyncio.Queue[Change] = asyncio.Queue(feed.queue_size)
+        self._backfilling = True
+
+    def offer(self, change: Change) -> bool:
+        """
+        テールから変更を受け取る
+
+        Args:
+            change: 変更
+
+        Returns:
+            bool: キューがあふれた場合False
+        """
+        try:
+            self._queue.put_nowait(change)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+        return True
+
+    async def next_batch(self, timeout: float) -> list[Change]:
+        """
+        次の変更をまとめて取得する
+
+        購読開始直後はDBから未配信の変更を読み直し、追いついた後は
+        テールから届いた変更を返します。
+
+        Args:
+            timeout: 変更を待つ最大時間（秒）
+
+        Returns:
+            list[Change]: 連番順の変更（タイムアウトした場合は空）
+
+        Raises:
+            ChangeFeedOverflowError: 配信が追いつかず変更を取りこぼした場合
+            ChangeFeedResyncRequiredError: 読み直す変更が削除済みの場合
+        """
+        if self.overflowed:
+            raise ChangeFeedOverflowError
+        if self._backfilling:
+            page = await self._feed.read_user(self.source, self.user_id, self.cursor)
+            # 読み取り後の保持境界が位置以下であれば、読み取った範囲は削除されていない
+            if self.cursor < await self._feed.horizon(self.user_id):
+                raise ChangeFeedResyncRequiredError
+            self._backfilling = len(page) >= self._feed.page_size
+            if page:
+                self.cursor = page[-1].seq
+                return page
+
+        try:
+            first = await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return []
+        batch = [first]
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        # 読み直しと重複した変更は除外する
+        batch = [change for change in batch if change.seq > self.cursor]
+        if batch:
+            self.cursor = batch[-1].seq
+        return batch
+
+
+class ChangeFeed:
+    """
+    変更ログのテールと購読者への振り分け
+
+    Attributes:
+        sources: 変更ログを持つDBのセッションファクトリ
+        poll_interval: 他ワーカーの変更を確認する間隔（秒）
+        queue_size: 購読者ごとのキューの上限
+        page_size: 1回に読み取る変更の上限
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[async_sessionmaker[AsyncSession]],
+        *,
+        route: Callable[[str], int] | None = None,
+        poll_interval: float | None = None,
+        queue_size: int | None = None,
+        page_size: int | None = None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            sources: 変更ログを持つDBのセッションファクトリ
+            route: ユーザーIDから変更ログのDB番号を求める関数（省略時は0）
+            poll_interval: 確認間隔（省略時は設定値）
+            queue_size: 購読者ごとのキューの上限（省略時は設定値）
+            page_size: 1回に読み取る変更の上限（省略時は設定値）
+        """
+        self.sources = list(sources)
+        self.poll_interval = poll_interval or settings.change_feed_poll_interval
+        self.queue_size = queue_size or settings.change_feed_queue_size
+        self.page_size = page_size or settings.change_feed_page_size
+        self._route: Callable[[str], int] = route or (lambda user_id: 0)  # noqa: ARG005
+        self._subscribers: list[dict[str, set[Subscription]]] = [
+            {} for _ in self.sources
+        ]
+        self._wakeups = [asyncio.Event() for _ in self.sources]
+        self._ready = [asyncio.Event() for _ in self.sources]
+        self._tails: list[asyncio.Task[None]] = []
+
+    def subscriber_count(self) -> int:
+        """
+        購読数を取得する
+
+        Returns:
+            int: 購読数
+        """
+        return sum(len(subs) for users in self._subscribers for subs in users.values())
+
+    def start(self) -> None:
+        """DBごとのテールタスクを開始する"""
+        if self._tails:
+            return
+        self._tails = [
+            asyncio.create_task(self._tail(source), name=f"change-feed-tail-{source}")
+            for source in range(len(self.sources))
+        ]
+
+    async def stop(self) -> None:
+        """テールタスクを停止する"""
+        for task in self._tails:
+            task.cancel()
+        await asyncio.gather(*self._tails, return_exceptions=True)
+        self._tails = []
+        for ready in self._ready:
+            ready.clear()
+
+    def wake(self) -> None:
+        """テールに新しい変更の確認を促す（同一プロセス内の書き込み後に使用）"""
+        for wakeup in self._wakeups:
+            wakeup.set()
+
+    @asynccontextmanager
+    async def subscribe(
+        self, user_id: str, after: int = 0
+    ) -> AsyncGenerator[Subscription, None]:
+        """
+        ユーザーの変更を購読する
+
+        Args:
+            user_id: ユーザーID
+            after: この連番より後の変更から配信する
+
+        Yields:
+            Subscription: 購読
+        """
+        self.start()
+        source = self._route(user_id)
+        # テールの開始位置が決まってから登録し、その後に読み直すことで
+        # 読み直しとテールの間で変更を取りこぼさないようにする
+        await self._ready[source].wait()
+        subscription = Subscription(self, user_id, source, after)
+        users = self._subscribers[source]
+        users.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subs = users.get(user_id)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del users[user_id]
+
+    async def read_user(self, source: int, user_id: str, after: int) -> list[Change]:
+        """
+        ユーザーの変更を連番順に読み取る
+
+        Args:
+            source: DB番号
+            user_id: ユーザーID
+            after: この連番より後の変更を読み取る
+
+        Returns:
+            list[Change]: 変更（最大page_size件）
+        """
+        async with self.sources[source]() as session:
+            result = await session.execute(
+                text(
+                    f"{_SELECT}WHERE c.user_id = :user_id AND c.seq > :after "
+                    "ORDER BY c.seq LIMIT :limit"
+                ),
+                {"user_id": user_id, "after": after, "limit": self.page_size},
+            )
+            return _changes(result.all())
+
+    async def last_seq(self, user_id: str) -> int:
+        """
+        ユーザーの変更ログのDBの最新の連番を取得する
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            int: 最新の連番（変更がない場合0）
+        """
+        return await self._last_seq(self._route(user_id))
+
+    async def horizon(self, user_id: str) -> int:
+        """
+        ユーザーの変更ログのDBの保持境界を取得する
+
+        この連番以下の変更は削除済みのため、これより前からは再開できません。
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            int: 保持境界（削除していない場合0）
+        """
+        async with self.sources[self._route(user_id)]() as session:
+            return await retention_horizon(session, "changes")
+
+    async def _read(self, source: int, after: int) -> list[Change]:
+        """全ユーザーの変更を連番順に読み取る"""
+        async with self.sources[source]() as session:
+            result = await session.execute(
+                text(f"{_SELECT}WHERE c.seq > :after ORDER BY c.seq LIMIT :limit"),
+                {"after": after, "limit": self.page_size},
+            )
+            return _changes(result.all())
+
+    async def _last_seq(self, source: int) -> int:
+        """最新の連番を取得する（変更ログが削除済みでも採番済みの連番を返す）"""
+        async with self.sources[source]() as session:
+            result = await session.execute(
+                text("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+            )
+            return result.scalar_one_or_none() or 0
+
+    async def _tail(self, source: int) -> None:
+        """新しい変更を読み取り、購読者へ振り分ける"""
+        # 開始位置の読み取りも再試行の対象にし、一時的な失敗でテールが止まって
+        # 購読者が待ち続けることがないようにする
+        cursor: int | None = None
+        wakeup = self._wakeups[source]
+        while True:
+            try:
+                if cursor is None:
+                    cursor = await self._last_seq(source)
+                    self._ready[source].set()
+                changes = await self._read(source, cursor)
+            except Exception:
+                logger.exception("change feed tail failed; will retry")
+                changes = []
+            for change in changes:
+                self._dispatch(source, change)
+                cursor = change.seq
+            if len(changes) >= self.page_size:
+                continue
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+            wakeup.clear()
+
+    def _dispatch(self, source: int, change: Change) -> None:
+        """変更を所有ユーザーの購読者へ渡す"""
+        subs = self._subscribers[source].get(change.user_id)
+        if not subs:
+            return
+        for subscription in list(subs):
+            if not subscription.offer(change):
+                CHANGE_FEED_OVERFLOWS.labels().inc()
+                subs.discard(subscription)
+
+
+_feed: ChangeFeed | None = None
+
+
+def get_change_feed() -> ChangeFeed:
+    """
+    プロセス共有の変更フィードを取得する
+
+    DB_BACKEND=sharded の場合はシャードごとに変更ログをテールします。
+
+    Returns:
+        ChangeFeed: 変更フィード
+    """
+    global _feed
+    if _feed is None:
+        if settings.db_backend == "sharded":
+            shards = get_shard_set()
+            _feed = ChangeFeed(shards.session_factories, route=shards.shard_for_user)
+        else:
+            _feed = ChangeFeed([get_session_factory()])
+    return _feed
+
+
+def _collect_subscribers() -> None:
+    """購読数をメトリクスに反映する"""
+    CHANGE_FEED_SUBSCRIBERS.labels().set(
+        _feed.subscriber_count() if _feed is not None else 0
+    )
+
+
+REGISTRY.add_collector(_collect_subscribers)
+
+
+def notify_changes() -> None:
+    """変更フィードが使用されていれば、テールに新しい変更の確認を促す"""
+    if _feed is not None:
+        _feed.wake()
+
+
+async def shutdown_change_feed() -> None:
+    """プロセス共有の変更フィードが使用されていれば、テールを停止する"""
+    global _feed
+    if _feed is not None:
+        await _feed.stop()
+        _feed = None
@@ -4,6 +4,8 @@
 このモジュールは環境変数からアプリケーション設定を読み込みます。
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,13 +23,94 @@ class Settings(BaseSettings):
         api_v1_prefix: API v1のURLプレフィックス
         host: サーバーのホスト
         port: サーバーのポート
-        db_backend: データベースバックエンド（sqlite/cosmos）
+        db_backend: データベースバックエンド（sqlite/hybrid/sharded/cosmos）
         db_uri: データベース接続URI
+        db_shard_count: シャード数
+        db_shard_uri_template: シャードの接続URIテンプレート（{shard}を番号に置換）
+        db_shard_pool_size: シャードごとのコネクションプールサイズ
+        write_behind_flush_interval: ライトビハインドのフラッシュ間隔（秒）
+        write_behind_flush_batch_size: フラッシュを前倒しするダーティ件数
+        write_behind_max_dirty: 書き込みを待機させるダーティ件数の上限
+        write_behind_max_users: メモリに保持するユーザー数の上限
+        slow_query_threshold_ms: スロークエリの閾値（ミリ秒、0以下で無効）
+        slow_query_explain_sample_rate: 未取得のSQL文でEXPLAIN QUERY PLANを
+            バックグラウンドで取得する確率
+        metrics_enabled: /metrics 用のHTTPリクエスト計測の有効/無効
+        loop_monitor_enabled: イベントループ遅延モニタの有効/無効
+        loop_lag_interval: ループ遅延の計測間隔（秒）
+        loop_stall_threshold: ブロッキングとして報告するループ停止時間（秒）
+        loop_stall_log_interval: ブロッキング時のスタックをログに出力する最短間隔（秒）
+        server_timing_enabled: Server-Timingヘッダーによる処理時間内訳の出力
         cosmos_uri: Azure Cosmos DB URI
         cosmos_key: Azure Cosmos DB アクセスキー
         cosmos_db_name: Azure Cosmos DB データベース名
         cosmos_container_folders: foldersコンテナ名
         cosmos_container_threads: chatThreadsコンテナ名
+        offload_enabled: 大きなペイロードのJSON処理をスレッドプールへ逃がすか
+        offload_min_bytes: オフロードするドキュメントの最小サイズ（文字数）
+        offload_min_rows: オフロードする一覧ページの最小行数
+        offload_max_workers: オフロード用スレッドプールのスレッド数
+        change_feed_poll_interval: 他ワーカーの変更を変更ログから確認する間隔（秒）
+        change_feed_queue_size: 変更フィードの購読者ごとのキューの上限
+        change_feed_page_size: 変更ログを1回に読み取る件数の上限
+        change_feed_keepalive: SSEのキープアライブ送信間隔（秒）
+        change_retention_seconds: 変更ログの保持期間（秒、既定の0以下では削除しない）
+        tombstone_retention_seconds: 墓標の保持期間（秒、既定の0以下では削除しない）
+        coalesce_reads_enabled: 同時の同一読み取りを1回の問い合わせにまとめるか
+        admission_enabled: /api/v1 のアドミッション制御（負荷制限）の有効/無効
+        admission_read_limit: 読み取り（GET）の同時実行数の上限
+        admission_write_limit: 書き込み（POST/PUT/DELETE）の同時実行数の上限
+        admission_read_queue: 読み取りの待ち行列の長さの上限
+        admission_write_queue: 書き込みの待ち行列の長さの上限
+        admission_queue_timeout: 待ち行列で待つ最大時間（秒）
+        admission_target_db_latency_ms: 同時実行数を下げるSQL実行時間のEWMA（ミリ秒）
+        admission_decrease_factor: 同時実行数を下げる際の乗数
+        admission_adjust_interval: 同時実行数の上限を調整する間隔（秒）
+        admission_retry_after: 503応答のRetry-After（秒）
+        maintenance_enabled: SQLiteのバックグラウンドメンテナンスの有効/無効
+        maintenance_tick: 実行時刻を過ぎたメンテナンスを確認する間隔（秒）
+        maintenance_checkpoint_interval: WALチェックポイントの実行間隔（秒）
+        maintenance_optimize_interval: PRAGMA optimize/ANALYZE の実行間隔（秒）
+        maintenance_vacuum_interval: インクリメンタルバキュームの実行間隔（秒）
+        maintenance_vacuum_step_pages: インクリメンタルバキューム1回で回収するページ数
+        maintenance_prune_interval: 保持期間を過ぎた行の削除の実行間隔（秒）
+        maintenance_prune_batch_rows: 保持期間を過ぎた行を1回のコミットで削除する行数
+        maintenance_wal_truncate_pages: TRUNCATEに切り替えるWALフレーム数
+        maintenance_analysis_limit: 統計情報の更新でインデックスごとに走査する行数
+        maintenance_busy_in_flight: メンテナンスを先送りする処理中リクエスト数
+            （ループ遅延による先送りは loop_monitor_enabled 時のみ）
+        maintenance_max_defer: 負荷が高くてもメンテナンスを実行する先送り時間（秒）
+        backup_dir: オンラインバックアップの保存先ディレクトリ
+        backup_step_pages: バックアップ1ステップでコピーするページ数
+        backup_step_sleep: バックアップのステップ間の休止時間（秒）
+        backup_compress: バックアップをgzip圧縮するか
+        backup_baseline_window: 比較用のレイテンシを計測するバックアップ開始前の
+            期間（秒、0以下で計測しない）
+        shared_cache_size: 共有スレッドの応答キャッシュのエントリ数
+        shared_cache_ttl: 共有スレッドの応答キャッシュの有効期間（秒）
+        shared_max_age: 共有スレッドの応答のCache-Control max-age（秒）
+        auth_mode: 認証方式（headers: X-User-Idヘッダー / jwt: Bearerトークンを検証）
+        jwt_jwks_path: JWT検証用のJWKSファイルのパス（URLより優先）
+        jwt_jwks_url: JWT検証用のJWKSのURL
+        jwt_refresh_interval: JWKSをバックグラウンドで再読み込みする間隔（秒）
+        jwt_cache_size: 検証済みトークンのキャッシュ件数
+        jwt_issuer: 要求するiss（空の場合は検査しない）
+        jwt_audience: 要求するaud（空の場合は検査しない）
+        jwt_leeway: exp/nbfの許容誤差（秒）
+        ready_check_interval: /ready のDB疎通確認の結果を再利用する時間（秒）
+        ready_db_timeout: /ready のDB疎通確認のタイムアウト（秒）
+        ready_write_lock_timeout: /ready で書き込みロックの取得を待つ時間（秒）
+        ready_max_pool_utilization: 未準備とするコネクションプールの使用率
+        ready_max_loop_lag: 未準備とするイベントループ遅延（秒）
+            （loop_monitor_enabled 時のみ判定）
+        ready_max_write_queue: 未準備とする書き込みの待ち行列の長さ
+        ready_max_write_behind_dirty: 未準備とするライトビハインドの未フラッシュ件数
+        batch_migration_batch_size: バッチマイグレーションの1バッチの行数の上限
+        batch_migration_pause: バッチマイグレーションのバッチ間の休止時間（秒）
+        batch_migration_target_seconds: バッチを小さくする1バッチの所要時間（秒）
+        admin_token: 管理操作（プロファイリング等）を許可するトークン（空の場合は無効）
+        profile_dir: プロファイル結果の保存先ディレクトリ
+        profile_sample_interval: スタックサンプリングの間隔（秒）
         fixed_user_id: 固定ユーザーID（認証実装まで使用）
         fixed_email: 固定メールアドレス（認証実装まで使用）
     """
@@ -43,6 +126,98 @@ class Settings(BaseSettings):
     db_backend: str = "sqlite"
     db_uri: str = "sqlite+aiosqlite:///./data/app.db"
 
+    db_shard_count: int = 4
+    db_shard_uri_template: str = "sqlite+aiosqlite:///./data/app-shard{shard}.db"
+    db_shard_pool_size: int = 5
+
+    write_behind_flush_interval: float = 1.0
+    write_behind_flush_batch_size: int = 500
+    write_behind_max_dirty: int = 5000
+    write_behind_max_users: int = 10000
+
+    slow_query_threshold_ms: float = 100.0
+    slow_query_explain_sample_rate: float = 0.01
+
+    metrics_enabled: bool = True
+    loop_monitor_enabled: bool = False
+    loop_lag_interval: float = 0.1
+    loop_stall_threshold: float = 0.5
+    loop_stall_log_interval: float = 60.0
+    server_timing_enabled: bool = False
+
+    offload_enabled: bool = False
+    offload_min_bytes: int = 65536
+    offload_min_rows: int = 100
+    offload_max_workers: int = 4
+
+    change_feed_poll_interval: float = 0.5
+    change_feed_queue_size: int = 1000
+    change_feed_page_size: int = 500
+    change_feed_keepalive: float = 15.0
+    change_retention_seconds: float = 0.0
+    tombstone_retention_seconds: float = 0.0
+
+    coalesce_reads_enabled: bool = False
+
+    admission_enabled: bool = False
+    admission_read_limit: int = 64
+    admission_write_limit: int = 8
+    admission_read_queue: int = 256
+    admission_write_queue: int = 64
+    admission_queue_timeout: float = 2.0
+    admission_target_db_latency_ms: float = 50.0
+    admission_decrease_factor: float = 0.7
+    admission_adjust_interval: float = 0.5
+    admission_retry_after: int = 1
+
+    maintenance_enabled: bool = True
+    maintenance_tick: float = 30.0
+    maintenance_checkpoint_interval: float = 60.0
+    maintenance_optimize_interval: float = 3600.0
+    maintenance_vacuum_interval: float = 600.0
+    maintenance_vacuum_step_pages: int = 256
+    maintenance_prune_interval: float = 3600.0
+    maintenance_prune_batch_rows: int = 5000
+    maintenance_wal_truncate_pages: int = 4096
+    maintenance_analysis_limit: int = 400
+    maintenance_busy_in_flight: int = 4
+    maintenance_max_defer: float = 600.0
+
+    backup_dir: str = "./data/backups"
+    backup_step_pages: int = 256
+    backup_step_sleep: float = 0.01
+    backup_compress: bool = False
+    backup_baseline_window: float = 5.0
+
+    shared_cache_size: int = 10000
+    shared_cache_ttl: float = 30.0
+    shared_max_age: int = 60
+
+    auth_mode: Literal["headers", "jwt"] = "headers"
+    jwt_jwks_path: str = ""
+    jwt_jwks_url: str = ""
+    jwt_refresh_interval: float = 300.0
+    jwt_cache_size: int = 10000
+    jwt_issuer: str = ""
+    jwt_audience: str = ""
+    jwt_leeway: float = 30.0
+
+    ready_check_interval: float = 2.0
+    ready_db_timeout: float = 1.0
+    ready_write_lock_timeout: float = 0.1
+    ready_max_pool_utilization: float = 1.0
+    ready_max_loop_lag: float = 0.5
+    ready_max_write_queue: int = 48
+    ready_max_write_behind_dirty: int = 4000
+
+    batch_migration_batch_size: int = 1000
+    batch_migration_pause: float = 0.05
+    batch_migration_target_seconds: float = 0.05
+
+    admin_token: str = ""
+    profile_dir: str = "./data/profiles"
+    profile_sample_interval: float = 0.001
+
     cosmos_uri: str = ""
     cosmos_key: str = ""
     cosmos_db_name: str = "3pull"
@@ -4,19 +4,40 @@
 このモジュールはSQLiteデータベースへの非同期接続を管理します。
 """
 
+import logging
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import FrameType
 from typing import Any
 
+import greenlet
+from fastapi import Depends
 from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+_PLAN_CACHE_SIZE = 1024
+_MAX_PENDING_EXPLAINS = 64
+_MAX_PARAMS_REPR = 500
 
 
 def _on_connect(dbapi_conn: Any, connection_record: Any) -> None:  # noqa: ARG001
@@ -27,11 +48,308 @@ def _on_connect(dbapi_conn: Any, connection_record: Any) -> None:  # noqa: ARG00
     cursor.close()
 
 
-def create_engine() -> AsyncEngine:
+class QueryPlan:
+    """
+    EXPLAIN QUERY PLANの結果
+
+    Attributes:
+        details: 各ステップの説明（例: "SCAN folders"）
+        has_scan: テーブル全体の走査（SCAN）を含むか
+    """
+
+    __slots__ = ("details", "has_scan")
+
+    def __init__(self, details: list[str]) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            details: 各ステップの説明
+        """
+        self.details = details
+        self.has_scan = any(d.startswith("SCAN") for d in details)
+
+    def scanned_tables(self) -> set[str]:
+        """
+        全体を走査するテーブル名を取得する
+
+        Returns:
+            set[str]: SCANステップの対象テーブル名
+        """
+        return {d.split()[1] for d in self.details if d.startswith("SCAN ")}
+
+    def __str__(self) -> str:
+        """プランを1行に整形する"""
+        return " | ".join(self.details)
+
+
+# SQL文ごとのプラン（LRU）。取得はバックグラウンドのスレッドで行う
+_plans: OrderedDict[str, QueryPlan] = OrderedDict()
+_plans_lock = threading.Lock()
+_pending_explains: set[str] = set()
+_explain_executor: ThreadPoolExecutor | None = None
+# EXPLAIN用の読み取り専用接続（DBファイルごと、バックグラウンドのスレッドでのみ使用）
+_explain_connections: dict[str, sqlite3.Connection] = {}
+
+
+def _calling_method() -> str:
+    """
+    SQLを発行したリポジトリメソッドを取得する
+
+    非同期セッションのSQLはgreenlet内で実行されるため、呼び出し元の
+    コルーチンは親greenletのフレームをたどって探します。
+
+    Returns:
+        str: "モジュール.クラス.メソッド"（見つからない場合は "unknown"）
+    """
+    frames: list[FrameType | None] = [sys._getframe(1)]  # pyright: ignore[reportPrivateUsage]
+    parent = greenlet.getcurrent().parent
+    if parent is not None:
+        frames.append(parent.gr_frame)
+    for frame in frames:
+        while frame is not None:
+            module: str = frame.f_globals.get("__name__", "")
+            qualname = frame.f_code.co_qualname
+            if module.startswith("app.repositories") and "." in qualname:
+                return f"{module}.{qualname}"
+            frame = frame.f_back
+    return "unknown"
+
+
+def explain_query_plan(conn: Connection, statement: str, parameters: Any) -> QueryPlan:
+    """
+    SQL文のEXPLAIN QUERY PLANを取得する
+
+    DBAPIカーソルを直接使用するため、実行イベントは発生しません。
+
+    Args:
+        conn: SQLを実行する接続
+        statement: SQL文（DBAPIのパラメータ形式）
+        parameters: バインドパラメータ
+
+    Returns:
+        QueryPlan: プラン
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return QueryPlan([str(row[3]) for row in cursor.fetchall()])
+    finally:
+        cursor.close()
+
+
+def is_explainable(statement: str) -> bool:
+    """
+    EXPLAIN QUERY PLANの対象となるSQL文か判定する
+
+    Args:
+        statement: SQL文
+
+    Returns:
+        bool: SELECT/UPDATE/DELETE/WITHで始まる場合True
+    """
+    return statement.lstrip().upper().startswith(_EXPLAINABLE)
+
+
+def _cached_plan(statement: str) -> QueryPlan | None:
+    """取得済みのプランを返す（LRUの順序を更新する）"""
+    with _plans_lock:
+        plan = _plans.get(statement)
+        if plan is not None:
+            _plans.move_to_end(statement)
+        return plan
+
+
+def _store_plan(statement: str, plan: QueryPlan) -> None:
+    """プランを保存し、最も長く参照されていないものから件数の上限まで削除する"""
+    with _plans_lock:
+        _plans[statement] = plan
+        _plans.move_to_end(statement)
+        while len(_plans) > _PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+
+
+def _explain_in_background(
+    database: str, statement: str, parameters: Any, caller: str
+) -> None:
+    """
+    SQL文のEXPLAIN QUERY PLANを読み取り専用の別接続で取得する
+
+    初めてSCANを含むプランを取得したときに警告を出力します。
+
+    Args:
+        database: DBファイルのパス
+        statement: SQL文
+        parameters: バインドパラメータ
+        caller: SQLを発行したリポジトリメソッド
+    """
+    try:
+        conn = _explain_connections.get(database)
+        if conn is None:
+            uri = f"{Path(database).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            _explain_connections[database] = conn
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plan = QueryPlan([str(row[3]) for row in rows])
+    except Exception:
+        logger.debug("EXPLAIN QUERY PLAN failed: %s", statement, exc_info=True)
+        return
+    finally:
+        with _plans_lock:
+            _pending_explains.discard(statement)
+
+    _store_plan(statement, plan)
+    if plan.has_scan:
+        logger.warning(
+            "Full scan in query plan (%s): %s [%s]",
+            caller,
+            " ".join(statement.split()),
+            plan,
+        )
+
+
+def _schedule_explain(conn: Connection, statement: str, parameters: Any) -> None:
+    """
+    SQL文のEXPLAIN QUERY PLANの取得をバックグラウンドのスレッドへ依頼する
+
+    リクエストの接続では実行しません。取得待ちが上限に達している場合と、
+    同じSQL文を取得中の場合は依頼しません。
+
+    Args:
+        conn: SQLを実行した接続
+        statement: SQL文
+        parameters: バインドパラメータ
+    """
+    global _explain_executor
+    database = conn.engine.url.database
+    if not database or database == ":memory:":
+        return
+    with _plans_lock:
+        if (
+            statement in _pending_explains
+            or len(_pending_explains) >= _MAX_PENDING_EXPLAINS
+        ):
+            return
+        _pending_explains.add(statement)
+    if _explain_executor is None:
+        _explain_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="explain"
+        )
+    _explain_executor.submit(
+        _explain_in_background, database, statement, parameters, _calling_method()
+    )
+
+
+def wait_for_query_plans() -> None:
+    """取得を依頼したEXPLAIN QUERY PLANがすべて完了するまで待つ"""
+    if _explain_executor is not None:
+        _explain_executor.submit(lambda: None).result()
+
+
+def shutdown_query_explainer() -> None:
+    """EXPLAIN QUERY PLAN用のスレッドと接続を終了する"""
+    global _explain_executor
+    if _explain_executor is not None:
+        _explain_executor.shutdown(wait=True)
+        _explain_executor = None
+    for conn in _explain_connections.values():
+        conn.close()
+    _explain_connections.clear()
+
+
+# 実行中のSQLの開始時刻（実行コンテキストごと。失敗したSQLは handle_error で破棄する）
+_query_started: dict[Any, float] = {}
+
+
+def _before_cursor_execute(
+    conn: Connection,  # noqa: ARG001
+    cursor: Any,  # noqa: ARG001
+    statement: str,  # noqa: ARG001
+    parameters: Any,  # noqa: ARG001
+    context: Any,
+    executemany: bool,  # noqa: ARG001
+) -> None:
+    """SQL実行の開始時刻を記録する"""
+    _query_started[context] = time.perf_counter()
+
+
+def _handle_error(exception_context: ExceptionContext) -> None:
+    """失敗したSQLの開始時刻を破棄する"""
+    _query_started.pop(exception_context.execution_context, None)
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,  # noqa: ARG001
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """
+    閾値を超えたSQLをプランと呼び出し元とともにログ出力する
+
+    プランが未取得のSQL文は slow_query_explain_sample_rate の確率で
+    バックグラウンドでの取得を依頼し、以降のログに含めます。
+    """
+    started = _query_started.pop(context, None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    plan = _cached_plan(statement)
+    if (
+        plan is None
+        and not executemany
+        and is_explainable(statement)
+        and random.random() < settings.slow_query_explain_sample_rate
+    ):
+        _schedule_explain(conn, statement, parameters)
+
+    threshold = settings.slow_query_threshold_ms
+    if threshold <= 0 or elapsed_ms < threshold:
+        return
+    logger.warning(
+        "Slow query %.1f ms in %s%s: %s params=%.*s plan=[%s]",
+        elapsed_ms,
+        _calling_method(),
+        " [SCAN]" if plan is not None and plan.has_scan else "",
+        " ".join(statement.split()),
+        _MAX_PARAMS_REPR,
+        repr(parameters),
+        plan if plan is not None else "n/a",
+    )
+
+
+def instrument_slow_queries(engine: AsyncEngine) -> None:
+    """
+    エンジンにスロークエリログを登録する
+
+    SLOW_QUERY_THRESHOLD_MS を超えたSQLを、バインドパラメータ・
+    呼び出し元のリポジトリメソッド・EXPLAIN QUERY PLAN（取得済みの場合）とともに
+    ログ出力します。
+
+    Args:
+        engine: 対象の非同期エンジン
+    """
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def create_engine(
+    db_uri: str | None = None, *, pool_size: int | None = None
+) -> AsyncEngine:
     """
     非同期SQLiteエンジンを作成する
 
-    WALモードと外部キー制約を有効化したSQLiteエンジンを返します。
+    WALモードと外部キー制約を有効化し、メトリクス計測とスロークエリログを
+    登録したSQLiteエンジンを返します。
+    pool_sizeを指定した場合は接続を使い回すコネクションプールを使用します。
+
+    Args:
+        db_uri: データベース接続URI（省略時は設定値）
+        pool_size: コネクションプールのサイズ（省略時はプールしない）
 
     Returns:
         AsyncEngine: 非同期SQLAlchemyエンジン
@@ -39,36 +357,102 @@ def create_engine() -> AsyncEngine:
     connect_args: dict[str, Any] = {
         "check_same_thread": False,
     }
+    pool_args: dict[str, Any] = (
+        {"poolclass": NullPool}
+        if pool_size is None
+        else {"poolclass": AsyncAdaptedQueuePool, "pool_size": pool_size}
+    )
 
     engine = create_async_engine(
-        settings.db_uri,
+        db_uri or settings.db_uri,
         echo=settings.debug,
         future=True,
-        poolclass=NullPool,
         connect_args=connect_args,
+        **pool_args,
     )
 
     event.listen(engine.sync_engine, "connect", _on_connect)
+    instrument_engine(engine)
+    instrument_slow_queries(engine)
 
     return engine
 
 
-engine = create_engine()
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """
+    エンジンのセッションファクトリを作成する
+
+    Args:
+        engine: 非同期エンジン
+
+    Returns:
+        async_sessionmaker[AsyncSession]: セッションファクトリ
+    """
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_engine() -> AsyncEngine:
+    """
+    プロセス共有のエンジンを取得する
+
+    初回の呼び出し時に DB_URI から作成します。テストではモジュールの読み込み後に
+    DB_URI を差し替えられるよう、インポート時には作成しません。
+
+    Returns:
+        AsyncEngine: 非同期SQLAlchemyエンジン
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine()
+    return _engine
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    プロセス共有のエンジンのセッションファクトリを取得する
+
+    FastAPIのDependsで使用でき、app.dependency_overrides で
+    リクエストが使用するDBを差し替えられます。
+
+    Returns:
+        async_sessionmaker[AsyncSession]: セッションファクトリ
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = create_session_factory(get_engine())
+    return _session_factory
+
+
+async def dispose_engine() -> None:
+    """プロセス共有のエンジンが使用されていれば、接続を破棄する"""
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+async def get_session(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),  # noqa: B008
+) -> AsyncGenerator[AsyncSession, None]:
     """
     データベースセッションを取得する
 
     FastAPIのDependsで使用するための非同期ジェネレータです。
 
+    Args:
+        session_factory: セッションファクトリ
+
     Yields:
         AsyncSession: 非同期SQLAlchemyセッション
 
@@ -79,7 +463,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             pass
         ```
     """
-    async with AsyncSessionLocal() as session:
+    async with session_factory() as session:
         try:
             yield session
         finally:
@@ -0,0 +1,237 @@
+"""
+イベントループ遅延モニタ
+
+このモジュールはイベントループの遅延（ラグ）を定期的に計測するサンプラーと、
+ループを長時間ブロックしているコールバックを検出するウォッチドッグを提供します。
+
+サンプラーはループ上のタスクとして一定間隔でスリープし、予定より遅れて
+再開した時間をヒストグラムに記録します。ウォッチドッグは別スレッドで
+サンプラーの心拍を監視し、閾値を超えて途絶えた場合にループのスレッドの
+スタックと、実行中タスクが処理しているルートをログに出力します。
+スタックの出力は一定間隔に1回までとし、間の停止はメトリクスにのみ記録します。
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Counter, Histogram, route_template
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = REGISTRY.register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "Delay between scheduled and actual wake-up of the loop lag sampler.",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    )
+)
+LOOP_STALLS = REGISTRY.register(
+    Counter(
+        "event_loop_stalls",
+        "Event loop stalls longer than the threshold by active route.",
+        ("route",),
+    )
+)
+
+
+class LoopMonitor:
+    """
+    イベントループの遅延計測とブロッキング検出
+
+    Attributes:
+        interval: ラグ計測の間隔（秒）
+        stall_threshold: ブロッキングとして報告する停止時間（秒）
+        stack_log_interval: スタックをログに出力する最短間隔（秒）
+        last_lag: 直近のラグ（秒）
+        max_lag: 起動後の最大ラグ（秒）
+    """
+
+    def __init__(
+        self, interval: float, stall_threshold: float, stack_log_interval: float = 0.0
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            interval: ラグ計測の間隔（秒）
+            stall_threshold: ブロッキングとして報告する停止時間（秒）
+            stack_log_interval: スタックをログに出力する最短間隔（秒、0で毎回）
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.stack_log_interval = stack_log_interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._requests: dict[asyncio.Task[Any], Scope] = {}
+        self._beat = time.monotonic()
+        self._reported_beat = 0.0
+        self._stack_logged_at: float | None = None
+        self._suppressed = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id = 0
+        self._sampler: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """実行中のイベントループで計測を開始する"""
+        if self._sampler is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._sampler = asyncio.create_task(self._sample(), name="loop-lag-sampler")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """計測を停止する"""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def track(self, scope: Scope) -> None:
+        """
+        現在のタスクが処理しているリクエストを登録する
+
+        Args:
+            scope: リクエストのASGIスコープ
+        """
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = scope
+
+    def untrack(self) -> None:
+        """現在のタスクのリクエスト登録を解除する"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests.pop(task, None)
+
+    async def _sample(self) -> None:
+        """ループの遅延を一定間隔で計測する"""
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self._beat - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.labels().observe(lag)
+
+    def _watch(self) -> None:
+        """サンプラーの心拍を監視し、途絶えた場合にスタックを報告する"""
+        while not self._stop.wait(self.stall_threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled >= self.stall_threshold and beat != self._reported_beat:
+                self._reported_beat = beat
+                self._report(stalled)
+
+    def _active_route(self) -> str:
+        """ループで実行中のタスクが処理しているルートを取得する"""
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return "unknown"
+        scope = self._requests.get(task) if task is not None else None
+        if scope is None:
+            return "background"
+        route = route_template(scope)
+        return scope["path"] if route == "unmatched" else route
+
+    def _report(self, stalled: float) -> None:
+        """ブロッキング中のスタックとルートをログに出力する（間隔内は集計のみ）"""
+        route = self._active_route()
+        LOOP_STALLS.labels(route).inc()
+        now = time.monotonic()
+        if (
+            self._stack_logged_at is not None
+            and now - self._stack_logged_at < self.stack_log_interval
+        ):
+            self._suppressed += 1
+            return
+
+        frame = sys._current_frames().get(self._loop_thread_id)  # pyright: ignore[reportPrivateUsage]
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        logger.warning(
+            "Event loop blocked for %.0f ms+ in %s (%d stalls not logged since the "
+            "last report):\n%s",
+            stalled * 1000,
+            route,
+            self._suppressed,
+            stack,
+        )
+        self._stack_logged_at = now
+        self._suppressed = 0
+
+
+_monitor: LoopMonitor | None = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """
+    プロセス共有のループモニタを取得する
+
+    Returns:
+        LoopMonitor: ループモニタ
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor(
+            interval=settings.loop_lag_interval,
+            stall_threshold=settings.loop_stall_threshold,
+            stack_log_interval=settings.loop_stall_log_interval,
+        )
+    return _monitor
+
+
+class LoopMonitorMiddleware:
+    """
+    リクエストを処理中のタスクをループモニタに登録するASGIミドルウェア
+
+    ブロッキング検出時に、停止の原因となったルートを特定するために使用します。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            app: ラップするASGIアプリケーション
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        リクエストを処理する
+
+        Args:
+            scope: ASGIスコープ
+            receive: ASGI受信関数
+            send: ASGI送信関数
+        """
+        if scope["type"] != "http" or not settings.loop_monitor_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        monitor = get_loop_monitor()
+        monitor.track(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            monitor.untrack()
@@ -0,0 +1,473 @@
+"""
+SQLiteメンテナンス
+
+このモジュールはSQLiteのメンテナンス（WALチェックポイント、統計情報の更新、
+インクリメンタルバキューム、保持期間を過ぎた変更ログ・墓標の削除）を定期的に
+実行するスケジューラを提供します。
+
+各タスクは実行間隔ごとに実行されますが、処理中のリクエストが多い場合や
+イベントループが遅延している場合は先送りします（最大先送り時間を超えた場合は
+実行します）。ループの遅延はループ遅延モニタ（LOOP_MONITOR_ENABLED）が
+有効な場合のみ考慮します。インクリメンタルバキュームは小さなページ数ずつ実行し、
+負荷が高くなった時点で中断して次回に続きを行います。変更ログ・墓標の削除も
+MAINTENANCE_PRUNE_BATCH_ROWS 行ずつコミットし、同様に中断します。
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from datetime import datetime
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.changes import retention_horizon
+from app.core.clock import to_api_datetime, utc_now
+from app.core.config import settings
+from app.core.db import get_engine
+from app.core.loop_monitor import get_loop_monitor
+from app.core.metrics import HTTP_REQUESTS_IN_FLIGHT, REGISTRY, Counter, Gauge
+from app.core.shards import get_shard_set
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_LAST_RUN = REGISTRY.register(
+    Gauge(
+        "db_maintenance_last_run_timestamp_seconds",
+        "Unix time of the last maintenance run by database and task.",
+        ("database", "task"),
+    )
+)
+MAINTENANCE_DURATION = REGISTRY.register(
+    Gauge(
+        "db_maintenance_last_duration_seconds",
+        "Duration of the last maintenance run by database and task.",
+        ("database", "task"),
+    )
+)
+MAINTENANCE_PAGES = REGISTRY.register(
+    Counter(
+        "db_maintenance_pages",
+        "Pages reclaimed (vacuum) or WAL frames checkpointed by maintenance.",
+        ("database", "task"),
+    )
+)
+MAINTENANCE_DEFERRALS = REGISTRY.register(
+    Counter(
+        "db_maintenance_deferrals",
+        "Maintenance runs postponed because of request load.",
+        ("database", "task"),
+    )
+)
+
+type Yield = Callable[[], bool]
+type TaskFn = Callable[[AsyncConnection, Yield], Awaitable[int]]
+
+
+class MaintenanceTaskStatus(BaseModel):
+    """
+    メンテナンスタスクの実行状況
+
+    Attributes:
+        database: DB名（main/shardN）
+        task: タスク名
+        runs: 実行回数
+        deferrals: 負荷により先送りした回数
+        last_run: 直近の実行開始日時（未実行の場合None）
+        last_duration_seconds: 直近の所要時間（秒）
+        last_pages: 直近に回収したページ数（checkpointはWALフレーム数、
+            prune_* は削除した行数）
+        total_pages: 回収したページ数の累計
+        last_error: 直近の実行で発生したエラー（成功時はNone）
+    """
+
+    database: str
+    task: str
+    runs: int = 0
+    deferrals: int = 0
+    last_run: str | None = None
+    last_duration_seconds: float = 0.0
+    last_pages: int = 0
+    total_pages: int = 0
+    last_error: str | None = None
+
+
+async def checkpoint(conn: AsyncConnection, should_yield: Yield) -> int:  # noqa: ARG001
+    """
+    WALをチェックポイントする
+
+    PASSIVEで実行し、WALの全フレームを書き戻せたうえでWALが閾値より大きい場合は
+    TRUNCATEに切り替えてWALファイルを切り詰めます。
+
+    Args:
+        conn: DB接続
+        should_yield: 負荷が高い場合にTrueを返す関数
+
+    Returns:
+        int: チェックポイントしたWALフレーム数
+    """
+    result = await conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)")
+    busy, log, done = tuple(result.one())
+    if busy == 0 and log == done and log >= settings.maintenance_wal_truncate_pages:
+        await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    return max(done, 0)
+
+
+async def optimize(conn: AsyncConnection, should_yield: Yield) -> int:  # noqa: ARG001
+    """
+    クエリプランナーの統計情報を更新する
+
+    統計情報（sqlite_stat1）がまだない場合はANALYZE、ある場合は
+    PRAGMA optimize を実行します。analysis_limitで走査行数を抑えます。
+
+    Args:
+        conn: DB接続
+        should_yield: 負荷が高い場合にTrueを返す関数
+
+    Returns:
+        int: 常に0
+    """
+    result = await conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    )
+    has_stats = result.scalar_one() > 0
+    await conn.exec_driver_sql(
+        f"PRAGMA analysis_limit = {settings.maintenance_analysis_limit}"
+    )
+    await conn.exec_driver_sql("PRAGMA optimize" if has_stats else "ANALYZE")
+    return 0
+
+
+async def incremental_vacuum(conn: AsyncConnection, should_yield: Yield) -> int:
+    """
+    空きページをファイルから回収する
+
+    auto_vacuum=INCREMENTAL のDBでのみ有効です。
+    MAINTENANCE_VACUUM_STEP_PAGES ずつ回収し、負荷が高くなった時点で中断します。
+
+    Args:
+        conn: DB接続
+        should_yield: 負荷が高い場合にTrueを返す関数
+
+    Returns:
+        int: 回収したページ数
+    """
+    result = await conn.exec_driver_sql("PRAGMA auto_vacuum")
+    if result.scalar_one() != 2:
+        return 0
+
+    reclaimed = 0
+    while True:
+        result = await conn.exec_driver_sql("PRAGMA freelist_count")
+        free: int = result.scalar_one()
+        if free == 0:
+            break
+        step = min(free, settings.maintenance_vacuum_step_pages)
+        # 結果行を読み切るまで1ページずつしか回収されないため、ドライバで読み切る
+        driver = (await conn.get_raw_connection()).driver_connection
+        assert driver is not None
+        cursor = await driver.execute(f"PRAGMA incremental_vacuum({step})")
+        await cursor.fetchall()
+        await cursor.close()
+        result = await conn.exec_driver_sql("PRAGMA freelist_count")
+        reclaimed += free - result.scalar_one()
+        if should_yield():
+            break
+        await asyncio.sleep(0)
+    return reclaimed
+
+
+async def _prune(
+    conn: AsyncConnection,
+    should_yield: Yield,
+    *,
+    table: str,
+    key: str,
+    timestamp: str,
+    retention: float,
+) -> int:
+    """
+    保持期間を過ぎた行をキーの昇順にバッチで削除し、保持境界を記録する
+
+    キーと時刻はともに単調増加するため、保持境界より後の先頭から期限切れの
+    行が続く範囲だけを削除します。バッチごとに削除と保持境界の更新を
+    コミットし、負荷が高くなった時点で中断します。
+
+    Args:
+        conn: DB接続
+        should_yield: 負荷が高い場合にTrueを返す関数
+        table: 対象テーブル（retention_horizons の名前を兼ねる）
+        key: 単調増加する連番の列
+        timestamp: 記録日時の列
+        retention: 保持期間（秒、0以下で削除しない）
+
+    Returns:
+        int: 削除した行数
+    """
+    result = await conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'retention_horizons'"
+    )
+    if retention <= 0 or result.scalar_one() == 0:
+        return 0
+
+    limit = settings.maintenance_prune_batch_rows
+    pruned = 0
+    while True:
+        after = await retention_horizon(conn, table)
+        result = await conn.execute(
+            text(
+                f"SELECT {key}, {timestamp} < datetime('now', :age) FROM {table} "
+                f"WHERE {key} > :after ORDER BY {key} LIMIT :limit"
+            ),
+            {"age": f"-{retention} seconds", "after": after, "limit": limit},
+        )
+        rows = result.all()
+        upper: int | None = None
+        for row_key, expired in rows:
+            if not expired:
+                break
+            upper = row_key
+        if upper is None:
+            await conn.rollback()
+            break
+
+        result = await conn.execute(
+            text(f"DELETE FROM {table} WHERE {key} > :after AND {key} <= :upper"),
+            {"after": after, "upper": upper},
+        )
+        pruned += result.rowcount
+        await conn.execute(
+            text(
+                "INSERT INTO retention_horizons (name, seq) VALUES (:name, :seq) "
+                "ON CONFLICT (name) DO UPDATE SET seq = excluded.seq, "
+                "updated_at = CURRENT_TIMESTAMP"
+            ),
+            {"name": table, "seq": upper},
+        )
+        await conn.commit()
+        if upper != rows[-1][0] or len(rows) < limit or should_yield():
+            break
+        await asyncio.sleep(0)
+    return pruned
+
+
+async def prune_changes(conn: AsyncConnection, should_yield: Yield) -> int:
+    """
+    保持期間（CHANGE_RETENTION_SECONDS）を過ぎた変更ログを削除する
+
+    Args:
+        conn: DB接続
+        should_yield: 負荷が高い場合にTrueを返す関数
+
+    Returns:
+        int: 削除した行数
+    """
+    return await _prune(
+        conn,
+        should_yield,
+        table="changes",
+        key="seq",
+        timestamp="changed_at",
+        retention=settings.change_retention_seconds,
+    )
+
+
+async def prune_tombstones(conn: AsyncConnection, should_yield: Yield) -> int:
+    """
+    保持期間（TOMBSTONE_RETENTION_SECONDS）を過ぎた墓標を削除する
+
+    Args:
+        conn: DB接続
+        should_yield: 負荷が高い場合にTrueを返す関数
+
+    Returns:
+        int: 削除した行数
+    """
+    return await _prune(
+        conn,
+        should_yield,
+        table="tombstones",
+        key="version",
+        timestamp="deleted_at",
+        retention=settings.tombstone_retention_seconds,
+    )
+
+
+TASKS: dict[str, TaskFn] = {
+    "checkpoint": checkpoint,
+    "optimize": optimize,
+    "incremental_vacuum": incremental_vacuum,
+    "prune_changes": prune_changes,
+    "prune_tombstones": prune_tombstones,
+}
+
+
+def _interval(task: str) -> float:
+    """タスクの実行間隔（秒）を取得する"""
+    return {
+        "checkpoint": settings.maintenance_checkpoint_interval,
+        "optimize": settings.maintenance_optimize_interval,
+        "incremental_vacuum": settings.maintenance_vacuum_interval,
+        "prune_changes": settings.maintenance_prune_interval,
+        "prune_tombstones": settings.maintenance_prune_interval,
+    }[task]
+
+
+def is_busy() -> bool:
+    """
+    リクエスト負荷が高いか判定する
+
+    ループの遅延はループ遅延モニタが有効な場合のみ判定に使います。
+
+    Returns:
+        bool: 処理中のリクエスト数が閾値を超えているか、ループが遅延している場合True
+    """
+    return HTTP_REQUESTS_IN_FLIGHT.total() > settings.maintenance_busy_in_flight or (
+        settings.loop_monitor_enabled
+        and get_loop_monitor().last_lag >= settings.loop_stall_threshold
+    )
+
+
+class MaintenanceScheduler:
+    """
+    SQLiteメンテナンスのスケジューラ
+
+    Attributes:
+        engines: DB名をキーとしたエンジン
+    """
+
+    def __init__(self, engines: Mapping[str, AsyncEngine]) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            engines: DB名をキーとしたエンジン
+        """
+        self.engines = dict(engines)
+        self._status = {
+            (database, task): MaintenanceTaskStatus(database=database, task=task)
+            for database in self.engines
+            for task in TASKS
+        }
+        now = time.monotonic()
+        self._due = {key: now + _interval(key[1]) for key in self._status}
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """実行中のイベントループでスケジューラを開始する"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="db-maintenance")
+
+    async def stop(self) -> None:
+        """スケジューラを停止する"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> list[MaintenanceTaskStatus]:
+        """
+        全タスクの実行状況を取得する
+
+        Returns:
+            list[MaintenanceTaskStatus]: DB・タスクごとの実行状況
+        """
+        return [status.model_copy() for status in self._status.values()]
+
+    async def run_due(self, now: float | None = None) -> None:
+        """
+        実行時刻を過ぎたタスクを実行する（負荷が高い場合は先送りする）
+
+        Args:
+            now: 現在時刻（time.monotonic、テスト用）
+        """
+        now = time.monotonic() if now is None else now
+        for key, due in self._due.items():
+            if now < due:
+                continue
+            overdue = now - due >= settings.maintenance_max_defer
+            if is_busy() and not overdue:
+                self._status[key].deferrals += 1
+                MAINTENANCE_DEFERRALS.labels(*key).inc()
+                continue
+            await self.run(*key)
+            self._due[key] = time.monotonic() + _interval(key[1])
+
+    async def run(self, database: str, task: str) -> MaintenanceTaskStatus:
+        """
+        タスクを実行する
+
+        Args:
+            database: DB名
+            task: タスク名
+
+        Returns:
+            MaintenanceTaskStatus: 実行後の状況
+        """
+        status = self._status[(database, task)]
+        async with self._lock:
+            started_at: datetime = utc_now()
+            started = time.perf_counter()
+            try:
+                async with self.engines[database].connect() as conn:
+                    pages = await TASKS[task](conn, is_busy)
+                    await conn.commit()
+            except Exception as exc:
+                logger.exception("maintenance %s on %s failed", task, database)
+                status.last_error = repr(exc)
+                pages = 0
+            else:
+                status.last_error = None
+            elapsed = time.perf_counter() - started
+
+        status.runs += 1
+        status.last_run = to_api_datetime(started_at)
+        status.last_duration_seconds = elapsed
+        status.last_pages = pages
+        status.total_pages += pages
+        MAINTENANCE_LAST_RUN.labels(database, task).set(started_at.timestamp())
+        MAINTENANCE_DURATION.labels(database, task).set(elapsed)
+        MAINTENANCE_PAGES.labels(database, task).inc(pages)
+        return status.model_copy()
+
+    async def _loop(self) -> None:
+        """一定間隔で実行時刻を過ぎたタスクを実行する"""
+        while True:
+            await asyncio.sleep(settings.maintenance_tick)
+            try:
+                await self.run_due()
+            except Exception:
+                logger.exception("maintenance run failed; will retry")
+
+
+_scheduler: MaintenanceScheduler | None = None
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    """
+    プロセス共有のメンテナンススケジューラを取得する
+
+    DB_BACKEND=sharded の場合はメインDBと全シャードが対象です。
+
+    Returns:
+        MaintenanceScheduler: メンテナンススケジューラ
+    """
+    global _scheduler
+    if _scheduler is None:
+        engines = {"main": get_engine()}
+        if settings.db_backend == "sharded":
+            for shard, engine in enumerate(get_shard_set().engines):
+                engines[f"shard{shard}"] = engine
+        _scheduler = MaintenanceScheduler(engines)
+    return _scheduler
+
+
+async def shutdown_maintenance_scheduler() -> None:
+    """プロセス共有のメンテナンススケジューラが使用されていれば停止する"""
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
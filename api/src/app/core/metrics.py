@@ -0,0 +1,597 @@
+"""
+Prometheusメトリクス
+
+このモジュールは外部ライブラリに依存しない最小限のメトリクス実装
+（カウンター・ゲージ・ヒストグラム）と、HTTPリクエスト・SQL実行・
+セッション・コネクション・キャッシュの計測を提供します。
+
+記録はイベントループのスレッドから行われる前提で、値の更新にロックを取りません。
+ロックを取るのはラベルの組み合わせごとの系列を初めて作成するときだけです。
+"""
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    """ラベル値をテキスト形式用にエスケープする"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """ラベルを {name="value",...} 形式に整形する"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """値をテキスト形式に整形する"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric[ChildT](ABC):
+    """
+    ラベル付きメトリクスの基底クラス
+
+    Attributes:
+        name: メトリクス名
+        documentation: HELP行の説明
+        label_names: ラベル名
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            name: メトリクス名
+            documentation: HELP行の説明
+            label_names: ラベル名
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: dict[tuple[str, ...], ChildT] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> ChildT:
+        """
+        ラベル値に対応する系列を取得する（なければ作成する）
+
+        Args:
+            *values: ラベル値（label_namesの順）
+
+        Returns:
+            ChildT: 系列
+        """
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def series(self) -> list[tuple[tuple[str, ...], ChildT]]:
+        """
+        作成済みの系列を取得する
+
+        Returns:
+            list[tuple[tuple[str, ...], ChildT]]: (ラベル値, 系列) の一覧
+        """
+        return list(self._children.items())
+
+    @abstractmethod
+    def _new_child(self) -> ChildT:
+        """系列を作成する"""
+
+    @abstractmethod
+    def _samples(self) -> Iterable[tuple[str, str, float]]:
+        """(サフィックス, ラベル文字列, 値) の一覧を返す"""
+
+    def render(self) -> str:
+        """
+        テキスト形式に整形する
+
+        Returns:
+            str: HELP/TYPE行とサンプル行
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {_format_value(value)}"
+            for suffix, labels, value in self._samples()
+        )
+        return "\n".join(lines)
+
+
+class _Value:
+    """カウンター・ゲージの系列"""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        """コンストラクタ"""
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """値を加算する"""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """値を減算する"""
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        """値を設定する"""
+        self.value = value
+
+
+class Counter(_Metric[_Value]):
+    """単調増加するカウンター"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        """系列を作成する"""
+        return _Value()
+
+    def _samples(self) -> Iterable[tuple[str, str, float]]:
+        """(サフィックス, ラベル文字列, 値) の一覧を返す"""
+        for values, child in self.series():
+            yield "_total", _format_labels(self.label_names, values), child.value
+
+
+class Gauge(_Metric[_Value]):
+    """増減するゲージ"""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        """系列を作成する"""
+        return _Value()
+
+    def _samples(self) -> Iterable[tuple[str, str, float]]:
+        """(サフィックス, ラベル文字列, 値) の一覧を返す"""
+        for values, child in self.series():
+            yield "", _format_labels(self.label_names, values), child.value
+
+    def total(self) -> float:
+        """
+        全系列の合計値を取得する
+
+        Returns:
+            float: 合計値
+        """
+        return sum(child.value for _, child in self.series())
+
+
+class _HistogramValue:
+    """ヒストグラムの系列"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            bounds: バケットの上限値（昇順、+Infを除く）
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        観測値を記録する
+
+        Args:
+            value: 観測値
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric[_HistogramValue]):
+    """
+    固定バケットのヒストグラム
+
+    Attributes:
+        buckets: バケットの上限値（昇順、+Infを除く）
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            name: メトリクス名
+            documentation: HELP行の説明
+            label_names: ラベル名
+            buckets: バケットの上限値
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        """系列を作成する"""
+        return _HistogramValue(self.buckets)
+
+    def _samples(self) -> Iterable[tuple[str, str, float]]:
+        """(サフィックス, ラベル文字列, 値) の一覧を返す"""
+        names = (*self.label_names, "le")
+        for values, child in self.series():
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, float("inf")), list(child.counts), strict=True
+            ):
+                cumulative += count
+                le = _format_value(bound)
+                yield "_bucket", _format_labels(names, (*values, le)), cumulative
+            labels = _format_labels(self.label_names, values)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, cumulative
+
+
+class Ewma:
+    """
+    指数加重移動平均
+
+    Attributes:
+        alpha: 新しい観測値の重み（0〜1）
+        value: 現在の平均値
+    """
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha: float) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            alpha: 新しい観測値の重み（0〜1）
+        """
+        self.alpha = alpha
+        self.value = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        観測値を反映する
+
+        Args:
+            value: 観測値
+        """
+        self.value += self.alpha * (value - self.value)
+
+
+class Registry:
+    """
+    メトリクスの登録先
+
+    レンダリング時に値を計算するコールバック（キャッシュのヒット率など）も登録できます。
+    """
+
+    def __init__(self) -> None:
+        """コンストラクタ"""
+        self._metrics: list[_Metric[Any]] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register[MetricT: _Metric[Any]](self, metric: MetricT) -> MetricT:
+        """
+        メトリクスを登録する
+
+        Args:
+            metric: 登録するメトリクス
+
+        Returns:
+            MetricT: 登録したメトリクス
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        レンダリング直前に呼び出すコールバックを登録する
+
+        Args:
+            collector: ゲージの値を更新するコールバック
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Prometheusテキスト形式（0.0.4）に整形する
+
+        Returns:
+            str: メトリクス全体のテキスト
+        """
+        for collector in self._collectors:
+            collector()
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route and status.",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "http_requests_in_flight",
+        "HTTP requests currently being served.",
+        ("method",),
+    )
+)
+DB_STATEMENT_DURATION = REGISTRY.register(
+    Histogram(
+        "db_statement_duration_seconds",
+        "SQL statement execution time by database and verb.",
+        ("database", "verb"),
+    )
+)
+DB_CONNECTIONS_OPENED = REGISTRY.register(
+    Counter(
+        "db_connections_opened",
+        "DBAPI connections opened (every checkout under NullPool).",
+        ("database",),
+    )
+)
+DB_CONNECTIONS_CLOSED = REGISTRY.register(
+    Counter("db_connections_closed", "DBAPI connections closed.", ("database",))
+)
+DB_CONNECTION_CHECKOUTS = REGISTRY.register(
+    Counter(
+        "db_connection_checkouts",
+        "Connections checked out from the pool.",
+        ("database",),
+    )
+)
+DB_SESSION_TRANSACTIONS = REGISTRY.register(
+    Counter(
+        "db_session_transactions",
+        "ORM sessions that began a transaction on a connection.",
+    )
+)
+DB_LATENCY = Ewma(alpha=0.1)
+DB_LATENCY_EWMA = REGISTRY.register(
+    Gauge(
+        "db_statement_latency_ewma_seconds",
+        "Exponentially weighted moving average of SQL statement latency.",
+    )
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "cache_requests",
+        "Cache lookups by cache and result (hit/miss).",
+        ("cache", "result"),
+    )
+)
+CACHE_HIT_RATIO = REGISTRY.register(
+    Gauge("cache_hit_ratio", "Cache hit ratio since process start.", ("cache",))
+)
+
+_VERBS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA"})
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """
+    キャッシュの参照結果を記録する
+
+    Args:
+        cache: キャッシュ名
+        hit: ヒットしたか
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _collect_cache_ratios() -> None:
+    """キャッシュごとのヒット率を計算する"""
+    totals: dict[str, list[float]] = {}
+    for (cache, result), child in CACHE_REQUESTS.series():
+        hit_total = totals.setdefault(cache, [0.0, 0.0])
+        hit_total[1] += child.value
+        if result == "hit":
+            hit_total[0] += child.value
+    for cache, (hits, total) in totals.items():
+        CACHE_HIT_RATIO.labels(cache).set(hits / total if total else 0.0)
+
+
+REGISTRY.add_collector(_collect_cache_ratios)
+REGISTRY.add_collector(lambda: DB_LATENCY_EWMA.labels().set(DB_LATENCY.value))
+
+
+def _statement_verb(statement: str) -> str:
+    """SQL文の先頭の動詞を取得する（未知の場合はOTHER）"""
+    verb = statement.lstrip()[:6].upper()
+    return verb if verb in _VERBS else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    エンジンにSQL実行・コネクションの計測を登録する
+
+    Args:
+        engine: 計測対象の非同期エンジン
+    """
+    sync_engine = engine.sync_engine
+    database = Path(sync_engine.url.database or "memory").name
+    opened = DB_CONNECTIONS_OPENED.labels(database)
+    closed = DB_CONNECTIONS_CLOSED.labels(database)
+    checkouts = DB_CONNECTION_CHECKOUTS.labels(database)
+    # 実行中のSQLの開始時刻（実行コンテキストごと。失敗したSQLは破棄する）
+    started: dict[Any, float] = {}
+
+    def before_cursor_execute(
+        conn: Connection,  # noqa: ARG001
+        cursor: Any,  # noqa: ARG001
+        statement: str,  # noqa: ARG001
+        parameters: Any,  # noqa: ARG001
+        context: Any,
+        executemany: bool,  # noqa: ARG001
+    ) -> None:
+        started[context] = time.perf_counter()
+
+    def after_cursor_execute(
+        conn: Connection,  # noqa: ARG001
+        cursor: Any,  # noqa: ARG001
+        statement: str,
+        parameters: Any,  # noqa: ARG001
+        context: Any,
+        executemany: bool,  # noqa: ARG001
+    ) -> None:
+        begun = started.pop(context, None)
+        if begun is None:
+            return
+        elapsed = time.perf_counter() - begun
+        verb = _statement_verb(statement)
+        DB_STATEMENT_DURATION.labels(database, verb).observe(elapsed)
+        DB_LATENCY.observe(elapsed)
+
+    def handle_error(exception_context: ExceptionContext) -> None:
+        started.pop(exception_context.execution_context, None)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
+    event.listen(sync_engine, "connect", lambda *_: opened.inc())
+    event.listen(sync_engine, "close", lambda *_: closed.inc())
+    event.listen(sync_engine, "checkout", lambda *_: checkouts.inc())
+
+
+@event.listens_for(Session, "after_begin")
+def _on_session_begin(*args: Any) -> None:  # noqa: ARG001
+    """セッションがトランザクションを開始した回数を記録する"""
+    DB_SESSION_TRANSACTIONS.labels().inc()
+
+
+def route_template(scope: Scope) -> str:
+    """
+    リクエストが一致したルートのパステンプレートを取得する
+
+    ルーターのプレフィックスを含むパス（例: /api/v1/folders/{folder_id}）を返します。
+    一致時にスコープへ設定される route の公開属性（path_regex, path_format）のみを
+    使用します。FastAPIのバージョンによって route の path がプレフィックスを
+    含まない場合があるため、path_regex が一致するパスの末尾より前を
+    プレフィックス（固定文字列）として補います。
+
+    Args:
+        scope: ルーティング済みのASGIスコープ
+
+    Returns:
+        str: パステンプレート（どのルートにも一致しない場合は "unmatched"）
+    """
+    route = scope.get("route")
+    template: str | None = getattr(route, "path_format", None)
+    if route is None or not template:
+        return "unmatched"
+    path: str = scope.get("path", "")
+    start = 0
+    while start != -1:
+        if route.path_regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+class MetricsMiddleware:
+    """
+    HTTPリクエストのレイテンシと処理中リクエスト数を記録するASGIミドルウェア
+
+    ルートラベルにはパスのテンプレート（例: /api/v1/folders/{id}）を使用し、
+    どのルートにも一致しないリクエストは "unmatched" にまとめます。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            app: ラップするASGIアプリケーション
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        リクエストを処理する
+
+        Args:
+            scope: ASGIスコープ
+            receive: ASGI受信関数
+            send: ASGI送信関数
+        """
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method: str = scope["method"]
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method, route_template(scope), str(status)
+            ).observe(time.perf_counter() - started)
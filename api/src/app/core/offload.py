@@ -0,0 +1,97 @@
+"""
+CPU処理のオフロード
+
+このモジュールは大きなドキュメントや一覧ページのJSONデコード・モデル構築・
+エンコードを、イベントループから上限付きのスレッドプールへ逃がす仕組みを提供します。
+
+小さなペイロードはスレッドへの受け渡しの方が高くつくため、
+バイト数または行数が閾値（OFFLOAD_MIN_BYTES / OFFLOAD_MIN_ROWS）以上の場合のみ
+オフロードします。閾値は scripts/load_http.py の --large-prompt-bytes で
+小さなリクエストのp99を比較して調整してください。
+"""
+
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def should_offload(*, size_bytes: int = 0, rows: int = 0) -> bool:
+    """
+    処理をオフロードすべきか判定する
+
+    Args:
+        size_bytes: 処理対象のバイト数（文字数）
+        rows: 処理対象の行数
+
+    Returns:
+        bool: いずれかが閾値以上の場合True
+    """
+    return settings.offload_enabled and (
+        size_bytes >= settings.offload_min_bytes or rows >= settings.offload_min_rows
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """オフロード用のスレッドプールを取得する"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.offload_max_workers, thread_name_prefix="offload"
+        )
+    return _executor
+
+
+async def run_off_loop[**P, R](
+    func: Callable[P, R], *args: P.args, **kwargs: P.kwargs
+) -> R:
+    """
+    関数をオフロード用スレッドプールで実行する
+
+    コンテキスト変数（Server-Timingの計測など）は呼び出し元から引き継ぎます。
+
+    Args:
+        func: 実行する関数
+        *args: 位置引数
+        **kwargs: キーワード引数
+
+    Returns:
+        R: 関数の戻り値
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+async def render_json[T](adapter: TypeAdapter[T], value: T) -> Response:
+    """
+    モデルをオフロード用スレッドプールでJSONに変換したレスポンスを作成する
+
+    response_modelによる検証とエンコードをループ上で行わずに済ませるため、
+    大きな一覧ページで使用します。
+
+    Args:
+        adapter: 値の型アダプタ
+        value: レスポンスの値
+
+    Returns:
+        Response: application/json のレスポンス
+    """
+    body = await run_off_loop(adapter.dump_json, value, by_alias=True)
+    return Response(body, media_type="application/json")
+
+
+def shutdown_offload_executor() -> None:
+    """オフロード用スレッドプールを終了する"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,195 @@
+"""
+リクエスト単位のプロファイラ
+
+このモジュールは指定したリクエストだけを cProfile とサンプリングプロファイラの
+もとで実行し、結果を pstats ファイルと折りたたみスタック形式
+（flamegraph.pl / speedscope で読み込めるテキスト）として保存する仕組みを提供します。
+
+プロファイリングは X-Profile ヘッダーを付けたリクエストのうち、
+デバッグモードまたは管理者トークンが一致する場合のみ行います。
+"""
+
+import asyncio
+import cProfile
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.auth import is_admin
+from app.core.config import settings
+from app.core.ids import new_uuid
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_PATTERN = re.compile(r"[0-9a-f-]{36}")
+PROFILE_FORMATS = {"pstats": "pstats", "folded": "folded.txt"}
+
+_active = threading.Lock()
+
+
+def profile_path(profile_id: str, fmt: str) -> Path | None:
+    """
+    プロファイル結果のファイルパスを取得する
+
+    Args:
+        profile_id: プロファイルID
+        fmt: 形式（pstats/folded）
+
+    Returns:
+        Path | None: ファイルパス（IDまたは形式が不正な場合はNone）
+    """
+    if fmt not in PROFILE_FORMATS or not PROFILE_ID_PATTERN.fullmatch(profile_id):
+        return None
+    return Path(settings.profile_dir) / f"{profile_id}.{PROFILE_FORMATS[fmt]}"
+
+
+def _frame_name(frame: FrameType) -> str:
+    """フレームを "モジュール:関数名" に整形する"""
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+class StackSampler:
+    """
+    指定スレッドのスタックを一定間隔で採取するサンプリングプロファイラ
+
+    Attributes:
+        samples: 折りたたみスタックごとの採取回数
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            thread_id: 採取対象のスレッドID（イベントループのスレッド）
+            interval: 採取間隔（秒）
+        """
+        self.samples: Counter[str] = Counter()
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        """採取を開始する"""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """採取を停止する"""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """採取ループ"""
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)  # pyright: ignore[reportPrivateUsage]
+            stack: list[str] = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """
+        折りたたみスタック形式に整形する
+
+        Returns:
+            str: "呼び出し元;...;呼び出し先 回数" の行
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+def _save(profile_id: str, profiler: cProfile.Profile, sampler: StackSampler) -> None:
+    """プロファイル結果をファイルに保存する"""
+    pstats_path = profile_path(profile_id, "pstats")
+    folded_path = profile_path(profile_id, "folded")
+    assert pstats_path is not None and folded_path is not None
+    pstats_path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(pstats_path)
+    folded_path.write_text(sampler.collapsed(), encoding="utf-8")
+
+
+class ProfilerMiddleware:
+    """
+    許可されたリクエストをプロファイリングするASGIミドルウェア
+
+    API v1 のリクエストに X-Profile ヘッダーがあり管理操作が許可されている場合、
+    cProfile とスタックサンプリングのもとで処理し、レスポンスヘッダー
+    X-Profile-Id に結果のIDを返します。cProfile は同時に1つしか有効にできないため、
+    別のリクエストをプロファイリング中の場合は通常どおり処理します。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            app: ラップするASGIアプリケーション
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        リクエストを処理する
+
+        Args:
+            scope: ASGIスコープ
+            receive: ASGI受信関数
+            send: ASGI送信関数
+        """
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(settings.api_v1_prefix)
+            or PROFILE_HEADER not in (headers := Headers(scope=scope))
+            or not is_admin(headers)
+            or not _active.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_uuid()
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-profile-id", profile_id.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), settings.profile_sample_interval)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            sampler.start()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                profiler.disable()
+                sampler.stop()
+            await asyncio.to_thread(_save, profile_id, profiler, sampler)
+        finally:
+            _active.release()
+        logger.info(
+            "Profiled %s %s in %.1f ms: %s",
+            scope["method"],
+            scope["path"],
+            (time.perf_counter() - started) * 1000,
+            profile_id,
+        )
@@ -0,0 +1,253 @@
+"""
+準備状態の確認
+
+このモジュールはロードバランサーやオーケストレーターの /ready プローブ向けに、
+DBの疎通と負荷の指標（コネクションプールの使用率、イベントループ遅延、
+書き込みの待ち行列）からリクエストを受け付けられるかを判定するプローブを提供します。
+
+DBの疎通確認は、DBファイルの読み取り（SELECT 1 はファイルを読まないため
+スキーマを読む）と、短いbusy_timeoutでの書き込みロックの取得
+（BEGIN IMMEDIATE; ROLLBACK）を行います。疎通確認は READY_CHECK_INTERVAL 秒に
+1回だけ実行し、その間のプローブは結果を再利用します。同時に届いたプローブは
+実行中の確認を待ち、DBへの問い合わせは1回にまとめます。
+負荷の指標はプロセス内の値を読むだけのため、プローブごとに取得します。
+イベントループ遅延はループ遅延モニタ（LOOP_MONITOR_ENABLED）が計測するため、
+モニタが無効の場合は null を返し、READY_MAX_LOOP_LAG による判定も行いません。
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Mapping
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.core.admission import get_admission_controller
+from app.core.config import settings
+from app.core.db import get_engine
+from app.core.loop_monitor import get_loop_monitor
+from app.core.shards import get_shard_set
+from app.core.singleflight import SingleFlight
+from app.models.schemas import DatabaseReadiness, PoolUsage, ReadinessResponse
+from app.repositories.write_behind import get_write_behind_store
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessProbe:
+    """
+    DBの疎通と負荷の指標による準備状態の判定
+
+    Attributes:
+        engines: 疎通を確認するDB名→エンジン
+    """
+
+    def __init__(
+        self,
+        engines: Mapping[str, AsyncEngine],
+        *,
+        interval: float | None = None,
+        timeout: float | None = None,
+        write_lock_timeout: float | None = None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            engines: 疎通を確認するDB名→エンジン
+            interval: 疎通確認の結果を再利用する時間（秒、省略時は設定値）
+            timeout: 疎通確認のタイムアウト（秒、省略時は設定値）
+            write_lock_timeout: 書き込みロックの取得を待つ時間（秒、省略時は設定値）
+        """
+        self.engines = dict(engines)
+        self._interval = settings.ready_check_interval if interval is None else interval
+        self._timeout = timeout or settings.ready_db_timeout
+        self._write_lock_timeout = (
+            settings.ready_write_lock_timeout
+            if write_lock_timeout is None
+            else write_lock_timeout
+        )
+        self._databases: list[DatabaseReadiness] = []
+        self._checked_at = -math.inf
+        self._flights: SingleFlight[str, list[DatabaseReadiness]] = SingleFlight(
+            "readiness"
+        )
+
+    async def check(self) -> ReadinessResponse:
+        """
+        準備状態を判定する
+
+        DBに疎通できないか書き込みロックを取得できない場合、または
+        いずれかの指標が設定の上限を超えた場合は未準備です。
+
+        Returns:
+            ReadinessResponse: 判定結果と各指標
+        """
+        if time.monotonic() - self._checked_at >= self._interval:
+            await self._flights.do("databases", self._check_databases)
+        pools = self.pool_usage()
+        loop_lag = (
+            get_loop_monitor().last_lag if settings.loop_monitor_enabled else None
+        )
+        write_queue = get_admission_controller().write.queue_depth
+        dirty = (
+            get_write_behind_store().stats().dirty_count
+            if settings.db_backend == "hybrid"
+            else 0
+        )
+
+        reasons = [
+            f"database_unreachable:{d.database}" for d in self._databases if not d.ok
+        ]
+        reasons += [
+            f"write_locked:{d.database}"
+            for d in self._databases
+            if d.ok and d.write_error is not None
+        ]
+        reasons += [
+            f"pool_saturated:{p.database}"
+            for p in pools
+            if p.utilization > settings.ready_max_pool_utilization
+        ]
+        if loop_lag is not None and loop_lag > settings.ready_max_loop_lag:
+            reasons.append("loop_lag")
+        if write_queue > settings.ready_max_write_queue:
+            reasons.append("write_queue")
+        if dirty > settings.ready_max_write_behind_dirty:
+            reasons.append("write_behind_dirty")
+
+        return ReadinessResponse(
+            status="not_ready" if reasons else "ready",
+            reasons=reasons,
+            databases=self._databases,
+            checkedAgeSeconds=time.monotonic() - self._checked_at,
+            pools=pools,
+            loopLagSeconds=loop_lag,
+            writeQueueDepth=write_queue,
+            writeBehindDirty=dirty,
+        )
+
+    def pool_usage(self) -> list[PoolUsage]:
+        """
+        コネクションプールの使用状況を取得する
+
+        接続を使い回さない（NullPool）エンジンは対象外です。
+
+        Returns:
+            list[PoolUsage]: DBごとの使用状況
+        """
+        usage: list[PoolUsage] = []
+        for database, engine in self.engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            checked_out = pool.checkedout()
+            usage.append(
+                PoolUsage(
+                    database=database,
+                    checkedOut=checked_out,
+                    size=pool.size(),
+                    utilization=checked_out / max(pool.size(), 1),
+                )
+            )
+        return usage
+
+    async def _check_databases(self) -> list[DatabaseReadiness]:
+        """全DBの疎通を並行して確認し、結果を保持する"""
+        self._databases = list(
+            await asyncio.gather(
+                *(self._ping(name, engine) for name, engine in self.engines.items())
+            )
+        )
+        self._checked_at = time.monotonic()
+        return self._databases
+
+    async def _ping(self, database: str, engine: AsyncEngine) -> DatabaseReadiness:
+        """
+        DBファイルの読み取りと書き込みロックの取得を往復させる
+        （タイムアウトや例外は失敗として返す）
+        """
+        started = time.perf_counter()
+        latency: float | None = None
+        error: str | None = None
+        write_lock_ms: float | None = None
+        write_error: str | None = None
+        try:
+            async with asyncio.timeout(self._timeout):
+                async with engine.connect() as conn:
+                    # SELECT 1 はDBファイルを読まないため、スキーマを読み取る
+                    await conn.exec_driver_sql("SELECT 1 FROM sqlite_master LIMIT 1")
+                    latency = (time.perf_counter() - started) * 1000
+                    try:
+                        write_lock_ms = await self._acquire_write_lock(conn)
+                    except OperationalError as e:
+                        write_error = str(e.orig)
+                        logger.warning(
+                            "Readiness write lock check failed for %s: %s",
+                            database,
+                            write_error,
+                        )
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logger.warning("Readiness check failed for %s: %s", database, error)
+        return DatabaseReadiness(
+            database=database,
+            ok=error is None,
+            latencyMs=(
+                (time.perf_counter() - started) * 1000 if latency is None else latency
+            ),
+            error=error,
+            writeLockMs=write_lock_ms,
+            writeError=write_error,
+        )
+
+    async def _acquire_write_lock(self, conn: AsyncConnection) -> float:
+        """
+        短いbusy_timeoutで書き込みロックを取得・解放する
+
+        Args:
+            conn: DB接続
+
+        Returns:
+            float: 取得・解放の所要時間（ミリ秒）
+
+        Raises:
+            OperationalError: busy_timeout までにロックを取得できなかった場合
+        """
+        result = await conn.exec_driver_sql("PRAGMA busy_timeout")
+        busy_timeout = int(result.scalar_one())
+        timeout_ms = int(self._write_lock_timeout * 1000)
+        await conn.exec_driver_sql(f"PRAGMA busy_timeout = {timeout_ms}")
+        started = time.perf_counter()
+        try:
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            await conn.exec_driver_sql("ROLLBACK")
+        finally:
+            # プールへ戻す接続の設定を元に戻す
+            await conn.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+        return (time.perf_counter() - started) * 1000
+
+
+_probe: ReadinessProbe | None = None
+
+
+def get_readiness_probe() -> ReadinessProbe:
+    """
+    プロセス共有の準備状態プローブを取得する
+
+    DB_BACKEND=sharded の場合はメインDBと全シャードが対象です。
+
+    Returns:
+        ReadinessProbe: 準備状態プローブ
+    """
+    global _probe
+    if _probe is None:
+        engines = {"main": get_engine()}
+        if settings.db_backend == "sharded":
+            for shard, engine in enumerate(get_shard_set().engines):
+                engines[f"shard{shard}"] = engine
+        _probe = ReadinessProbe(engines)
+    return _probe
@@ -0,0 +1,211 @@
+"""
+シャード管理
+
+このモジュールはユーザーIDのハッシュで複数のSQLiteファイルへ
+データを振り分けるためのシャード接続と、シャード番号を埋め込んだIDを提供します。
+
+シャーディング時のフォルダ・チャットスレッドのIDは、先頭4桁（16進）を
+シャード番号にしたUUID形式です。IDのみの操作はIDからシャードを求めるため、
+書き込みはそのユーザーのシャードだけで完結します。
+"""
+
+import hashlib
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.db import create_engine, create_session_factory
+
+# IDに埋め込めるシャード数の上限（UUIDの先頭4桁）
+MAX_SHARD_COUNT = 0x10000
+
+
+def shard_for_user(user_id: str, shard_count: int) -> int:
+    """
+    ユーザーIDからシャード番号を求める
+
+    プロセスやPythonのハッシュシードに依存しない安定したハッシュを使用します。
+
+    Args:
+        user_id: ユーザーID
+        shard_count: シャード数
+
+    Returns:
+        int: シャード番号（0 〜 shard_count - 1）
+
+    Example:
+        ```python
+        shard = shard_for_user("12345678-1234-1234-1234-123456789000", 4)
+        ```
+    """
+    digest = hashlib.blake2b(user_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def new_shard_id(shard: int) -> str:
+    """
+    シャード番号を埋め込んだIDを生成する
+
+    ランダムなUUID（v4）の先頭4桁（16進）をシャード番号に置き換えます。
+
+    Args:
+        shard: シャード番号
+
+    Returns:
+        str: UUID形式のID（例: "0003b3f1-1d87-4055-98d1-37a54ee8f52f"）
+
+    Example:
+        ```python
+        id = new_shard_id(3)
+        assert shard_of_id(id) == 3
+        ```
+    """
+    return str(uuid.UUID(f"{shard:04x}{uuid.uuid4().hex[4:]}"))
+
+
+def shard_of_id(id: str) -> int | None:
+    """
+    IDに埋め込まれたシャード番号を取得する
+
+    Args:
+        id: フォルダまたはチャットスレッドのID
+
+    Returns:
+        int | None: シャード番号（UUID形式でない場合はNone）
+    """
+    try:
+        return uuid.UUID(id).int >> 112
+    except ValueError:
+        return None
+
+
+def shard_uris(
+    shard_count: int | None = None, uri_template: str | None = None
+) -> list[str]:
+    """
+    全シャードの接続URIを取得する
+
+    Args:
+        shard_count: シャード数（省略時は設定値）
+        uri_template: 接続URIテンプレート（省略時は設定値）
+
+    Returns:
+        list[str]: シャード番号順の接続URI
+    """
+    count = shard_count or settings.db_shard_count
+    template = uri_template or settings.db_shard_uri_template
+    return [template.format(shard=shard) for shard in range(count)]
+
+
+class ShardSet:
+    """
+    シャード接続
+
+    各シャードはコネクションプール付きのエンジンを持ちます。
+
+    Attributes:
+        engines: シャード番号順のエンジン
+        session_factories: シャード番号順のセッションファクトリ
+    """
+
+    def __init__(
+        self,
+        uris: Sequence[str] | None = None,
+        *,
+        pool_size: int | None = None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            uris: シャードの接続URI（省略時は設定値から生成）
+            pool_size: シャードごとのプールサイズ（省略時は設定値）
+
+        Raises:
+            ValueError: シャード数がIDに埋め込める上限を超える場合
+        """
+        uris = uris or shard_uris()
+        if len(uris) > MAX_SHARD_COUNT:
+            raise ValueError(f"Shard count must be at most {MAX_SHARD_COUNT}")
+        self.engines: list[AsyncEngine] = [
+            create_engine(uri, pool_size=pool_size or settings.db_shard_pool_size)
+            for uri in uris
+        ]
+        self.session_factories = [
+            create_session_factory(engine) for engine in self.engines
+        ]
+
+    @property
+    def shard_count(self) -> int:
+        """シャード数"""
+        return len(self.engines)
+
+    def shard_for_user(self, user_id: str) -> int:
+        """
+        ユーザーIDからシャード番号を求める
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            int: シャード番号
+        """
+        return shard_for_user(user_id, self.shard_count)
+
+    def shard_for_id(self, id: str) -> int | None:
+        """
+        IDからシャード番号を求める
+
+        Args:
+            id: フォルダまたはチャットスレッドのID
+
+        Returns:
+            int | None: シャード番号（このシャードセットのIDでない場合はNone）
+        """
+        shard = shard_of_id(id)
+        if shard is None or shard >= self.shard_count:
+            return None
+        return shard
+
+    def session(self, shard: int) -> AsyncSession:
+        """
+        シャードのセッションを作成する
+
+        Args:
+            shard: シャード番号
+
+        Returns:
+            AsyncSession: 非同期SQLAlchemyセッション
+        """
+        return self.session_factories[shard]()
+
+    async def dispose(self) -> None:
+        """全シャードのコネクションプールを破棄する"""
+        for engine in self.engines:
+            await engine.dispose()
+
+
+_shard_set: ShardSet | None = None
+
+
+def get_shard_set() -> ShardSet:
+    """
+    プロセス共有のシャードセットを取得する
+
+    Returns:
+        ShardSet: シャードセット
+    """
+    global _shard_set
+    if _shard_set is None:
+        _shard_set = ShardSet()
+    return _shard_set
+
+
+async def dispose_shard_set() -> None:
+    """プロセス共有のシャードセットが使用されていれば、接続を破棄する"""
+    global _shard_set
+    if _shard_set is not None:
+        await _shard_set.dispose()
+        _shard_set = None
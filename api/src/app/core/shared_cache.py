@@ -0,0 +1,174 @@
+"""
+共有スレッドキャッシュ
+
+このモジュールは公開中のチャットスレッドの応答（変換済みのJSONバイト列とETag）を
+プロセス内に保持するキャッシュを提供します。
+
+リポジトリはチャットスレッドの更新・削除・移動の後に invalidate_shared_threads を
+呼び出し、エントリを破棄します。破棄の前に始まった読み込みの結果は
+キャッシュに格納しないため、古い内容が残ることはありません。
+他のワーカーの更新は検知できないため、エントリは SHARED_CACHE_TTL 秒で失効します。
+
+共有されていない（存在しない）スレッドも「なし」として保持するため、
+無効なIDへの繰り返しのアクセスもSQLiteに届きません。
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.singleflight import SingleFlight
+
+
+class SharedThread:
+    """
+    共有スレッドの応答
+
+    Attributes:
+        body: 応答のJSONバイト列（共有されていない場合None）
+        etag: ETagヘッダーの値（共有されていない場合None）
+        expires_at: 失効時刻（time.monotonic）
+    """
+
+    __slots__ = ("body", "etag", "expires_at")
+
+    def __init__(self, body: bytes | None, expires_at: float) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            body: 応答のJSONバイト列（共有されていない場合None）
+            expires_at: 失効時刻（time.monotonic）
+        """
+        self.body = body
+        self.etag = (
+            f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            if body is not None
+            else None
+        )
+        self.expires_at = expires_at
+
+
+class _Load:
+    """読み込み中の状態（読み込み中に破棄された場合 invalidated が True）"""
+
+    __slots__ = ("invalidated",)
+
+    def __init__(self) -> None:
+        """コンストラクタ"""
+        self.invalidated = False
+
+
+class SharedThreadCache:
+    """
+    共有スレッドの応答のLRUキャッシュ
+
+    キャッシュミスの読み込みはスレッドIDごとに1回にまとめます。
+    """
+
+    def __init__(
+        self, max_entries: int | None = None, ttl: float | None = None
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            max_entries: 保持するエントリ数の上限（省略時は設定値）
+            ttl: エントリの有効期間（秒、省略時は設定値）
+        """
+        self._max_entries = max_entries or settings.shared_cache_size
+        self._ttl = settings.shared_cache_ttl if ttl is None else ttl
+        self._entries: OrderedDict[str, SharedThread] = OrderedDict()
+        self._flights: SingleFlight[str, SharedThread] = SingleFlight("shared_threads")
+        self._loading: dict[str, set[_Load]] = {}
+
+    def __len__(self) -> int:
+        """保持しているエントリ数"""
+        return len(self._entries)
+
+    async def get(
+        self, id: str, load: Callable[[], Awaitable[str | None]]
+    ) -> SharedThread:
+        """
+        共有スレッドの応答を取得する（キャッシュにない場合は読み込む）
+
+        Args:
+            id: スレッドID
+            load: 公開用のJSON文字列を読み込む関数（共有されていない場合None）
+
+        Returns:
+            SharedThread: 共有スレッドの応答
+        """
+        entry = self._entries.get(id)
+        hit = entry is not None and entry.expires_at > time.monotonic()
+        record_cache("shared_threads", hit)
+        if entry is not None and hit:
+            self._entries.move_to_end(id)
+            return entry
+        return await self._flights.do(id, lambda: self._load(id, load))
+
+    def invalidate(self, ids: Iterable[str]) -> None:
+        """
+        エントリを破棄する
+
+        Args:
+            ids: スレッドID
+        """
+        for id in ids:
+            self._entries.pop(id, None)
+            self._flights.forget(id)
+            for loading in self._loading.get(id, ()):
+                loading.invalidated = True
+
+    async def _load(
+        self, id: str, load: Callable[[], Awaitable[str | None]]
+    ) -> SharedThread:
+        """読み込んだ応答を、読み込み中に破棄されていなければ格納する"""
+        loading = _Load()
+        self._loading.setdefault(id, set()).add(loading)
+        try:
+            raw = await load()
+        finally:
+            self._loading[id].discard(loading)
+            if not self._loading[id]:
+                del self._loading[id]
+        entry = SharedThread(
+            raw.encode("utf-8") if raw is not None else None,
+            time.monotonic() + self._ttl,
+        )
+        if not loading.invalidated:
+            self._entries[id] = entry
+            self._entries.move_to_end(id)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+_cache: SharedThreadCache | None = None
+
+
+def get_shared_thread_cache() -> SharedThreadCache:
+    """
+    プロセス共有の共有スレッドキャッシュを取得する
+
+    Returns:
+        SharedThreadCache: 共有スレッドキャッシュ
+    """
+    global _cache
+    if _cache is None:
+        _cache = SharedThreadCache()
+    return _cache
+
+
+def invalidate_shared_threads(ids: Iterable[str]) -> None:
+    """
+    共有スレッドキャッシュが使用されていれば、チャットスレッドのエントリを破棄する
+
+    Args:
+        ids: 更新・削除・移動したチャットスレッドのID
+    """
+    if _cache is not None:
+        _cache.invalidate(ids)
@@ -0,0 +1,112 @@
+"""
+シングルフライト
+
+このモジュールは同じキーの非同期処理が同時に要求された場合に、
+最初の呼び出し（リーダー）だけを実行し、後続の呼び出しはその結果を
+共有する仕組みを提供します。
+
+結果はキャッシュしません。処理が完了した時点でキーは破棄され、
+以降の呼び出しは新たに実行されます。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+from app.core.metrics import REGISTRY, Counter
+
+SINGLEFLIGHT_CALLS = REGISTRY.register(
+    Counter(
+        "singleflight_calls",
+        "Single-flight calls by group and role (leader/shared).",
+        ("group", "role"),
+    )
+)
+
+
+class SingleFlight[K: Hashable, V]:
+    """
+    同一キーの同時実行をまとめるグループ
+
+    Attributes:
+        name: グループ名（メトリクスのラベル）
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            name: グループ名
+        """
+        self.name = name
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        """実行中のキーの数"""
+        return len(self._calls)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """
+        キーに対する処理を実行する（実行中であれば結果を共有する）
+
+        リーダーがキャンセルされた場合、待機していた呼び出しの1つが
+        新たなリーダーとして処理を実行します。
+
+        Args:
+            key: 処理のキー
+            fn: 処理を行うコルーチン関数
+
+        Returns:
+            V: 処理の結果
+        """
+        while (call := self._calls.get(key)) is not None:
+            try:
+                result = await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if call.cancelled():
+                    continue
+                raise
+            SINGLEFLIGHT_CALLS.labels(self.name, "shared").inc()
+            return result
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        SINGLEFLIGHT_CALLS.labels(self.name, "leader").inc()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as exc:
+            call.set_exception(exc)
+            # 待機者がいない場合に未取得の例外として警告されないようにする
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            self.forget(key, call)
+
+    def forget(self, key: K, call: asyncio.Future[V] | None = None) -> None:
+        """
+        キーを破棄し、以降の呼び出しが新たに実行されるようにする
+
+        実行中の処理はそのまま完了し、既に待機している呼び出しには結果が渡ります。
+
+        Args:
+            key: 処理のキー
+            call: 指定した場合、このキーの処理が一致するときのみ破棄する
+        """
+        if call is None or self._calls.get(key) is call:
+            self._calls.pop(key, None)
+
+    def forget_where(self, predicate: Callable[[K], bool]) -> None:
+        """
+        条件に一致するキーをすべて破棄する
+
+        Args:
+            predicate: 破棄するキーの場合にTrueを返す関数
+        """
+        for key in [k for k in self._calls if predicate(k)]:
+            del self._calls[key]
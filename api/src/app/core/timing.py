@@ -0,0 +1,240 @@
+"""
+リクエスト処理時間の内訳計測
+
+このモジュールはリクエストごとのフェーズ別処理時間（DB、JSONデコード、
+モデル構築、レスポンス生成など）をコンテキスト変数に集計し、
+標準のServer-Timingヘッダーとして返す仕組みを提供します。
+
+計測が無効なリクエストではコンテキスト変数が未設定のため、
+各フックは共有の空コンテキストマネージャを返すだけで済みます。
+"""
+
+import functools
+import time
+from collections.abc import Awaitable, Callable, Coroutine
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+_NOOP: AbstractContextManager[None] = nullcontext()
+
+
+class RequestTimings:
+    """
+    1リクエスト分のフェーズ別処理時間
+
+    Attributes:
+        phases: フェーズ名ごとの累計処理時間（秒、記録順）
+        handler_end: エンドポイント関数が終了した時刻（perf_counter）
+    """
+
+    __slots__ = ("phases", "handler_end")
+
+    def __init__(self) -> None:
+        """コンストラクタ"""
+        self.phases: dict[str, float] = {}
+        self.handler_end: float | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        フェーズの処理時間を加算する
+
+        Args:
+            name: フェーズ名
+            seconds: 処理時間（秒）
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        """
+        Server-Timingヘッダー値を生成する
+
+        Args:
+            total: リクエスト全体の処理時間（秒）
+
+        Returns:
+            str: 例 "db;dur=1.203, decode;dur=0.112, total;dur=2.950"
+        """
+        entries = [f"{name};dur={sec * 1000:.3f}" for name, sec in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class _Phase:
+    """フェーズの処理時間を計測するコンテキストマネージャ"""
+
+    __slots__ = ("_timings", "_name", "_started")
+
+    def __init__(self, timings: RequestTimings, name: str) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            timings: 加算先のリクエスト計測
+            name: フェーズ名
+        """
+        self._timings = timings
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        """計測を開始する"""
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """計測を終了して加算する"""
+        self._timings.add(self._name, time.perf_counter() - self._started)
+
+
+def phase(name: str) -> AbstractContextManager[None]:
+    """
+    フェーズの処理時間を計測するコンテキストマネージャを取得する
+
+    計測が無効な場合は何もしない共有インスタンスを返します。
+
+    Args:
+        name: フェーズ名（例: "db", "decode", "validate"）
+
+    Returns:
+        AbstractContextManager[None]: 計測用コンテキストマネージャ
+
+    Example:
+        ```python
+        with phase("db"):
+            result = await session.execute(stmt)
+        ```
+    """
+    timings = _timings.get()
+    if timings is None:
+        return _NOOP
+    return _Phase(timings, name)
+
+
+def current_timings() -> RequestTimings | None:
+    """
+    現在のリクエストの計測を取得する
+
+    Returns:
+        RequestTimings | None: 計測が無効な場合はNone
+    """
+    return _timings.get()
+
+
+def _mark_handler_end[**P, R](
+    endpoint: Callable[P, Awaitable[R]],
+) -> Callable[P, Coroutine[Any, Any, R]]:
+    """エンドポイント関数の終了時刻を記録するラッパーを作成する"""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings = _timings.get()
+            if timings is not None:
+                timings.handler_end = time.perf_counter()
+
+    return wrapper
+
+
+class TimingRoute(APIRoute):
+    """
+    レスポンス生成時間を計測するルートクラス
+
+    エンドポイント関数の終了からレスポンス生成完了までを
+    "response" フェーズ（response_modelの検証とJSONエンコード）として記録します。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            path: ルートのパス
+            endpoint: エンドポイント関数
+            **kwargs: APIRouteへ渡す引数
+        """
+        super().__init__(path, _mark_handler_end(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """
+        レスポンス生成時間を記録するリクエストハンドラを取得する
+
+        Returns:
+            Callable[[Request], Coroutine[Any, Any, Response]]: リクエストハンドラ
+        """
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+            timings = _timings.get()
+            if timings is not None and timings.handler_end is not None:
+                timings.add("response", time.perf_counter() - timings.handler_end)
+            return response
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """
+    Server-Timingヘッダーを付与するASGIミドルウェア
+
+    SERVER_TIMING_ENABLED が有効な場合のみ、リクエストごとに計測を開始し、
+    レスポンスヘッダーにフェーズ別の処理時間を付与します。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            app: ラップするASGIアプリケーション
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        リクエストを処理する
+
+        Args:
+            scope: ASGIスコープ
+            receive: ASGI受信関数
+            send: ASGI送信関数
+        """
+        if scope["type"] != "http" or not settings.server_timing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                header = timings.header(time.perf_counter() - started)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", header.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
@@ -0,0 +1,449 @@
+"""
+JWT検証
+
+このモジュールは Authorization: Bearer のJWTを検証するための鍵セット（JWKS）の
+読み込みと、検証済みトークンのキャッシュを提供します。
+
+鍵セットはローカルファイルまたはURLからバックグラウンドで定期的に読み込むため、
+リクエスト処理中に鍵の取得を待つことはありません。署名の検証結果は
+トークンのハッシュをキーとするLRUに有効期限まで保持し、同じトークンの
+2回目以降のリクエストでは署名検証とデコードを省略します。
+
+署名方式は RS256（kty=RSA）と HS256（kty=oct）に対応します。RS256の検証は
+公開鍵によるべき乗剰余とPKCS#1 v1.5の符号化結果の比較のみのため、
+標準ライブラリで実装しています。
+"""
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import hmac
+import json
+import logging
+import math
+import time
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# SHA-256のDigestInfo（RFC 8017 9.2 注1）
+_SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+# 未知のkidによる鍵セットの再読み込みを要求できる最小間隔（秒）
+MIN_REFRESH_INTERVAL = 10.0
+
+
+class TokenError(Exception):
+    """トークンが不正な場合の例外"""
+
+    pass
+
+
+class KeySetUnavailableError(Exception):
+    """鍵セットが読み込まれていない場合の例外"""
+
+    pass
+
+
+class TokenClaims(BaseModel):
+    """
+    検証済みトークンのクレーム
+
+    Attributes:
+        subject: ユーザーID（sub）
+        email: メールアドレス（email、ない場合は空文字）
+        expires_at: 有効期限（UNIX時刻）
+    """
+
+    subject: str
+    email: str
+    expires_at: float
+
+
+def _b64decode(segment: str) -> bytes:
+    """base64url（パディングなし）をデコードする"""
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except ValueError:
+        raise TokenError("Malformed token") from None
+
+
+def _b64int(segment: str) -> int:
+    """base64urlの整数（JWKのn, e, d）をデコードする"""
+    return int.from_bytes(_b64decode(segment), "big")
+
+
+def _pkcs1_sha256(message: bytes, size: int) -> bytes:
+    """EMSA-PKCS1-v1_5（SHA-256）で符号化する"""
+    t = _SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+    return b"\x00\x01" + b"\xff" * (size - len(t) - 3) + b"\x00" + t
+
+
+class RSAKey:
+    """
+    RS256の公開鍵
+
+    Attributes:
+        n: モジュラス
+        e: 公開指数
+        size: モジュラスのバイト数
+    """
+
+    alg = "RS256"
+
+    def __init__(self, n: int, e: int) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            n: モジュラス
+            e: 公開指数
+        """
+        self.n = n
+        self.e = e
+        self.size = (n.bit_length() + 7) // 8
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """
+        署名を検証する
+
+        署名をべき乗剰余で戻した結果を、期待する符号化結果全体とバイト列で
+        比較します（パディングを解析しないため、解析の緩さによる偽造を受けません）。
+
+        Args:
+            message: 署名対象（ヘッダー.ペイロード）
+            signature: 署名
+
+        Returns:
+            bool: 署名が正しい場合True
+        """
+        if len(signature) != self.size:
+            return False
+        s = int.from_bytes(signature, "big")
+        if s >= self.n:
+            return False
+        em = pow(s, self.e, self.n).to_bytes(self.size, "big")
+        return hmac.compare_digest(em, _pkcs1_sha256(message, self.size))
+
+
+class HMACKey:
+    """
+    HS256の共有鍵
+
+    Attributes:
+        secret: 共有鍵
+    """
+
+    alg = "HS256"
+
+    def __init__(self, secret: bytes) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            secret: 共有鍵
+        """
+        self.secret = secret
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """
+        署名を検証する
+
+        Args:
+            message: 署名対象（ヘッダー.ペイロード）
+            signature: 署名
+
+        Returns:
+            bool: 署名が正しい場合True
+        """
+        expected = hmac.new(self.secret, message, hashlib.sha256).digest()
+        return hmac.compare_digest(expected, signature)
+
+
+type VerifyingKey = RSAKey | HMACKey
+
+
+def parse_jwks(data: dict[str, Any]) -> dict[str, VerifyingKey]:
+    """
+    JWKSから検証用の鍵を取り出す
+
+    署名用（use=sig または未指定）のRSA・oct鍵のみを対象とし、
+    それ以外の鍵は無視します。kidのない鍵は空文字のkidとして扱います。
+
+    Args:
+        data: JWKS（{"keys": [...]}）
+
+    Returns:
+        dict[str, VerifyingKey]: kidごとの検証用の鍵
+
+    Raises:
+        ValueError: JWKSの形式が不正な場合
+    """
+    jwks: Any = data.get("keys", [])
+    if not isinstance(jwks, list):
+        raise ValueError("JWKS must contain a list of keys")
+
+    keys: dict[str, VerifyingKey] = {}
+    jwk: dict[str, Any]
+    for jwk in jwks:
+        if jwk.get("use", "sig") != "sig":
+            continue
+        kid = str(jwk.get("kid", ""))
+        if jwk.get("kty") == "RSA" and jwk.get("alg", "RS256") == "RS256":
+            keys[kid] = RSAKey(_b64int(jwk["n"]), _b64int(jwk["e"]))
+        elif jwk.get("kty") == "oct" and jwk.get("alg", "HS256") == "HS256":
+            keys[kid] = HMACKey(_b64decode(jwk["k"]))
+    return keys
+
+
+def load_jwks(path: str = "", url: str = "", timeout: float = 10.0) -> dict[str, Any]:
+    """
+    JWKSをファイルまたはURLから読み込む（ブロッキング）
+
+    Args:
+        path: JWKSファイルのパス（優先）
+        url: JWKSのURL
+        timeout: URLの取得タイムアウト（秒）
+
+    Returns:
+        dict[str, Any]: JWKS
+
+    Raises:
+        ValueError: 読み込み元が指定されていない場合
+    """
+    if path:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    if url:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read())
+    raise ValueError("JWT_JWKS_PATH or JWT_JWKS_URL must be set")
+
+
+class TokenVerifier:
+    """
+    JWTの検証と検証済みトークンのキャッシュ
+
+    鍵セットはバックグラウンドで定期的に再読み込みします。未知のkidの
+    トークンを受け取った場合は再読み込みを前倒しで要求しますが、
+    そのリクエスト自体は待たずに拒否します。
+
+    キーセットから鍵が削除された場合は、その鍵で検証済みのトークンが
+    残らないようキャッシュを破棄します。
+    """
+
+    def __init__(
+        self,
+        *,
+        jwks_path: str | None = None,
+        jwks_url: str | None = None,
+        refresh_interval: float | None = None,
+        cache_size: int | None = None,
+        issuer: str | None = None,
+        audience: str | None = None,
+        leeway: float | None = None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            jwks_path: JWKSファイルのパス（省略時は設定値）
+            jwks_url: JWKSのURL（省略時は設定値）
+            refresh_interval: 鍵セットの再読み込み間隔（秒、省略時は設定値）
+            cache_size: 検証済みトークンのキャッシュ件数（省略時は設定値）
+            issuer: 要求するiss（空の場合は検査しない、省略時は設定値）
+            audience: 要求するaud（空の場合は検査しない、省略時は設定値）
+            leeway: exp/nbfの許容誤差（秒、省略時は設定値）
+        """
+        self._jwks_path = settings.jwt_jwks_path if jwks_path is None else jwks_path
+        self._jwks_url = settings.jwt_jwks_url if jwks_url is None else jwks_url
+        self._refresh_interval = refresh_interval or settings.jwt_refresh_interval
+        self._cache_size = cache_size or settings.jwt_cache_size
+        self._issuer = settings.jwt_issuer if issuer is None else issuer
+        self._audience = settings.jwt_audience if audience is None else audience
+        self._leeway = settings.jwt_leeway if leeway is None else leeway
+        self._keys: dict[str, VerifyingKey] = {}
+        self._cache: OrderedDict[bytes, TokenClaims] = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._last_refresh_request = -math.inf
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def key_ids(self) -> list[str]:
+        """読み込み済みの鍵のkid"""
+        return list(self._keys)
+
+    async def start(self) -> None:
+        """
+        鍵セットを読み込み、バックグラウンドでの再読み込みを開始する
+
+        初回の読み込みに失敗した場合もアプリケーションは起動し、
+        読み込めるまでのリクエストは503となります。
+        """
+        if self._task is not None:
+            return
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Failed to load JWKS")
+        self._task = asyncio.create_task(self._loop(), name="jwks-refresh")
+
+    async def stop(self) -> None:
+        """バックグラウンドでの再読み込みを停止する"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> None:
+        """
+        鍵セットを再読み込みする
+
+        Raises:
+            Exception: 読み込みに失敗した場合（現在の鍵セットは維持されます）
+        """
+        data = await asyncio.to_thread(load_jwks, self._jwks_path, self._jwks_url)
+        keys = parse_jwks(data)
+        if not keys:
+            raise ValueError("JWKS contains no usable signing keys")
+        if set(self._keys) - set(keys):
+            self._cache.clear()
+        self._keys = keys
+
+    def verify(self, token: str) -> TokenClaims:
+        """
+        トークンを検証する
+
+        検証済みのトークンはキャッシュから返します。
+
+        Args:
+            token: JWT（コンパクト形式）
+
+        Returns:
+            TokenClaims: 検証済みのクレーム
+
+        Raises:
+            KeySetUnavailableError: 鍵セットが読み込まれていない場合
+            TokenError: トークンが不正・期限切れの場合
+        """
+        now = time.time()
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = self._cache.get(digest)
+        if claims is not None and claims.expires_at > now:
+            record_cache("jwt", True)
+            self._cache.move_to_end(digest)
+            return claims
+        record_cache("jwt", False)
+        self._cache.pop(digest, None)
+
+        claims = self._verify_signed(token, now)
+        self._cache[digest] = claims
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return claims
+
+    def _verify_signed(self, token: str, now: float) -> TokenClaims:
+        """署名とクレームを検証する"""
+        if not self._keys:
+            raise KeySetUnavailableError("Signing keys are not loaded")
+        # JWTはbase64urlと"."のみのため、それ以外の文字を含むものは検証しない
+        if not token.isascii():
+            raise TokenError("Malformed token")
+        segments = token.split(".")
+        if len(segments) != 3:
+            raise TokenError("Malformed token")
+        header = self._decode_segment(segments[0])
+        key = self._keys.get(str(header.get("kid", "")))
+        if key is None:
+            self._request_refresh()
+            raise TokenError("Unknown signing key")
+        if header.get("alg") != key.alg:
+            raise TokenError("Unexpected signing algorithm")
+        signed = f"{segments[0]}.{segments[1]}".encode("ascii")
+        if not key.verify(signed, _b64decode(segments[2])):
+            raise TokenError("Invalid signature")
+
+        payload = self._decode_segment(segments[1])
+        exp = payload.get("exp")
+        if not isinstance(exp, int | float) or exp + self._leeway <= now:
+            raise TokenError("Token expired")
+        nbf = payload.get("nbf")
+        if isinstance(nbf, int | float) and nbf - self._leeway > now:
+            raise TokenError("Token not yet valid")
+        if self._issuer and payload.get("iss") != self._issuer:
+            raise TokenError("Unexpected issuer")
+        if self._audience:
+            aud = payload.get("aud")
+            audiences = aud if isinstance(aud, list) else [aud]
+            if self._audience not in audiences:
+                raise TokenError("Unexpected audience")
+        subject = payload.get("sub")
+        if not isinstance(subject, str) or not subject:
+            raise TokenError("Missing subject")
+        email = payload.get("email")
+        return TokenClaims(
+            subject=subject,
+            email=email if isinstance(email, str) else "",
+            expires_at=exp + self._leeway,
+        )
+
+    @staticmethod
+    def _decode_segment(segment: str) -> dict[str, Any]:
+        """ヘッダー・ペイロードをデコードする"""
+        try:
+            value = json.loads(_b64decode(segment))
+        except ValueError:
+            raise TokenError("Malformed token") from None
+        if not isinstance(value, dict):
+            raise TokenError("Malformed token")
+        return value  # pyright: ignore[reportUnknownVariableType]
+
+    def _request_refresh(self) -> None:
+        """鍵セットの再読み込みを前倒しで要求する（最小間隔を空ける）"""
+        now = time.monotonic()
+        if now - self._last_refresh_request >= MIN_REFRESH_INTERVAL:
+            self._last_refresh_request = now
+            self._wakeup.set()
+
+    async def _loop(self) -> None:
+        """一定間隔、または要求があった時点で鍵セットを再読み込みする"""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self._refresh_interval)
+            self._wakeup.clear()
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh JWKS")
+
+
+_verifier: TokenVerifier | None = None
+
+
+def get_token_verifier() -> TokenVerifier:
+    """
+    プロセス共有のトークン検証器を取得する
+
+    Returns:
+        TokenVerifier: トークン検証器
+    """
+    global _verifier
+    if _verifier is None:
+        _verifier = TokenVerifier()
+    return _verifier
+
+
+async def shutdown_token_verifier() -> None:
+    """プロセス共有のトークン検証器が使用されていれば、再読み込みを停止する"""
+    global _verifier
+    if _verifier is not None:
+        await _verifier.stop()
+        _verifier = None
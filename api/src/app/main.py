@@ -4,13 +4,66 @@ FastAPIアプリケーション
 このモジュールはFastAPIアプリケーションのエントリーポイントです。
 """
 
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.admission import AdmissionMiddleware
+from app.core.changes import shutdown_change_feed
 from app.core.config import settings
+from app.core.db import dispose_engine, shutdown_query_explainer
+from app.core.loop_monitor import LoopMonitorMiddleware, get_loop_monitor
+from app.core.maintenance import (
+    get_maintenance_scheduler,
+    shutdown_maintenance_scheduler,
+)
+from app.core.metrics import MetricsMiddleware
+from app.core.offload import shutdown_offload_executor
+from app.core.profiler import ProfilerMiddleware
+from app.core.shards import dispose_shard_set
+from app.core.timing import ServerTimingMiddleware
+from app.core.tokens import get_token_verifier, shutdown_token_verifier
+from app.repositories.write_behind import shutdown_write_behind_store
 from app.routers.v1.router import get_v1_router
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa: ARG001
+    """
+    アプリケーションの起動・終了処理
+
+    起動時にイベントループ遅延モニタとSQLiteメンテナンスを開始し、
+    JWT認証の場合は鍵セットを読み込みます。
+    終了時にメンテナンス、鍵セットの再読み込み、変更フィードのテールを停止し、
+    ライトビハインドストアの未フラッシュ変更をSQLiteへ書き込み、
+    シャード・メインDBの接続とオフロード用スレッドプールを破棄します。
+
+    Args:
+        app: FastAPIアプリケーションインスタンス
+
+    Yields:
+        None: アプリケーション稼働中
+    """
+    if settings.loop_monitor_enabled:
+        get_loop_monitor().start()
+    if settings.maintenance_enabled:
+        get_maintenance_scheduler().start()
+    if settings.auth_mode == "jwt":
+        await get_token_verifier().start()
+    yield
+    await get_loop_monitor().stop()
+    await shutdown_maintenance_scheduler()
+    await shutdown_token_verifier()
+    await shutdown_change_feed()
+    await shutdown_write_behind_store()
+    await dispose_shard_set()
+    await dispose_engine()
+    shutdown_query_explainer()
+    shutdown_offload_executor()
+
+
 def create_application() -> FastAPI:
     """
     FastAPIアプリケーションを作成
@@ -24,8 +77,16 @@ def create_application() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=lifespan,
     )
 
+    app.add_middleware(ProfilerMiddleware)
+    app.add_middleware(ServerTimingMiddleware)
+    app.add_middleware(AdmissionMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(LoopMonitorMiddleware)
+    # 最後に追加したミドルウェアが最も外側になる。503などミドルウェアが返す
+    # 応答にもCORSヘッダーが付くよう、CORSは最後に追加する
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
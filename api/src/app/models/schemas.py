@@ -31,6 +31,89 @@ class HealthResponse(BaseModel):
     }
 
 
+class DatabaseReadiness(BaseModel):
+    """
+    DBの疎通確認の結果
+
+    Attributes:
+        database: DB名（main/shardN）
+        ok: 疎通できたか
+        latency_ms: DBファイルの読み取りの往復時間（ミリ秒）
+        error: 失敗した場合のエラー
+        write_lock_ms: 書き込みロックの取得・解放の所要時間（ミリ秒）
+        write_error: 書き込みロックを取得できなかった場合のエラー
+    """
+
+    database: str = Field(..., description="DB名")
+    ok: bool = Field(..., description="疎通できたか")
+    latency_ms: float = Field(..., alias="latencyMs", description="往復時間（ミリ秒）")
+    error: str | None = Field(None, description="失敗した場合のエラー")
+    write_lock_ms: float | None = Field(
+        None, alias="writeLockMs", description="書き込みロックの所要時間（ミリ秒）"
+    )
+    write_error: str | None = Field(
+        None, alias="writeError", description="書き込みロックの取得のエラー"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class PoolUsage(BaseModel):
+    """
+    コネクションプールの使用状況
+
+    Attributes:
+        database: DB名（main/shardN）
+        checked_out: 使用中の接続数
+        size: プールサイズ
+        utilization: 使用率（使用中/サイズ、オーバーフロー時は1を超える）
+    """
+
+    database: str = Field(..., description="DB名")
+    checked_out: int = Field(..., alias="checkedOut", description="使用中の接続数")
+    size: int = Field(..., description="プールサイズ")
+    utilization: float = Field(..., description="使用率")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ReadinessResponse(BaseModel):
+    """
+    準備状態の確認レスポンス
+
+    Attributes:
+        status: ステータス（ready/not_ready）
+        reasons: 未準備の理由（準備完了の場合は空）
+        databases: DBごとの疎通確認の結果
+        checked_age_seconds: 疎通確認を実行してからの経過秒数
+        pools: コネクションプールの使用状況（プールを使うDBのみ）
+        loop_lag_seconds: 直近のイベントループ遅延（秒、モニタが無効の場合None）
+        write_queue_depth: 書き込みの待ち行列の長さ
+        write_behind_dirty: ライトビハインドの未フラッシュ件数
+    """
+
+    status: str = Field(..., description="ステータス")
+    reasons: list[str] = Field(..., description="未準備の理由")
+    databases: list[DatabaseReadiness] = Field(..., description="DBの疎通確認")
+    checked_age_seconds: float = Field(
+        ..., alias="checkedAgeSeconds", description="疎通確認からの経過秒数"
+    )
+    pools: list[PoolUsage] = Field(..., description="コネクションプールの使用状況")
+    loop_lag_seconds: float | None = Field(
+        ...,
+        alias="loopLagSeconds",
+        description="イベントループ遅延（秒、ループ遅延モニタが無効の場合null）",
+    )
+    write_queue_depth: int = Field(
+        ..., alias="writeQueueDepth", description="書き込みの待ち行列の長さ"
+    )
+    write_behind_dirty: int = Field(
+        ..., alias="writeBehindDirty", description="ライトビハインドの未フラッシュ件数"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class ItemBase(BaseModel):
     """
     アイテムの基本スキーマ
@@ -209,3 +292,148 @@ class ChatThreadRead(BaseModel):
     email: str = Field(..., description="メールアドレス")
 
     model_config = ConfigDict(populate_by_name=True)
+
+
+class Tombstone(BaseModel):
+    """
+    削除済みドキュメントの墓標
+
+    Attributes:
+        entity: 種別（folders/chat_threads）
+        id: 削除されたドキュメントID
+        version: 削除時のバージョン
+    """
+
+    entity: str = Field(..., description="種別（folders/chat_threads）")
+    id: str = Field(..., description="削除されたドキュメントID")
+    version: int = Field(..., description="削除時のバージョン")
+
+
+class SyncResponse(BaseModel):
+    """
+    差分同期レスポンス
+
+    Attributes:
+        folders: 作成・更新されたフォルダ
+        chat_threads: 作成・更新されたチャットスレッド
+        tombstones: 削除されたドキュメントの墓標
+        version: 次回の since に指定するバージョン
+        has_more: 続きがある場合True（version を since にして再取得する）
+        resync_required: since より後の墓標が保持期間を過ぎて削除済みの場合True
+            （ローカルのデータを破棄し、version（0）から全件を取得し直す）
+    """
+
+    folders: list[FolderRead] = Field(..., description="作成・更新されたフォルダ")
+    chat_threads: list[ChatThreadRead] = Field(
+        ..., alias="chatThreads", description="作成・更新されたチャットスレッド"
+    )
+    tombstones: list[Tombstone] = Field(..., description="削除されたドキュメント")
+    version: int = Field(..., description="次回の since に指定するバージョン")
+    has_more: bool = Field(..., alias="hasMore", description="続きがあるか")
+    resync_required: bool = Field(
+        False, alias="resyncRequired", description="全件の再同期が必要か"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class FolderThreadsTarget(BaseModel):
+    """
+    フォルダ内のチャットスレッドの移動・コピー先
+
+    Attributes:
+        target_folder_id: 移動・コピー先のフォルダID
+    """
+
+    target_folder_id: str = Field(
+        ..., alias="targetFolderId", description="移動・コピー先のフォルダID"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class FolderThreadsResult(BaseModel):
+    """
+    フォルダ単位の一括操作の結果
+
+    Attributes:
+        affected: 移動・コピー・削除したチャットスレッド数
+    """
+
+    affected: int = Field(..., description="対象となったチャットスレッド数")
+
+
+class ThreadSummary(BaseModel):
+    """
+    サイドバー表示用のチャットスレッド概要
+
+    Attributes:
+        id: スレッドID
+        name: スレッド名
+        created_at: 作成日時
+    """
+
+    id: str = Field(..., description="スレッドID")
+    name: str = Field(..., description="スレッド名")
+    created_at: str = Field(..., alias="createdAt", description="作成日時")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class BootstrapFolder(FolderRead):
+    """
+    スレッド概要を埋め込んだフォルダ
+
+    Attributes:
+        threads: フォルダ内のスレッド概要（件数上限まで）
+        thread_count: フォルダ内のスレッド総数
+    """
+
+    threads: list[ThreadSummary] = Field(..., description="スレッド概要")
+    thread_count: int = Field(..., alias="threadCount", description="スレッド総数")
+
+
+class BootstrapResponse(BaseModel):
+    """
+    初期表示用のサイドバーデータ
+
+    Attributes:
+        folders: スレッド概要を埋め込んだフォルダ一覧
+        unfiled_threads: どのフォルダにも属さないスレッドの概要（件数上限まで）
+        unfiled_count: どのフォルダにも属さないスレッドの総数
+    """
+
+    folders: list[BootstrapFolder] = Field(..., description="フォルダ一覧")
+    unfiled_threads: list[ThreadSummary] = Field(
+        ..., alias="unfiledThreads", description="フォルダに属さないスレッド概要"
+    )
+    unfiled_count: int = Field(
+        ..., alias="unfiledCount", description="フォルダに属さないスレッド総数"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class SharedThreadRead(BaseModel):
+    """
+    共有中のチャットスレッドの公開レスポンス
+
+    所有者のユーザーID・メールアドレスとフォルダは含みません。
+
+    Attributes:
+        id: スレッドID
+        name: スレッド名
+        prompt: プロンプト
+        temperature: 温度パラメータ
+        created_at: 作成日時
+        shared_at: 共有日時（null許容）
+    """
+
+    id: str = Field(..., description="スレッドID")
+    name: str = Field(..., description="スレッド名")
+    prompt: str = Field(..., description="プロンプト")
+    temperature: float = Field(..., description="温度パラメータ")
+    created_at: str = Field(..., alias="createdAt", description="作成日時")
+    shared_at: str | None = Field(None, alias="sharedAt", description="共有日時")
+
+    model_config = ConfigDict(populate_by_name=True)
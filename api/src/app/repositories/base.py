@@ -4,6 +4,7 @@ Repository抽象インターフェース
 このモジュールはデータアクセス層の抽象インターフェースを定義します。
 """
 
+from collections.abc import Sequence
 from typing import Protocol
 
 from app.models.schemas import (
@@ -13,6 +14,7 @@ from app.models.schemas import (
     FolderCreate,
     FolderRead,
     FolderUpdate,
+    SyncResponse,
 )
 
 
@@ -133,6 +135,21 @@ class ChatThreadRepositoryProtocol(Protocol):
         """
         ...
 
+    async def get_shared(self, id: str) -> str:
+        """
+        共有中のチャットスレッドを公開用のJSON文字列で取得
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            str: SharedThreadRead形式のJSON文字列
+
+        Raises:
+            RepositoryNotFoundError: スレッドが見つからないか共有されていない場合
+        """
+        ...
+
     async def list(
         self,
         user_id: str,
@@ -198,3 +215,100 @@ class ChatThreadRepositoryProtocol(Protocol):
             RepositoryNotFoundError: チャットスレッドが見つからない場合
         """
         ...
+
+    async def move_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへ移動
+
+        Args:
+            folder_id: 移動元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: 移動先のフォルダID
+
+        Returns:
+            Sequence[str]: 移動したチャットスレッドのID
+        """
+        ...
+
+    async def copy_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへコピー
+
+        コピーは新しいIDと作成日時を持ち、共有されていない状態になります。
+
+        Args:
+            folder_id: コピー元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: コピー先のフォルダID
+
+        Returns:
+            Sequence[str]: 作成したチャットスレッドのID
+        """
+        ...
+
+    async def delete_in_folder(self, folder_id: str, *, user_id: str) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で削除
+
+        Args:
+            folder_id: フォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+
+        Returns:
+            Sequence[str]: 削除したチャットスレッドのID
+        """
+        ...
+
+
+class SyncRepositoryProtocol(Protocol):
+    """
+    差分同期リポジトリのプロトコル
+
+    SQLite/Cosmos DB双方で同一のメソッド契約を維持します。
+    """
+
+    async def changes_since(
+        self, user_id: str, *, since: int = 0, limit: int = 500
+    ) -> SyncResponse:
+        """
+        指定バージョンより後の変更を取得
+
+        Args:
+            user_id: ユーザーID
+            since: 前回の同期で受け取ったバージョン（0の場合は全件）
+            limit: 取得件数上限（フォルダ・スレッド・墓標の合計）
+
+        Returns:
+            SyncResponse: 作成・更新されたドキュメント、墓標、次回のバージョン
+        """
+        ...
+
+
+class BootstrapRepositoryProtocol(Protocol):
+    """
+    初期表示（サイドバー）リポジトリのプロトコル
+
+    応答をモデルを介さずに送信できるよう、JSON文字列の行を返します。
+    SQLite/Cosmos DB双方で同一のメソッド契約を維持します。
+    """
+
+    async def sidebar(
+        self, user_id: str, *, thread_limit: int = 100
+    ) -> tuple[Sequence[str], Sequence[str], int]:
+        """
+        スレッド概要を埋め込んだフォルダ一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            thread_limit: フォルダごとのスレッド概要の件数上限
+
+        Returns:
+            tuple[Sequence[str], Sequence[str], int]: フォルダ（BootstrapFolder）の
+                JSON文字列、フォルダに属さないスレッド概要（ThreadSummary）の
+                JSON文字列、フォルダに属さないスレッドの総数
+        """
+        ...
@@ -0,0 +1,354 @@
+"""
+読み取り合流リポジトリ実装
+
+このモジュールは同じ読み取りが同時に要求された場合に、DBへの問い合わせと
+デコード済みの結果を共有するリポジトリのラッパーを提供します。
+
+キーは（ユーザーID, メソッド, 引数）で、ID指定の取得はユーザーIDを持ちません。
+書き込みの後は対象ユーザーの実行中のキーを破棄するため、
+書き込み完了後に開始した読み取りが書き込み前の問い合わせに合流することはありません。
+
+共有された結果は複数のリクエストで同じオブジェクトになるため、
+呼び出し側で変更しないでください。
+"""
+
+from collections.abc import Sequence
+
+from app.core.singleflight import SingleFlight
+from app.models.schemas import (
+    ChatThreadCreate,
+    ChatThreadRead,
+    ChatThreadUpdate,
+    FolderCreate,
+    FolderRead,
+    FolderUpdate,
+)
+from app.repositories.base import (
+    ChatThreadRepositoryProtocol,
+    FolderRepositoryProtocol,
+)
+
+type _Key = tuple[str | None, str, tuple[object, ...]]
+
+_folder_gets: SingleFlight[_Key, FolderRead] = SingleFlight("folders")
+_folder_lists: SingleFlight[_Key, list[FolderRead]] = SingleFlight("folders")
+_thread_gets: SingleFlight[_Key, ChatThreadRead] = SingleFlight("chat_threads")
+_thread_lists: SingleFlight[_Key, list[ChatThreadRead]] = SingleFlight("chat_threads")
+
+
+def _forget_user[V](flights: SingleFlight[_Key, V], user_id: str) -> None:
+    """ユーザーの一覧のキーを破棄する"""
+    flights.forget_where(lambda key: key[0] == user_id)
+
+
+def _forget_gets(ids: Sequence[str]) -> None:
+    """チャットスレッドのID指定の取得のキーを破棄する"""
+    for id in ids:
+        _thread_gets.forget((None, "get", (id,)))
+
+
+class CoalescingFolderRepository:
+    """
+    フォルダの読み取り合流リポジトリ実装
+
+    Attributes:
+        inner: 実際に問い合わせを行うリポジトリ
+    """
+
+    def __init__(self, inner: FolderRepositoryProtocol) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            inner: 実際に問い合わせを行うリポジトリ
+        """
+        self.inner = inner
+
+    async def get(self, id: str) -> FolderRead:
+        """
+        IDでフォルダを取得
+
+        Args:
+            id: フォルダID
+
+        Returns:
+            FolderRead: フォルダ情報
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        return await _folder_gets.do((None, "get", (id,)), lambda: self.inner.get(id))
+
+    async def list(
+        self, user_id: str, *, limit: int = 50, offset: int = 0
+    ) -> list[FolderRead]:
+        """
+        フォルダ一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数上限
+            offset: 取得開始位置
+
+        Returns:
+            list[FolderRead]: フォルダ一覧
+        """
+        return await _folder_lists.do(
+            (user_id, "list", (limit, offset)),
+            lambda: self.inner.list(user_id, limit=limit, offset=offset),
+        )
+
+    async def create(
+        self, dto: FolderCreate, *, user_id: str, email: str
+    ) -> FolderRead:
+        """
+        フォルダを作成
+
+        Args:
+            dto: フォルダ作成データ
+            user_id: ユーザーID
+            email: メールアドレス
+
+        Returns:
+            FolderRead: 作成されたフォルダ情報
+        """
+        try:
+            return await self.inner.create(dto, user_id=user_id, email=email)
+        finally:
+            _forget_user(_folder_lists, user_id)
+
+    async def update(self, id: str, dto: FolderUpdate) -> FolderRead:
+        """
+        フォルダを更新
+
+        Args:
+            id: フォルダID
+            dto: フォルダ更新データ
+
+        Returns:
+            FolderRead: 更新されたフォルダ情報
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        try:
+            folder = await self.inner.update(id, dto)
+        finally:
+            _folder_gets.forget((None, "get", (id,)))
+        _forget_user(_folder_lists, folder.user_id)
+        return folder
+
+    async def delete(self, id: str) -> None:
+        """
+        フォルダを削除
+
+        所有者はわからないため、全ユーザーの一覧のキーを破棄します。
+
+        Args:
+            id: フォルダID
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        try:
+            await self.inner.delete(id)
+        finally:
+            _folder_gets.forget((None, "get", (id,)))
+            _folder_lists.forget_where(lambda key: True)
+
+
+class CoalescingChatThreadRepository:
+    """
+    チャットスレッドの読み取り合流リポジトリ実装
+
+    Attributes:
+        inner: 実際に問い合わせを行うリポジトリ
+    """
+
+    def __init__(self, inner: ChatThreadRepositoryProtocol) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            inner: 実際に問い合わせを行うリポジトリ
+        """
+        self.inner = inner
+
+    async def get(self, id: str) -> ChatThreadRead:
+        """
+        IDでチャットスレッドを取得
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            ChatThreadRead: チャットスレッド情報
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        return await _thread_gets.do((None, "get", (id,)), lambda: self.inner.get(id))
+
+    async def get_shared(self, id: str) -> str:
+        """
+        共有中のチャットスレッドを公開用のJSON文字列で取得
+
+        読み込みは共有スレッドキャッシュ側でまとめるため、そのまま委譲します。
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            str: SharedThreadRead形式のJSON文字列
+
+        Raises:
+            RepositoryNotFoundError: スレッドが見つからないか共有されていない場合
+        """
+        return await self.inner.get_shared(id)
+
+    async def list(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        folder_id: str | None = None,
+    ) -> list[ChatThreadRead]:
+        """
+        チャットスレッド一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数上限
+            offset: 取得開始位置
+            folder_id: フォルダIDでフィルタ（任意）
+
+        Returns:
+            list[ChatThreadRead]: チャットスレッド一覧
+        """
+        return await _thread_lists.do(
+            (user_id, "list", (limit, offset, folder_id)),
+            lambda: self.inner.list(
+                user_id, limit=limit, offset=offset, folder_id=folder_id
+            ),
+        )
+
+    async def create(
+        self, dto: ChatThreadCreate, *, user_id: str, email: str
+    ) -> ChatThreadRead:
+        """
+        チャットスレッドを作成
+
+        Args:
+            dto: チャットスレッド作成データ
+            user_id: ユーザーID
+            email: メールアドレス
+
+        Returns:
+            ChatThreadRead: 作成されたチャットスレッド情報
+        """
+        try:
+            return await self.inner.create(dto, user_id=user_id, email=email)
+        finally:
+            _forget_user(_thread_lists, user_id)
+
+    async def update(self, id: str, dto: ChatThreadUpdate) -> ChatThreadRead:
+        """
+        チャットスレッドを更新
+
+        Args:
+            id: チャットスレッドID
+            dto: チャットスレッド更新データ
+
+        Returns:
+            ChatThreadRead: 更新されたチャットスレッド情報
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        try:
+            thread = await self.inner.update(id, dto)
+        finally:
+            _thread_gets.forget((None, "get", (id,)))
+        _forget_user(_thread_lists, thread.user_id)
+        return thread
+
+    async def delete(self, id: str) -> None:
+        """
+        チャットスレッドを削除
+
+        所有者はわからないため、全ユーザーの一覧のキーを破棄します。
+
+        Args:
+            id: チャットスレッドID
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        try:
+            await self.inner.delete(id)
+        finally:
+            _thread_gets.forget((None, "get", (id,)))
+            _thread_lists.forget_where(lambda key: True)
+
+    async def move_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへ移動
+
+        Args:
+            folder_id: 移動元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: 移動先のフォルダID
+
+        Returns:
+            Sequence[str]: 移動したチャットスレッドのID
+        """
+        try:
+            ids = await self.inner.move_to_folder(
+                folder_id, user_id=user_id, target_folder_id=target_folder_id
+            )
+        finally:
+            _forget_user(_thread_lists, user_id)
+        _forget_gets(ids)
+        return ids
+
+    async def copy_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへコピー
+
+        Args:
+            folder_id: コピー元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: コピー先のフォルダID
+
+        Returns:
+            Sequence[str]: 作成したチャットスレッドのID
+        """
+        try:
+            return await self.inner.copy_to_folder(
+                folder_id, user_id=user_id, target_folder_id=target_folder_id
+            )
+        finally:
+            _forget_user(_thread_lists, user_id)
+
+    async def delete_in_folder(self, folder_id: str, *, user_id: str) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で削除
+
+        Args:
+            folder_id: フォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+
+        Returns:
+            Sequence[str]: 削除したチャットスレッドのID
+        """
+        try:
+            ids = await self.inner.delete_in_folder(folder_id, user_id=user_id)
+        finally:
+            _forget_user(_thread_lists, user_id)
+        _forget_gets(ids)
+        return ids
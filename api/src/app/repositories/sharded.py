@@ -0,0 +1,423 @@
+"""
+シャーディングSQLiteリポジトリ実装
+
+このモジュールはユーザーIDのハッシュで選んだシャードに対して
+SQLiteリポジトリを実行するリポジトリ実装を提供します。
+
+ユーザースコープの一覧取得は単一シャードのみを参照し、
+IDのみの操作はIDに埋め込んだシャード番号でシャードを特定します。
+"""
+
+from collections.abc import Sequence
+from functools import partial
+
+from app.core.shards import ShardSet, new_shard_id
+from app.models.schemas import (
+    ChatThreadCreate,
+    ChatThreadRead,
+    ChatThreadUpdate,
+    FolderCreate,
+    FolderRead,
+    FolderUpdate,
+    SyncResponse,
+)
+from app.repositories.base import RepositoryNotFoundError
+from app.repositories.sqlite import (
+    SQLiteBootstrapRepository,
+    SQLiteChatThreadRepository,
+    SQLiteFolderRepository,
+    SQLiteSyncRepository,
+)
+
+
+class ShardedFolderRepository:
+    """
+    フォルダのシャーディングSQLiteリポジトリ実装
+
+    Attributes:
+        shards: シャードセット
+    """
+
+    def __init__(self, shards: ShardSet) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            shards: シャードセット
+        """
+        self.shards = shards
+
+    def _route(self, id: str) -> int:
+        """IDのシャードを取得する（シャードを埋め込んだIDでない場合はNotFound）"""
+        shard = self.shards.shard_for_id(id)
+        if shard is None:
+            raise RepositoryNotFoundError(f"Folder with id {id} not found")
+        return shard
+
+    async def get(self, id: str) -> FolderRead:
+        """
+        IDでフォルダを取得
+
+        Args:
+            id: フォルダID
+
+        Returns:
+            FolderRead: フォルダ情報
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteFolderRepository(session).get(id)
+
+    async def list(
+        self, user_id: str, *, limit: int = 50, offset: int = 0
+    ) -> list[FolderRead]:
+        """
+        フォルダ一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数上限
+            offset: 取得開始位置
+
+        Returns:
+            list[FolderRead]: フォルダ一覧
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteFolderRepository(session).list(
+                user_id, limit=limit, offset=offset
+            )
+
+    async def create(
+        self, dto: FolderCreate, *, user_id: str, email: str
+    ) -> FolderRead:
+        """
+        フォルダを作成
+
+        Args:
+            dto: フォルダ作成データ
+            user_id: ユーザーID
+            email: メールアドレス
+
+        Returns:
+            FolderRead: 作成されたフォルダ情報
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteFolderRepository(
+                session, new_id=partial(new_shard_id, shard)
+            ).create(dto, user_id=user_id, email=email)
+
+    async def update(self, id: str, dto: FolderUpdate) -> FolderRead:
+        """
+        フォルダを更新
+
+        Args:
+            id: フォルダID
+            dto: フォルダ更新データ
+
+        Returns:
+            FolderRead: 更新されたフォルダ情報
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteFolderRepository(session).update(id, dto)
+
+    async def delete(self, id: str) -> None:
+        """
+        フォルダを削除
+
+        Args:
+            id: フォルダID
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            await SQLiteFolderRepository(session).delete(id)
+
+
+class ShardedChatThreadRepository:
+    """
+    チャットスレッドのシャーディングSQLiteリポジトリ実装
+
+    Attributes:
+        shards: シャードセット
+    """
+
+    def __init__(self, shards: ShardSet) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            shards: シャードセット
+        """
+        self.shards = shards
+
+    def _route(self, id: str) -> int:
+        """IDのシャードを取得する（シャードを埋め込んだIDでない場合はNotFound）"""
+        shard = self.shards.shard_for_id(id)
+        if shard is None:
+            raise RepositoryNotFoundError(f"ChatThread with id {id} not found")
+        return shard
+
+    async def get(self, id: str) -> ChatThreadRead:
+        """
+        IDでチャットスレッドを取得
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            ChatThreadRead: チャットスレッド情報
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(session).get(id)
+
+    async def get_shared(self, id: str) -> str:
+        """
+        共有中のチャットスレッドを公開用のJSON文字列で取得
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            str: SharedThreadRead形式のJSON文字列
+
+        Raises:
+            RepositoryNotFoundError: スレッドが見つからないか共有されていない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(session).get_shared(id)
+
+    async def list(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        folder_id: str | None = None,
+    ) -> list[ChatThreadRead]:
+        """
+        チャットスレッド一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数上限
+            offset: 取得開始位置
+            folder_id: フォルダIDでフィルタ（任意）
+
+        Returns:
+            list[ChatThreadRead]: チャットスレッド一覧
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(session).list(
+                user_id, limit=limit, offset=offset, folder_id=folder_id
+            )
+
+    async def create(
+        self, dto: ChatThreadCreate, *, user_id: str, email: str
+    ) -> ChatThreadRead:
+        """
+        チャットスレッドを作成
+
+        Args:
+            dto: チャットスレッド作成データ
+            user_id: ユーザーID
+            email: メールアドレス
+
+        Returns:
+            ChatThreadRead: 作成されたチャットスレッド情報
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(
+                session, new_id=partial(new_shard_id, shard)
+            ).create(dto, user_id=user_id, email=email)
+
+    async def update(self, id: str, dto: ChatThreadUpdate) -> ChatThreadRead:
+        """
+        チャットスレッドを更新
+
+        Args:
+            id: チャットスレッドID
+            dto: チャットスレッド更新データ
+
+        Returns:
+            ChatThreadRead: 更新されたチャットスレッド情報
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(session).update(id, dto)
+
+    async def delete(self, id: str) -> None:
+        """
+        チャットスレッドを削除
+
+        Args:
+            id: チャットスレッドID
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        shard = self._route(id)
+        async with self.shards.session(shard) as session:
+            await SQLiteChatThreadRepository(session).delete(id)
+
+    async def move_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへ移動
+
+        Args:
+            folder_id: 移動元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: 移動先のフォルダID
+
+        Returns:
+            Sequence[str]: 移動したチャットスレッドのID
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(session).move_to_folder(
+                folder_id, user_id=user_id, target_folder_id=target_folder_id
+            )
+
+    async def copy_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへコピー
+
+        Args:
+            folder_id: コピー元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: コピー先のフォルダID
+
+        Returns:
+            Sequence[str]: 作成したチャットスレッドのID
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(
+                session, new_id=partial(new_shard_id, shard)
+            ).copy_to_folder(
+                folder_id, user_id=user_id, target_folder_id=target_folder_id
+            )
+
+    async def delete_in_folder(self, folder_id: str, *, user_id: str) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で削除
+
+        Args:
+            folder_id: フォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+
+        Returns:
+            Sequence[str]: 削除したチャットスレッドのID
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteChatThreadRepository(session).delete_in_folder(
+                folder_id, user_id=user_id
+            )
+
+
+class ShardedSyncRepository:
+    """
+    差分同期のシャーディングSQLiteリポジトリ実装
+
+    ユーザーのデータと変更ログは単一のシャードにあるため、
+    バージョンはシャードごとの変更ログの連番です。
+
+    Attributes:
+        shards: シャードセット
+    """
+
+    def __init__(self, shards: ShardSet) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            shards: シャードセット
+        """
+        self.shards = shards
+
+    async def changes_since(
+        self, user_id: str, *, since: int = 0, limit: int = 500
+    ) -> SyncResponse:
+        """
+        指定バージョンより後の変更を取得
+
+        Args:
+            user_id: ユーザーID
+            since: 前回の同期で受け取ったバージョン（0の場合は全件）
+            limit: 取得件数上限（フォルダ・スレッド・墓標の合計）
+
+        Returns:
+            SyncResponse: 作成・更新されたドキュメント、墓標、次回のバージョン
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteSyncRepository(session).changes_since(
+                user_id, since=since, limit=limit
+            )
+
+
+class ShardedBootstrapRepository:
+    """
+    初期表示（サイドバー）のシャーディングSQLiteリポジトリ実装
+
+    ユーザーのフォルダとスレッドは単一のシャードにあるため、
+    そのシャードのみを参照します。
+
+    Attributes:
+        shards: シャードセット
+    """
+
+    def __init__(self, shards: ShardSet) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            shards: シャードセット
+        """
+        self.shards = shards
+
+    async def sidebar(
+        self, user_id: str, *, thread_limit: int = 100
+    ) -> tuple[Sequence[str], Sequence[str], int]:
+        """
+        スレッド概要を埋め込んだフォルダ一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            thread_limit: フォルダごとのスレッド概要の件数上限
+
+        Returns:
+            tuple[Sequence[str], Sequence[str], int]: フォルダ（BootstrapFolder）の
+                JSON文字列、フォルダに属さないスレッド概要（ThreadSummary）の
+                JSON文字列、フォルダに属さないスレッドの総数
+        """
+        shard = self.shards.shard_for_user(user_id)
+        async with self.shards.session(shard) as session:
+            return await SQLiteBootstrapRepository(session).sidebar(
+                user_id, thread_limit=thread_limit
+            )
@@ -5,12 +5,19 @@ SQLiteリポジトリ実装
 """
 
 import json
+from collections.abc import Callable, Sequence
+from typing import Any
 
-from sqlalchemy import text
+from pydantic import BaseModel
+from sqlalchemy import Result, TextClause, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.changes import notify_changes
 from app.core.clock import to_api_datetime, utc_now
 from app.core.ids import new_uuid
+from app.core.offload import run_off_loop, should_offload
+from app.core.shared_cache import invalidate_shared_threads
+from app.core.timing import phase
 from app.models.schemas import (
     ChatThreadCreate,
     ChatThreadRead,
@@ -18,9 +25,135 @@ from app.models.schemas import (
     FolderCreate,
     FolderRead,
     FolderUpdate,
+    SyncResponse,
+    Tombstone,
 )
 from app.repositories.base import RepositoryNotFoundError
 
+# チャットスレッド t の概要（ThreadSummary）のJSONを組み立てる式
+_THREAD_SUMMARY = (
+    "json_object('id', t.id, 'name', json_extract(t.doc, '$.name'), "
+    "'createdAt', json_extract(t.doc, '$.createdAt'))"
+)
+
+# フォルダ f に属するチャットスレッド t の条件（インデックスの式と一致させる）
+_THREADS_IN_FOLDER = (
+    "json_extract(t.doc, '$.userId') = :user_id "
+    "AND json_extract(t.doc, '$.folderId') = f.id"
+)
+
+# ユーザーのどのフォルダにも属さないチャットスレッド t の条件
+_UNFILED_THREADS = (
+    "json_extract(t.doc, '$.userId') = :user_id "
+    "AND json_extract(t.doc, '$.folderId') NOT IN ("
+    "SELECT f.id FROM folders AS f WHERE json_extract(f.doc, '$.userId') = :user_id)"
+)
+
+
+async def _execute(
+    session: AsyncSession, statement: TextClause, params: dict[str, Any]
+) -> Result[Any]:
+    """SQLを実行する（"db" フェーズとして計測）"""
+    with phase("db"):
+        return await session.execute(statement, params)
+
+
+async def _commit(session: AsyncSession) -> None:
+    """
+    トランザクションをコミットする（"db" フェーズとして計測）
+
+    コミット後、変更フィードのテールに新しい変更の確認を促します。
+    """
+    with phase("db"):
+        await session.commit()
+    notify_changes()
+
+
+def _load[ReadT: BaseModel](model: type[ReadT], raw: str) -> ReadT:
+    """
+    docのJSON文字列をモデルに変換する
+
+    JSONデコードを "decode"、モデル構築を "validate" フェーズとして計測します。
+    """
+    with phase("decode"):
+        doc = json.loads(raw)
+    with phase("validate"):
+        return model(**doc)
+
+
+def _load_all[ReadT: BaseModel](model: type[ReadT], rows: Sequence[str]) -> list[ReadT]:
+    """docのJSON文字列の一覧をモデルの一覧に変換する"""
+    return [_load(model, row) for row in rows]
+
+
+async def _load_one[ReadT: BaseModel](model: type[ReadT], raw: str) -> ReadT:
+    """
+    docのJSON文字列をモデルに変換する
+
+    大きなドキュメントはイベントループを塞がないようスレッドプールで変換します。
+    """
+    if should_offload(size_bytes=len(raw)):
+        return await run_off_loop(_load, model, raw)
+    return _load(model, raw)
+
+
+async def _load_page[ReadT: BaseModel](
+    model: type[ReadT], rows: Sequence[str]
+) -> list[ReadT]:
+    """
+    一覧ページのdocをモデルの一覧に変換する
+
+    行数または合計サイズが閾値以上の場合はスレッドプールで変換します。
+    """
+    if should_offload(rows=len(rows), size_bytes=sum(len(row) for row in rows)):
+        return await run_off_loop(_load_all, model, rows)
+    return _load_all(model, rows)
+
+
+def _dump_sync(doc: dict[str, Any]) -> str:
+    """docをJSON文字列に変換する（"encode" フェーズとして計測）"""
+    with phase("encode"):
+        return json.dumps(doc, ensure_ascii=False)
+
+
+async def _dump(read: BaseModel) -> str:
+    """
+    モデルをdocのJSON文字列に変換する
+
+    文字列フィールドの合計が閾値以上の場合はスレッドプールで変換します。
+    """
+    doc = read.model_dump(by_alias=True)
+    size = sum(len(value) for value in doc.values() if isinstance(value, str))
+    if should_offload(size_bytes=size):
+        return await run_off_loop(_dump_sync, doc)
+    return _dump_sync(doc)
+
+
+def _json_set(dto: BaseModel) -> tuple[str, dict[str, Any]]:
+    """
+    更新データからdocを部分更新するjson_set式を作成する
+
+    設定されたフィールド（エイリアス名）ごとにパスと値をバインドするため、
+    読み込みを伴わずに1文で更新できます。
+
+    Args:
+        dto: 更新データ
+
+    Returns:
+        tuple[str, dict[str, Any]]: (SET句のdoc式, バインドパラメータ)
+    """
+    update_data = dto.model_dump(by_alias=True, exclude_unset=True)
+    if not update_data:
+        return "doc", {}
+    args: list[str] = []
+    params: dict[str, Any] = {}
+    with phase("encode"):
+        for i, (key, value) in enumerate(update_data.items()):
+            args.append(f":path{i}, json(:value{i})")
+            params[f"path{i}"] = f"$.{key}"
+            params[f"value{i}"] = json.dumps(value, ensure_ascii=False)
+    return f"json_set(doc, {', '.join(args)})", params
+
 
 class SQLiteFolderRepository:
     """
@@ -28,16 +161,21 @@ class SQLiteFolderRepository:
 
     Attributes:
         session: 非同期SQLAlchemyセッション
+        new_id: 作成するフォルダのIDを生成する関数
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self, session: AsyncSession, *, new_id: Callable[[], str] = new_uuid
+    ) -> None:
         """
         コンストラクタ
 
         Args:
             session: 非同期SQLAlchemyセッション
+            new_id: IDを生成する関数（省略時はUUID）
         """
         self.session = session
+        self.new_id = new_id
 
     async def get(self, id: str) -> FolderRead:
         """
@@ -52,16 +190,15 @@ class SQLiteFolderRepository:
         Raises:
             RepositoryNotFoundError: フォルダが見つからない場合
         """
-        result = await self.session.execute(
-            text("SELECT doc FROM folders WHERE id = :id"), {"id": id}
+        result = await _execute(
+            self.session, text("SELECT doc FROM folders WHERE id = :id"), {"id": id}
         )
         row = result.scalar_one_or_none()
 
         if row is None:
             raise RepositoryNotFoundError(f"Folder with id {id} not found")
 
-        doc = json.loads(row)
-        return FolderRead(**doc)
+        return await _load_one(FolderRead, row)
 
     async def list(
         self, user_id: str, *, limit: int = 50, offset: int = 0
@@ -77,7 +214,8 @@ class SQLiteFolderRepository:
         Returns:
             list[FolderRead]: フォルダ一覧
         """
-        result = await self.session.execute(
+        result = await _execute(
+            self.session,
             text(
                 "SELECT doc FROM folders "
                 "WHERE json_extract(doc, '$.userId') = :user_id "
@@ -87,12 +225,7 @@ class SQLiteFolderRepository:
         )
         rows = result.scalars().all()
 
-        folders = []
-        for row in rows:
-            doc = json.loads(row)
-            folders.append(FolderRead(**doc))
-
-        return folders
+        return await _load_page(FolderRead, rows)
 
     async def create(
         self, dto: FolderCreate, *, user_id: str, email: str
@@ -108,7 +241,7 @@ class SQLiteFolderRepository:
         Returns:
             FolderRead: 作成されたフォルダ情報
         """
-        folder_id = new_uuid()
+        folder_id = self.new_id()
         now_utc = utc_now()
         created_at_api = to_api_datetime(now_utc)
 
@@ -121,9 +254,10 @@ class SQLiteFolderRepository:
             email=email,
         )
 
-        doc_json = json.dumps(read.model_dump(by_alias=True), ensure_ascii=False)
+        doc_json = await _dump(read)
 
-        await self.session.execute(
+        await _execute(
+            self.session,
             text(
                 "INSERT INTO folders (id, doc, created_at, updated_at) "
                 "VALUES (:id, :doc, :created_at, :updated_at)"
@@ -135,7 +269,7 @@ class SQLiteFolderRepository:
                 "updated_at": now_utc,
             },
         )
-        await self.session.commit()
+        await _commit(self.session)
 
         return read
 
@@ -153,34 +287,23 @@ class SQLiteFolderRepository:
         Raises:
             RepositoryNotFoundError: フォルダが見つからない場合
         """
-        result = await self.session.execute(
-            text("SELECT doc FROM folders WHERE id = :id"), {"id": id}
+        doc_expr, params = _json_set(dto)
+        result = await _execute(
+            self.session,
+            text(
+                f"UPDATE folders SET doc = {doc_expr}, updated_at = :updated_at "
+                "WHERE id = :id RETURNING doc"
+            ),
+            {**params, "id": id, "updated_at": utc_now()},
         )
         row = result.scalar_one_or_none()
 
         if row is None:
             raise RepositoryNotFoundError(f"Folder with id {id} not found")
 
-        current = FolderRead(**json.loads(row))
-        update_data = dto.model_dump(exclude_unset=True)
-        patched = current.model_copy(update=update_data)
+        await _commit(self.session)
 
-        now_utc = utc_now()
-        doc_json = json.dumps(patched.model_dump(by_alias=True), ensure_ascii=False)
-
-        await self.session.execute(
-            text(
-                "UPDATE folders SET doc = :doc, updated_at = :updated_at WHERE id = :id"
-            ),
-            {
-                "id": id,
-                "doc": doc_json,
-                "updated_at": now_utc,
-            },
-        )
-        await self.session.commit()
-
-        return patched
+        return await _load_one(FolderRead, row)
 
     async def delete(self, id: str) -> None:
         """
@@ -192,18 +315,14 @@ class SQLiteFolderRepository:
         Raises:
             RepositoryNotFoundError: フォルダが見つからない場合
         """
-        result = await self.session.execute(
-            text("SELECT id FROM folders WHERE id = :id"), {"id": id}
+        result = await _execute(
+            self.session, text("DELETE FROM folders WHERE id = :id"), {"id": id}
         )
-        row = result.scalar_one_or_none()
 
-        if row is None:
+        if result.rowcount == 0:  # pyright: ignore[reportAttributeAccessIssue]
             raise RepositoryNotFoundError(f"Folder with id {id} not found")
 
-        await self.session.execute(
-            text("DELETE FROM folders WHERE id = :id"), {"id": id}
-        )
-        await self.session.commit()
+        await _commit(self.session)
 
 
 class SQLiteChatThreadRepository:
@@ -212,16 +331,21 @@ class SQLiteChatThreadRepository:
 
     Attributes:
         session: 非同期SQLAlchemyセッション
+        new_id: 作成するチャットスレッドのIDを生成する関数
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self, session: AsyncSession, *, new_id: Callable[[], str] = new_uuid
+    ) -> None:
         """
         コンストラクタ
 
         Args:
             session: 非同期SQLAlchemyセッション
+            new_id: IDを生成する関数（省略時はUUID）
         """
         self.session = session
+        self.new_id = new_id
 
     async def get(self, id: str) -> ChatThreadRead:
         """
@@ -236,16 +360,54 @@ class SQLiteChatThreadRepository:
         Raises:
             RepositoryNotFoundError: チャットスレッドが見つからない場合
         """
-        result = await self.session.execute(
-            text("SELECT doc FROM chat_threads WHERE id = :id"), {"id": id}
+        result = await _execute(
+            self.session,
+            text("SELECT doc FROM chat_threads WHERE id = :id"),
+            {"id": id},
         )
         row = result.scalar_one_or_none()
 
         if row is None:
             raise RepositoryNotFoundError(f"ChatThread with id {id} not found")
 
-        doc = json.loads(row)
-        return ChatThreadRead(**doc)
+        return await _load_one(ChatThreadRead, row)
+
+    async def get_shared(self, id: str) -> str:
+        """
+        共有中のチャットスレッドを公開用のJSON文字列で取得
+
+        共有中のスレッドのみを含む部分インデックスを使用し、
+        公開用のフィールドのみのJSONをSQLite側で組み立てます。
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            str: SharedThreadRead形式のJSON文字列
+
+        Raises:
+            RepositoryNotFoundError: スレッドが見つからないか共有されていない場合
+        """
+        result = await _execute(
+            self.session,
+            text(
+                "SELECT json_object('id', id, "
+                "'name', json_extract(doc, '$.name'), "
+                "'prompt', json_extract(doc, '$.prompt'), "
+                "'temperature', json_extract(doc, '$.temperature'), "
+                "'createdAt', json_extract(doc, '$.createdAt'), "
+                "'sharedAt', json_extract(doc, '$.sharedAt')) "
+                "FROM chat_threads INDEXED BY ix_chat_threads_shared "
+                "WHERE id = :id AND json_extract(doc, '$.isShared') = 1"
+            ),
+            {"id": id},
+        )
+        row = result.scalar_one_or_none()
+
+        if row is None:
+            raise RepositoryNotFoundError(f"Shared ChatThread with id {id} not found")
+
+        return row
 
     async def list(
         self,
@@ -268,7 +430,8 @@ class SQLiteChatThreadRepository:
             list[ChatThreadRead]: チャットスレッド一覧
         """
         if folder_id is not None:
-            result = await self.session.execute(
+            result = await _execute(
+                self.session,
                 text(
                     "SELECT doc FROM chat_threads "
                     "WHERE json_extract(doc, '$.userId') = :user_id "
@@ -283,7 +446,8 @@ class SQLiteChatThreadRepository:
                 },
             )
         else:
-            result = await self.session.execute(
+            result = await _execute(
+                self.session,
                 text(
                     "SELECT doc FROM chat_threads "
                     "WHERE json_extract(doc, '$.userId') = :user_id "
@@ -293,12 +457,7 @@ class SQLiteChatThreadRepository:
             )
         rows = result.scalars().all()
 
-        threads = []
-        for row in rows:
-            doc = json.loads(row)
-            threads.append(ChatThreadRead(**doc))
-
-        return threads
+        return await _load_page(ChatThreadRead, rows)
 
     async def create(
         self, dto: ChatThreadCreate, *, user_id: str, email: str
@@ -314,7 +473,7 @@ class SQLiteChatThreadRepository:
         Returns:
             ChatThreadRead: 作成されたチャットスレッド情報
         """
-        thread_id = new_uuid()
+        thread_id = self.new_id()
         now_utc = utc_now()
         created_at_api = to_api_datetime(now_utc)
 
@@ -331,9 +490,10 @@ class SQLiteChatThreadRepository:
             email=email,
         )
 
-        doc_json = json.dumps(read.model_dump(by_alias=True), ensure_ascii=False)
+        doc_json = await _dump(read)
 
-        await self.session.execute(
+        await _execute(
+            self.session,
             text(
                 "INSERT INTO chat_threads (id, doc, created_at, updated_at) "
                 "VALUES (:id, :doc, :created_at, :updated_at)"
@@ -345,7 +505,7 @@ class SQLiteChatThreadRepository:
                 "updated_at": now_utc,
             },
         )
-        await self.session.commit()
+        await _commit(self.session)
 
         return read
 
@@ -363,55 +523,363 @@ class SQLiteChatThreadRepository:
         Raises:
             RepositoryNotFoundError: チャットスレッドが見つからない場合
         """
-        result = await self.session.execute(
-            text("SELECT doc FROM chat_threads WHERE id = :id"), {"id": id}
+        doc_expr, params = _json_set(dto)
+        result = await _execute(
+            self.session,
+            text(
+                f"UPDATE chat_threads SET doc = {doc_expr}, updated_at = :updated_at "
+                "WHERE id = :id RETURNING doc"
+            ),
+            {**params, "id": id, "updated_at": utc_now()},
         )
         row = result.scalar_one_or_none()
 
         if row is None:
             raise RepositoryNotFoundError(f"ChatThread with id {id} not found")
 
-        current = ChatThreadRead(**json.loads(row))
-        update_data = dto.model_dump(exclude_unset=True)
-        patched = current.model_copy(update=update_data)
+        await _commit(self.session)
+        invalidate_shared_threads([id])
 
-        now_utc = utc_now()
-        doc_json = json.dumps(patched.model_dump(by_alias=True), ensure_ascii=False)
+        return await _load_one(ChatThreadRead, row)
+
+    async def delete(self, id: str) -> None:
+        """
+        チャットスレッドを削除
+
+        Args:
+            id: チャットスレッドID
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        result = await _execute(
+            self.session, text("DELETE FROM chat_threads WHERE id = :id"), {"id": id}
+        )
+
+        if result.rowcount == 0:  # pyright: ignore[reportAttributeAccessIssue]
+            raise RepositoryNotFoundError(f"ChatThread with id {id} not found")
+
+        await _commit(self.session)
+        invalidate_shared_threads([id])
 
-        await self.session.execute(
+    async def move_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへ移動
+
+        (userId, folderId) のインデックスで対象を絞り込み、1文で更新します。
+
+        Args:
+            folder_id: 移動元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: 移動先のフォルダID
+
+        Returns:
+            Sequence[str]: 移動したチャットスレッドのID
+        """
+        result = await _execute(
+            self.session,
             text(
-                "UPDATE chat_threads SET doc = :doc, updated_at = :updated_at "
-                "WHERE id = :id"
+                "UPDATE chat_threads "
+                "SET doc = json_set(doc, '$.folderId', :target_folder_id), "
+                "updated_at = :updated_at "
+                "WHERE json_extract(doc, '$.userId') = :user_id "
+                "AND json_extract(doc, '$.folderId') = :folder_id "
+                "RETURNING id"
             ),
             {
-                "id": id,
-                "doc": doc_json,
-                "updated_at": now_utc,
+                "user_id": user_id,
+                "folder_id": folder_id,
+                "target_folder_id": target_folder_id,
+                "updated_at": utc_now(),
             },
         )
-        await self.session.commit()
+        ids = list(result.scalars().all())
+        await _commit(self.session)
+        return ids
 
-        return patched
+    async def copy_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへコピー
 
-    async def delete(self, id: str) -> None:
+        コピー元のIDを取得して新しいIDを割り当て、INSERT ... SELECT の1文で
+        複製します。コピーは新しいIDと作成日時を持ち、共有されていない状態になります。
+        ID の取得と複製の間に移動・削除されたスレッドは複製せず、実際に作成した
+        スレッドのIDを RETURNING で返します。
+
+        Args:
+            folder_id: コピー元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: コピー先のフォルダID
+
+        Returns:
+            Sequence[str]: 作成したチャットスレッドのID
         """
-        チャットスレッドを削除
+        result = await _execute(
+            self.session,
+            text(
+                "SELECT id FROM chat_threads "
+                "WHERE json_extract(doc, '$.userId') = :user_id "
+                "AND json_extract(doc, '$.folderId') = :folder_id"
+            ),
+            {"user_id": user_id, "folder_id": folder_id},
+        )
+        new_ids = {thread_id: self.new_id() for thread_id in result.scalars().all()}
+        if not new_ids:
+            await self.session.rollback()
+            return []
+
+        now_utc = utc_now()
+        result = await _execute(
+            self.session,
+            text(
+                "INSERT INTO chat_threads (id, doc, created_at, updated_at) "
+                "SELECT ids.value, json_set(t.doc, '$.id', ids.value, "
+                "'$.folderId', :target_folder_id, '$.createdAt', :created_at, "
+                "'$.isShared', json('false'), '$.sharedAt', NULL), "
+                ":created_at_db, :created_at_db "
+                "FROM json_each(:ids) AS ids "
+                "JOIN chat_threads AS t ON t.id = ids.key "
+                "WHERE json_extract(t.doc, '$.userId') = :user_id "
+                "AND json_extract(t.doc, '$.folderId') = :folder_id "
+                "RETURNING id"
+            ),
+            {
+                "ids": json.dumps(new_ids),
+                "user_id": user_id,
+                "folder_id": folder_id,
+                "target_folder_id": target_folder_id,
+                "created_at": to_api_datetime(now_utc),
+                "created_at_db": now_utc,
+            },
+        )
+        ids = list(result.scalars().all())
+        await _commit(self.session)
+        return ids
+
+    async def delete_in_folder(self, folder_id: str, *, user_id: str) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で削除
+
+        (userId, folderId) のインデックスで対象を絞り込み、1文で削除します。
 
         Args:
-            id: チャットスレッドID
+            folder_id: フォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
 
-        Raises:
-            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        Returns:
+            Sequence[str]: 削除したチャットスレッドのID
         """
-        result = await self.session.execute(
-            text("SELECT id FROM chat_threads WHERE id = :id"), {"id": id}
+        result = await _execute(
+            self.session,
+            text(
+                "DELETE FROM chat_threads "
+                "WHERE json_extract(doc, '$.userId') = :user_id "
+                "AND json_extract(doc, '$.folderId') = :folder_id "
+                "RETURNING id"
+            ),
+            {"user_id": user_id, "folder_id": folder_id},
         )
-        row = result.scalar_one_or_none()
+        ids = list(result.scalars().all())
+        await _commit(self.session)
+        invalidate_shared_threads(ids)
+        return ids
 
-        if row is None:
-            raise RepositoryNotFoundError(f"ChatThread with id {id} not found")
 
-        await self.session.execute(
-            text("DELETE FROM chat_threads WHERE id = :id"), {"id": id}
+class SQLiteSyncRepository:
+    """
+    差分同期のSQLiteリポジトリ実装
+
+    バージョンは変更ログの連番で、書き込み時にトリガーで各行の version 列と
+    削除時の墓標（tombstones）に記録されます。(userId, version) の
+    インデックスにより、取得コストはライブラリの件数ではなく変更件数に比例します。
+
+    Attributes:
+        session: 非同期SQLAlchemyセッション
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            session: 非同期SQLAlchemyセッション
+        """
+        self.session = session
+
+    async def changes_since(
+        self, user_id: str, *, since: int = 0, limit: int = 500
+    ) -> SyncResponse:
+        """
+        指定バージョンより後の変更を取得
+
+        最新のバージョンを先に確定し、それ以下の変更のみを返すため、
+        取得中にコミットされた変更は次回の同期で返されます。
+        since が墓標の保持境界より前の場合は、その間の削除を返せないため
+        変更を返さずに全件の再同期を求めます。
+
+        Args:
+            user_id: ユーザーID
+            since: 前回の同期で受け取ったバージョン（0の場合は全件）
+            limit: 取得件数上限（フォルダ・スレッド・墓標の合計）
+
+        Returns:
+            SyncResponse: 作成・更新されたドキュメント、墓標、次回のバージョン
+        """
+        result = await _execute(
+            self.session,
+            text(
+                "SELECT (SELECT seq FROM sqlite_sequence WHERE name = 'changes'), "
+                "(SELECT seq FROM retention_horizons WHERE name = 'tombstones')"
+            ),
+            {},
+        )
+        last_seq, horizon = tuple(result.one())
+        high_water: int = last_seq or 0
+        if 0 < since < (horizon or 0):
+            return SyncResponse(
+                folders=[],
+                chatThreads=[],
+                tombstones=[],
+                version=0,
+                hasMore=True,
+                resyncRequired=True,
+            )
+        params = {
+            "user_id": user_id,
+            "since": since,
+            "high_water": high_water,
+            "limit": limit + 1,
+        }
+
+        entries: list[tuple[int, str, str]] = []
+        for table in ("folders", "chat_threads"):
+            result = await _execute(
+                self.session,
+                text(
+                    f"SELECT version, doc FROM {table} "
+                    "WHERE json_extract(doc, '$.userId') = :user_id "
+                    "AND version > :since AND version <= :high_water "
+                    "ORDER BY version LIMIT :limit"
+                ),
+                params,
+            )
+            rows: Sequence[Any] = result.all()
+            entries.extend((row[0], table, row[1]) for row in rows)
+        result = await _execute(
+            self.session,
+            text(
+                "SELECT version, entity, entity_id FROM tombstones "
+                "WHERE user_id = :user_id "
+                "AND version > :since AND version <= :high_water "
+                "ORDER BY version LIMIT :limit"
+            ),
+            params,
+        )
+        rows = result.all()
+        tombstones = {row[0]: (row[1], row[2]) for row in rows}
+        entries.extend((version, "tombstones", "") for version in tombstones)
+
+        # 各表の先頭limit+1件を合わせた中の先頭limit件は全体の先頭limit件と一致し、
+        # limit件を超えていれば続きがある
+        entries.sort()
+        has_more = len(entries) > limit
+        page = entries[:limit]
+        folders = [doc for _, table, doc in page if table == "folders"]
+        threads = [doc for _, table, doc in page if table == "chat_threads"]
+        return SyncResponse(
+            folders=await _load_page(FolderRead, folders),
+            chatThreads=await _load_page(ChatThreadRead, threads),
+            tombstones=[
+                Tombstone(
+                    entity=tombstones[version][0],
+                    id=tombstones[version][1],
+                    version=version,
+                )
+                for version, table, _ in page
+                if table == "tombstones"
+            ],
+            version=page[-1][0] if has_more else max(high_water, since),
+            hasMore=has_more,
+            resyncRequired=False,
+        )
+
+
+class SQLiteBootstrapRepository:
+    """
+    初期表示（サイドバー）のSQLiteリポジトリ実装
+
+    フォルダごとのスレッド概要と件数を相関サブクエリで集約し、
+    応答のJSONをSQLite側で組み立てます。サブクエリは
+    (userId, folderId) のインデックスで解決されるため、
+    フォルダ数に関係なく2文で取得できます。
+
+    Attributes:
+        session: 非同期SQLAlchemyセッション
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            session: 非同期SQLAlchemyセッション
+        """
+        self.session = session
+
+    async def sidebar(
+        self, user_id: str, *, thread_limit: int = 100
+    ) -> tuple[Sequence[str], Sequence[str], int]:
+        """
+        スレッド概要を埋め込んだフォルダ一覧を取得
+
+        2文はそれぞれ自動コミットの読み取りで実行するため、間にコミットされた
+        書き込みによってフォルダとフォルダに属さないスレッドが異なる時点の
+        内容になる場合があります（次回の取得で解消します）。
+
+        Args:
+            user_id: ユーザーID
+            thread_limit: フォルダごとのスレッド概要の件数上限
+
+        Returns:
+            tuple[Sequence[str], Sequence[str], int]: フォルダ（BootstrapFolder）の
+                JSON文字列、フォルダに属さないスレッド概要（ThreadSummary）の
+                JSON文字列、フォルダに属さないスレッドの総数
+        """
+        params = {"user_id": user_id, "thread_limit": thread_limit}
+        result = await _execute(
+            self.session,
+            text(
+                "SELECT json_set(f.doc, "
+                "'$.threads', json(("
+                "SELECT json_group_array(json(s.summary)) FROM ("
+                f"SELECT {_THREAD_SUMMARY} AS summary FROM chat_threads AS t "
+                f"WHERE {_THREADS_IN_FOLDER} LIMIT :thread_limit) AS s)), "
+                "'$.threadCount', ("
+                f"SELECT COUNT(*) FROM chat_threads AS t WHERE {_THREADS_IN_FOLDER})) "
+                "FROM folders AS f WHERE json_extract(f.doc, '$.userId') = :user_id"
+            ),
+            params,
+        )
+        folders = result.scalars().all()
+
+        # 総数は件数上限と独立したスカラーサブクエリで求め、概要が0件
+        # （thread_limit=0 を含む）でも1行返るよう外部結合する
+        result = await _execute(
+            self.session,
+            text(
+                "SELECT s.summary, c.total FROM ("
+                "SELECT COUNT(*) AS total FROM chat_threads AS t "
+                f"WHERE {_UNFILED_THREADS}) AS c "
+                f"LEFT JOIN (SELECT {_THREAD_SUMMARY} AS summary "
+                f"FROM chat_threads AS t WHERE {_UNFILED_THREADS} "
+                "LIMIT :thread_limit) AS s ON 1"
+            ),
+            params,
         )
-        await self.session.commit()
+        rows: Sequence[Any] = result.all()
+        unfiled = [row[0] for row in rows if row[0] is not None]
+        return folders, unfiled, rows[0][1]
@@ -0,0 +1,908 @@
+"""
+ライトビハインドリポジトリ実装
+
+このモジュールはメモリを一次ストアとし、変更をバックグラウンドで
+まとめてSQLiteへフラッシュするハイブリッドリポジトリを提供します。
+
+読み書きはプロセス内メモリで完結するため、単一ワーカーでの運用を前提とします。
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.changes import notify_changes
+from app.core.clock import to_api_datetime, utc_now
+from app.core.config import settings
+from app.core.db import get_session_factory
+from app.core.ids import new_uuid
+from app.core.metrics import REGISTRY, Gauge, Histogram, record_cache
+from app.core.shared_cache import invalidate_shared_threads
+from app.models.schemas import (
+    ChatThreadCreate,
+    ChatThreadRead,
+    ChatThreadUpdate,
+    FolderCreate,
+    FolderRead,
+    FolderUpdate,
+    SharedThreadRead,
+)
+from app.repositories.base import RepositoryNotFoundError
+
+logger = logging.getLogger(__name__)
+
+TableName = Literal["folders", "chat_threads"]
+
+WRITE_BEHIND_DIRTY = REGISTRY.register(
+    Gauge("write_behind_dirty_records", "Records waiting to be flushed to SQLite.")
+)
+WRITE_BEHIND_FLUSH_DURATION = REGISTRY.register(
+    Histogram(
+        "write_behind_flush_duration_seconds",
+        "Duration of successful write-behind flushes to SQLite.",
+    )
+)
+
+
+class WriteBehindStats(BaseModel):
+    """
+    ライトビハインドストアの統計情報
+
+    Attributes:
+        dirty_count: 未フラッシュのレコード数
+        oldest_dirty_age_seconds: 最も古い未フラッシュ変更の経過秒数
+        flush_count: 成功したフラッシュ回数
+        flush_failures: 失敗したフラッシュ回数
+        flushed_records: フラッシュ済みレコード数の累計
+        last_flush_seconds: 直近のフラッシュ所要時間（秒）
+        max_flush_seconds: フラッシュ所要時間の最大値（秒）
+        cached_users: メモリに読み込み済みのユーザー数
+    """
+
+    dirty_count: int
+    oldest_dirty_age_seconds: float
+    flush_count: int
+    flush_failures: int
+    flushed_records: int
+    last_flush_seconds: float
+    max_flush_seconds: float
+    cached_users: int
+
+
+class _DirtyEntry:
+    """未フラッシュの変更（upsertまたはdelete）"""
+
+    __slots__ = ("op", "model", "user_id", "created_at", "updated_at", "dirtied_at")
+
+    def __init__(
+        self,
+        op: Literal["upsert", "delete"],
+        model: FolderRead | ChatThreadRead | None,
+        user_id: str,
+        created_at: datetime,
+        updated_at: datetime,
+        dirtied_at: float,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            op: 変更種別
+            model: upsert時の最新ドキュメント（delete時はNone）
+            user_id: 所有ユーザーID
+            created_at: 作成日時（UTC、INSERT時のみ使用）
+            updated_at: 更新日時（UTC）
+            dirtied_at: 最初に未フラッシュとなった時刻（monotonic）
+        """
+        self.op = op
+        self.model = model
+        self.user_id = user_id
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.dirtied_at = dirtied_at
+
+
+type _Batch = list[tuple[tuple[TableName, str], _DirtyEntry]]
+
+
+class _MemoryTable[ReadT: (FolderRead, ChatThreadRead)]:
+    """
+    1テーブル分のメモリ上ドキュメント
+
+    Attributes:
+        name: テーブル名
+        model: Readモデルクラス
+        docs: IDをキーとしたドキュメント
+        user_ids: ユーザーごとのID一覧（SQLiteの格納順を維持）
+        loaded_users: SQLiteから全件読み込み済みのユーザー（LRU順）
+    """
+
+    def __init__(self, name: TableName, model: type[ReadT]) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            name: テーブル名
+            model: Readモデルクラス
+        """
+        self.name: TableName = name
+        self.model = model
+        self.docs: dict[str, ReadT] = {}
+        self.user_ids: dict[str, dict[str, None]] = {}
+        self.loaded_users: OrderedDict[str, None] = OrderedDict()
+
+    def remember(self, doc: ReadT) -> None:
+        """ドキュメントをメモリに登録する"""
+        self.docs[doc.id] = doc
+        self.user_ids.setdefault(doc.user_id, {})[doc.id] = None
+
+    def forget(self, id: str, user_id: str) -> None:
+        """ドキュメントをメモリから除去する"""
+        self.docs.pop(id, None)
+        ids = self.user_ids.get(user_id)
+        if ids is not None:
+            ids.pop(id, None)
+
+
+class WriteBehindStore:
+    """
+    メモリ優先のドキュメントストア
+
+    読み書きはメモリで処理し、変更はダーティセットに積んで
+    一定間隔またはダーティ件数の閾値でSQLiteへフラッシュします。
+    1回のフラッシュはダーティセット全体を単一トランザクションで書き込むため、
+    クラッシュ時もSQLiteにはメモリ上のある時点の整合した状態が残ります。
+
+    Attributes:
+        folders: フォルダのメモリテーブル
+        chat_threads: チャットスレッドのメモリテーブル
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        *,
+        flush_interval: float | None = None,
+        flush_batch_size: int | None = None,
+        max_dirty: int | None = None,
+        max_users: int | None = None,
+    ) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            session_factory: SQLiteセッションファクトリ（省略時はプロセス共有のもの）
+            flush_interval: フラッシュ間隔（秒、省略時は設定値）
+            flush_batch_size: フラッシュを前倒しするダーティ件数（省略時は設定値）
+            max_dirty: 書き込み側で同期フラッシュするダーティ件数（省略時は設定値）
+            max_users: メモリに保持するユーザー数の上限（省略時は設定値）
+        """
+        self._session_factory = session_factory or get_session_factory()
+        self._flush_interval = flush_interval or settings.write_behind_flush_interval
+        self._flush_batch_size = (
+            flush_batch_size or settings.write_behind_flush_batch_size
+        )
+        self._max_dirty = max_dirty or settings.write_behind_max_dirty
+        self._max_users = max_users or settings.write_behind_max_users
+
+        self.folders = _MemoryTable("folders", FolderRead)
+        self.chat_threads = _MemoryTable("chat_threads", ChatThreadRead)
+
+        self._dirty: OrderedDict[tuple[TableName, str], _DirtyEntry] = OrderedDict()
+        self._io_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+        self._flush_count = 0
+        self._flush_failures = 0
+        self._flushed_records = 0
+        self._last_flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+
+    def start(self) -> None:
+        """バックグラウンドフラッシュタスクを開始する（起動済みなら何もしない）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """
+        バックグラウンドフラッシュを停止し、残りの変更をフラッシュする
+
+        アプリケーションのシャットダウン時に呼び出します。
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> WriteBehindStats:
+        """
+        統計情報を取得する
+
+        Returns:
+            WriteBehindStats: ダーティセットとフラッシュの統計情報
+        """
+        now = time.monotonic()
+        oldest = min((e.dirtied_at for e in self._dirty.values()), default=now)
+        return WriteBehindStats(
+            dirty_count=len(self._dirty),
+            oldest_dirty_age_seconds=now - oldest,
+            flush_count=self._flush_count,
+            flush_failures=self._flush_failures,
+            flushed_records=self._flushed_records,
+            last_flush_seconds=self._last_flush_seconds,
+            max_flush_seconds=self._max_flush_seconds,
+            cached_users=len(self.folders.loaded_users)
+            + len(self.chat_threads.loaded_users),
+        )
+
+    async def get[ReadT: (FolderRead, ChatThreadRead)](
+        self, table: _MemoryTable[ReadT], id: str
+    ) -> ReadT | None:
+        """
+        IDでドキュメントを取得する
+
+        メモリにない場合はSQLiteから読み込みます。
+
+        Args:
+            table: 対象のメモリテーブル
+            id: ドキュメントID
+
+        Returns:
+            ReadT | None: ドキュメント（存在しない場合はNone）
+        """
+        doc = table.docs.get(id)
+        if doc is not None or self._is_pending_delete(table, id):
+            return doc
+
+        async with self._io_lock, self._session_factory() as session:
+            result = await session.execute(
+                text(f"SELECT doc FROM {table.name} WHERE id = :id"), {"id": id}
+            )
+            row = result.scalar_one_or_none()
+
+        doc = table.docs.get(id)
+        if doc is not None or row is None or self._is_pending_delete(table, id):
+            return doc
+
+        doc = table.model(**json.loads(row))
+        if doc.user_id in table.loaded_users:
+            table.remember(doc)
+        return doc
+
+    async def list[ReadT: (FolderRead, ChatThreadRead)](
+        self, table: _MemoryTable[ReadT], user_id: str
+    ) -> list[ReadT]:
+        """
+        ユーザーのドキュメント一覧を取得する
+
+        Args:
+            table: 対象のメモリテーブル
+            user_id: ユーザーID
+
+        Returns:
+            list[ReadT]: SQLiteの格納順に並んだドキュメント一覧
+        """
+        await self._ensure_user_loaded(table, user_id)
+        ids = table.user_ids.get(user_id, {})
+        return [table.docs[id] for id in ids]
+
+    async def put[ReadT: (FolderRead, ChatThreadRead)](
+        self, table: _MemoryTable[ReadT], doc: ReadT, now_utc: datetime
+    ) -> None:
+        """
+        ドキュメントを書き込む（作成・更新共通）
+
+        Args:
+            table: 対象のメモリテーブル
+            doc: 最新のドキュメント
+            now_utc: 書き込み時刻（UTC）
+        """
+        table.remember(doc)
+        self._mark_dirty(table, doc.id, "upsert", doc, doc.user_id, now_utc)
+        await self._after_write()
+
+    async def delete[ReadT: (FolderRead, ChatThreadRead)](
+        self, table: _MemoryTable[ReadT], doc: ReadT
+    ) -> None:
+        """
+        ドキュメントを削除する
+
+        Args:
+            table: 対象のメモリテーブル
+            doc: 削除するドキュメント
+        """
+        table.forget(doc.id, doc.user_id)
+        self._mark_dirty(table, doc.id, "delete", None, doc.user_id, utc_now())
+        await self._after_write()
+
+    async def put_many[ReadT: (FolderRead, ChatThreadRead)](
+        self, table: _MemoryTable[ReadT], docs: Sequence[ReadT], now_utc: datetime
+    ) -> None:
+        """
+        複数のドキュメントを書き込む（フラッシュ判定は1回のみ）
+
+        Args:
+            table: 対象のメモリテーブル
+            docs: 最新のドキュメント
+            now_utc: 書き込み時刻（UTC）
+        """
+        for doc in docs:
+            table.remember(doc)
+            self._mark_dirty(table, doc.id, "upsert", doc, doc.user_id, now_utc)
+        await self._after_write()
+
+    async def delete_many[ReadT: (FolderRead, ChatThreadRead)](
+        self, table: _MemoryTable[ReadT], docs: Sequence[ReadT]
+    ) -> None:
+        """
+        複数のドキュメントを削除する（フラッシュ判定は1回のみ）
+
+        Args:
+            table: 対象のメモリテーブル
+            docs: 削除するドキュメント
+        """
+        now_utc = utc_now()
+        for doc in docs:
+            table.forget(doc.id, doc.user_id)
+            self._mark_dirty(table, doc.id, "delete", None, doc.user_id, now_utc)
+        await self._after_write()
+
+    async def flush(self) -> int:
+        """
+        ダーティセットを単一トランザクションでSQLiteへ書き込む
+
+        Returns:
+            int: フラッシュしたレコード数
+
+        Raises:
+            Exception: 書き込みに失敗した場合（変更はダーティセットに戻されます）
+        """
+        async with self._io_lock:
+            if not self._dirty:
+                return 0
+
+            batch = list(self._dirty.items())
+            self._dirty.clear()
+            started = time.perf_counter()
+            try:
+                await self._write_batch(batch)
+            except Exception:
+                self._restore(batch)
+                self._flush_failures += 1
+                WRITE_BEHIND_DIRTY.labels().set(len(self._dirty))
+                raise
+
+            elapsed = time.perf_counter() - started
+            WRITE_BEHIND_FLUSH_DURATION.labels().observe(elapsed)
+            WRITE_BEHIND_DIRTY.labels().set(len(self._dirty))
+            self._flush_count += 1
+            self._flushed_records += len(batch)
+            self._last_flush_seconds = elapsed
+            self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+            self._release_unloaded(batch)
+            return len(batch)
+
+    def _table(self, name: TableName) -> _MemoryTable[Any]:
+        """テーブル名からメモリテーブルを取得する"""
+        return self.folders if name == "folders" else self.chat_threads
+
+    def _is_pending_delete(self, table: _MemoryTable[Any], id: str) -> bool:
+        """未フラッシュの削除があるかを判定する"""
+        entry = self._dirty.get((table.name, id))
+        return entry is not None and entry.op == "delete"
+
+    def _mark_dirty(
+        self,
+        table: _MemoryTable[Any],
+        id: str,
+        op: Literal["upsert", "delete"],
+        model: FolderRead | ChatThreadRead | None,
+        user_id: str,
+        now_utc: datetime,
+    ) -> None:
+        """変更をダーティセットに記録する（初回ダーティ時刻と順序は維持）"""
+        key = (table.name, id)
+        previous = self._dirty.get(key)
+        if previous is None:
+            self._dirty[key] = _DirtyEntry(
+                op, model, user_id, now_utc, now_utc, time.monotonic()
+            )
+            WRITE_BEHIND_DIRTY.labels().set(len(self._dirty))
+            return
+
+        previous.op = op
+        previous.model = model
+        previous.updated_at = now_utc
+
+    async def _after_write(self) -> None:
+        """ダーティ件数に応じてフラッシュを前倒し、上限超過時は同期フラッシュする"""
+        self.start()
+        if len(self._dirty) >= self._max_dirty:
+            await self.flush()
+        elif len(self._dirty) >= self._flush_batch_size:
+            self._wakeup.set()
+
+    async def _ensure_user_loaded(self, table: _MemoryTable[Any], user_id: str) -> None:
+        """ユーザーのドキュメントをSQLiteから読み込み、メモリと統合する"""
+        hit = user_id in table.loaded_users
+        record_cache("write_behind_users", hit)
+        if hit:
+            table.loaded_users.move_to_end(user_id)
+            return
+
+        async with self._io_lock:
+            if user_id in table.loaded_users:
+                return
+
+            async with self._session_factory() as session:
+                result = await session.execute(
+                    text(
+                        f"SELECT doc FROM {table.name} "
+                        "WHERE json_extract(doc, '$.userId') = :user_id"
+                    ),
+                    {"user_id": user_id},
+                )
+                rows = result.scalars().all()
+
+            merged: dict[str, None] = {}
+            for row in rows:
+                doc = table.model(**json.loads(row))
+                entry = self._dirty.get((table.name, doc.id))
+                if entry is None:
+                    table.docs[doc.id] = doc
+                    merged[doc.id] = None
+                elif entry.op == "upsert":
+                    merged[doc.id] = None
+            for id in table.user_ids.get(user_id, {}):
+                merged.setdefault(id, None)
+
+            table.user_ids[user_id] = merged
+            table.loaded_users[user_id] = None
+            self._evict_users(table)
+
+    def _evict_users(self, table: _MemoryTable[Any]) -> None:
+        """上限を超えたユーザーを、未フラッシュの変更がないものからLRU順に追い出す"""
+        overflow = len(table.loaded_users) - self._max_users
+        if overflow <= 0:
+            return
+
+        for user_id in list(table.loaded_users):
+            if overflow <= 0:
+                break
+            ids = table.user_ids.get(user_id, {})
+            if any((table.name, id) in self._dirty for id in ids):
+                continue
+            for id in ids:
+                table.docs.pop(id, None)
+            table.user_ids.pop(user_id, None)
+            del table.loaded_users[user_id]
+            overflow -= 1
+
+    async def _write_batch(self, batch: _Batch) -> None:
+        """ダーティエントリを単一トランザクションで書き込む"""
+        upserts: dict[TableName, list[dict[str, Any]]] = {}
+        deletes: dict[TableName, list[dict[str, Any]]] = {}
+        for (name, id), entry in batch:
+            if entry.op == "delete" or entry.model is None:
+                deletes.setdefault(name, []).append({"id": id})
+                continue
+            doc_json = json.dumps(
+                entry.model.model_dump(by_alias=True), ensure_ascii=False
+            )
+            upserts.setdefault(name, []).append(
+                {
+                    "id": id,
+                    "doc": doc_json,
+                    "created_at": entry.created_at,
+                    "updated_at": entry.updated_at,
+                }
+            )
+
+        async with self._session_factory() as session:
+            for name, params in upserts.items():
+                await session.execute(
+                    text(
+                        f"INSERT INTO {name} (id, doc, created_at, updated_at) "
+                        "VALUES (:id, :doc, :created_at, :updated_at) "
+                        "ON CONFLICT(id) DO UPDATE SET "
+                        "doc = excluded.doc, updated_at = excluded.updated_at"
+                    ),
+                    params,
+                )
+            for name, params in deletes.items():
+                await session.execute(
+                    text(f"DELETE FROM {name} WHERE id = :id"), params
+                )
+            await session.commit()
+        notify_changes()
+
+    def _restore(self, batch: _Batch) -> None:
+        """フラッシュに失敗したエントリを、より新しい変更を優先してダーティセットへ戻す"""
+        newer = self._dirty
+        self._dirty = OrderedDict(
+            (key, entry) for key, entry in batch if key not in newer
+        )
+        self._dirty.update(newer)
+
+    def _release_unloaded(self, batch: _Batch) -> None:
+        """読み込み済みでないユーザーのフラッシュ済みドキュメントをメモリから解放する"""
+        for (name, id), entry in batch:
+            table = self._table(name)
+            if entry.user_id in table.loaded_users or (name, id) in self._dirty:
+                continue
+            table.forget(id, entry.user_id)
+
+    async def _flush_loop(self) -> None:
+        """フラッシュ間隔ごと、または閾値到達時にフラッシュを実行する"""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("write-behind flush failed; will retry")
+
+
+class WriteBehindFolderRepository:
+    """
+    フォルダのライトビハインドリポジトリ実装
+
+    Attributes:
+        store: ライトビハインドストア
+    """
+
+    def __init__(self, store: WriteBehindStore) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            store: ライトビハインドストア
+        """
+        self.store = store
+
+    async def get(self, id: str) -> FolderRead:
+        """
+        IDでフォルダを取得
+
+        Args:
+            id: フォルダID
+
+        Returns:
+            FolderRead: フォルダ情報
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        doc = await self.store.get(self.store.folders, id)
+        if doc is None:
+            raise RepositoryNotFoundError(f"Folder with id {id} not found")
+        return doc
+
+    async def list(
+        self, user_id: str, *, limit: int = 50, offset: int = 0
+    ) -> list[FolderRead]:
+        """
+        フォルダ一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数上限
+            offset: 取得開始位置
+
+        Returns:
+            list[FolderRead]: フォルダ一覧
+        """
+        docs = await self.store.list(self.store.folders, user_id)
+        return docs[offset : offset + limit]
+
+    async def create(
+        self, dto: FolderCreate, *, user_id: str, email: str
+    ) -> FolderRead:
+        """
+        フォルダを作成
+
+        Args:
+            dto: フォルダ作成データ
+            user_id: ユーザーID
+            email: メールアドレス
+
+        Returns:
+            FolderRead: 作成されたフォルダ情報
+        """
+        now_utc = utc_now()
+        read = FolderRead(
+            id=new_uuid(),
+            name=dto.name,
+            type=dto.type,
+            createdAt=to_api_datetime(now_utc),
+            userId=user_id,
+            email=email,
+        )
+        await self.store.put(self.store.folders, read, now_utc)
+        return read
+
+    async def update(self, id: str, dto: FolderUpdate) -> FolderRead:
+        """
+        フォルダを更新
+
+        Args:
+            id: フォルダID
+            dto: フォルダ更新データ
+
+        Returns:
+            FolderRead: 更新されたフォルダ情報
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        current = await self.get(id)
+        patched = current.model_copy(update=dto.model_dump(exclude_unset=True))
+        await self.store.put(self.store.folders, patched, utc_now())
+        return patched
+
+    async def delete(self, id: str) -> None:
+        """
+        フォルダを削除
+
+        Args:
+            id: フォルダID
+
+        Raises:
+            RepositoryNotFoundError: フォルダが見つからない場合
+        """
+        current = await self.get(id)
+        await self.store.delete(self.store.folders, current)
+
+
+class WriteBehindChatThreadRepository:
+    """
+    チャットスレッドのライトビハインドリポジトリ実装
+
+    Attributes:
+        store: ライトビハインドストア
+    """
+
+    def __init__(self, store: WriteBehindStore) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            store: ライトビハインドストア
+        """
+        self.store = store
+
+    async def get(self, id: str) -> ChatThreadRead:
+        """
+        IDでチャットスレッドを取得
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            ChatThreadRead: チャットスレッド情報
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        doc = await self.store.get(self.store.chat_threads, id)
+        if doc is None:
+            raise RepositoryNotFoundError(f"ChatThread with id {id} not found")
+        return doc
+
+    async def get_shared(self, id: str) -> str:
+        """
+        共有中のチャットスレッドを公開用のJSON文字列で取得
+
+        Args:
+            id: チャットスレッドID
+
+        Returns:
+            str: SharedThreadRead形式のJSON文字列
+
+        Raises:
+            RepositoryNotFoundError: スレッドが見つからないか共有されていない場合
+        """
+        doc = await self.store.get(self.store.chat_threads, id)
+        if doc is None or not doc.is_shared:
+            raise RepositoryNotFoundError(f"Shared ChatThread with id {id} not found")
+        shared = SharedThreadRead.model_validate(doc.model_dump())
+        return shared.model_dump_json(by_alias=True)
+
+    async def list(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        folder_id: str | None = None,
+    ) -> list[ChatThreadRead]:
+        """
+        チャットスレッド一覧を取得
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数上限
+            offset: 取得開始位置
+            folder_id: フォルダIDでフィルタ（任意）
+
+        Returns:
+            list[ChatThreadRead]: チャットスレッド一覧
+        """
+        docs = await self.store.list(self.store.chat_threads, user_id)
+        if folder_id is not None:
+            docs = [doc for doc in docs if doc.folder_id == folder_id]
+        return docs[offset : offset + limit]
+
+    async def create(
+        self, dto: ChatThreadCreate, *, user_id: str, email: str
+    ) -> ChatThreadRead:
+        """
+        チャットスレッドを作成
+
+        Args:
+            dto: チャットスレッド作成データ
+            user_id: ユーザーID
+            email: メールアドレス
+
+        Returns:
+            ChatThreadRead: 作成されたチャットスレッド情報
+        """
+        now_utc = utc_now()
+        read = ChatThreadRead(
+            id=new_uuid(),
+            name=dto.name,
+            prompt=dto.prompt,
+            temperature=dto.temperature,
+            folderId=dto.folder_id,
+            isShared=dto.is_shared,
+            createdAt=to_api_datetime(now_utc),
+            sharedAt=dto.shared_at,
+            userId=user_id,
+            email=email,
+        )
+        await self.store.put(self.store.chat_threads, read, now_utc)
+        return read
+
+    async def update(self, id: str, dto: ChatThreadUpdate) -> ChatThreadRead:
+        """
+        チャットスレッドを更新
+
+        Args:
+            id: チャットスレッドID
+            dto: チャットスレッド更新データ
+
+        Returns:
+            ChatThreadRead: 更新されたチャットスレッド情報
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        current = await self.get(id)
+        patched = current.model_copy(update=dto.model_dump(exclude_unset=True))
+        await self.store.put(self.store.chat_threads, patched, utc_now())
+        invalidate_shared_threads([id])
+        return patched
+
+    async def delete(self, id: str) -> None:
+        """
+        チャットスレッドを削除
+
+        Args:
+            id: チャットスレッドID
+
+        Raises:
+            RepositoryNotFoundError: チャットスレッドが見つからない場合
+        """
+        current = await self.get(id)
+        await self.store.delete(self.store.chat_threads, current)
+        invalidate_shared_threads([id])
+
+    async def move_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへ移動
+
+        Args:
+            folder_id: 移動元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: 移動先のフォルダID
+
+        Returns:
+            Sequence[str]: 移動したチャットスレッドのID
+        """
+        docs = await self.store.list(self.store.chat_threads, user_id)
+        moved = [
+            doc.model_copy(update={"folder_id": target_folder_id})
+            for doc in docs
+            if doc.folder_id == folder_id
+        ]
+        await self.store.put_many(self.store.chat_threads, moved, utc_now())
+        return [doc.id for doc in moved]
+
+    async def copy_to_folder(
+        self, folder_id: str, *, user_id: str, target_folder_id: str
+    ) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で別のフォルダへコピー
+
+        Args:
+            folder_id: コピー元のフォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+            target_folder_id: コピー先のフォルダID
+
+        Returns:
+            Sequence[str]: 作成したチャットスレッドのID
+        """
+        now_utc = utc_now()
+        created_at = to_api_datetime(now_utc)
+        docs = await self.store.list(self.store.chat_threads, user_id)
+        copies = [
+            doc.model_copy(
+                update={
+                    "id": new_uuid(),
+                    "folder_id": target_folder_id,
+                    "created_at": created_at,
+                    "is_shared": False,
+                    "shared_at": None,
+                }
+            )
+            for doc in docs
+            if doc.folder_id == folder_id
+        ]
+        await self.store.put_many(self.store.chat_threads, copies, now_utc)
+        return [doc.id for doc in copies]
+
+    async def delete_in_folder(self, folder_id: str, *, user_id: str) -> Sequence[str]:
+        """
+        フォルダ内のチャットスレッドを一括で削除
+
+        Args:
+            folder_id: フォルダID
+            user_id: ユーザーID（このユーザーのスレッドのみが対象）
+
+        Returns:
+            Sequence[str]: 削除したチャットスレッドのID
+        """
+        docs = await self.store.list(self.store.chat_threads, user_id)
+        deleted = [doc for doc in docs if doc.folder_id == folder_id]
+        await self.store.delete_many(self.store.chat_threads, deleted)
+        ids = [doc.id for doc in deleted]
+        invalidate_shared_threads(ids)
+        return ids
+
+
+_store: WriteBehindStore | None = None
+
+
+def get_write_behind_store() -> WriteBehindStore:
+    """
+    プロセス共有のライトビハインドストアを取得する
+
+    Returns:
+        WriteBehindStore: ライトビハインドストア
+    """
+    global _store
+    if _store is None:
+        _store = WriteBehindStore()
+    return _store
+
+
+async def shutdown_write_behind_store() -> None:
+    """プロセス共有のストアが使用されていれば、残りの変更をフラッシュして停止する"""
+    if _store is not None:
+        await _store.close()
@@ -0,0 +1,68 @@
+"""
+初期表示エンドポイント
+
+このモジュールはWebアプリの初回描画に必要なフォルダとスレッド概要を
+1回のリクエストで返すエンドポイントを提供します。
+"""
+
+from collections.abc import Sequence
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+
+from app.api.auth import AuthenticatedUser, get_current_user
+from app.api.deps import get_bootstrap_repo
+from app.core.timing import TimingRoute
+from app.models.schemas import BootstrapResponse
+from app.repositories.base import BootstrapRepositoryProtocol
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"], route_class=TimingRoute)
+
+
+def _render(
+    folders: Sequence[str], unfiled: Sequence[str], unfiled_count: int
+) -> bytes:
+    """BootstrapResponseの形のJSONを、DBが返した行のまま連結して組み立てる"""
+    return (
+        f'{{"folders":[{",".join(folders)}],'
+        f'"unfiledThreads":[{",".join(unfiled)}],'
+        f'"unfiledCount":{unfiled_count:d}}}'
+    ).encode()
+
+
+# 応答はモデルを介さずに送信するため、スキーマはOpenAPIの記載のみに使用する
+@router.get("", responses={200: {"model": BootstrapResponse}})
+async def bootstrap(
+    thread_limit: int = Query(
+        100,
+        ge=0,
+        le=1000,
+        alias="threadLimit",
+        description="フォルダごとのスレッド概要の件数上限",
+    ),
+    current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
+    repo: BootstrapRepositoryProtocol = Depends(get_bootstrap_repo),  # noqa: B008
+) -> Response:
+    """
+    初期表示データを取得
+
+    認証済みユーザーの全フォルダを、フォルダ内のスレッド概要（id, name,
+    createdAt）とスレッド総数を埋め込んで返します。フォルダごとに
+    スレッド一覧を取得する必要がなく、初回描画は1往復で済みます。
+    応答はDBが組み立てたJSONを行ごとのモデル変換なしで連結して返します
+    （行はすでにメモリ上にあるため、ストリーミングせず1回で送信します）。
+
+    Args:
+        thread_limit: フォルダごとのスレッド概要の件数上限（0〜1000、デフォルト100）
+        current_user: 認証済みユーザー情報
+        repo: 初期表示リポジトリ
+
+    Returns:
+        Response: BootstrapResponse形式のJSON
+    """
+    folders, unfiled, unfiled_count = await repo.sidebar(
+        current_user.user_id, thread_limit=thread_limit
+    )
+    return Response(
+        _render(folders, unfiled, unfiled_count), media_type="application/json"
+    )
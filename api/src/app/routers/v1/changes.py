@@ -0,0 +1,106 @@
+"""
+変更フィードエンドポイント
+
+このモジュールはフォルダ・チャットスレッドの変更をServer-Sent Eventsで
+配信するエンドポイントを提供します。
+"""
+
+from collections.abc import AsyncGenerator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.api.auth import AuthenticatedUser, get_current_user
+from app.core.changes import (
+    Change,
+    ChangeFeedOverflowError,
+    ChangeFeedResyncRequiredError,
+    get_change_feed,
+)
+from app.core.config import settings
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+RETRY_MS = 3000
+
+
+def _format(change: Change) -> str:
+    """変更をSSEのイベントに整形する"""
+    return f"id: {change.seq}\nevent: change\ndata: {change.to_json()}\n\n"
+
+
+async def _event_stream(user_id: str, after: int) -> AsyncGenerator[str, None]:
+    """
+    ユーザーの変更をSSEとして送信する
+
+    購読のキューがあふれた場合はストリームを終了し、クライアントの再接続
+    （Last-Event-ID付き）で未配信分を読み直させます。読み直す変更が削除済みの
+    場合は resync イベントを送信して終了します（再接続は410になります）。
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+    async with get_change_feed().subscribe(user_id, after) as subscription:
+        while True:
+            try:
+                batch = await subscription.next_batch(settings.change_feed_keepalive)
+            except ChangeFeedOverflowError:
+                return
+            except ChangeFeedResyncRequiredError:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            if not batch:
+                yield ": keepalive\n\n"
+                continue
+            yield "".join(_format(change) for change in batch)
+
+
+@router.get("/stream")
+async def stream_changes(
+    after: int | None = Query(
+        None, ge=0, description="この連番より後の変更から配信する"
+    ),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+    current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
+) -> StreamingResponse:
+    """
+    変更をServer-Sent Eventsで配信
+
+    認証済みユーザーのフォルダ・チャットスレッドの作成・更新・削除を
+    `change` イベントとして配信します。イベントIDは変更の連番で、
+    再接続時のLast-Event-IDヘッダー（またはafterパラメータ）で続きから再開できます。
+    どちらも指定しない場合は接続後の変更のみを配信します。
+    再開位置より後の変更が保持期間を過ぎて削除済みの場合は410を返すため、
+    クライアントは /sync で全件を取得し直してください。
+
+    Args:
+        after: この連番より後の変更から配信する（Last-Event-IDが優先）
+        last_event_id: Last-Event-IDヘッダー
+        current_user: 認証済みユーザー情報
+
+    Returns:
+        StreamingResponse: text/event-stream のレスポンス
+
+    Raises:
+        HTTPException: Last-Event-IDが連番でない場合（400）、
+            再開位置より後の変更が削除済みの場合（410）
+    """
+    if last_event_id is not None:
+        if not last_event_id.isdigit():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Last-Event-ID must be a change sequence number.",
+            )
+        after = int(last_event_id)
+    feed = get_change_feed()
+    if after is None:
+        after = await feed.last_seq(current_user.user_id)
+    elif after < await feed.horizon(current_user.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Changes after this sequence were pruned; resync required.",
+        )
+
+    return StreamingResponse(
+        _event_stream(current_user.user_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
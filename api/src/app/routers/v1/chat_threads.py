@@ -4,17 +4,24 @@
 このモジュールはチャットスレッドのCRUD操作を提供します。
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 
 from app.api.auth import AuthenticatedUser, get_current_user
 from app.api.deps import get_chatthread_repo
+from app.core.offload import render_json, should_offload
+from app.core.timing import TimingRoute
 from app.models.schemas import ChatThreadCreate, ChatThreadRead, ChatThreadUpdate
 from app.repositories.base import (
     ChatThreadRepositoryProtocol,
     RepositoryNotFoundError,
 )
 
-router = APIRouter(prefix="/chat-threads", tags=["chatThreads"])
+router = APIRouter(
+    prefix="/chat-threads", tags=["chatThreads"], route_class=TimingRoute
+)
+
+PAGE = TypeAdapter(list[ChatThreadRead])
 
 
 @router.get("", response_model=list[ChatThreadRead])
@@ -26,7 +33,7 @@ async def list_chat_threads(
     ),
     current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
     repo: ChatThreadRepositoryProtocol = Depends(get_chatthread_repo),  # noqa: B008
-) -> list[ChatThreadRead]:
+) -> list[ChatThreadRead] | Response:
     """
     チャットスレッド一覧を取得
 
@@ -41,14 +48,17 @@ async def list_chat_threads(
         repo: チャットスレッドリポジトリ
 
     Returns:
-        list[ChatThreadRead]: チャットスレッド一覧
+        list[ChatThreadRead] | Response: スレッド一覧（大きなページは変換済みJSON）
     """
-    return await repo.list(
+    threads = await repo.list(
         user_id=current_user.user_id,
         limit=limit,
         offset=offset,
         folder_id=folder_id,
     )
+    if should_offload(rows=len(threads)):
+        return await render_json(PAGE, threads)
+    return threads
 
 
 @router.get("/{thread_id}", response_model=ChatThreadRead)
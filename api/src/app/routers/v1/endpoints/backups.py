@@ -0,0 +1,63 @@
+"""
+オンラインバックアップエンドポイント
+
+このモジュールは稼働中のSQLiteのバックアップ作成機能を提供します。
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.auth import require_admin
+from app.core.backup import (
+    BackupError,
+    BackupInProgressError,
+    BackupReport,
+    run_backup,
+)
+from app.core.config import settings
+from app.repositories.write_behind import get_write_behind_store
+
+router = APIRouter(
+    prefix="/backups",
+    tags=["backups"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+
+@router.post("")
+async def create_backup(
+    compress: bool | None = Query(
+        None, description="gzip圧縮するか（省略時はBACKUP_COMPRESS）"
+    ),
+) -> BackupReport:
+    """
+    バックアップを作成
+
+    SQLiteのオンラインバックアップAPIで全DBを BACKUP_DIR へ複製します。
+    書き込みを止めずに開始時点のスナップショットを取得し、
+    バックアップ中のリクエスト・SQLの平均レイテンシを開始直前の
+    BACKUP_BASELINE_WINDOW 秒間と比較して返します（その分だけ開始を待ちます）。
+    シャーディング時のスナップショットはシャードごとに別の時点になります。
+    hybridの場合は未フラッシュの変更をSQLiteへ書き込んでから複製します。
+
+    Args:
+        compress: gzip圧縮するか
+
+    Returns:
+        BackupReport: バックアップ結果と同時リクエストへの影響
+
+    Raises:
+        HTTPException: バックアップが実行中の場合（409）、失敗した場合（500）
+    """
+    if settings.db_backend == "hybrid":
+        await get_write_behind_store().flush()
+    try:
+        return await run_backup(compress)
+    except BackupInProgressError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=str(exc)
+        ) from exc
+    except BackupError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)
+        ) from exc
@@ -2,11 +2,15 @@
 ヘルスチェックエンドポイント
 
 このモジュールはアプリケーションのヘルスチェック機能を提供します。
+
+/health はプロセスが応答できるか（liveness）のみを返し、
+/ready はDBの疎通と負荷の指標からリクエストを受け付けられるか（readiness）を返します。
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 
-from app.models.schemas import HealthResponse
+from app.core.readiness import get_readiness_probe
+from app.models.schemas import HealthResponse, ReadinessResponse
 
 router = APIRouter()
 
@@ -29,3 +33,38 @@ async def health_check() -> HealthResponse:
     return HealthResponse(
         status="healthy", message="アプリケーションは正常に動作しています"
     )
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    tags=["health"],
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "model": ReadinessResponse,
+            "description": (
+                "DBに疎通できないか書き込みロックを取得できない、"
+                "または負荷の指標が上限を超えている"
+            ),
+        }
+    },
+)
+async def readiness_check(response: Response) -> ReadinessResponse:
+    """
+    準備状態の確認
+
+    DBの疎通確認（READY_CHECK_INTERVAL 秒ごとに1回、DBファイルの読み取りと
+    書き込みロックの取得）、コネクションプールの使用率、イベントループ遅延、
+    書き込みの待ち行列を確認し、いずれかが上限を超えた場合は503を返します。
+
+    Args:
+        response: レスポンス（ステータスコードとヘッダーの設定に使用）
+
+    Returns:
+        ReadinessResponse: 判定結果と各指標
+    """
+    readiness = await get_readiness_probe().check()
+    response.headers["Cache-Control"] = "no-store"
+    if readiness.reasons:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness
@@ -0,0 +1,69 @@
+"""
+SQLiteメンテナンスエンドポイント
+
+このモジュールはSQLiteメンテナンスの実行状況の取得と即時実行の機能を提供します。
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.auth import require_admin
+from app.core.maintenance import MaintenanceTaskStatus, get_maintenance_scheduler
+
+router = APIRouter(
+    prefix="/maintenance",
+    tags=["maintenance"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+
+@router.get("")
+async def list_maintenance() -> list[MaintenanceTaskStatus]:
+    """
+    メンテナンスの実行状況を取得
+
+    DB・タスクごとに直近の実行日時、所要時間、回収したページ数、
+    負荷による先送り回数を返します。
+
+    Returns:
+        list[MaintenanceTaskStatus]: DB・タスクごとの実行状況
+    """
+    return get_maintenance_scheduler().status()
+
+
+@router.post("/{task}/run")
+async def run_maintenance(
+    task: Literal[
+        "checkpoint",
+        "optimize",
+        "incremental_vacuum",
+        "prune_changes",
+        "prune_tombstones",
+    ],
+    database: str = Query("main", description="対象DB（main/shardN）"),
+) -> MaintenanceTaskStatus:
+    """
+    メンテナンスを即時実行
+
+    負荷による先送りは行いません（インクリメンタルバキュームと変更ログ・墓標の
+    削除は負荷が高い場合途中で中断します）。
+
+    Args:
+        task: タスク名
+        database: 対象DB
+
+    Returns:
+        MaintenanceTaskStatus: 実行後の状況
+
+    Raises:
+        HTTPException: 対象DBが存在しない場合（404）
+    """
+    scheduler = get_maintenance_scheduler()
+    if database not in scheduler.engines:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Database {database} not found",
+        )
+    return await scheduler.run(database, task)
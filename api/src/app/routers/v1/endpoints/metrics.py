@@ -0,0 +1,27 @@
+"""
+メトリクスエンドポイント
+
+このモジュールはPrometheusテキスト形式のメトリクスを提供します。
+"""
+
+from fastapi import APIRouter, Response
+
+from app.core.metrics import REGISTRY
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics() -> Response:
+    """
+    メトリクス
+
+    ルート別レイテンシ、処理中リクエスト数、SQL実行統計、
+    セッション・コネクション数、キャッシュヒット率を返します。
+
+    Returns:
+        Response: Prometheusテキスト形式（0.0.4）のメトリクス
+    """
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
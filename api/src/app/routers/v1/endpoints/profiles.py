@@ -0,0 +1,55 @@
+"""
+プロファイル結果エンドポイント
+
+このモジュールはリクエスト単位のプロファイル結果のダウンロード機能を提供します。
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.api.auth import require_admin
+from app.core.profiler import profile_path
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["profiles"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+MEDIA_TYPES = {
+    "pstats": "application/octet-stream",
+    "folded": "text/plain; charset=utf-8",
+}
+
+
+@router.get("/{profile_id}/{fmt}")
+async def download_profile(
+    profile_id: str, fmt: Literal["pstats", "folded"]
+) -> FileResponse:
+    """
+    プロファイル結果をダウンロード
+
+    X-Profile ヘッダー付きリクエストのレスポンスで返された X-Profile-Id の
+    結果を取得します。pstats は `python -m pstats` や snakeviz で、
+    folded は flamegraph.pl や speedscope で表示できます。
+
+    Args:
+        profile_id: プロファイルID
+        fmt: 形式（pstats/folded）
+
+    Returns:
+        FileResponse: プロファイル結果ファイル
+
+    Raises:
+        HTTPException: プロファイル結果が見つからない場合（404）
+    """
+    path = profile_path(profile_id, fmt)
+    if path is None or not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found",
+        )
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], filename=path.name)
@@ -4,14 +4,29 @@
 このモジュールはフォルダのCRUD操作を提供します。
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 
 from app.api.auth import AuthenticatedUser, get_current_user
-from app.api.deps import get_folder_repo
-from app.models.schemas import FolderCreate, FolderRead, FolderUpdate
-from app.repositories.base import FolderRepositoryProtocol, RepositoryNotFoundError
-
-router = APIRouter(prefix="/folders", tags=["folders"])
+from app.api.deps import get_chatthread_repo, get_folder_repo
+from app.core.offload import render_json, should_offload
+from app.core.timing import TimingRoute
+from app.models.schemas import (
+    FolderCreate,
+    FolderRead,
+    FolderThreadsResult,
+    FolderThreadsTarget,
+    FolderUpdate,
+)
+from app.repositories.base import (
+    ChatThreadRepositoryProtocol,
+    FolderRepositoryProtocol,
+    RepositoryNotFoundError,
+)
+
+router = APIRouter(prefix="/folders", tags=["folders"], route_class=TimingRoute)
+
+PAGE = TypeAdapter(list[FolderRead])
 
 
 @router.get("", response_model=list[FolderRead])
@@ -20,7 +35,7 @@ async def list_folders(
     offset: int = Query(0, ge=0, description="取得開始位置"),
     current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
     repo: FolderRepositoryProtocol = Depends(get_folder_repo),  # noqa: B008
-) -> list[FolderRead]:
+) -> list[FolderRead] | Response:
     """
     フォルダ一覧を取得
 
@@ -33,9 +48,12 @@ async def list_folders(
         repo: フォルダリポジトリ
 
     Returns:
-        list[FolderRead]: フォルダ一覧
+        list[FolderRead] | Response: フォルダ一覧（大きなページは変換済みJSON）
     """
-    return await repo.list(user_id=current_user.user_id, limit=limit, offset=offset)
+    folders = await repo.list(user_id=current_user.user_id, limit=limit, offset=offset)
+    if should_offload(rows=len(folders)):
+        return await render_json(PAGE, folders)
+    return folders
 
 
 @router.get("/{folder_id}", response_model=FolderRead)
@@ -151,3 +169,120 @@ async def delete_folder(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Folder {folder_id} not found",
         ) from None
+
+
+async def _require_owned_folder(
+    repo: FolderRepositoryProtocol, folder_id: str, user_id: str
+) -> FolderRead:
+    """ユーザーのフォルダを取得する（存在しない・他ユーザーの場合は404）"""
+    try:
+        folder = await repo.get(folder_id)
+    except RepositoryNotFoundError:
+        folder = None
+    if folder is None or folder.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Folder {folder_id} not found",
+        )
+    return folder
+
+
+@router.post("/{folder_id}:moveThreads", response_model=FolderThreadsResult)
+async def move_folder_threads(
+    folder_id: str,
+    dto: FolderThreadsTarget,
+    current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
+    folders: FolderRepositoryProtocol = Depends(get_folder_repo),  # noqa: B008
+    threads: ChatThreadRepositoryProtocol = Depends(get_chatthread_repo),  # noqa: B008
+) -> FolderThreadsResult:
+    """
+    フォルダ内のチャットスレッドを一括で移動
+
+    フォルダIDの索引を使う1文の更新で、全スレッドを移動先フォルダへ移します。
+
+    Args:
+        folder_id: 移動元のフォルダID
+        dto: 移動先フォルダの指定
+        current_user: 認証済みユーザー情報
+        folders: フォルダリポジトリ
+        threads: チャットスレッドリポジトリ
+
+    Returns:
+        FolderThreadsResult: 移動したスレッド数
+
+    Raises:
+        HTTPException: 移動元・移動先のフォルダが見つからない場合（404）
+    """
+    user_id = current_user.user_id
+    await _require_owned_folder(folders, folder_id, user_id)
+    await _require_owned_folder(folders, dto.target_folder_id, user_id)
+    ids = await threads.move_to_folder(
+        folder_id, user_id=user_id, target_folder_id=dto.target_folder_id
+    )
+    return FolderThreadsResult(affected=len(ids))
+
+
+@router.post("/{folder_id}:copyThreads", response_model=FolderThreadsResult)
+async def copy_folder_threads(
+    folder_id: str,
+    dto: FolderThreadsTarget,
+    current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
+    folders: FolderRepositoryProtocol = Depends(get_folder_repo),  # noqa: B008
+    threads: ChatThreadRepositoryProtocol = Depends(get_chatthread_repo),  # noqa: B008
+) -> FolderThreadsResult:
+    """
+    フォルダ内のチャットスレッドを一括でコピー
+
+    INSERT ... SELECTの1文で、全スレッドを新しいIDで移動先フォルダへ複製します。
+    コピーは共有されていない状態で作成されます。
+
+    Args:
+        folder_id: コピー元のフォルダID
+        dto: コピー先フォルダの指定
+        current_user: 認証済みユーザー情報
+        folders: フォルダリポジトリ
+        threads: チャットスレッドリポジトリ
+
+    Returns:
+        FolderThreadsResult: 作成したスレッド数
+
+    Raises:
+        HTTPException: コピー元・コピー先のフォルダが見つからない場合（404）
+    """
+    user_id = current_user.user_id
+    await _require_owned_folder(folders, folder_id, user_id)
+    await _require_owned_folder(folders, dto.target_folder_id, user_id)
+    ids = await threads.copy_to_folder(
+        folder_id, user_id=user_id, target_folder_id=dto.target_folder_id
+    )
+    return FolderThreadsResult(affected=len(ids))
+
+
+@router.post("/{folder_id}:empty", response_model=FolderThreadsResult)
+async def empty_folder(
+    folder_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
+    folders: FolderRepositoryProtocol = Depends(get_folder_repo),  # noqa: B008
+    threads: ChatThreadRepositoryProtocol = Depends(get_chatthread_repo),  # noqa: B008
+) -> FolderThreadsResult:
+    """
+    フォルダ内のチャットスレッドを一括で削除
+
+    フォルダ自体は残し、含まれる全スレッドを1文の削除で取り除きます。
+
+    Args:
+        folder_id: フォルダID
+        current_user: 認証済みユーザー情報
+        folders: フォルダリポジトリ
+        threads: チャットスレッドリポジトリ
+
+    Returns:
+        FolderThreadsResult: 削除したスレッド数
+
+    Raises:
+        HTTPException: フォルダが見つからない場合（404）
+    """
+    user_id = current_user.user_id
+    await _require_owned_folder(folders, folder_id, user_id)
+    ids = await threads.delete_in_folder(folder_id, user_id=user_id)
+    return FolderThreadsResult(affected=len(ids))
@@ -6,15 +6,30 @@ API v1 ルーター
 
 from fastapi import APIRouter
 
-from app.routers.v1 import chat_threads, folders
-from app.routers.v1.endpoints import health, items
+from app.routers.v1 import bootstrap, changes, chat_threads, folders, shared, sync
+from app.routers.v1.endpoints import (
+    backups,
+    health,
+    items,
+    maintenance,
+    metrics,
+    profiles,
+)
 
 router = APIRouter()
 
 router.include_router(health.router)
+router.include_router(metrics.router)
+router.include_router(profiles.router)
+router.include_router(maintenance.router)
+router.include_router(backups.router)
 router.include_router(items.router)
 router.include_router(folders.router)
 router.include_router(chat_threads.router)
+router.include_router(changes.router)
+router.include_router(sync.router)
+router.include_router(bootstrap.router)
+router.include_router(shared.router)
 
 
 def get_v1_router() -> APIRouter:
@@ -0,0 +1,73 @@
+"""
+共有スレッドエンドポイント
+
+このモジュールは共有中のチャットスレッドを認証なしで公開するエンドポイントを
+提供します。応答は共有スレッドキャッシュから返し、Cache-Control/ETagにより
+ブラウザやCDNでの再利用と条件付きリクエストに対応します。
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from app.api.deps import get_chatthread_repo
+from app.core.config import settings
+from app.core.shared_cache import get_shared_thread_cache
+from app.core.timing import TimingRoute
+from app.models.schemas import SharedThreadRead
+from app.repositories.base import ChatThreadRepositoryProtocol, RepositoryNotFoundError
+
+router = APIRouter(prefix="/shared", tags=["shared"], route_class=TimingRoute)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """If-None-MatchがETagに一致するか判定する（弱い比較）"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in tags
+
+
+@router.get("/{thread_id}", response_model=SharedThreadRead)
+async def get_shared_thread(
+    thread_id: str,
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+    repo: ChatThreadRepositoryProtocol = Depends(get_chatthread_repo),  # noqa: B008
+) -> Response:
+    """
+    共有中のチャットスレッドを取得
+
+    認証は不要です。所有者のユーザーID・メールアドレスとフォルダは含みません。
+    If-None-MatchがETagに一致する場合は本文なしの304を返します。
+
+    Args:
+        thread_id: チャットスレッドID
+        if_none_match: If-None-Matchヘッダー
+        repo: チャットスレッドリポジトリ
+
+    Returns:
+        Response: SharedThreadRead形式のJSON
+
+    Raises:
+        HTTPException: スレッドが見つからないか共有されていない場合（404）
+    """
+
+    async def load() -> str | None:
+        try:
+            return await repo.get_shared(thread_id)
+        except RepositoryNotFoundError:
+            return None
+
+    shared = await get_shared_thread_cache().get(thread_id, load)
+    if shared.body is None or shared.etag is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Shared thread {thread_id} not found",
+            headers={"Cache-Control": "no-store"},
+        )
+
+    headers = {
+        "Cache-Control": f"public, max-age={settings.shared_max_age}",
+        "ETag": shared.etag,
+    }
+    if if_none_match and _matches(if_none_match, shared.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(shared.body, media_type="application/json", headers=headers)
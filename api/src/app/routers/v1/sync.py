@@ -0,0 +1,45 @@
+"""
+差分同期エンドポイント
+
+このモジュールはオフライン・モバイルクライアント向けの差分同期を提供します。
+"""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.auth import AuthenticatedUser, get_current_user
+from app.api.deps import get_sync_repo
+from app.core.timing import TimingRoute
+from app.models.schemas import SyncResponse
+from app.repositories.base import SyncRepositoryProtocol
+
+router = APIRouter(prefix="/sync", tags=["sync"], route_class=TimingRoute)
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    since: int = Query(0, ge=0, description="前回の同期で受け取ったバージョン"),
+    limit: int = Query(500, ge=1, le=2000, description="取得件数上限"),
+    current_user: AuthenticatedUser = Depends(get_current_user),  # noqa: B008
+    repo: SyncRepositoryProtocol = Depends(get_sync_repo),  # noqa: B008
+) -> SyncResponse:
+    """
+    差分同期
+
+    認証済みユーザーのフォルダ・チャットスレッドのうち、指定バージョンより後に
+    作成・更新されたものと、削除されたものの墓標を返します。
+    レスポンスの version を次回の since に指定してください。
+    hasMore が true の場合は、続きをすぐに取得できます。
+    resyncRequired が true の場合は、since より後の削除の墓標が保持期間
+    （TOMBSTONE_RETENTION_SECONDS）を過ぎて削除済みのため、ローカルのデータを
+    破棄して since=0 から取得し直してください。
+
+    Args:
+        since: 前回の同期で受け取ったバージョン（0の場合は全件）
+        limit: 取得件数上限（1〜2000、デフォルト500）
+        current_user: 認証済みユーザー情報
+        repo: 差分同期リポジトリ
+
+    Returns:
+        SyncResponse: 変更されたドキュメント、墓標、次回のバージョン
+    """
+    return await repo.changes_since(current_user.user_id, since=since, limit=limit)
@@ -0,0 +1,162 @@
+"""
+テスト共通設定
+
+このモジュールはテスト全体で使用するプラグインとテスト用DBを登録します。
+
+テスト用DBは、セッションの開始時にマイグレーション済みのテンプレートDBを
+一時ディレクトリへ1回だけ作成し、SQLiteのバックアップAPIでワーカーごとに複製して
+DB_URI を差し替えます。pytest-xdist で並列実行する場合（-n auto）はコントローラが
+テンプレートを作成し、各ワーカーは自身の複製を使用します。
+一時ディレクトリはセッションの終了時に削除し、data/app.db には書き込みません。
+
+他のテストのデータが残っていない空のDBが必要なテストは migrated_engine
+（シャードは migrated_shards）フィクスチャでテストごとにテンプレートを複製します。
+isolated_db フィクスチャはさらにリクエストのセッションファクトリを差し替えます。
+"""
+
+import asyncio
+import shutil
+import tempfile
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from alembic import command
+from app.core.backup import backup_database
+from app.core.config import settings
+from app.core.db import create_engine, create_session_factory, get_session_factory
+from app.core.shards import ShardSet
+from app.main import app
+
+pytest_plugins = ["tests.sql_guard"]
+
+API_ROOT = Path(__file__).resolve().parents[1]
+TEMPLATE = pytest.StashKey[Path]()
+TEMP_DIR = pytest.StashKey[Path]()
+
+
+def _uri(path: Path) -> str:
+    """DBファイルの接続URIを取得する"""
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def _clone(template: Path, dest: Path) -> None:
+    """テンプレートDBをバックアップAPIで一括複製する"""
+    backup_database(template, dest, step_pages=-1, step_sleep=0)
+
+
+def _build_template(directory: Path) -> Path:
+    """マイグレーション済みのテンプレートDBを作成する"""
+    template = directory / "template.db"
+    config = Config(str(API_ROOT / "alembic.ini"))
+    config.attributes["db_uris"] = [_uri(template)]
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+    return template
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """テンプレートDBを用意し、このプロセスのDBをその複製に差し替える"""
+    workerinput: dict[str, Any] | None = getattr(config, "workerinput", None)
+    if workerinput is None:
+        directory = Path(tempfile.mkdtemp(prefix="3pull-tests-"))
+        config.stash[TEMP_DIR] = directory
+        template = _build_template(directory)
+        worker = "main"
+    else:
+        template = Path(workerinput["db_template"])
+        worker = workerinput["workerid"]
+    config.stash[TEMPLATE] = template
+
+    # 並列実行のコントローラはテストを実行しないため複製しない
+    if workerinput is None and getattr(config.option, "dist", "no") != "no":
+        return
+    database = template.with_name(f"{worker}.db")
+    _clone(template, database)
+    settings.db_uri = _uri(database)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: Any) -> None:
+    """pytest-xdist のワーカーへテンプレートDBのパスを渡す"""
+    node.workerinput["db_template"] = str(node.config.stash[TEMPLATE])
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """テンプレートDBと各ワーカーのDBを削除する"""
+    directory = config.stash.get(TEMP_DIR, None)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+async def _clone_template(request: pytest.FixtureRequest, path: Path) -> str:
+    """テンプレートDBを複製して接続URIを返す"""
+    await asyncio.to_thread(_clone, request.config.stash[TEMPLATE], path)
+    return _uri(path)
+
+
+@pytest.fixture
+async def migrated_engine(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncGenerator[AsyncEngine, None]:
+    """
+    テンプレートを複製したマイグレーション済みの空のDBのエンジンのフィクスチャ
+
+    リクエストのセッションファクトリは差し替えないため、エンジンを直接使う
+    テストが対象です。テストの終了時にエンジンを破棄します。
+
+    Yields:
+        AsyncEngine: 複製したDBのエンジン
+    """
+    engine = create_engine(await _clone_template(request, tmp_path / "migrated.db"))
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def migrated_shards(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncGenerator[ShardSet, None]:
+    """
+    テンプレートを複製したマイグレーション済みの空のDB3つのシャードセットのフィクスチャ
+
+    Yields:
+        ShardSet: 複製したDBのシャードセット
+    """
+    uris = [
+        await _clone_template(request, tmp_path / f"shard{shard}.db")
+        for shard in range(3)
+    ]
+    shards = ShardSet(uris, pool_size=2)
+    try:
+        yield shards
+    finally:
+        await shards.dispose()
+
+
+@pytest.fixture
+async def isolated_db(
+    migrated_engine: AsyncEngine,
+) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """
+    テンプレートを複製した空のDBをリクエストで使用させるフィクスチャ
+
+    依存性注入の get_session_factory を差し替えるため、リポジトリを経由する
+    APIリクエストのみが対象です（sql_recorder やバックグラウンド処理は
+    ワーカーのDBを参照します）。
+
+    Yields:
+        async_sessionmaker[AsyncSession]: 複製したDBのセッションファクトリ
+    """
+    session_factory = create_session_factory(migrated_engine)
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    try:
+        yield session_factory
+    finally:
+        app.dependency_overrides.pop(get_session_factory, None)
@@ -0,0 +1,125 @@
+"""
+JWTテストユーティリティ
+
+このモジュールはテストとベンチマーク（scripts/bench_auth.py）で使用する
+JWTの署名とRSA鍵ペアの生成を提供します。本番の検証処理（app.core.tokens）は
+署名を行わないため、検証に必要な関数のみを共有します。
+
+Example:
+    ```python
+    jwk = generate_rsa_jwk("test-key", bits=1024)
+    token = encode_token({"sub": "user", "exp": time.time() + 3600}, jwk)
+    ```
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import math
+import secrets
+from typing import Any
+
+from app.core.tokens import (
+    RSAKey,
+    _b64decode,  # pyright: ignore[reportPrivateUsage]
+    _b64int,  # pyright: ignore[reportPrivateUsage]
+    _pkcs1_sha256,  # pyright: ignore[reportPrivateUsage]
+)
+
+
+def _b64encode(data: bytes) -> str:
+    """base64url（パディングなし）にエンコードする"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def encode_token(claims: dict[str, Any], jwk: dict[str, Any]) -> str:
+    """
+    JWTを署名して作成する
+
+    Args:
+        claims: ペイロード
+        jwk: 署名用の鍵（kty=oct、またはdを含むkty=RSA）
+
+    Returns:
+        str: JWT（コンパクト形式）
+
+    Raises:
+        ValueError: 署名に使えない鍵の場合
+    """
+    alg = "RS256" if jwk.get("kty") == "RSA" else "HS256"
+    header = {"alg": alg, "typ": "JWT", "kid": jwk.get("kid", "")}
+    signed = ".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode("utf-8"))
+        for part in (header, claims)
+    ).encode("ascii")
+    if alg == "HS256":
+        signature = hmac.new(_b64decode(jwk["k"]), signed, hashlib.sha256).digest()
+    elif "d" in jwk:
+        key = RSAKey(_b64int(jwk["n"]), _b64int(jwk["e"]))
+        em = int.from_bytes(_pkcs1_sha256(signed, key.size), "big")
+        signature = pow(em, _b64int(jwk["d"]), key.n).to_bytes(key.size, "big")
+    else:
+        raise ValueError("RSA signing requires the private exponent (d)")
+    return f"{signed.decode('ascii')}.{_b64encode(signature)}"
+
+
+def _is_probable_prime(n: int, rounds: int = 40) -> bool:
+    """Miller-Rabin法で素数判定する"""
+    if n < 2:
+        return False
+    for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29):
+        if n % p == 0:
+            return n == p
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d, r = d // 2, r + 1
+    for _ in range(rounds):
+        x = pow(secrets.randbelow(n - 3) + 2, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def generate_rsa_jwk(kid: str, bits: int = 2048) -> dict[str, Any]:
+    """
+    RSA鍵ペアを生成してJWK（秘密鍵を含む）として返す
+
+    公開鍵のみのJWKは n, e, kty, kid を取り出してください。
+
+    Args:
+        kid: 鍵ID
+        bits: モジュラスのビット数
+
+    Returns:
+        dict[str, Any]: 秘密指数dを含むJWK
+    """
+    e = 65537
+
+    def prime() -> int:
+        while True:
+            candidate = secrets.randbits(bits // 2) | (3 << (bits // 2 - 2)) | 1
+            if math.gcd(candidate - 1, e) == 1 and _is_probable_prime(candidate):
+                return candidate
+
+    p, q = prime(), prime()
+    while p == q:
+        q = prime()
+    n = p * q
+    d = pow(e, -1, (p - 1) * (q - 1))
+    size = (n.bit_length() + 7) // 8
+    return {
+        "kty": "RSA",
+        "kid": kid,
+        "alg": "RS256",
+        "use": "sig",
+        "n": _b64encode(n.to_bytes(size, "big")),
+        "e": _b64encode(e.to_bytes(3, "big")),
+        "d": _b64encode(d.to_bytes(size, "big")),
+    }
@@ -0,0 +1,112 @@
+"""
+SQLガードプラグイン
+
+このモジュールはテスト中に発行されたSQLを記録し、リポジトリ操作ごとの
+SQL文数の上限と、主要テーブルの全体走査（SCAN）を検査するフィクスチャを提供します。
+
+Example:
+    ```python
+    async def test_get(sql_recorder: SQLRecorder):
+        with sql_recorder.budget(1):
+            await repo.get(id)
+    ```
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from app.core.db import explain_query_plan, get_engine, is_explainable
+
+GUARDED_TABLES = frozenset({"folders", "chat_threads"})
+
+
+class SQLRecorder:
+    """
+    テスト中に発行されたSQLの記録
+
+    Attributes:
+        statements: 発行されたSQL文（発行順）
+        scans: 全体走査を含むSQL文とそのプラン
+    """
+
+    def __init__(self, guarded_tables: frozenset[str] = GUARDED_TABLES) -> None:
+        """
+        コンストラクタ
+
+        Args:
+            guarded_tables: 全体走査を禁止するテーブル
+        """
+        self.statements: list[str] = []
+        self.scans: list[tuple[str, str]] = []
+        self._guarded_tables = guarded_tables
+
+    def __call__(
+        self,
+        conn: Connection,
+        cursor: Any,  # noqa: ARG002
+        statement: str,
+        parameters: Any,
+        context: Any,  # noqa: ARG002
+        executemany: bool,
+    ) -> None:
+        """before_cursor_executeイベントでSQLを記録する"""
+        self.statements.append(statement)
+        if executemany or not is_explainable(statement):
+            return
+        plan = explain_query_plan(conn, statement, parameters)
+        if plan.scanned_tables() & self._guarded_tables:
+            self.scans.append((" ".join(statement.split()), str(plan)))
+
+    @contextmanager
+    def budget(self, max_statements: int, *, exact: bool = False) -> Iterator[None]:
+        """
+        ブロック内で発行されるSQL文数を検査する
+
+        Args:
+            max_statements: SQL文数の上限
+            exact: 上限ちょうどであることを要求するか
+
+        Yields:
+            None: 検査対象のブロック
+        """
+        start = len(self.statements)
+        yield
+        issued = self.statements[start:]
+        detail = "\n".join(f"  {s}" for s in issued)
+        if exact:
+            assert len(issued) == max_statements, (
+                f"expected {max_statements} statements, got {len(issued)}:\n{detail}"
+            )
+        else:
+            assert len(issued) <= max_statements, (
+                f"expected at most {max_statements} statements, "
+                f"got {len(issued)}:\n{detail}"
+            )
+
+
+@pytest.fixture
+def sql_recorder() -> Iterator[SQLRecorder]:
+    """
+    アプリケーションのエンジンで発行されたSQLを記録するフィクスチャ
+
+    テスト終了時に folders / chat_threads の全体走査があれば失敗させます。
+
+    Yields:
+        SQLRecorder: SQLの記録
+    """
+    recorder = SQLRecorder()
+    engine = get_engine()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        yield recorder
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", recorder)
+
+    if recorder.scans:
+        report = "\n".join(f"  {sql}\n    -> {plan}" for sql, plan in recorder.scans)
+        pytest.fail(f"Full table scan on guarded tables:\n{report}")
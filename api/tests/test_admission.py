@@ -0,0 +1,124 @@
+"""
+アドミッション制御のテスト
+
+このモジュールはレーンの待ち行列・拒否と、過負荷時の503応答、
+DBレイテンシによる同時実行数の調整のテストを提供します。
+"""
+
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core import admission
+from app.core.admission import AdmissionController, Lane
+from app.core.config import settings
+from app.core.metrics import DB_LATENCY
+from app.main import app
+
+AUTH_HEADERS = {"X-User-Id": "admission-user", "X-User-Email": "adm@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_lane_queues_then_rejects():
+    """
+    上限を超えたリクエストが待ち行列に入り、満杯なら即座に拒否されることのテスト
+    """
+    lane = Lane("write", max_limit=1, max_queue=1)
+    assert await lane.acquire(timeout=1.0) is None
+
+    waiting = asyncio.create_task(lane.acquire(timeout=1.0))
+    await asyncio.sleep(0)
+    assert lane.queue_depth == 1
+    assert await lane.acquire(timeout=1.0) == "queue_full"
+
+    lane.release()
+    assert await waiting is None
+    assert lane.in_flight == 1
+    assert await lane.acquire(timeout=0.01) == "timeout"
+    assert lane.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_write_lane_returns_503(monkeypatch: pytest.MonkeyPatch):
+    """
+    書き込みレーンが埋まっている場合に503とRetry-Afterが返り、読み取りは通ることのテスト
+    """
+    controller = AdmissionController(
+        read_limit=4, write_limit=1, read_queue=4, write_queue=0
+    )
+    monkeypatch.setattr(admission, "_controller", controller)
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    monkeypatch.setattr(settings, "admission_retry_after", 3)
+    assert await controller.write.acquire(timeout=1.0) is None
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        write = await client.post(
+            "/api/v1/folders", json={"name": "shed"}, headers=AUTH_HEADERS
+        )
+        read = await client.get("/api/v1/folders", headers=AUTH_HEADERS)
+        health = await client.get("/api/v1/health")
+
+    controller.write.release()
+    assert write.status_code == 503
+    assert write.headers["retry-after"] == "3"
+    assert read.status_code == 200
+    assert health.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_shed_responses_carry_cors_headers(monkeypatch: pytest.MonkeyPatch):
+    """
+    503応答にCORSヘッダーが付き、OPTIONSは上限に達していても拒否されないことのテスト
+    """
+    controller = AdmissionController(
+        read_limit=1, write_limit=1, read_queue=0, write_queue=0
+    )
+    monkeypatch.setattr(admission, "_controller", controller)
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    assert await controller.read.acquire(timeout=1.0) is None
+    assert await controller.write.acquire(timeout=1.0) is None
+    origin = {"Origin": "http://localhost:3000"}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        shed = await client.get("/api/v1/folders", headers=AUTH_HEADERS | origin)
+        preflight = await client.options(
+            "/api/v1/folders",
+            headers=origin | {"Access-Control-Request-Method": "POST"},
+        )
+        options = await client.options("/api/v1/folders", headers=AUTH_HEADERS)
+
+    controller.read.release()
+    controller.write.release()
+    assert shed.status_code == 503
+    assert shed.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert preflight.status_code == 200
+    assert options.status_code != 503
+
+
+def test_limit_adapts_to_db_latency(monkeypatch: pytest.MonkeyPatch):
+    """
+    DBレイテンシが目標を超えると上限が下がり、回復すると1ずつ戻ることのテスト
+    """
+    monkeypatch.setattr(settings, "admission_target_db_latency_ms", 50.0)
+    monkeypatch.setattr(settings, "admission_decrease_factor", 0.5)
+    monkeypatch.setattr(settings, "admission_adjust_interval", 1.0)
+    monkeypatch.setattr(DB_LATENCY, "value", 0.2)
+    lane = Lane("read", max_limit=8, max_queue=8)
+    now = lane._adjusted_at  # pyright: ignore[reportPrivateUsage]
+
+    lane.adjust(now + 1)
+    assert lane.limit == 4
+    lane.adjust(now + 1.5)
+    assert lane.limit == 4
+    lane.adjust(now + 2)
+    assert lane.limit == 2
+
+    monkeypatch.setattr(DB_LATENCY, "value", 0.01)
+    lane._saturated = True  # pyright: ignore[reportPrivateUsage]
+    lane.adjust(now + 3)
+    assert lane.limit == 3
@@ -0,0 +1,183 @@
+"""
+JWT認証のテスト
+
+このモジュールはBearerトークンの検証、検証済みトークンのキャッシュ、
+鍵セットのバックグラウンド再読み込みのテストを提供します。
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from pydantic import ValidationError
+
+from app.core import tokens
+from app.core.config import Settings, settings
+from app.core.tokens import RSAKey, TokenError, TokenVerifier
+from app.main import app
+from tests.jwt_tools import encode_token, generate_rsa_jwk
+
+PRIVATE_JWK = generate_rsa_jwk("test-key", bits=1024)
+HMAC_JWK = {"kty": "oct", "kid": "hmac-key", "k": "c2VjcmV0LXNlY3JldC1zZWNyZXQ"}
+
+
+def _public(jwk: dict[str, Any]) -> dict[str, Any]:
+    """秘密指数を除いた公開鍵のJWKを返す"""
+    return {k: v for k, v in jwk.items() if k != "d"}
+
+
+def _write_jwks(path: Path, *jwks: dict[str, Any]) -> None:
+    """JWKSファイルを書き込む"""
+    path.write_text(json.dumps({"keys": [_public(jwk) for jwk in jwks]}))
+
+
+def _token(jwk: dict[str, Any] = PRIVATE_JWK, **claims: Any) -> str:
+    """有効期限1時間のトークンを作成する"""
+    payload = {"sub": "jwt-user", "email": "jwt@example.com"}
+    payload["exp"] = time.time() + 3600
+    return encode_token(payload | claims, jwk)
+
+
+@pytest.fixture
+async def verifier(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[TokenVerifier, None]:
+    """JWT認証に切り替え、一時ファイルのJWKSを読み込んだ検証器を用意する"""
+    jwks_path = tmp_path / "jwks.json"
+    _write_jwks(jwks_path, PRIVATE_JWK, HMAC_JWK)
+    verifier = TokenVerifier(jwks_path=str(jwks_path), refresh_interval=60)
+    await verifier.start()
+    monkeypatch.setattr(settings, "auth_mode", "jwt")
+    monkeypatch.setattr(tokens, "_verifier", verifier)
+    yield verifier
+    await verifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_bearer_token_authenticates(verifier: TokenVerifier):
+    """
+    RS256・HS256の有効なトークンで認証され、不正なトークンは401となることのテスト
+    """
+    expired = _token(exp=time.time() - 3600)
+    forged = _token()[:-4] + "AAAA"
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        ok = await client.get(
+            "/api/v1/folders", headers={"Authorization": f"Bearer {_token()}"}
+        )
+        hmac_ok = await client.get(
+            "/api/v1/folders",
+            headers={"Authorization": f"Bearer {_token(HMAC_JWK)}"},
+        )
+        headers_only = await client.get(
+            "/api/v1/folders",
+            headers={"X-User-Id": "jwt-user", "X-User-Email": "jwt@example.com"},
+        )
+        rejected = [
+            await client.get(
+                "/api/v1/folders", headers={"Authorization": f"Bearer {token}"}
+            )
+            for token in (expired, forged, "not-a-token")
+        ]
+
+    assert ok.status_code == 200
+    assert hmac_ok.status_code == 200
+    assert headers_only.status_code == 401
+    assert headers_only.headers["WWW-Authenticate"] == "Bearer"
+    assert [r.status_code for r in rejected] == [401, 401, 401]
+
+
+@pytest.mark.asyncio
+async def test_non_ascii_token_is_rejected(verifier: TokenVerifier):
+    """
+    ASCII以外の文字を含むトークンが500ではなく401となることのテスト
+    """
+    token = _token()
+    header, payload, signature = token.split(".")
+    with pytest.raises(TokenError, match="Malformed token"):
+        verifier.verify(f"{header}.{payload}é.{signature}")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/api/v1/folders",
+            headers={"Authorization": f"Bearer {token}é".encode("latin-1")},
+        )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_cached(
+    verifier: TokenVerifier, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    同じトークンの署名検証は1回のみで、鍵の削除でキャッシュが破棄されることのテスト
+    """
+    calls: list[bytes] = []
+    original = RSAKey.verify
+
+    def counting_verify(self: RSAKey, message: bytes, signature: bytes) -> bool:
+        calls.append(message)
+        return original(self, message, signature)
+
+    monkeypatch.setattr(RSAKey, "verify", counting_verify)
+    token = _token()
+    for _ in range(3):
+        assert verifier.verify(token).subject == "jwt-user"
+    assert len(calls) == 1
+
+    _write_jwks(tmp_path / "jwks.json", HMAC_JWK)
+    await verifier.refresh()
+    with pytest.raises(TokenError):
+        verifier.verify(token)
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_triggers_background_refresh(
+    verifier: TokenVerifier, tmp_path: Path
+):
+    """
+    未知のkidのトークンは待たずに拒否され、再読み込み後に受け入れられることのテスト
+    """
+    rotated = generate_rsa_jwk("rotated-key", bits=1024)
+    _write_jwks(tmp_path / "jwks.json", PRIVATE_JWK, rotated)
+    token = _token(rotated)
+
+    with pytest.raises(TokenError):
+        verifier.verify(token)
+    for _ in range(100):
+        if "rotated-key" in verifier.key_ids:
+            break
+        await asyncio.sleep(0.01)
+    assert verifier.verify(token).subject == "jwt-user"
+
+
+@pytest.mark.asyncio
+async def test_missing_key_set_returns_503(monkeypatch: pytest.MonkeyPatch):
+    """
+    鍵セットが読み込めていない場合は503となることのテスト
+    """
+    monkeypatch.setattr(settings, "auth_mode", "jwt")
+    monkeypatch.setattr(tokens, "_verifier", TokenVerifier(jwks_path="missing.json"))
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/api/v1/folders", headers={"Authorization": f"Bearer {_token()}"}
+        )
+    assert response.status_code == 503
+
+
+def test_unknown_auth_mode_is_rejected():
+    """
+    認証方式の綴りを誤った設定がヘッダー認証に戻らず起動時に拒否されることのテスト
+    """
+    with pytest.raises(ValidationError):
+        Settings(auth_mode="JWT")  # pyright: ignore[reportArgumentType]
@@ -0,0 +1,124 @@
+"""
+オンラインバックアップのテスト
+
+このモジュールは書き込み中のバックアップ、圧縮バックアップからの復元、
+管理エンドポイントのテストを提供します。
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.backup import BackupError, backup_database, restore_database
+from app.core.config import settings
+from app.main import app
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+def _create(path: Path, rows: int) -> None:
+    """WALモードのDBを作成する"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE blobs (id INTEGER PRIMARY KEY, b)")
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO blobs (b) VALUES (randomblob(2000))", [()] * rows)
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def test_backup_finishes_with_snapshot_during_writes(tmp_path: Path):
+    """
+    書き込みが続く間も、開始時点のスナップショットで小さなステップの
+    バックアップが完了することのテスト
+    """
+    source = tmp_path / "source.db"
+    _create(source, 500)
+    stop = threading.Event()
+
+    def _write() -> None:
+        conn = sqlite3.connect(source, isolation_level=None)
+        while not stop.is_set():
+            conn.execute("INSERT INTO blobs (b) VALUES (randomblob(100))")
+        conn.close()
+
+    writer = threading.Thread(target=_write)
+    writer.start()
+    try:
+        result = backup_database(
+            source, tmp_path / "copy.db", step_pages=16, step_sleep=0.001
+        )
+    finally:
+        stop.set()
+        writer.join()
+
+    assert result.steps > 1
+    copy = sqlite3.connect(result.path)
+    (count,) = copy.execute("SELECT COUNT(*) FROM blobs").fetchone()
+    (mode,) = copy.execute("PRAGMA journal_mode").fetchone()
+    copy.close()
+    assert count >= 500
+    assert mode == "delete"
+    assert not list(tmp_path.glob("*.partial"))
+
+
+def test_compressed_backup_restores(tmp_path: Path):
+    """
+    圧縮バックアップから元の内容を復元できることのテスト
+    """
+    source = tmp_path / "source.db"
+    _create(source, 200)
+    result = backup_database(source, tmp_path / "copy.db", compress=True)
+    assert result.path.endswith(".db.gz")
+    assert result.size_bytes < source.stat().st_size
+
+    target = tmp_path / "target.db"
+    _create(target, 1)
+    pages = restore_database(Path(result.path), target)
+
+    conn = sqlite3.connect(target)
+    (count,) = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()
+    conn.close()
+    assert pages == result.pages
+    assert count == 200
+    with pytest.raises(BackupError):
+        restore_database(tmp_path / "missing.db.gz", target)
+
+
+@pytest.mark.asyncio
+async def test_backup_endpoint_reports_latency(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    管理者トークン付きでバックアップが作成され、レイテンシの影響が報告されることのテスト
+    """
+    monkeypatch.setattr(settings, "debug", False)
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "backup_baseline_window", 0.05)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        denied = await client.post("/api/v1/backups")
+        response = await client.post(
+            "/api/v1/backups",
+            params={"compress": True},
+            headers={"X-Admin-Token": ADMIN_TOKEN},
+        )
+
+    assert denied.status_code == 403
+    assert response.status_code == 200
+    body = response.json()
+    [backup] = body["backups"]
+    assert backup["database"] == "main"
+    assert backup["compressed"] is True
+    assert Path(backup["path"]).parent == tmp_path
+    assert Path(backup["path"]).is_file()
+    assert {"requests", "mean_request_ms", "baseline_request_ms"} <= set(
+        body["latency"]
+    )
+    # 計測期間より前に完了したリクエストは比較対象に含めない
+    assert body["latency"]["baseline_request_ms"] is None
@@ -0,0 +1,133 @@
+"""
+バッチマイグレーションのテスト
+
+このモジュールはキーセット順のバッチ適用と中断からの再開、
+適用中の並行書き込み、定義の読み込みのテストを提供します。
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.batch_migration import (
+    BatchMigration,
+    BatchMigrationError,
+    BatchMigrationRunner,
+    load_migrations,
+)
+from app.core.db import create_session_factory
+from app.models.schemas import ChatThreadCreate
+from app.repositories.sqlite import SQLiteChatThreadRepository
+
+ADD_PINNED = BatchMigration(
+    "20251110_add_pinned",
+    "chat_threads",
+    set_sql="doc = json_set(doc, '$.pinned', json('false'))",
+    where_sql="json_type(doc, '$.pinned') IS NULL",
+)
+
+
+async def _create_threads(engine: AsyncEngine, count: int) -> None:
+    """チャットスレッドを作成する"""
+    async with create_session_factory(engine)() as session:
+        repo = SQLiteChatThreadRepository(session)
+        for i in range(count):
+            await repo.create(
+                ChatThreadCreate(
+                    name=f"T{i}", prompt="p", temperature=0.5, folderId="folder"
+                ),
+                user_id="batch-user",
+                email="batch@example.com",
+            )
+
+
+async def _scalar(engine: AsyncEngine, sql: str) -> int:
+    """1値を返すSQLを実行する"""
+    async with engine.connect() as conn:
+        return (await conn.execute(text(sql))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_run_resumes_from_checkpoint(migrated_engine: AsyncEngine):
+    """
+    バッチ数の上限で中断した適用が続きから再開し、完了後は再実行しても変わらないことのテスト
+    """
+    await _create_threads(migrated_engine, 25)
+    changes_before = await _scalar(migrated_engine, "SELECT COUNT(*) FROM changes")
+    runner = BatchMigrationRunner(migrated_engine, batch_size=10, pause=0)
+    assert await runner.status(ADD_PINNED) is None
+
+    paused = await runner.run(ADD_PINNED, max_batches=1)
+    assert paused.completed_at is None
+    assert (paused.batches, paused.rows_changed) == (1, 10)
+    assert await runner.pending(ADD_PINNED) == 15
+    assert paused.last_key == await _scalar(
+        migrated_engine,
+        "SELECT MAX(id) FROM (SELECT id FROM chat_threads ORDER BY id LIMIT 10)",
+    )
+
+    seen: list[int] = []
+    done = await runner.run(ADD_PINNED, on_batch=lambda p: seen.append(p.batches))
+    assert done.completed_at is not None
+    assert (done.rows_scanned, done.rows_changed) == (25, 25)
+    assert seen == [2, 3, 3]
+    assert await runner.pending(ADD_PINNED) == 0
+
+    # 書き換えは更新トリガーで変更ログに記録される
+    changes = await _scalar(migrated_engine, "SELECT COUNT(*) FROM changes")
+    assert changes == changes_before + 25
+    async with migrated_engine.connect() as conn:
+        docs = (await conn.execute(text("SELECT doc FROM chat_threads"))).scalars()
+        assert all(json.loads(doc)["pinned"] is False for doc in docs)
+
+    again = await runner.run(ADD_PINNED)
+    assert again.batches == done.batches
+
+    # where_sql により、進捗を消して再実行しても適用済みの行は書き換えない
+    await runner.reset(ADD_PINNED)
+    rerun = await runner.run(ADD_PINNED)
+    assert (rerun.rows_scanned, rerun.rows_changed) == (25, 0)
+
+
+@pytest.mark.asyncio
+async def test_writes_proceed_during_run(migrated_engine: AsyncEngine):
+    """
+    適用中もAPIの書き込みがロック待ちで失敗せず進み、再実行で残りが適用されることのテスト
+    """
+    await _create_threads(migrated_engine, 200)
+    runner = BatchMigrationRunner(migrated_engine, batch_size=20, pause=0.001)
+
+    progress, _ = await asyncio.gather(
+        runner.run(ADD_PINNED), _create_threads(migrated_engine, 50)
+    )
+    assert progress.completed_at is not None
+    assert await _scalar(migrated_engine, "SELECT COUNT(*) FROM chat_threads") == 250
+
+    # カーソルより前に作成された行は適用漏れになるため、再実行で埋める
+    await runner.reset(ADD_PINNED)
+    await runner.run(ADD_PINNED)
+    assert await runner.pending(ADD_PINNED) == 0
+
+
+def test_load_migrations_in_file_order(tmp_path: Path):
+    """
+    定義がファイル名順に読み込まれ、不正な定義・重複が拒否されることのテスト
+    """
+    for stem, name in (("20251201_b", "b"), ("20251101_a", "a")):
+        (tmp_path / f"{stem}.py").write_text(
+            "from app.core.batch_migration import BatchMigration\n"
+            f"migration = BatchMigration({name!r}, 'folders', set_sql='doc = doc')\n"
+        )
+    (tmp_path / "__init__.py").write_text('"""定義"""\n')
+    assert [m.name for m in load_migrations(tmp_path)] == ["a", "b"]
+
+    (tmp_path / "20251202_dup.py").write_text((tmp_path / "20251201_b.py").read_text())
+    with pytest.raises(BatchMigrationError, match="Duplicate"):
+        load_migrations(tmp_path)
+
+    with pytest.raises(BatchMigrationError, match="Unsupported table"):
+        BatchMigration("x", "changes", set_sql="op = op")  # type: ignore[arg-type]
@@ -0,0 +1,91 @@
+"""
+初期表示エンドポイントのテスト
+
+このモジュールはフォルダとスレッド概要を1回で返すエンドポイントのテストを提供します。
+"""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.ids import new_uuid
+from app.main import app
+from app.models.schemas import BootstrapResponse
+from tests.sql_guard import SQLRecorder
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_embeds_thread_summaries(sql_recorder: SQLRecorder):
+    """
+    全フォルダがスレッド概要と件数を埋め込んで返され、
+    フォルダ数に関係なく2文で取得されることのテスト
+    """
+    headers = {"X-User-Id": f"bootstrap-{new_uuid()}", "X-User-Email": "b@example.com"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        folder_ids: list[str] = []
+        for i in range(3):
+            response = await client.post(
+                "/api/v1/folders",
+                json={"name": f"Folder {i}", "type": "chat"},
+                headers=headers,
+            )
+            folder_ids.append(response.json()["id"])
+        for i, folder_id in enumerate([*folder_ids[:2], folder_ids[0], "gone"]):
+            await client.post(
+                "/api/v1/chat-threads",
+                json={
+                    "name": f"Thread {i}",
+                    "prompt": "p" * 1000,
+                    "temperature": 0.5,
+                    "folderId": folder_id,
+                },
+                headers=headers,
+            )
+
+        with sql_recorder.budget(2, exact=True):
+            response = await client.get("/api/v1/bootstrap", headers=headers)
+        limited = await client.get(
+            "/api/v1/bootstrap", params={"threadLimit": 1}, headers=headers
+        )
+        counts_only = await client.get(
+            "/api/v1/bootstrap", params={"threadLimit": 0}, headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert int(response.headers["content-length"]) == len(response.content)
+    body = BootstrapResponse.model_validate_json(response.content)
+    folders = {folder.id: folder for folder in body.folders}
+    assert list(folders) == folder_ids
+    assert [t.name for t in folders[folder_ids[0]].threads] == ["Thread 0", "Thread 2"]
+    assert [f.thread_count for f in body.folders] == [2, 1, 0]
+    assert folders[folder_ids[2]].threads == []
+    assert [t.name for t in body.unfiled_threads] == ["Thread 3"]
+    assert body.unfiled_count == 1
+    assert "prompt" not in response.text
+
+    first = BootstrapResponse.model_validate_json(limited.content).folders[0]
+    assert len(first.threads) == 1
+    assert first.thread_count == 2
+
+    # 概要を含めない場合も件数は返す
+    counts = BootstrapResponse.model_validate_json(counts_only.content)
+    assert [f.thread_count for f in counts.folders] == [2, 1, 0]
+    assert all(f.threads == [] for f in counts.folders)
+    assert counts.unfiled_threads == []
+    assert counts.unfiled_count == 1
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_for_new_user_is_empty():
+    """
+    フォルダもスレッドもないユーザーでは空の応答が返ることのテスト
+    """
+    headers = {"X-User-Id": f"bootstrap-{new_uuid()}", "X-User-Email": "b@example.com"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/api/v1/bootstrap", headers=headers)
+
+    assert response.json() == {"folders": [], "unfiledThreads": [], "unfiledCount": 0}
@@ -0,0 +1,238 @@
+"""
+変更フィードのテスト
+
+このモジュールは変更ログの記録と、購読者への読み直し・テール配信、
+保持期間を過ぎた変更ログの削除のテストを提供します。
+"""
+
+import asyncio
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import changes, maintenance
+from app.core.changes import (
+    Change,
+    ChangeFeed,
+    ChangeFeedOverflowError,
+    ChangeFeedResyncRequiredError,
+    retention_horizon,
+)
+from app.core.config import settings
+from app.core.db import create_session_factory, get_session_factory
+from app.core.maintenance import MaintenanceScheduler
+from app.main import app
+from app.models.schemas import ChatThreadCreate, FolderCreate, FolderUpdate
+from app.repositories.sqlite import SQLiteChatThreadRepository, SQLiteFolderRepository
+
+TEST_USER_ID = "changes-user"
+TEST_USER_EMAIL = "changes@example.com"
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_logged_in_order():
+    """
+    作成・更新・削除が連番付きで変更ログに記録されることのテスト
+    """
+    async with get_session_factory()() as session:
+        repo = SQLiteFolderRepository(session)
+        folder = await repo.create(
+            FolderCreate(name="Logged", type="chat"),
+            user_id=TEST_USER_ID,
+            email=TEST_USER_EMAIL,
+        )
+        await repo.update(folder.id, FolderUpdate(name="Renamed"))
+        await repo.delete(folder.id)
+
+        result = await session.execute(
+            text(
+                "SELECT seq, entity, op FROM changes WHERE entity_id = :id ORDER BY seq"
+            ),
+            {"id": folder.id},
+        )
+        rows = result.all()
+
+    assert [(entity, op) for _, entity, op in rows] == [
+        ("folders", "upsert"),
+        ("folders", "upsert"),
+        ("folders", "delete"),
+    ]
+    seqs = [seq for seq, _, _ in rows]
+    assert seqs == sorted(seqs)
+
+
+@pytest.mark.asyncio
+async def test_subscription_backfills_then_follows_tail():
+    """
+    購読開始時に未配信の変更を読み直し、その後の変更をテールから受け取ることのテスト
+    """
+    feed = ChangeFeed([get_session_factory()], poll_interval=0.02)
+    user_id = f"{TEST_USER_ID}-feed"
+    async with get_session_factory()() as session:
+        folder = await SQLiteFolderRepository(session).create(
+            FolderCreate(name="Before", type="chat"),
+            user_id=user_id,
+            email=TEST_USER_EMAIL,
+        )
+
+    try:
+        async with feed.subscribe(user_id) as subscription:
+            backfill = await subscription.next_batch(1.0)
+            assert [c.entity_id for c in backfill][-1] == folder.id
+
+            async with get_session_factory()() as session:
+                thread = await SQLiteChatThreadRepository(session).create(
+                    ChatThreadCreate(
+                        name="Live", prompt="p", temperature=0.5, folderId=folder.id
+                    ),
+                    user_id=user_id,
+                    email=TEST_USER_EMAIL,
+                )
+                await SQLiteChatThreadRepository(session).create(
+                    ChatThreadCreate(
+                        name="Other user",
+                        prompt="p",
+                        temperature=0.5,
+                        folderId=folder.id,
+                    ),
+                    user_id=f"{user_id}-other",
+                    email=TEST_USER_EMAIL,
+                )
+
+            live = await subscription.next_batch(1.0)
+            assert [c.entity_id for c in live] == [thread.id]
+            event = json.loads(live[0].to_json())
+            assert event["entity"] == "chat_threads"
+            assert event["doc"]["name"] == "Live"
+            assert await subscription.next_batch(0.05) == []
+    finally:
+        await feed.stop()
+
+
+@pytest.mark.asyncio
+async def test_tail_retries_failed_start(monkeypatch: pytest.MonkeyPatch):
+    """
+    テールの開始位置の読み取りが失敗しても再試行し、購読を開始できることのテスト
+    """
+    feed = ChangeFeed([get_session_factory()], poll_interval=0.01)
+    original = feed._last_seq  # pyright: ignore[reportPrivateUsage]
+    attempts: list[int] = []
+
+    async def flaky_last_seq(source: int) -> int:
+        attempts.append(source)
+        if len(attempts) == 1:
+            raise OSError("database is unavailable")
+        return await original(source)
+
+    monkeypatch.setattr(feed, "_last_seq", flaky_last_seq)
+    try:
+        async with asyncio.timeout(1.0):
+            async with feed.subscribe(f"{TEST_USER_ID}-retry", after=2**62):
+                pass
+    finally:
+        await feed.stop()
+    assert len(attempts) >= 2
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_overflows():
+    """
+    キューがあふれた購読者が取りこぼしを通知されることのテスト
+    """
+    feed = ChangeFeed([get_session_factory()], queue_size=1)
+    try:
+        async with feed.subscribe(f"{TEST_USER_ID}-slow", after=2**62) as subscription:
+            assert subscription.offer(Change(1, "u", "folders", "a", "upsert", None))
+            assert not subscription.offer(
+                Change(2, "u", "folders", "b", "upsert", None)
+            )
+            with pytest.raises(ChangeFeedOverflowError):
+                await subscription.next_batch(0.01)
+    finally:
+        await feed.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_invalid_last_event_id():
+    """
+    連番でないLast-Event-IDが400になることのテスト
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/api/v1/changes/stream",
+            headers={
+                "X-User-Id": TEST_USER_ID,
+                "X-User-Email": TEST_USER_EMAIL,
+                "Last-Event-ID": "not-a-seq",
+            },
+        )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_pruned_history_requires_resync(
+    migrated_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    保持期間を過ぎた変更ログがバッチで削除され、保持境界より前からの再開は
+    再同期を求められることのテスト
+    """
+    monkeypatch.setattr(maintenance, "is_busy", lambda: False)
+    monkeypatch.setattr(settings, "maintenance_prune_batch_rows", 2)
+    monkeypatch.setattr(settings, "change_retention_seconds", 7 * 86400)
+    session_factory = create_session_factory(migrated_engine)
+    feed = ChangeFeed([session_factory])
+    try:
+        async with session_factory() as session:
+            repo = SQLiteFolderRepository(session)
+            for i in range(5):
+                await repo.create(
+                    FolderCreate(name=f"F{i}", type="chat"),
+                    user_id=TEST_USER_ID,
+                    email=TEST_USER_EMAIL,
+                )
+        async with migrated_engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "UPDATE changes SET changed_at = datetime('now', '-8 days') "
+                    "WHERE seq <= 3"
+                )
+            )
+
+        status = await MaintenanceScheduler({"main": migrated_engine}).run(
+            "main", "prune_changes"
+        )
+        assert (status.last_pages, status.last_error) == (3, None)
+        async with migrated_engine.connect() as conn:
+            result = await conn.execute(text("SELECT seq FROM changes ORDER BY seq"))
+            assert result.scalars().all() == [4, 5]
+            assert await retention_horizon(conn, "changes") == 3
+        assert await feed.last_seq(TEST_USER_ID) == 5
+
+        async with feed.subscribe(TEST_USER_ID, after=2) as subscription:
+            with pytest.raises(ChangeFeedResyncRequiredError):
+                await subscription.next_batch(0.01)
+        async with feed.subscribe(TEST_USER_ID, after=3) as subscription:
+            assert [c.seq for c in await subscription.next_batch(0.01)] == [4, 5]
+
+        monkeypatch.setattr(changes, "_feed", feed)
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/changes/stream",
+                headers={
+                    "X-User-Id": TEST_USER_ID,
+                    "X-User-Email": TEST_USER_EMAIL,
+                    "Last-Event-ID": "2",
+                },
+            )
+        assert response.status_code == 410
+    finally:
+        await feed.stop()
@@ -0,0 +1,102 @@
+"""
+読み取り合流リポジトリのテスト
+
+このモジュールは同時の同一読み取りが1回の問い合わせにまとまることと、
+書き込みで実行中のキーが破棄されることのテストを提供します。
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_session_factory
+from app.models.schemas import FolderCreate, FolderRead
+from app.repositories.coalescing import CoalescingFolderRepository
+from app.repositories.sqlite import SQLiteFolderRepository
+from tests.sql_guard import SQLRecorder
+
+TEST_USER_ID = "coalescing-user"
+TEST_USER_EMAIL = "coalescing@example.com"
+
+
+class GatedFolderRepository(SQLiteFolderRepository):
+    """一覧取得を呼び出し回数を数えつつゲートで止めるリポジトリ"""
+
+    def __init__(
+        self, session: AsyncSession, gate: asyncio.Event, calls: list[str]
+    ) -> None:
+        super().__init__(session)
+        self.gate = gate
+        self.calls = calls
+
+    async def list(
+        self, user_id: str, *, limit: int = 50, offset: int = 0
+    ) -> list[FolderRead]:
+        self.calls.append(user_id)
+        await self.gate.wait()
+        return await super().list(user_id, limit=limit, offset=offset)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lists_share_one_query(sql_recorder: SQLRecorder):
+    """
+    同時の同一一覧取得が1回のSQLで処理され、結果が共有されることのテスト
+    """
+    async with get_session_factory()() as session:
+        await SQLiteFolderRepository(session).create(
+            FolderCreate(name="Shared", type="chat"),
+            user_id=TEST_USER_ID,
+            email=TEST_USER_EMAIL,
+        )
+
+    async with AsyncExitStack() as stack:
+        repos = [
+            CoalescingFolderRepository(
+                SQLiteFolderRepository(
+                    await stack.enter_async_context(get_session_factory()())
+                )
+            )
+            for _ in range(5)
+        ]
+        with sql_recorder.budget(1, exact=True):
+            results = await asyncio.gather(*(repo.list(TEST_USER_ID) for repo in repos))
+
+    assert all(r is results[0] for r in results)
+    assert "Shared" in [f.name for f in results[0]]
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates_pending_list():
+    """
+    書き込み後に開始した一覧取得が書き込み前の問い合わせに合流しないことのテスト
+    """
+    gate = asyncio.Event()
+    calls: list[str] = []
+    async with AsyncExitStack() as stack:
+
+        async def gated() -> CoalescingFolderRepository:
+            session = await stack.enter_async_context(get_session_factory()())
+            return CoalescingFolderRepository(
+                GatedFolderRepository(session, gate, calls)
+            )
+
+        before = asyncio.create_task((await gated()).list(TEST_USER_ID))
+        joined = asyncio.create_task((await gated()).list(TEST_USER_ID))
+        await asyncio.sleep(0)
+        assert len(calls) == 1
+
+        created = await (await gated()).create(
+            FolderCreate(name="After write", type="chat"),
+            user_id=TEST_USER_ID,
+            email=TEST_USER_EMAIL,
+        )
+
+        after = asyncio.create_task((await gated()).list(TEST_USER_ID))
+        await asyncio.sleep(0)
+        assert len(calls) == 2
+
+        gate.set()
+        await asyncio.gather(before, joined)
+        assert created.id in [f.id for f in await after]
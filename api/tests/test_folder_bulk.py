@@ -0,0 +1,218 @@
+"""
+フォルダ一括操作のテスト
+
+このモジュールはフォルダ内スレッドの一括移動・コピー・削除エンドポイントと
+ライトビハインド実装のテストを提供します。
+"""
+
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import TextClause, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.ids import new_uuid
+from app.main import app
+from app.models.schemas import ChatThreadCreate, FolderCreate
+from app.repositories import sqlite
+from app.repositories.sqlite import SQLiteChatThreadRepository
+from app.repositories.write_behind import (
+    WriteBehindChatThreadRepository,
+    WriteBehindFolderRepository,
+    WriteBehindStore,
+)
+
+
+def _headers() -> dict[str, str]:
+    """実行ごとに別ユーザーの認証ヘッダーを作成する"""
+    return {"X-User-Id": f"bulk-{new_uuid()}", "X-User-Email": "bulk@example.com"}
+
+
+async def _folder(client: AsyncClient, headers: dict[str, str], name: str) -> str:
+    """フォルダを作成してIDを返す"""
+    response = await client.post(
+        "/api/v1/folders", json={"name": name, "type": "chat"}, headers=headers
+    )
+    return response.json()["id"]
+
+
+async def _thread_ids(
+    client: AsyncClient, headers: dict[str, str], folder_id: str
+) -> list[str]:
+    """フォルダ内のスレッドIDを取得する"""
+    response = await client.get(
+        "/api/v1/chat-threads", params={"folderId": folder_id}, headers=headers
+    )
+    return [thread["id"] for thread in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_move_copy_and_empty_folder():
+    """
+    フォルダ内のスレッドを一括で移動・コピー・削除し、件数が返ることのテスト
+    """
+    headers = _headers()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        source = await _folder(client, headers, "Source")
+        target = await _folder(client, headers, "Target")
+        for i in range(3):
+            await client.post(
+                "/api/v1/chat-threads",
+                json={
+                    "name": f"Thread {i}",
+                    "prompt": "p",
+                    "temperature": 0.5,
+                    "folderId": source,
+                    "isShared": True,
+                },
+                headers=headers,
+            )
+        original = await _thread_ids(client, headers, source)
+
+        moved = await client.post(
+            f"/api/v1/folders/{source}:moveThreads",
+            json={"targetFolderId": target},
+            headers=headers,
+        )
+        assert moved.status_code == 200
+        assert moved.json() == {"affected": 3}
+        assert await _thread_ids(client, headers, source) == []
+        assert sorted(await _thread_ids(client, headers, target)) == sorted(original)
+
+        copied = await client.post(
+            f"/api/v1/folders/{target}:copyThreads",
+            json={"targetFolderId": source},
+            headers=headers,
+        )
+        assert copied.json() == {"affected": 3}
+        copies = await client.get(
+            "/api/v1/chat-threads", params={"folderId": source}, headers=headers
+        )
+        assert len(copies.json()) == 3
+        assert not {t["id"] for t in copies.json()} & set(original)
+        assert all(t["isShared"] is False for t in copies.json())
+
+        emptied = await client.post(f"/api/v1/folders/{target}:empty", headers=headers)
+        assert emptied.json() == {"affected": 3}
+        assert await _thread_ids(client, headers, target) == []
+        assert len(await _thread_ids(client, headers, source)) == 3
+        assert (await client.get(f"/api/v1/folders/{target}")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_copy_returns_only_inserted_threads(
+    isolated_db: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+):
+    """
+    IDの取得後に移動されたスレッドは複製せず、作成したスレッドのIDだけを
+    返すことのテスト
+    """
+    user_id = f"bulk-{new_uuid()}"
+    async with isolated_db() as session:
+        threads = SQLiteChatThreadRepository(session)
+        created = [
+            await threads.create(
+                ChatThreadCreate(
+                    name=f"T{i}", prompt="p", temperature=0.1, folderId="source"
+                ),
+                user_id=user_id,
+                email="b@x",
+            )
+            for i in range(3)
+        ]
+        original = sqlite._execute  # pyright: ignore[reportPrivateUsage]
+
+        async def racing_execute(
+            session: AsyncSession, statement: TextClause, params: dict[str, Any]
+        ) -> Any:
+            # 複製の直前に別のリクエストが1件を移動した状況を再現する
+            if statement.text.startswith("INSERT"):
+                await session.execute(
+                    text(
+                        "UPDATE chat_threads SET doc = "
+                        "json_set(doc, '$.folderId', 'elsewhere') WHERE id = :id"
+                    ),
+                    {"id": created[0].id},
+                )
+            return await original(session, statement, params)
+
+        monkeypatch.setattr(sqlite, "_execute", racing_execute)
+        copied = await threads.copy_to_folder(
+            "source", user_id=user_id, target_folder_id="target"
+        )
+        monkeypatch.undo()
+
+        assert len(copied) == 2
+        copies = [t for t in await threads.list(user_id) if t.folder_id == "target"]
+        assert sorted(t.id for t in copies) == sorted(copied)
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_require_owned_folders():
+    """
+    存在しない・他ユーザーのフォルダを指定した場合に404となることのテスト
+    """
+    owner = _headers()
+    other = _headers()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        source = await _folder(client, owner, "Mine")
+        foreign = await _folder(client, other, "Theirs")
+
+        to_foreign = await client.post(
+            f"/api/v1/folders/{source}:moveThreads",
+            json={"targetFolderId": foreign},
+            headers=owner,
+        )
+        missing = await client.post(
+            f"/api/v1/folders/{source}:copyThreads",
+            json={"targetFolderId": "missing-folder"},
+            headers=owner,
+        )
+        not_owner = await client.post(f"/api/v1/folders/{source}:empty", headers=other)
+
+    assert to_foreign.status_code == 404
+    assert missing.status_code == 404
+    assert not_owner.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_write_behind_bulk_operations():
+    """
+    ライトビハインド実装でも一括操作がメモリ上で反映されることのテスト
+    """
+    user_id = f"bulk-{new_uuid()}"
+    store = WriteBehindStore(flush_interval=60)
+    folders = WriteBehindFolderRepository(store)
+    threads = WriteBehindChatThreadRepository(store)
+    folder = await folders.create(
+        FolderCreate(name="Hybrid", type="chat"), user_id=user_id, email="b@x"
+    )
+    created = [
+        await threads.create(
+            ChatThreadCreate(
+                name=f"T{i}", prompt="p", temperature=0.1, folderId=folder.id
+            ),
+            user_id=user_id,
+            email="b@x",
+        )
+        for i in range(2)
+    ]
+
+    moved = await threads.move_to_folder(
+        folder.id, user_id=user_id, target_folder_id="other"
+    )
+    copied = await threads.copy_to_folder(
+        "other", user_id=user_id, target_folder_id=folder.id
+    )
+    deleted = await threads.delete_in_folder("other", user_id=user_id)
+
+    assert sorted(moved) == sorted(deleted) == sorted(t.id for t in created)
+    remaining = await threads.list(user_id)
+    assert sorted(t.id for t in remaining) == sorted(copied)
+    assert all(t.folder_id == folder.id for t in remaining)
+    await store.close()
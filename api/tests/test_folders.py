@@ -6,6 +6,8 @@
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.main import app
 
@@ -68,7 +70,7 @@ async def test_update_folder():
 
 
 @pytest.mark.asyncio
-async def test_list_folders():
+async def test_list_folders(isolated_db: async_sessionmaker[AsyncSession]):
     """
     フォルダ一覧取得のテスト
     """
@@ -92,7 +94,11 @@ async def test_list_folders():
         assert list_response.status_code == 200
         folders = list_response.json()
         assert isinstance(folders, list)
-        assert len(folders) >= 2
+        assert sorted(f["name"] for f in folders) == ["Folder 1", "Folder 2"]
+
+    async with isolated_db() as session:
+        count = await session.execute(text("SELECT COUNT(*) FROM folders"))
+        assert count.scalar_one() == 2
 
 
 @pytest.mark.asyncio
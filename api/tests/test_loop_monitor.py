@@ -0,0 +1,60 @@
+"""
+イベントループ遅延モニタのテスト
+
+このモジュールはループ遅延の計測とブロッキング検出のテストを提供します。
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopMonitor
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_attributed_to_route(caplog: pytest.LogCaptureFixture):
+    """
+    ループをブロックした処理がルートとスタック付きで報告されることのテスト
+    """
+    caplog.set_level(logging.WARNING, logger="app.core.loop_monitor")
+    monitor = LoopMonitor(interval=0.02, stall_threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    monitor.track({"type": "http", "path": "/api/v1/blocking"})
+    time.sleep(0.3)
+    monitor.untrack()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.max_lag >= 0.2
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(
+        "/api/v1/blocking" in m and "test_blocking_call_is_attributed_to_route" in m
+        for m in messages
+    )
+
+
+@pytest.mark.asyncio
+async def test_stack_dumps_are_rate_limited(caplog: pytest.LogCaptureFixture):
+    """
+    間隔内に繰り返した停止はスタックを出力せず、次の報告で件数が示されることのテスト
+    """
+    caplog.set_level(logging.WARNING, logger="app.core.loop_monitor")
+    monitor = LoopMonitor(interval=0.02, stall_threshold=0.05, stack_log_interval=60)
+    monitor.start()
+    for _ in range(3):
+        await asyncio.sleep(0.05)
+        time.sleep(0.15)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    reports = [r.getMessage() for r in caplog.records]
+    assert len(reports) == 1
+    assert "(0 stalls not logged" in reports[0]
+
+    monitor.stack_log_interval = 0
+    monitor._report(0.1)  # pyright: ignore[reportPrivateUsage]
+    assert "(2 stalls not logged" in caplog.records[-1].getMessage()
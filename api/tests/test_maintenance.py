@@ -0,0 +1,173 @@
+"""
+SQLiteメンテナンスのテスト
+
+このモジュールはメンテナンスタスクの実行、負荷による先送り、
+管理エンドポイントの権限のテストを提供します。
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import maintenance
+from app.core.config import settings
+from app.core.db import create_engine
+from app.core.loop_monitor import get_loop_monitor
+from app.core.maintenance import MaintenanceScheduler
+from app.main import app
+
+
+@pytest.fixture
+async def fragmented(tmp_path: Path) -> AsyncGenerator[AsyncEngine, None]:
+    """削除により空きページが残った auto_vacuum=INCREMENTAL のDBのフィクスチャ"""
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/maintenance.db")
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        await conn.exec_driver_sql("VACUUM")
+        await conn.exec_driver_sql("CREATE TABLE blobs (id INTEGER PRIMARY KEY, b)")
+        await conn.exec_driver_sql(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n"
+            " WHERE i < 200) INSERT INTO blobs (b) SELECT randomblob(4000) FROM n"
+        )
+        await conn.exec_driver_sql("DELETE FROM blobs")
+    yield engine
+    await engine.dispose()
+
+
+async def _freelist(engine: AsyncEngine) -> int:
+    """空きページ数を取得する"""
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql("PRAGMA freelist_count")
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_tasks_reclaim_pages_and_record_status(
+    fragmented: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    各タスクが実行され、回収したページ数と実行状況が記録されることのテスト
+    """
+    monkeypatch.setattr(settings, "maintenance_vacuum_step_pages", 16)
+    monkeypatch.setattr(maintenance, "is_busy", lambda: False)
+    scheduler = MaintenanceScheduler({"main": fragmented})
+    free = await _freelist(fragmented)
+    assert free > 100
+
+    # 最後の接続を閉じた際の自動チェックポイントでWALが消えないよう接続を保持する
+    async with fragmented.connect():
+        vacuum = await scheduler.run("main", "incremental_vacuum")
+        checkpoint = await scheduler.run("main", "checkpoint")
+        optimize = await scheduler.run("main", "optimize")
+
+    assert vacuum.last_pages == free
+    assert await _freelist(fragmented) == 0
+    assert checkpoint.last_pages > 0
+    for status in (vacuum, checkpoint, optimize):
+        assert status.runs == 1
+        assert status.last_run is not None
+        assert status.last_error is None
+    async with fragmented.connect() as conn:
+        result = await conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        assert result.scalar_one() == 1
+
+
+@pytest.mark.asyncio
+async def test_due_tasks_are_deferred_while_busy(
+    fragmented: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    負荷が高い間は先送りし、最大先送り時間を超えたら実行することのテスト
+    """
+    monkeypatch.setattr(maintenance, "is_busy", lambda: True)
+    monkeypatch.setattr(settings, "maintenance_vacuum_step_pages", 16)
+    monkeypatch.setattr(settings, "maintenance_max_defer", 100.0)
+    for name in ("checkpoint", "optimize", "vacuum", "prune"):
+        monkeypatch.setattr(settings, f"maintenance_{name}_interval", 10.0)
+    scheduler = MaintenanceScheduler({"main": fragmented})
+    due = max(scheduler._due.values())  # pyright: ignore[reportPrivateUsage]
+
+    await scheduler.run_due(now=due)
+    assert all(s.runs == 0 and s.deferrals == 1 for s in scheduler.status())
+
+    await scheduler.run_due(now=due + 100.0)
+    statuses = {s.task: s for s in scheduler.status()}
+    assert all(s.runs == 1 for s in statuses.values())
+    # 負荷が高いためバキュームは1ステップで中断する
+    assert statuses["incremental_vacuum"].last_pages == 16
+    assert await _freelist(fragmented) > 0
+
+
+def test_loop_lag_counts_only_when_monitored(monkeypatch: pytest.MonkeyPatch):
+    """
+    ループ遅延モニタが有効な場合のみ、ループの遅延で負荷が高いと判定することのテスト
+    """
+    monkeypatch.setattr(get_loop_monitor(), "last_lag", 10.0)
+    monkeypatch.setattr(settings, "loop_monitor_enabled", False)
+    assert not maintenance.is_busy()
+    monkeypatch.setattr(settings, "loop_monitor_enabled", True)
+    assert maintenance.is_busy()
+
+
+@pytest.mark.asyncio
+async def test_loop_logs_failures_and_keeps_running(
+    fragmented: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    """
+    スケジューラの実行が失敗してもログに出力して次の間隔で再試行することのテスト
+    """
+    monkeypatch.setattr(settings, "maintenance_tick", 0.01)
+    scheduler = MaintenanceScheduler({"main": fragmented})
+    calls: list[float | None] = []
+
+    async def failing_run_due(now: float | None = None) -> None:
+        calls.append(now)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(scheduler, "run_due", failing_run_due)
+    scheduler.start()
+    try:
+        async with asyncio.timeout(1.0):
+            while len(calls) < 2:
+                await asyncio.sleep(0.01)
+    finally:
+        await scheduler.stop()
+    assert "maintenance run failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_endpoints_require_admin(monkeypatch: pytest.MonkeyPatch):
+    """
+    管理者トークンがない場合はメンテナンスを参照・実行できないことのテスト
+    """
+    monkeypatch.setattr(settings, "debug", False)
+    monkeypatch.setattr(settings, "admin_token", "test-admin-token")
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        denied = await client.post("/api/v1/maintenance/checkpoint/run")
+        run = await client.post(
+            "/api/v1/maintenance/checkpoint/run",
+            headers={"X-Admin-Token": "test-admin-token"},
+        )
+        listed = await client.get(
+            "/api/v1/maintenance", headers={"X-Admin-Token": "test-admin-token"}
+        )
+
+    assert denied.status_code == 403
+    assert run.status_code == 200
+    assert run.json()["runs"] >= 1
+    assert {(s["database"], s["task"]) for s in listed.json()} >= {
+        ("main", "checkpoint"),
+        ("main", "optimize"),
+        ("main", "incremental_vacuum"),
+    }
@@ -0,0 +1,89 @@
+"""
+メトリクスエンドポイントのテスト
+
+このモジュールはPrometheusメトリクスの出力と計測のテストを提供します。
+"""
+
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.db import create_engine
+from app.core.metrics import DB_STATEMENT_DURATION, Histogram, record_cache
+from app.main import app
+
+AUTH_HEADERS = {"X-User-Id": "metrics-user", "X-User-Email": "metrics@example.com"}
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    ヒストグラムが累積バケットとして出力されることのテスト
+    """
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    histogram.labels("/a").observe(0.05)
+    histogram.labels("/a").observe(0.5)
+    histogram.labels("/a").observe(5.0)
+
+    lines = histogram.render().splitlines()
+
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_route_and_db_statistics():
+    """
+    ルート別レイテンシとSQL実行統計が出力されることのテスト
+    """
+    record_cache("test_cache", True)
+    record_cache("test_cache", False)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.get("/api/v1/folders", headers=AUTH_HEADERS)
+        await client.get("/api/v1/folders/missing-folder", headers=AUTH_HEADERS)
+        response = await client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/folders",status="200"}'
+    ) in body
+    # パスパラメータはテンプレートのまま集約する
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/folders/{folder_id}",status="404"}'
+    ) in body
+    assert 'http_requests_in_flight{method="GET"} 1' in body
+    database = Path(make_url(settings.db_uri).database or "").name
+    assert (
+        f'db_statement_duration_seconds_count{{database="{database}",verb="SELECT"}}'
+        in body
+    )
+    assert "db_connections_opened_total" in body
+    assert 'cache_hit_ratio{cache="test_cache"} 0.5' in body
+
+
+@pytest.mark.asyncio
+async def test_failed_statements_are_not_timed(tmp_path: Path):
+    """
+    失敗したSQLは計測されず、後続のSQLの計測に影響しないことのテスト
+    """
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/metrics.db")
+    series = DB_STATEMENT_DURATION.labels("metrics.db", "SELECT")
+    try:
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.exec_driver_sql("SELECT * FROM no_such_table")
+            await conn.exec_driver_sql("SELECT 1")
+    finally:
+        await engine.dispose()
+    assert sum(series.counts) == 1
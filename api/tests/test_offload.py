@@ -0,0 +1,73 @@
+"""
+CPU処理オフロードのテスト
+
+このモジュールは大きなペイロードのオフロード時も応答が変わらないことのテストを提供します。
+"""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core import offload
+from app.core.config import settings
+from app.core.ids import new_uuid
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_offloaded_responses_match_inline(monkeypatch: pytest.MonkeyPatch):
+    """
+    閾値を超えたドキュメントと一覧ページがスレッドプールで処理され、
+    インライン処理と同じ応答を返すことのテスト
+    """
+    # 前回までの実行で作成したスレッドが閾値に数えられないようユーザーを分ける
+    auth_headers = {
+        "X-User-Id": f"offload-{new_uuid()}",
+        "X-User-Email": "offload@example.com",
+    }
+    calls: list[str] = []
+    original = offload.run_off_loop
+
+    async def counting_run_off_loop(func, *args, **kwargs):
+        calls.append(func.__name__)
+        return await original(func, *args, **kwargs)
+
+    monkeypatch.setattr(offload, "run_off_loop", counting_run_off_loop)
+    monkeypatch.setattr("app.repositories.sqlite.run_off_loop", counting_run_off_loop)
+    monkeypatch.setattr(settings, "offload_enabled", True)
+    large_prompt = "x" * 2048
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        folder = await client.post(
+            "/api/v1/folders",
+            json={"name": "Offload", "type": "chat"},
+            headers=auth_headers,
+        )
+        for i in range(3):
+            await client.post(
+                "/api/v1/chat-threads",
+                json={
+                    "name": f"Thread {i}",
+                    "prompt": large_prompt,
+                    "temperature": 0.5,
+                    "folderId": folder.json()["id"],
+                },
+                headers=auth_headers,
+            )
+        inline = await client.get("/api/v1/chat-threads", headers=auth_headers)
+        assert calls == []
+
+        monkeypatch.setattr(settings, "offload_min_bytes", 1024)
+        monkeypatch.setattr(settings, "offload_min_rows", 3)
+        offloaded = await client.get("/api/v1/chat-threads", headers=auth_headers)
+        thread_id = offloaded.json()[0]["id"]
+        single = await client.get(
+            f"/api/v1/chat-threads/{thread_id}", headers=auth_headers
+        )
+
+    assert offloaded.status_code == 200
+    assert offloaded.headers["content-type"] == "application/json"
+    assert offloaded.json() == inline.json()
+    assert single.json()["prompt"] == large_prompt
+    assert calls == ["_load_all", "dump_json", "_load"]
@@ -0,0 +1,92 @@
+"""
+リクエストプロファイラのテスト
+
+このモジュールはプロファイリングの許可判定と結果のダウンロードのテストを提供します。
+"""
+
+import pstats
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import app
+
+AUTH_HEADERS = {"X-User-Id": "profile-user", "X-User-Email": "profile@example.com"}
+ADMIN_TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def profiling(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """管理者トークンとプロファイル保存先を設定するフィクスチャ"""
+    monkeypatch.setattr(settings, "debug", False)
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_profiled_request_is_downloadable(profiling: Path):
+    """
+    管理者トークン付きのリクエストがプロファイリングされダウンロードできることのテスト
+    """
+    headers = {**AUTH_HEADERS, "X-Profile": "1", "X-Admin-Token": ADMIN_TOKEN}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/api/v1/chat-threads", headers=headers)
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        stats = await client.get(
+            f"/api/v1/profiles/{profile_id}/pstats",
+            headers={"X-Admin-Token": ADMIN_TOKEN},
+        )
+        folded = await client.get(
+            f"/api/v1/profiles/{profile_id}/folded",
+            headers={"X-Admin-Token": ADMIN_TOKEN},
+        )
+
+    assert stats.status_code == 200
+    assert folded.status_code == 200
+    saved = profiling / f"{profile_id}.pstats"
+    functions = {name for _, _, name in pstats.Stats(str(saved)).stats}  # pyright: ignore[reportAttributeAccessIssue]
+    assert "list_chat_threads" in functions
+
+
+@pytest.mark.asyncio
+async def test_profiling_requires_admin_token(profiling: Path):
+    """
+    管理者トークンがない場合はプロファイリングもダウンロードもできないことのテスト
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/api/v1/chat-threads", headers={**AUTH_HEADERS, "X-Profile": "1"}
+        )
+        download = await client.get(
+            "/api/v1/profiles/00000000-0000-0000-0000-000000000000/pstats"
+        )
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert download.status_code == 403
+    assert not list(profiling.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_non_ascii_admin_token_is_denied(profiling: Path):
+    """
+    ASCII以外の文字を含む管理者トークンがエラーにならず拒否されることのテスト
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        download = await client.get(
+            "/api/v1/profiles/00000000-0000-0000-0000-000000000000/pstats",
+            headers={"X-Admin-Token": "tést-admin-token".encode("latin-1")},
+        )
+
+    assert download.status_code == 403
@@ -0,0 +1,118 @@
+"""
+リポジトリのSQL文数とクエリプランのテスト
+
+このモジュールはSQLiteリポジトリの各操作が発行するSQL文数の上限と、
+一覧取得がインデックスを使用することのテストを提供します。
+"""
+
+import pytest
+
+from app.core.db import get_session_factory
+from app.core.ids import new_uuid
+from app.models.schemas import (
+    ChatThreadCreate,
+    ChatThreadUpdate,
+    FolderCreate,
+    FolderUpdate,
+)
+from app.repositories.base import RepositoryNotFoundError
+from app.repositories.sqlite import SQLiteChatThreadRepository, SQLiteFolderRepository
+from tests.sql_guard import SQLRecorder
+
+TEST_USER_ID = "query-budget-user"
+TEST_USER_EMAIL = "query-budget@example.com"
+
+
+@pytest.mark.asyncio
+async def test_folder_operations_stay_within_budget(sql_recorder: SQLRecorder):
+    """
+    フォルダ操作のSQL文数が上限内であることのテスト
+    """
+    async with get_session_factory()() as session:
+        repo = SQLiteFolderRepository(session)
+
+        with sql_recorder.budget(1, exact=True):
+            folder = await repo.create(
+                FolderCreate(name="Budget", type="chat"),
+                user_id=TEST_USER_ID,
+                email=TEST_USER_EMAIL,
+            )
+        with sql_recorder.budget(1, exact=True):
+            assert (await repo.get(folder.id)).name == "Budget"
+        with sql_recorder.budget(1):
+            updated = await repo.update(folder.id, FolderUpdate(name="Renamed"))
+        assert updated.name == "Renamed"
+        assert updated.type == "chat"
+        with sql_recorder.budget(1, exact=True):
+            assert folder.id in [f.id for f in await repo.list(TEST_USER_ID)]
+        with sql_recorder.budget(1, exact=True):
+            await repo.delete(folder.id)
+        with sql_recorder.budget(1), pytest.raises(RepositoryNotFoundError):
+            await repo.delete(folder.id)
+
+
+@pytest.mark.asyncio
+async def test_chat_thread_operations_stay_within_budget(sql_recorder: SQLRecorder):
+    """
+    チャットスレッド操作のSQL文数が上限内であることのテスト
+    """
+    async with get_session_factory()() as session:
+        repo = SQLiteChatThreadRepository(session)
+
+        thread = await repo.create(
+            ChatThreadCreate(
+                name="Budget", prompt="p", temperature=0.2, folderId="budget-folder"
+            ),
+            user_id=TEST_USER_ID,
+            email=TEST_USER_EMAIL,
+        )
+        with sql_recorder.budget(1, exact=True):
+            assert (await repo.get(thread.id)).prompt == "p"
+        with sql_recorder.budget(1):
+            updated = await repo.update(
+                thread.id, ChatThreadUpdate(isShared=True, temperature=0.9)
+            )
+        assert updated.is_shared is True
+        assert updated.temperature == 0.9
+        assert updated.name == "Budget"
+        with sql_recorder.budget(1, exact=True):
+            listed = await repo.list(TEST_USER_ID, folder_id="budget-folder")
+        assert [t.id for t in listed] == [thread.id]
+        with sql_recorder.budget(1), pytest.raises(RepositoryNotFoundError):
+            await repo.update("missing-id", ChatThreadUpdate(name="x"))
+        await repo.delete(thread.id)
+
+
+@pytest.mark.asyncio
+async def test_bulk_folder_operations_are_set_based(sql_recorder: SQLRecorder):
+    """
+    フォルダ単位の一括操作がスレッド数に関係なく一定のSQL文数で済むことのテスト
+    """
+    user_id = f"query-budget-{new_uuid()}"
+    async with get_session_factory()() as session:
+        repo = SQLiteChatThreadRepository(session)
+        for i in range(5):
+            await repo.create(
+                ChatThreadCreate(
+                    name=f"Bulk {i}", prompt="p", temperature=0.2, folderId="bulk-a"
+                ),
+                user_id=user_id,
+                email=TEST_USER_EMAIL,
+            )
+
+        with sql_recorder.budget(1, exact=True):
+            moved = await repo.move_to_folder(
+                "bulk-a", user_id=user_id, target_folder_id="bulk-b"
+            )
+        with sql_recorder.budget(2, exact=True):
+            copied = await repo.copy_to_folder(
+                "bulk-b", user_id=user_id, target_folder_id="bulk-c"
+            )
+        with sql_recorder.budget(1, exact=True):
+            deleted = await repo.delete_in_folder("bulk-b", user_id=user_id)
+
+        assert len(moved) == len(copied) == 5
+        assert sorted(deleted) == sorted(moved)
+        remaining = await repo.list(user_id)
+        assert sorted(t.id for t in remaining) == sorted(copied)
+        await repo.delete_in_folder("bulk-c", user_id=user_id)
@@ -0,0 +1,157 @@
+"""
+準備状態の確認のテスト
+
+このモジュールは /ready のDB疎通確認の共有、負荷の指標による503応答、
+コネクションプールの使用率の判定のテストを提供します。
+"""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from app.core import readiness
+from app.core.config import settings
+from app.core.db import create_engine
+from app.core.readiness import ReadinessProbe
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_database_check_is_cached_and_shared(tmp_path: Path):
+    """
+    同時・間隔内のプローブがDBの疎通確認を1回にまとめることのテスト
+    """
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/ready.db")
+    pings = 0
+
+    def count(conn: Any, cursor: Any, statement: str, *args: Any) -> None:  # noqa: ARG001
+        nonlocal pings
+        pings += "sqlite_master" in statement
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    probe = ReadinessProbe({"main": engine}, interval=60)
+    try:
+        results = await asyncio.gather(*(probe.check() for _ in range(5)))
+        assert pings == 1
+        assert all(r.status == "ready" for r in results)
+        assert results[0].databases[0].ok
+
+        await probe.check()
+        assert pings == 1
+
+        fresh = ReadinessProbe({"main": engine}, interval=0)
+        await fresh.check()
+        await fresh.check()
+        assert pings == 3
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_returns_503_past_limits(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    DBに疎通できない場合や指標が上限を超えた場合に503と理由が返ることのテスト
+    """
+    healthy = create_engine(f"sqlite+aiosqlite:///{tmp_path}/ready.db")
+    broken = create_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/ready.db")
+    monkeypatch.setattr(readiness, "_probe", ReadinessProbe({"main": healthy}))
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            ok = await client.get("/api/v1/ready")
+            assert ok.status_code == 200
+            assert ok.headers["cache-control"] == "no-store"
+            body = ok.json()
+            assert body["status"] == "ready"
+            assert body["reasons"] == []
+            assert body["databases"][0]["database"] == "main"
+            assert body["loopLagSeconds"] is None
+            assert body["writeQueueDepth"] == 0
+
+            # ループ遅延モニタが無効の間は遅延を計測しないため判定しない
+            monkeypatch.setattr(settings, "ready_max_loop_lag", -1.0)
+            assert (await client.get("/api/v1/ready")).status_code == 200
+            monkeypatch.setattr(settings, "loop_monitor_enabled", True)
+            lagging = await client.get("/api/v1/ready")
+            assert lagging.status_code == 503
+            assert lagging.json()["reasons"] == ["loop_lag"]
+            monkeypatch.undo()
+
+            monkeypatch.setattr(
+                readiness, "_probe", ReadinessProbe({"main": broken}, interval=0)
+            )
+            down = await client.get("/api/v1/ready")
+            assert down.status_code == 503
+            body = down.json()
+            assert body["reasons"] == ["database_unreachable:main"]
+            assert body["databases"][0]["error"]
+    finally:
+        await healthy.dispose()
+        await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_check_reads_file_and_takes_write_lock(tmp_path: Path):
+    """
+    DBファイルを読めない場合は疎通失敗、書き込みロックを取得できない場合は
+    未準備と判定されることのテスト
+    """
+    path = tmp_path / "ready.db"
+    engine = create_engine(f"sqlite+aiosqlite:///{path}")
+    probe = ReadinessProbe({"main": engine}, interval=0, write_lock_timeout=0.01)
+    try:
+        healthy = await probe.check()
+        assert healthy.status == "ready"
+        assert healthy.databases[0].write_lock_ms is not None
+
+        # 他の接続が書き込みロックを保持している間は書き込めない
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+        try:
+            locked = await probe.check()
+        finally:
+            holder.execute("ROLLBACK")
+            holder.close()
+        assert locked.reasons == ["write_locked:main"]
+        assert locked.databases[0].ok
+        assert locked.databases[0].write_error == "database is locked"
+        assert (await probe.check()).status == "ready"
+
+        # SELECT 1 では検出できない、DBファイルとして読めない状態
+        await engine.dispose()
+        path.write_bytes(b"not a database" * 512)
+        broken = await probe.check()
+        assert broken.reasons == ["database_unreachable:main"]
+        assert "not a database" in (broken.databases[0].error or "")
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_saturation(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    プールの使用率が上限を超えた場合に未準備と判定されることのテスト
+    """
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/ready.db", pool_size=2)
+    probe = ReadinessProbe({"shard0": engine}, interval=60)
+    monkeypatch.setattr(settings, "ready_max_pool_utilization", 0.5)
+    try:
+        assert (await probe.check()).status == "ready"
+
+        async with engine.connect(), engine.connect():
+            result = await probe.check()
+            assert result.pools[0].checked_out == 2
+            assert result.pools[0].utilization == 1.0
+            assert result.reasons == ["pool_saturated:shard0"]
+
+        assert (await probe.check()).status == "ready"
+    finally:
+        await engine.dispose()
@@ -0,0 +1,52 @@
+"""
+Server-Timingヘッダーのテスト
+
+このモジュールはリクエスト処理時間の内訳出力のテストを提供します。
+"""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import app
+
+AUTH_HEADERS = {"X-User-Id": "timing-user", "X-User-Email": "timing@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_phases(monkeypatch: pytest.MonkeyPatch):
+    """
+    有効時にフェーズ別の処理時間がヘッダーに出力されることのテスト
+    """
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        create_response = await client.post(
+            "/api/v1/folders",
+            json={"name": "Timing", "type": "chat"},
+            headers=AUTH_HEADERS,
+        )
+        assert "encode;dur=" in create_response.headers["server-timing"]
+
+        response = await client.get("/api/v1/folders", headers=AUTH_HEADERS)
+
+    assert response.status_code == 200
+    phases = {
+        entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")
+    }
+    assert {"db", "decode", "validate", "response", "total"} <= phases
+
+
+@pytest.mark.asyncio
+async def test_server_timing_disabled_by_default():
+    """
+    無効時はヘッダーが出力されないことのテスト
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/api/v1/folders", headers=AUTH_HEADERS)
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
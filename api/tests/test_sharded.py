@@ -0,0 +1,86 @@
+"""
+シャーディングリポジトリのテスト
+
+このモジュールはユーザーIDによるシャード振り分けとIDからのシャード特定のテストを提供します。
+"""
+
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.core.shards import ShardSet, new_shard_id, shard_for_user, shard_of_id
+from app.models.schemas import ChatThreadCreate, FolderCreate, FolderUpdate
+from app.repositories.base import RepositoryNotFoundError
+from app.repositories.sharded import (
+    ShardedBootstrapRepository,
+    ShardedChatThreadRepository,
+    ShardedFolderRepository,
+)
+
+
+def test_shard_for_user_is_stable_and_in_range():
+    """
+    シャード番号が安定しており範囲内であることのテスト
+    """
+    assert shard_for_user("user-a", 4) == shard_for_user("user-a", 4)
+    assert {shard_for_user(f"user-{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_shard_is_embedded_in_id():
+    """
+    生成したIDからシャード番号を取得でき、UUID形式でないIDはNoneになることのテスト
+    """
+    assert [shard_of_id(new_shard_id(shard)) for shard in (0, 3, 0xFFFF)] == [
+        0,
+        3,
+        0xFFFF,
+    ]
+    assert new_shard_id(1) != new_shard_id(1)
+    assert shard_of_id("not-a-uuid") is None
+
+
+@pytest.mark.asyncio
+async def test_user_data_lives_on_one_shard(migrated_shards: ShardSet):
+    """
+    ユーザーのデータが単一シャードに格納され、IDで参照できることのテスト
+    """
+    shards = migrated_shards
+    folders = ShardedFolderRepository(shards)
+    threads = ShardedChatThreadRepository(shards)
+    user_id = "sharded-user"
+    home = shards.shard_for_user(user_id)
+
+    folder = await folders.create(
+        FolderCreate(name="Sharded", type="chat"), user_id=user_id, email="s@e.com"
+    )
+    thread = await threads.create(
+        ChatThreadCreate(name="T", prompt="p", temperature=0.5, folderId=folder.id),
+        user_id=user_id,
+        email="s@e.com",
+    )
+
+    for shard in range(shards.shard_count):
+        async with shards.session(shard) as session:
+            count = (
+                await session.execute(text("SELECT COUNT(*) FROM chat_threads"))
+            ).scalar_one()
+        assert count == (1 if shard == home else 0)
+
+    assert shards.shard_for_id(folder.id) == shards.shard_for_id(thread.id) == home
+    assert (await threads.get(thread.id)).name == "T"
+    updated = await folders.update(folder.id, FolderUpdate(name="Renamed"))
+    assert updated.name == "Renamed"
+    assert [f.id for f in await folders.list(user_id)] == [folder.id]
+    [sidebar], _, unfiled_count = await ShardedBootstrapRepository(shards).sidebar(
+        user_id
+    )
+    assert json.loads(sidebar)["threads"][0]["id"] == thread.id
+    assert unfiled_count == 0
+
+    await threads.delete(thread.id)
+    with pytest.raises(RepositoryNotFoundError):
+        await threads.get(thread.id)
+    # シャード数を超える番号のIDは参照先がない
+    with pytest.raises(RepositoryNotFoundError):
+        await folders.get(new_shard_id(shards.shard_count))
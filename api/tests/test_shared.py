@@ -0,0 +1,129 @@
+"""
+共有スレッドエンドポイントのテスト
+
+このモジュールは共有スレッドの公開、応答キャッシュと無効化、
+条件付きリクエストのテストを提供します。
+"""
+
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.ids import new_uuid
+from app.core.shared_cache import SharedThreadCache
+from app.main import app
+from tests.sql_guard import SQLRecorder
+
+
+@pytest.mark.asyncio
+async def test_shared_thread_is_cached_and_invalidated(sql_recorder: SQLRecorder):
+    """
+    共有スレッドがキャッシュから返され、更新・共有解除で無効化されることのテスト
+    """
+    headers = {"X-User-Id": f"shared-{new_uuid()}", "X-User-Email": "s@example.com"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        created = await client.post(
+            "/api/v1/chat-threads",
+            json={
+                "name": "Viral",
+                "prompt": "p",
+                "temperature": 0.5,
+                "folderId": "f",
+                "isShared": True,
+            },
+            headers=headers,
+        )
+        thread_id = created.json()["id"]
+        url = f"/api/v1/shared/{thread_id}"
+
+        first = await client.get(url)
+        with sql_recorder.budget(0, exact=True):
+            second = await client.get(url)
+            not_modified = await client.get(
+                url, headers={"If-None-Match": first.headers["ETag"]}
+            )
+
+        await client.put(
+            f"/api/v1/chat-threads/{thread_id}",
+            json={"name": "Renamed"},
+            headers=headers,
+        )
+        renamed = await client.get(url)
+        await client.put(
+            f"/api/v1/chat-threads/{thread_id}",
+            json={"isShared": False},
+            headers=headers,
+        )
+        unshared = await client.get(url)
+
+    assert first.status_code == 200
+    assert first.json()["name"] == "Viral"
+    assert not {"userId", "email", "folderId"} & set(first.json())
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    assert renamed.json()["name"] == "Renamed"
+    assert renamed.headers["ETag"] != first.headers["ETag"]
+    assert unshared.status_code == 404
+    assert unshared.headers["Cache-Control"] == "no-store"
+
+
+@pytest.mark.asyncio
+async def test_private_thread_is_not_public():
+    """
+    共有されていないスレッドは404となることのテスト
+    """
+    headers = {"X-User-Id": f"shared-{new_uuid()}", "X-User-Email": "s@example.com"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        created = await client.post(
+            "/api/v1/chat-threads",
+            json={
+                "name": "Private",
+                "prompt": "p",
+                "temperature": 0.5,
+                "folderId": "f",
+            },
+            headers=headers,
+        )
+        response = await client.get(f"/api/v1/shared/{created.json()['id']}")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_cached():
+    """
+    読み込み中に無効化された場合、古い読み込み結果がキャッシュされないことのテスト
+    """
+    cache = SharedThreadCache(max_entries=10, ttl=60)
+    started = asyncio.Event()
+    release = asyncio.Event()
+    loads: list[str] = []
+
+    async def slow_load() -> str | None:
+        loads.append("slow")
+        started.set()
+        await release.wait()
+        return '{"name":"old"}'
+
+    async def load() -> str | None:
+        loads.append("fresh")
+        return '{"name":"new"}'
+
+    pending = asyncio.create_task(cache.get("t", slow_load))
+    await started.wait()
+    cache.invalidate(["t"])
+    release.set()
+    assert (await pending).body == b'{"name":"old"}'
+
+    assert (await cache.get("t", load)).body == b'{"name":"new"}'
+    assert (await cache.get("t", load)).body == b'{"name":"new"}'
+    assert loads == ["slow", "fresh"]
@@ -0,0 +1,135 @@
+"""
+スロークエリログのテスト
+
+このモジュールはスロークエリの検出とEXPLAIN QUERY PLANの取得のテストを提供します。
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core import db
+from app.core.config import settings
+from app.repositories.base import RepositoryNotFoundError
+from app.repositories.sqlite import SQLiteFolderRepository
+
+
+@pytest.fixture(autouse=True)
+def _plans(monkeypatch: pytest.MonkeyPatch) -> None:
+    """プランのキャッシュを空にし、未取得のSQL文のプランを必ず取得させる"""
+    monkeypatch.setattr(db, "_plans", OrderedDict())
+    monkeypatch.setattr(settings, "slow_query_explain_sample_rate", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logs_caller_and_params(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    """
+    閾値を超えたSQLが呼び出し元とバインドパラメータとともにログ出力されることのテスト
+    """
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 1e-6)
+    caplog.set_level(logging.WARNING, logger="app.core.db")
+
+    # 初回はプランの取得をバックグラウンドへ依頼し、2回目のログに含める
+    for _ in range(2):
+        async with db.get_session_factory()() as session:
+            await SQLiteFolderRepository(session).list("slow-query-user")
+        await asyncio.to_thread(db.wait_for_query_plans)
+
+    slow = [r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()]
+    assert len(slow) == 2
+    assert "SQLiteFolderRepository.list" in slow[1]
+    assert "slow-query-user" in slow[1]
+    assert "plan=[n/a]" in slow[0]
+    assert "ix_folders_user_id" in slow[1]
+    assert "[SCAN]" not in slow[1]
+
+
+@pytest.mark.asyncio
+async def test_scan_plan_is_flagged(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    """
+    インデックスを使用できないSQLがSCANとして警告されることのテスト
+    """
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    caplog.set_level(logging.WARNING, logger="app.core.db")
+
+    async with db.get_session_factory()() as session:
+        await session.execute(
+            text("SELECT doc FROM folders WHERE json_extract(doc, '$.email') = :e"),
+            {"e": "nobody@example.com"},
+        )
+    await asyncio.to_thread(db.wait_for_query_plans)
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("Full scan in query plan" in m and "SCAN folders" in m for m in messages)
+
+
+@pytest.mark.asyncio
+async def test_indexed_lookup_is_not_flagged(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    """
+    主キー検索はSCANとして警告されないことのテスト
+    """
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    caplog.set_level(logging.WARNING, logger="app.core.db")
+
+    async with db.get_session_factory()() as session:
+        with pytest.raises(RepositoryNotFoundError):
+            await SQLiteFolderRepository(session).get("missing-id")
+    await asyncio.to_thread(db.wait_for_query_plans)
+
+    assert not caplog.records
+    plan = db._plans["SELECT doc FROM folders WHERE id = ?"]  # pyright: ignore[reportPrivateUsage]
+    assert not plan.has_scan
+
+
+@pytest.mark.asyncio
+async def test_plans_are_not_fetched_unsampled_and_evicted_lru(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    サンプリングされないSQL文はプランを取得せず、キャッシュは最も長く参照されて
+    いないものから削除されることのテスト
+    """
+    monkeypatch.setattr(settings, "slow_query_explain_sample_rate", 0)
+    async with db.get_session_factory()() as session:
+        await session.execute(text("SELECT 1 FROM folders WHERE id = 'unsampled'"))
+    await asyncio.to_thread(db.wait_for_query_plans)
+    assert not db._plans  # pyright: ignore[reportPrivateUsage]
+
+    monkeypatch.setattr(db, "_PLAN_CACHE_SIZE", 2)
+    for statement in ("a", "b"):
+        db._store_plan(statement, db.QueryPlan([]))  # pyright: ignore[reportPrivateUsage]
+    assert db._cached_plan("a") is not None  # pyright: ignore[reportPrivateUsage]
+    db._store_plan("c", db.QueryPlan([]))  # pyright: ignore[reportPrivateUsage]
+    assert list(db._plans) == ["a", "c"]  # pyright: ignore[reportPrivateUsage]
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_leak_start_time(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    """
+    失敗したSQLの開始時刻が残らず、後続のSQLの計測に影響しないことのテスト
+    """
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 1e-6)
+    caplog.set_level(logging.WARNING, logger="app.core.db")
+
+    async with db.get_session_factory()() as session:
+        with pytest.raises(OperationalError):
+            await session.execute(text("SELECT * FROM no_such_table"))
+        assert not db._query_started  # pyright: ignore[reportPrivateUsage]
+        await session.execute(text("SELECT 1"))
+    assert not db._query_started  # pyright: ignore[reportPrivateUsage]
+
+    slow = [r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()]
+    assert [m for m in slow if "SELECT 1" in m]
+    assert not [m for m in slow if "no_such_table" in m]
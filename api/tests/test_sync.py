@@ -0,0 +1,186 @@
+"""
+差分同期エンドポイントのテスト
+
+このモジュールは変更・墓標の差分取得とページング、墓標の保持期間のテストを
+提供します。
+"""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core import maintenance
+from app.core.config import settings
+from app.core.ids import new_uuid
+from app.main import app
+from tests.sql_guard import SQLRecorder
+
+
+def _headers() -> dict[str, str]:
+    """テストごとに新しいユーザーの認証ヘッダーを作成する"""
+    return {"X-User-Id": f"sync-{new_uuid()}", "X-User-Email": "sync@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_only_changes_and_tombstones(sql_recorder: SQLRecorder):
+    """
+    前回のバージョン以降の作成・更新と削除の墓標のみが返ることのテスト
+    """
+    headers = _headers()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        folder = (
+            await client.post(
+                "/api/v1/folders", json={"name": "A", "type": "chat"}, headers=headers
+            )
+        ).json()
+        other = (
+            await client.post(
+                "/api/v1/folders", json={"name": "B", "type": "chat"}, headers=headers
+            )
+        ).json()
+        thread = (
+            await client.post(
+                "/api/v1/chat-threads",
+                json={
+                    "name": "T",
+                    "prompt": "p",
+                    "temperature": 0.5,
+                    "folderId": folder["id"],
+                },
+                headers=headers,
+            )
+        ).json()
+
+        full = (await client.get("/api/v1/sync", headers=headers)).json()
+        assert {f["id"] for f in full["folders"]} == {folder["id"], other["id"]}
+        assert [t["id"] for t in full["chatThreads"]] == [thread["id"]]
+        assert full["tombstones"] == []
+        assert full["hasMore"] is False
+
+        await client.put(
+            f"/api/v1/folders/{folder['id']}", json={"name": "A2"}, headers=headers
+        )
+        await client.delete(f"/api/v1/chat-threads/{thread['id']}", headers=headers)
+
+        with sql_recorder.budget(4, exact=True):
+            delta = (
+                await client.get(
+                    "/api/v1/sync", params={"since": full["version"]}, headers=headers
+                )
+            ).json()
+        assert [f["name"] for f in delta["folders"]] == ["A2"]
+        assert delta["chatThreads"] == []
+        assert [(t["entity"], t["id"]) for t in delta["tombstones"]] == [
+            ("chat_threads", thread["id"])
+        ]
+        assert delta["version"] > full["version"]
+
+        empty = (
+            await client.get(
+                "/api/v1/sync", params={"since": delta["version"]}, headers=headers
+            )
+        ).json()
+    assert empty["folders"] == empty["chatThreads"] == empty["tombstones"] == []
+    assert empty["version"] >= delta["version"]
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_by_version():
+    """
+    件数上限を超える変更がバージョン順にページングされることのテスト
+    """
+    headers = _headers()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        created = [
+            (
+                await client.post(
+                    "/api/v1/folders",
+                    json={"name": f"F{i}", "type": "chat"},
+                    headers=headers,
+                )
+            ).json()["id"]
+            for i in range(5)
+        ]
+
+        seen: list[str] = []
+        since = 0
+        while True:
+            page = (
+                await client.get(
+                    "/api/v1/sync",
+                    params={"since": since, "limit": 2},
+                    headers=headers,
+                )
+            ).json()
+            seen.extend(f["id"] for f in page["folders"])
+            since = page["version"]
+            if not page["hasMore"]:
+                break
+
+    assert seen == created
+
+
+@pytest.mark.asyncio
+async def test_sync_requires_resync_before_tombstone_horizon(
+    isolated_db: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+):
+    """
+    保持期間を過ぎた墓標が削除され、それより前の since には全件の再同期を
+    求めることのテスト
+    """
+    monkeypatch.setattr(settings, "tombstone_retention_seconds", 30 * 86400)
+    headers = _headers()
+    engine: AsyncEngine = isolated_db.kw["bind"]
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        ids = [
+            (
+                await client.post(
+                    "/api/v1/folders",
+                    json={"name": name, "type": "chat"},
+                    headers=headers,
+                )
+            ).json()["id"]
+            for name in ("A", "B", "C")
+        ]
+        synced = (await client.get("/api/v1/sync", headers=headers)).json()
+        for folder_id in ids[:2]:
+            await client.delete(f"/api/v1/folders/{folder_id}", headers=headers)
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "UPDATE tombstones SET deleted_at = datetime('now', '-31 days') "
+                    "WHERE entity_id = :id"
+                ),
+                {"id": ids[0]},
+            )
+        async with engine.connect() as conn:
+            assert await maintenance.prune_tombstones(conn, lambda: False) == 1
+
+        stale = (
+            await client.get(
+                "/api/v1/sync", params={"since": synced["version"]}, headers=headers
+            )
+        ).json()
+        assert stale["resyncRequired"] is True
+        assert stale["folders"] == stale["tombstones"] == []
+        assert (stale["version"], stale["hasMore"]) == (0, True)
+
+        full = (await client.get("/api/v1/sync", headers=headers)).json()
+        assert full["resyncRequired"] is False
+        assert [f["id"] for f in full["folders"]] == [ids[2]]
+        assert [t["id"] for t in full["tombstones"]] == [ids[1]]
+
+        horizon = full["tombstones"][0]["version"] - 1
+        delta = (
+            await client.get("/api/v1/sync", params={"since": horizon}, headers=headers)
+        ).json()
+        assert delta["resyncRequired"] is False
+        assert [t["id"] for t in delta["tombstones"]] == [ids[1]]
@@ -0,0 +1,119 @@
+"""
+ライトビハインドリポジトリのテスト
+
+このモジュールはメモリ優先リポジトリとSQLiteフラッシュのテストを提供します。
+"""
+
+import pytest
+
+from app.core.db import get_session_factory
+from app.models.schemas import ChatThreadCreate, ChatThreadUpdate, FolderCreate
+from app.repositories.base import RepositoryNotFoundError
+from app.repositories.sqlite import SQLiteChatThreadRepository
+from app.repositories.write_behind import (
+    WRITE_BEHIND_DIRTY,
+    WRITE_BEHIND_FLUSH_DURATION,
+    WriteBehindChatThreadRepository,
+    WriteBehindFolderRepository,
+    WriteBehindStore,
+)
+
+TEST_USER_ID = "write-behind-user"
+TEST_USER_EMAIL = "write-behind@example.com"
+
+
+@pytest.mark.asyncio
+async def test_writes_are_served_from_memory_until_flush():
+    """
+    フラッシュ前は書き込みがメモリからのみ読めることのテスト
+    """
+    store = WriteBehindStore(flush_interval=60)
+    folders = WriteBehindFolderRepository(store)
+    threads = WriteBehindChatThreadRepository(store)
+    flushes = sum(WRITE_BEHIND_FLUSH_DURATION.labels().counts)
+
+    folder = await folders.create(
+        FolderCreate(name="Hybrid", type="chat"),
+        user_id=TEST_USER_ID,
+        email=TEST_USER_EMAIL,
+    )
+    thread = await threads.create(
+        ChatThreadCreate(
+            name="Hybrid Thread", prompt="p", temperature=0.1, folderId=folder.id
+        ),
+        user_id=TEST_USER_ID,
+        email=TEST_USER_EMAIL,
+    )
+    updated = await threads.update(thread.id, ChatThreadUpdate(temperature=0.8))
+    assert updated.temperature == 0.8
+    assert store.stats().dirty_count == 2
+    assert WRITE_BEHIND_DIRTY.labels().value == 2
+
+    async with get_session_factory()() as session:
+        with pytest.raises(RepositoryNotFoundError):
+            await SQLiteChatThreadRepository(session).get(thread.id)
+
+    listed = await threads.list(TEST_USER_ID, folder_id=folder.id)
+    assert [t.id for t in listed] == [thread.id]
+
+    assert await store.flush() == 2
+    stats = store.stats()
+    assert stats.dirty_count == 0
+    assert stats.flush_count == 1
+    assert WRITE_BEHIND_DIRTY.labels().value == 0
+    assert sum(WRITE_BEHIND_FLUSH_DURATION.labels().counts) == flushes + 1
+
+    async with get_session_factory()() as session:
+        persisted = await SQLiteChatThreadRepository(session).get(thread.id)
+    assert persisted.temperature == 0.8
+
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_delete_is_flushed_and_hides_record():
+    """
+    削除がメモリ上で即時に反映され、フラッシュ後にSQLiteから消えることのテスト
+    """
+    store = WriteBehindStore(flush_interval=60)
+    folders = WriteBehindFolderRepository(store)
+
+    folder = await folders.create(
+        FolderCreate(name="To Delete", type="chat"),
+        user_id=TEST_USER_ID,
+        email=TEST_USER_EMAIL,
+    )
+    await store.flush()
+
+    await folders.delete(folder.id)
+    with pytest.raises(RepositoryNotFoundError):
+        await folders.get(folder.id)
+
+    await store.close()
+
+    reloaded = WriteBehindFolderRepository(WriteBehindStore(flush_interval=60))
+    with pytest.raises(RepositoryNotFoundError):
+        await reloaded.get(folder.id)
+    assert all(f.id != folder.id for f in await reloaded.list(TEST_USER_ID))
+
+
+@pytest.mark.asyncio
+async def test_max_dirty_forces_synchronous_flush():
+    """
+    ダーティ件数が上限に達すると書き込み側でフラッシュされることのテスト
+    """
+    store = WriteBehindStore(flush_interval=60, max_dirty=2)
+    folders = WriteBehindFolderRepository(store)
+
+    for i in range(2):
+        await folders.create(
+            FolderCreate(name=f"Folder {i}", type="chat"),
+            user_id=TEST_USER_ID,
+            email=TEST_USER_EMAIL,
+        )
+
+    stats = store.stats()
+    assert stats.dirty_count == 0
+    assert stats.flushed_records == 2
+
+    await store.close()